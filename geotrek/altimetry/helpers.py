@@ -1,19 +1,61 @@
+import hashlib
 import logging
+from contextlib import nullcontext
 
 from django.contrib.gis.geos import GEOSGeometry
 from django.utils import translation
 from django.utils.translation import gettext as _
 from django.contrib.gis.geos import LineString
 from django.conf import settings
+from django.core.cache import caches
 from django.db import connection
+from django.db.models import BinaryField, F, Func
+from django.db.models.functions import MD5
 
 import pygal
 from pygal.style import LightSolarizedStyle
 
+from .pyramid import DemPyramid
+
 logger = logging.getLogger(__name__)
 
 
 class AltimetryHelper:
+    PROFILES_VERSION_KEY = 'altimetry_profiles_version'
+
+    # Same computation as ``elevation_profile()`` for (Multi)LineStrings and Points:
+    # vertices distance from origin is measured on 2D parts, which start where the
+    # previous ones end for MultiLineStrings, vertices of lines are transformed to API
+    # SRID whereas points are kept in their own SRID.
+    ELEVATION_PROFILES_SQL = """
+        WITH objects (id, geom) AS ({objects}),
+             parts AS (
+                 SELECT objects.id, GeometryType(objects.geom) AS kind,
+                        COALESCE(dumped.path[1], 0) AS part, dumped.geom
+                 FROM objects, LATERAL ST_Dump(objects.geom) AS dumped
+                 WHERE GeometryType(objects.geom) IN ('POINT', 'LINESTRING', 'MULTILINESTRING')
+             ),
+             measured AS (
+                 SELECT id, kind, part, geom,
+                        CASE WHEN kind = 'MULTILINESTRING'
+                             THEN SUM(ST_Length(geom)) OVER (PARTITION BY id ORDER BY part)
+                             ELSE 0 END AS start
+                 FROM parts
+             )
+        SELECT measured.id,
+               measured.start + COALESCE(ST_M(points2dm.geom), 0),
+               ST_X(points3d.geom), ST_Y(points3d.geom), ST_Z(points3d.geom)
+        FROM measured,
+             LATERAL ST_DumpPoints(CASE WHEN measured.kind = 'POINT' THEN ST_Force2D(measured.geom)
+                                        ELSE ST_AddMeasure(ST_Force2D(measured.geom), 0, ST_Length(measured.geom))
+                                   END) AS points2dm,
+             LATERAL ST_DumpPoints(CASE WHEN measured.kind = 'POINT' THEN measured.geom
+                                        ELSE ST_Transform(measured.geom, %s)
+                                   END) AS points3d
+        WHERE points2dm.path = points3d.path
+        ORDER BY measured.id, measured.part, points2dm.path;
+    """
+
     @classmethod
     def elevation_profile(cls, geometry3d, precision=None, offset=0):
         """Extract elevation profile from a 3D geometry.
@@ -37,13 +79,13 @@ class AltimetryHelper:
         # Add measure to 2D version of geometry3d
         # Get distance from origin for each vertex
         sql = """
-        WITH line2d AS (SELECT ST_Force2D('%(ewkt)s'::geometry) AS geom),
+        WITH line2d AS (SELECT ST_Force2D(%s::geometry) AS geom),
              line_measure AS (SELECT ST_Addmeasure(geom, 0, ST_length(geom)) AS geom FROM line2d),
              points2dm AS (SELECT (ST_DumpPoints(geom)).geom AS point FROM line_measure)
-        SELECT (%(offset)s + ST_M(point)) FROM points2dm;
-        """ % {'offset': offset, 'ewkt': geometry3d.ewkt}
+        SELECT (%s + ST_M(point)) FROM points2dm;
+        """
         cursor = connection.cursor()
-        cursor.execute(sql)
+        cursor.execute(sql, [geometry3d.ewkt, offset])
         pointsm = cursor.fetchall()
         # Join (offset+distance, x, y, z) together
         geom3dapi = geometry3d.transform(settings.API_SRID, clone=True)
@@ -51,6 +93,74 @@ class AltimetryHelper:
         dxyz = [pointsm[i] + v for i, v in enumerate(geom3dapi.coords)]
         return dxyz
 
+    @classmethod
+    def elevation_profiles_version(cls):
+        return caches['fat'].get(cls.PROFILES_VERSION_KEY, 1)
+
+    @classmethod
+    def invalidate_elevation_profiles(cls):
+        """Drop all cached profiles, to be called when 3D geometries are recomputed
+        without updating objects (e.g. after loading a new DEM).
+        """
+        cache = caches['fat']
+        cache.set(cls.PROFILES_VERSION_KEY, cls.elevation_profiles_version() + 1, timeout=None)
+
+    @classmethod
+    def geometry_hash(cls, geometry):
+        """Hash of a 3D geometry, same as the one of ``geometry_hash_expression()``"""
+        return hashlib.md5(bytes(geometry.ewkb)).hexdigest()
+
+    @classmethod
+    def geometry_hash_expression(cls, field='geom_3d'):
+        """Hash of a 3D geometry computed in database"""
+        return MD5(Func(F(field), function='ST_AsEWKB', output_field=BinaryField()))
+
+    @classmethod
+    def elevation_profile_cache_key(cls, model, pk, date_update, geom_hash):
+        # Geometry may change without date_update being updated within a transaction
+        return 'altimetry_profile_{}_{}_{}_{}'.format(model._meta.label_lower, pk, date_update.timestamp(), geom_hash)
+
+    @classmethod
+    def elevation_profiles(cls, queryset):
+        """Extract elevation profiles of all objects of a queryset, in a single query.
+
+        Profiles are the same as ``elevation_profile()`` ones, and cached until
+        objects are updated. Return a dict of profiles by primary key, objects
+        without 3D geometry are left out.
+        """
+        model = queryset.model
+        cache = caches['fat']
+        version = cls.elevation_profiles_version()
+        rows = queryset.order_by().annotate(
+            geom_3d_hash=cls.geometry_hash_expression()
+        ).values_list('pk', 'date_update', 'geom_3d_hash')
+        keys = {
+            cls.elevation_profile_cache_key(model, pk, date_update, geom_hash): pk
+            for pk, date_update, geom_hash in rows
+        }
+        cached = cache.get_many(keys.keys(), version=version)
+        profiles = {keys[key]: profile for key, profile in cached.items()}
+        missing = set(keys.values()) - set(profiles)
+        if not missing:
+            return profiles
+
+        objects = model._base_manager.filter(pk__in=missing, geom_3d__isnull=False).order_by()
+        objects_sql, objects_params = objects.values_list('pk', 'geom_3d').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(cls.ELEVATION_PROFILES_SQL.format(objects=objects_sql),
+                           list(objects_params) + [settings.API_SRID])
+            computed = {}
+            for pk, distance, x, y, z in cursor.fetchall():
+                computed.setdefault(pk, []).append([distance, x, y, z])
+        # Other geometry types are not handled by the query
+        if missing - set(computed):
+            for obj in objects.exclude(pk__in=list(computed)):
+                computed[obj.pk] = cls.elevation_profile(obj.geom_3d)
+
+        cache.set_many({key: computed[pk] for key, pk in keys.items() if pk in computed}, version=version)
+        profiles.update(computed)
+        return profiles
+
     @classmethod
     def altimetry_limits(cls, profile):
         elevations = [int(v[3]) for v in profile]
@@ -89,17 +199,16 @@ class AltimetryHelper:
         style.colors = (settings.ALTIMETRIC_PROFILE_COLOR,)
         style.font_family = settings.ALTIMETRIC_PROFILE_FONT
         line_chart = pygal.XY(fill=True, style=style, **config)
-        if language:
-            translation.activate(language)
-        line_chart.x_title = _("Distance (m)")
-        line_chart.y_title = _("Altitude (m)")
+        # Do not change language of the caller, which may render other documents
+        with translation.override(language) if language else nullcontext():
+            line_chart.x_title = _("Distance (m)")
+            line_chart.y_title = _("Altitude (m)")
+            line_chart.no_data_text = _("Altimetry data not available")
         line_chart.show_minor_x_labels = False
         line_chart.x_labels_major_count = 5
         line_chart.show_minor_y_labels = False
         line_chart.truncate_label = 50
         line_chart.range = [floor_elevation, ceil_elevation]
-        line_chart.no_data_text = _("Altimetry data not available")
-        translation.deactivate()
         line_chart.add('', [(int(v[0]), int(v[3])) for v in profile])
         return line_chart.render()
 
@@ -126,19 +235,9 @@ class AltimetryHelper:
         return (xmin, ymin, xmax, ymax)
 
     @classmethod
-    def elevation_area(cls, geom):
-        xmin, ymin, xmax, ymax = cls._nice_extent(geom)
-        width = xmax - xmin
-        height = ymax - ymin
-        precision = settings.ALTIMETRIC_PROFILE_PRECISION
-        max_resolution = settings.ALTIMETRIC_AREA_MAX_RESOLUTION
-        if width / precision > max_resolution:
-            precision = int(width / max_resolution)
-        if height / precision > 10000:
-            precision = int(width / max_resolution)
-        if height < precision or width < precision:
-            precision = min([height, width])
-
+    def _elevation_grid(cls, xmin, ymin, xmax, ymax, precision):
+        """Sample DEM on a regular grid in database, return None if there is no elevation in the area.
+        """
         sql = """
             -- Author: Celian Garcia
             WITH columns AS (
@@ -195,17 +294,41 @@ class AltimetryHelper:
         envelop_native = GEOSGeometry(envelop_native, srid=settings.SRID)
 
         if center_z is None:
+            return None
+        return (envelop_native, envelop, center_z, min_z, max_z, resolution_w, resolution_h,
+                [record[7] for record in result])
+
+    @classmethod
+    def elevation_area(cls, geom):
+        xmin, ymin, xmax, ymax = cls._nice_extent(geom)
+        width = xmax - xmin
+        height = ymax - ymin
+        precision = settings.ALTIMETRIC_PROFILE_PRECISION
+        max_resolution = settings.ALTIMETRIC_AREA_MAX_RESOLUTION
+        if width / precision > max_resolution:
+            precision = int(width / max_resolution)
+        if height / precision > 10000:
+            precision = int(width / max_resolution)
+        if height < precision or width < precision:
+            precision = min([height, width])
+
+        pyramid = DemPyramid.open()
+        if pyramid is not None and pyramid.srid == settings.SRID:
+            grid = pyramid.elevation_grid(xmin, ymin, xmax, ymax, precision)
+        else:
+            grid = cls._elevation_grid(xmin, ymin, xmax, ymax, precision)
+        if grid is None:
             logger.warning("No DEM present")
             return {}
+        envelop_native, envelop, center_z, min_z, max_z, resolution_w, resolution_h, elevations = grid
 
         altitudes = []
         row = []
-        for i, record in enumerate(result):
+        for i, elevation in enumerate(elevations):
             if i > 0 and i % resolution_w == 0:
                 altitudes.append(row)
                 row = []
-            elevation = (record[7] or 0.0) - min_z
-            row.append(elevation)
+            row.append((elevation or 0.0) - min_z)
         altitudes.append(row)
 
         area = {
@@ -9,7 +9,9 @@ import os.path
 from subprocess import call, PIPE
 import tempfile
 
+from geotrek.altimetry.helpers import AltimetryHelper
 from geotrek.altimetry.models import AltimetryMixin, Dem
+from geotrek.altimetry.pyramid import DemPyramid
 from geotrek.core.models import Topology
 
 
@@ -107,6 +109,10 @@ class Command(BaseCommand):
         output.close()
         if verbose:
             self.stdout.write('DEM successfully loaded.\n')
+        if settings.ALTIMETRIC_DEM_PYRAMID_ROOT:
+            if verbose:
+                self.stdout.write('Building DEM pyramid.\n')
+            DemPyramid.build(rst)
         if update_altimetry_paths:
             if verbose:
                 self.stdout.write('Updating 3d geometries.\n')
@@ -117,6 +123,8 @@ class Command(BaseCommand):
                             model.objects.all().update(geom=F('geom'))
                     else:
                         model.objects.all().update(geom=F('geom'))
+            # Update dates are left untouched
+            AltimetryHelper.invalidate_elevation_profiles()
         return
 
     def call_command_system(self, cmd, **kwargs):
@@ -0,0 +1,80 @@
+import multiprocessing
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from mapentity.helpers import is_file_uptodate
+
+from geotrek.altimetry.helpers import AltimetryHelper
+from geotrek.altimetry.models import AltimetryMixin
+
+
+def _prepare_elevation_chart(args):
+    model_label, pk, language = args
+    obj = apps.get_model(model_label).objects.get(pk=pk)
+    return obj.prepare_elevation_chart(language)
+
+
+class Command(BaseCommand):
+    help = 'Render PNG elevation charts of objects whose chart is missing or outdated.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', default=['trekking.Trek'],
+                            help='Models to render charts of (default: trekking.Trek)')
+        parser.add_argument('--languages', '-l', dest='languages', default='',
+                            help='Languages to render, separated by commas (default: all)')
+        parser.add_argument('--processes', type=int, dest='processes', default=1,
+                            help='Number of processes used to render charts')
+
+    def get_models(self, labels):
+        models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                raise CommandError("Model {} does not exist".format(label))
+            if not issubclass(model, AltimetryMixin):
+                raise CommandError("Model {} has no elevation chart".format(label))
+            models.append(model)
+        return models
+
+    def get_languages(self, languages):
+        if not languages:
+            return settings.MODELTRANSLATION_LANGUAGES
+        languages = languages.split(',')
+        for language in languages:
+            if language not in settings.MODELTRANSLATION_LANGUAGES:
+                raise CommandError("Language {} doesn't exist. Select in these one : {}".format(
+                    language, settings.MODELTRANSLATION_LANGUAGES))
+        return languages
+
+    def handle(self, *args, **options):
+        models = self.get_models(options['models'])
+        languages = self.get_languages(options['languages'])
+
+        # Outdated charts are found from update dates, without loading objects
+        todo = []
+        for model in models:
+            qs = model.objects.existing() if hasattr(model.objects, 'existing') else model.objects.all()
+            outdated = set()
+            for pk, date_update in qs.order_by('pk').values_list('pk', 'date_update'):
+                obj = model(pk=pk)
+                for language in languages:
+                    if not is_file_uptodate(obj.get_elevation_chart_path(language), date_update):
+                        todo.append((model._meta.label, pk, language))
+                        outdated.add(pk)
+            # Compute elevation profiles at once, workers read them from cache
+            if outdated:
+                AltimetryHelper.elevation_profiles(model._base_manager.filter(pk__in=outdated))
+
+        if options['processes'] > 1 and len(todo) > 1:
+            # Each worker opens its own database connection
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(options['processes']) as pool:
+                results = pool.map(_prepare_elevation_chart, todo)
+        else:
+            results = [_prepare_elevation_chart(args) for args in todo]
+
+        if options['verbosity'] >= 1:
+            self.stdout.write("{} elevation charts rendered".format(sum(results)))
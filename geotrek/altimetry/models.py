@@ -1,11 +1,12 @@
 import os
 
+import cairosvg
 from django.conf import settings
 from django.contrib.gis.db import models
 from django.utils.translation import get_language, gettext_lazy as _
 from django.urls import reverse
 
-from mapentity.helpers import is_file_uptodate, convertit_download, smart_urljoin
+from mapentity.helpers import is_file_uptodate
 from .helpers import AltimetryHelper
 
 
@@ -45,7 +46,17 @@ class AltimetryMixin(models.Model):
         return self
 
     def get_elevation_profile(self):
-        return AltimetryHelper.elevation_profile(self.geom_3d)
+        if self.pk is None or self._state.adding or self.geom_3d is None:
+            return AltimetryHelper.elevation_profile(self.geom_3d)
+        # Shares the cache of profiles computed in bulk, as long as stored geometry is the same
+        stored = self._meta.model._base_manager.annotate(
+            geom_3d_hash=AltimetryHelper.geometry_hash_expression()
+        ).filter(pk=self.pk, geom_3d_hash=AltimetryHelper.geometry_hash(self.geom_3d))
+        profiles = AltimetryHelper.elevation_profiles(stored)
+        if self.pk not in profiles:
+            # Geometry not saved yet
+            return AltimetryHelper.elevation_profile(self.geom_3d)
+        return profiles[self.pk]
 
     def get_elevation_area(self):
         return AltimetryHelper.elevation_area(self.geom)
@@ -96,25 +107,26 @@ class AltimetryMixin(models.Model):
         if not language:
             language = get_language()
         basefolder = os.path.join(settings.MEDIA_ROOT, 'profiles')
-        if not os.path.exists(basefolder):
-            os.mkdir(basefolder)
+        os.makedirs(basefolder, exist_ok=True)
         return os.path.join(basefolder, '%s-%s-%s.png' % (self._meta.model_name, self.pk, language))
 
-    def prepare_elevation_chart(self, language, rooturl):
-        """Converts SVG elevation URI to PNG on disk.
+    def prepare_elevation_chart(self, language, rooturl=None):
+        """Renders SVG elevation chart to PNG on disk.
+        ``rooturl`` is not used anymore, chart is not downloaded from server.
         """
-        from .views import HttpSVGResponse
         path = self.get_elevation_chart_path(language)
         # Do nothing if image is up-to-date
         if is_file_uptodate(path, self.date_update):
             return False
-        # Download converted chart as png using convertit
-        source = smart_urljoin(rooturl, self.get_elevation_chart_url(language))
-        convertit_download(source,
-                           path,
-                           from_type=HttpSVGResponse.content_type,
-                           to_type='image/png',
-                           headers={'Accept-Language': language})
+        svg = self.get_elevation_profile_svg(language)
+        # Write in a temporary file first, the chart may be rendered concurrently
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            cairosvg.svg2png(bytestring=svg, write_to=tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
         return True
 
 
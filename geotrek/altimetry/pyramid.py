@@ -0,0 +1,210 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import warnings
+
+import numpy as np
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+
+METADATA_NAME = 'metadata.json'
+# Number of raster rows read or written at once
+BLOCK_ROWS = 1024
+# Coarsest level size (by width/height)
+MIN_LEVEL_SIZE = 256
+# Raw value considered as sea level by altimetry triggers
+NO_ELEVATION = -99999
+
+
+def _downsample(data):
+    """ Average cells 2 by 2, ignoring missing values """
+    height, width = data.shape
+    padded = np.full((height + height % 2, width + width % 2), np.nan, dtype=np.float32)
+    padded[:height, :width] = data
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    with warnings.catch_warnings():
+        # Blocks without any value are left empty
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return np.nanmean(blocks, axis=(1, 3))
+
+
+class DemPyramid:
+    """
+    DEM stored on disk as a pyramid of NumPy arrays (one per level, each level
+    having cells twice as large as the previous one), memory-mapped on read so that
+    only parts of levels used to sample an area are loaded.
+
+    Missing values are stored as NaN.
+    """
+
+    _opened = {}
+    _lock = threading.Lock()
+
+    def __init__(self, root, metadata):
+        self.root = root
+        self.srid = metadata['srid']
+        self.origin = metadata['origin']
+        self.levels = metadata['levels']
+        self._arrays = {}
+
+    @classmethod
+    def open(cls, root=None):
+        """ Return the pyramid of ``ALTIMETRIC_DEM_PYRAMID_ROOT``, or None if not built """
+        root = root or settings.ALTIMETRIC_DEM_PYRAMID_ROOT
+        if not root:
+            return None
+        try:
+            mtime = os.path.getmtime(os.path.join(root, METADATA_NAME))
+        except OSError:
+            return None
+        with cls._lock:
+            pyramid, opened_mtime = cls._opened.get(root, (None, None))
+            if pyramid is None or opened_mtime != mtime:
+                with open(os.path.join(root, METADATA_NAME)) as f:
+                    pyramid = cls(root, json.load(f))
+                cls._opened[root] = (pyramid, mtime)
+        return pyramid
+
+    @classmethod
+    def build(cls, raster, root=None):
+        """ Build the pyramid of a GDAL raster (in ``settings.SRID``), replacing the previous one """
+        root = root or settings.ALTIMETRIC_DEM_PYRAMID_ROOT
+        parent = os.path.dirname(os.path.abspath(root))
+        os.makedirs(parent, exist_ok=True)
+        tmp_root = tempfile.mkdtemp(dir=parent)
+        try:
+            metadata = cls._build_levels(raster, tmp_root)
+            with open(os.path.join(tmp_root, METADATA_NAME), 'w') as f:
+                json.dump(metadata, f)
+            os.chmod(tmp_root, 0o755)
+            if os.path.exists(root):
+                old_root = tempfile.mkdtemp(dir=parent)
+                os.replace(root, os.path.join(old_root, 'dem'))
+                os.replace(tmp_root, root)
+                shutil.rmtree(old_root)
+            else:
+                os.replace(tmp_root, root)
+        finally:
+            if os.path.exists(tmp_root):
+                shutil.rmtree(tmp_root)
+        return cls.open(root)
+
+    @classmethod
+    def _build_levels(cls, raster, root):
+        band = raster.bands[0]
+        width, height = raster.width, raster.height
+        scale_x, scale_y = raster.scale
+        filename = 'level_0.npy'
+        level = np.lib.format.open_memmap(os.path.join(root, filename), mode='w+',
+                                          dtype=np.float32, shape=(height, width))
+        for row in range(0, height, BLOCK_ROWS):
+            rows = min(BLOCK_ROWS, height - row)
+            block = np.asarray(band.data(offset=(0, row), size=(width, rows)), dtype=np.float32)
+            if band.nodata_value is not None:
+                block[block == band.nodata_value] = np.nan
+            block[block == NO_ELEVATION] = 0
+            level[row:row + rows] = block
+        level.flush()
+        levels = [{'file': filename, 'scale': [scale_x, scale_y]}]
+
+        while max(level.shape) > MIN_LEVEL_SIZE:
+            filename = 'level_{}.npy'.format(len(levels))
+            scale_x, scale_y = scale_x * 2, scale_y * 2
+            previous = level
+            height, width = (previous.shape[0] + 1) // 2, (previous.shape[1] + 1) // 2
+            level = np.lib.format.open_memmap(os.path.join(root, filename), mode='w+',
+                                              dtype=np.float32, shape=(height, width))
+            for row in range(0, height, BLOCK_ROWS):
+                rows = min(BLOCK_ROWS, height - row)
+                level[row:row + rows] = _downsample(previous[row * 2:(row + rows) * 2])
+            level.flush()
+            levels.append({'file': filename, 'scale': [scale_x, scale_y]})
+
+        return {
+            'srid': raster.srid,
+            'origin': list(raster.origin),
+            'levels': levels,
+        }
+
+    def level(self, precision):
+        """ Return index of the coarsest level whose cells are not larger than ``precision`` """
+        index = 0
+        for i, level in enumerate(self.levels):
+            if max(abs(level['scale'][0]), abs(level['scale'][1])) <= precision:
+                index = i
+        return index
+
+    def array(self, index):
+        if index not in self._arrays:
+            path = os.path.join(self.root, self.levels[index]['file'])
+            self._arrays[index] = np.load(path, mmap_mode='r')
+        return self._arrays[index]
+
+    def sample(self, xs, ys, precision):
+        """
+        Return elevations on the grid of ``xs`` and ``ys`` coordinates (one row by y)
+        with bilinear interpolation, NaN outside of DEM.
+        """
+        index = self.level(precision)
+        data = self.array(index)
+        scale_x, scale_y = self.levels[index]['scale']
+        height, width = data.shape
+        # Position in cells, from cell centers
+        cols = (np.asarray(xs, dtype=np.float64) - self.origin[0]) / scale_x - 0.5
+        rows = (np.asarray(ys, dtype=np.float64) - self.origin[1]) / scale_y - 0.5
+        inside_cols = (cols >= -0.5) & (cols <= width - 0.5)
+        inside_rows = (rows >= -0.5) & (rows <= height - 0.5)
+        if not inside_cols.any() or not inside_rows.any():
+            return np.full((len(rows), len(cols)), np.nan)
+
+        col0 = np.floor(cols).astype(np.int64)
+        row0 = np.floor(rows).astype(np.int64)
+        # Only read the window of the level covering the grid
+        col_min = int(np.clip(col0[inside_cols].min(), 0, width - 1))
+        col_max = int(np.clip(col0[inside_cols].max() + 1, 0, width - 1))
+        row_min = int(np.clip(row0[inside_rows].min(), 0, height - 1))
+        row_max = int(np.clip(row0[inside_rows].max() + 1, 0, height - 1))
+        window = np.array(data[row_min:row_max + 1, col_min:col_max + 1], dtype=np.float64)
+
+        left = np.clip(col0, col_min, col_max) - col_min
+        right = np.clip(col0 + 1, col_min, col_max) - col_min
+        top = np.clip(row0, row_min, row_max) - row_min
+        bottom = np.clip(row0 + 1, row_min, row_max) - row_min
+        fx = (cols - col0)[np.newaxis, :]
+        fy = (rows - row0)[:, np.newaxis]
+
+        values = np.stack([window[np.ix_(top, left)], window[np.ix_(top, right)],
+                           window[np.ix_(bottom, left)], window[np.ix_(bottom, right)]])
+        weights = np.stack([(1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy])
+        # Missing neighbours are left out of the interpolation
+        missing = np.isnan(values)
+        weights[missing] = 0
+        values[missing] = 0
+        total = weights.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            elevations = (values * weights).sum(axis=0) / total
+        elevations[total == 0] = np.nan
+        elevations[~inside_rows, :] = np.nan
+        elevations[:, ~inside_cols] = np.nan
+        return elevations
+
+    def elevation_grid(self, xmin, ymin, xmax, ymax, precision):
+        """
+        Sample DEM like the PostGIS query of ``AltimetryHelper.elevation_area()``.
+        Return None if there is no elevation in the area.
+        """
+        xs = np.arange(xmin, xmax + 1, precision)
+        ys = np.arange(ymin, ymax + 1, precision)
+        elevations = np.rint(self.sample(xs, ys, precision))
+        valid = elevations[~np.isnan(elevations)]
+        if not valid.size:
+            return None
+        xmin, ymin, xmax, ymax = float(xs[0]), float(ys[0]), float(xs[-1]), float(ys[-1])
+        envelop_native = Polygon(((xmin, ymin), (xmin, ymax), (xmax, ymax), (xmax, ymin), (xmin, ymin)),
+                                 srid=settings.SRID)
+        envelop = envelop_native.transform(4326, clone=True)
+        altitudes = [None if np.isnan(value) else int(value) for value in elevations.flat]
+        return (envelop_native, envelop, float(valid.mean()), int(valid.min()), int(valid.max()),
+                len(xs), len(ys), altitudes)
@@ -1,14 +1,17 @@
 import os
+import shutil
+import tempfile
 from io import StringIO
 from unittest import mock, skipIf
 
 from django.conf import settings
 from django.contrib.gis.geos import Point
 from django.core.management import call_command, CommandError
-from django.test import TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 
 from geotrek.altimetry.functions import RasterValue
 from geotrek.altimetry.models import Dem
+from geotrek.altimetry.pyramid import DemPyramid
 
 from geotrek.core.models import Path
 from geotrek.core.tests.factories import PathFactory
@@ -34,6 +37,18 @@ class CommandLoadDemTest(TransactionTestCase):
         value = dems.first()
         self.assertAlmostEqual(value.int, 343.600006103516)
 
+    def test_success_builds_pyramid(self):
+        output_stdout = StringIO()
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'elevation.tif')
+        root = os.path.join(tempfile.mkdtemp(), 'dem')
+        self.addCleanup(shutil.rmtree, os.path.dirname(root))
+        with override_settings(ALTIMETRIC_DEM_PYRAMID_ROOT=root):
+            call_command('loaddem', filename, verbosity=2, stdout=output_stdout)
+        self.assertIn('Building DEM pyramid.', output_stdout.getvalue())
+        pyramid = DemPyramid.open(root)
+        elevations = pyramid.sample([605600], [6650000], 1)
+        self.assertAlmostEqual(elevations[0][0], 343.6, delta=5)
+
     def test_success_with_replace(self):
         output_stdout = StringIO()
         filename = os.path.join(os.path.dirname(__file__), 'data', 'elevation.tif')
@@ -139,3 +154,24 @@ class CommandLoadDemTest(TransactionTestCase):
         dems = Dem.objects.all().annotate(int=RasterValue('rast', Point(x=605600, y=6650000, srid=2154)))
         value = dems.first()
         self.assertAlmostEqual(value.int, 343.600006103516)
+
+
+class PrepareElevationChartsTest(TestCase):
+    def test_render_outdated_charts(self):
+        trek = TrekFactory.create(published=True)
+        for language in settings.MODELTRANSLATION_LANGUAGES:
+            path = trek.get_elevation_chart_path(language)
+            if os.path.exists(path):
+                os.remove(path)
+        output = StringIO()
+        call_command('prepare_elevation_charts', languages='en,fr', stdout=output)
+        self.assertIn("2 elevation charts rendered", output.getvalue())
+        self.assertTrue(os.path.exists(trek.get_elevation_chart_path('en')))
+        self.assertTrue(os.path.exists(trek.get_elevation_chart_path('fr')))
+        output = StringIO()
+        call_command('prepare_elevation_charts', 'trekking.Trek', languages='en,fr', stdout=output)
+        self.assertIn("0 elevation charts rendered", output.getvalue())
+
+    def test_wrong_model(self):
+        with self.assertRaisesRegex(CommandError, "Model trekking.POIType has no elevation chart"):
+            call_command('prepare_elevation_charts', 'trekking.POIType')
@@ -1,14 +1,21 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from unittest import SkipTest, skipIf
 
 from django.db import connection
+from django.contrib.gis.gdal import GDALRaster
 from django.contrib.gis.geos import MultiLineString, LineString, Point
 from django.utils import translation
 
 from geotrek.core.models import Path, Topology
 from geotrek.core.tests.factories import TopologyFactory
 from geotrek.altimetry.helpers import AltimetryHelper
+from geotrek.altimetry.pyramid import DemPyramid
 
 
 class ElevationTest(TestCase):
@@ -107,6 +114,43 @@ class ElevationTest(TestCase):
         self.assertEqual(topo.min_elevation, 0)
         self.assertEqual(topo.max_elevation, 0)
 
+    def test_elevation_profiles(self):
+        if settings.TREKKING_TOPOLOGY_ENABLED:
+            line = TopologyFactory.create(paths=[(self.path, 0.2, 0.8)])
+            point = TopologyFactory.create(paths=[(self.path, 0.5, 0.5)])
+        else:
+            line = TopologyFactory.create(geom="SRID=2154;LINESTRING(63 97, 18 37)")
+            point = TopologyFactory.create(geom="SRID=2154;POINT(33 57)")
+        topologies = Topology.objects.filter(pk__in=[line.pk, point.pk])
+        with self.assertNumQueries(2):
+            profiles = AltimetryHelper.elevation_profiles(topologies)
+        for topo in topologies:
+            expected = AltimetryHelper.elevation_profile(topo.geom_3d)
+            self.assertEqual(len(profiles[topo.pk]), len(expected))
+            for step, expected_step in zip(profiles[topo.pk], expected):
+                for value, expected_value in zip(step, expected_step):
+                    self.assertAlmostEqual(value, expected_value)
+        # Profiles are cached
+        with self.assertNumQueries(1):
+            self.assertEqual(AltimetryHelper.elevation_profiles(topologies), profiles)
+        with self.assertNumQueries(1):
+            self.assertEqual(line.get_elevation_profile(), profiles[line.pk])
+        AltimetryHelper.invalidate_elevation_profiles()
+        with self.assertNumQueries(2):
+            AltimetryHelper.elevation_profiles(topologies)
+
+    def test_elevation_profile_of_modified_geometry(self):
+        if settings.TREKKING_TOPOLOGY_ENABLED:
+            topo = TopologyFactory.create(paths=[(self.path, 0.2, 0.8)])
+        else:
+            topo = TopologyFactory.create(geom="SRID=2154;LINESTRING(63 97, 18 37)")
+        stored_profile = topo.get_elevation_profile()
+        # Geometry not saved yet is used instead of the stored one
+        topo.geom_3d = LineString((63, 97, 10), (63, 37, 20), srid=settings.SRID)
+        profile = topo.get_elevation_profile()
+        self.assertNotEqual(profile, stored_profile)
+        self.assertEqual([step[3] for step in profile], [10, 20])
+
 
 class ElevationProfileTest(TestCase):
     def test_elevation_profile_multilinestring(self):
@@ -231,6 +275,55 @@ class ElevationOtherGeomAreaTest(TestCase):
         self.assertEqual(area['size']['y'], 1300.0)
 
 
+class ElevationAreaPyramidTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        fill_raster()
+        cls.geom = LineString((100, 370), (1100, 370), srid=settings.SRID)
+        cls.area = AltimetryHelper.elevation_area(cls.geom)
+
+    def setUp(self):
+        self.root = os.path.join(tempfile.mkdtemp(), 'dem')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.root))
+        # Same DEM as fill_raster()
+        raster = GDALRaster({
+            'srid': settings.SRID, 'width': 4, 'height': 5, 'origin': (0, 125), 'scale': (25, -25),
+            'datatype': 3,
+            'bands': [{'data': [0, 0, 3, 5, 2, 2, 10, 15, 5, 15, 20, 25, 20, 25, 30, 35, 30, 35, 40, 45]}],
+        })
+        self.pyramid = DemPyramid.build(raster, self.root)
+
+    def test_pyramid_levels(self):
+        self.assertEqual(len(self.pyramid.levels), 1)
+        self.assertEqual(self.pyramid.array(0).shape, (5, 4))
+        self.assertEqual(self.pyramid.level(10), 0)
+
+    def test_sample_is_interpolated(self):
+        elevations = self.pyramid.sample([12.5, 25, 200], [112.5, 100], 25)
+        self.assertEqual(elevations[0][0], 0)
+        self.assertEqual(elevations[1][1], 1)
+        self.assertTrue(np.isnan(elevations[:, 2]).all())
+
+    def test_area_from_pyramid(self):
+        with override_settings(ALTIMETRIC_DEM_PYRAMID_ROOT=self.root):
+            with self.assertNumQueries(0):
+                area = AltimetryHelper.elevation_area(self.geom)
+        self.assertEqual(area['resolution'], self.area['resolution'])
+        for corner in ('southwest', 'northwest', 'northeast', 'southeast'):
+            self.assertEqual(area['extent'][corner]['x'], self.area['extent'][corner]['x'])
+            self.assertEqual(area['extent'][corner]['y'], self.area['extent'][corner]['y'])
+            self.assertAlmostEqual(area['extent'][corner]['lat'], self.area['extent'][corner]['lat'])
+            self.assertAlmostEqual(area['extent'][corner]['lng'], self.area['extent'][corner]['lng'])
+        self.assertEqual(area['extent']['altitudes'], {'min': 0, 'max': 45})
+        self.assertEqual(len(area['altitudes']), 33)
+        self.assertEqual(len(area['altitudes'][0]), 53)
+
+    def test_area_outside_pyramid(self):
+        geom = LineString((10000, 10000), (11000, 10000), srid=settings.SRID)
+        with override_settings(ALTIMETRIC_DEM_PYRAMID_ROOT=self.root):
+            self.assertEqual(AltimetryHelper.elevation_area(geom), {})
+
+
 def fill_raster_order():
     with connection.cursor() as cur:
         cur.execute('INSERT INTO altimetry_dem (rast) VALUES (ST_MakeEmptyRaster(250, 250, 0, 250, 25, -25, 0, 0, %s))',
@@ -1,9 +1,12 @@
 import os
+from unittest import mock
 
 from django.test import TestCase
 from django.conf import settings
+from django.utils import translation
 from django.utils.translation import get_language
 
+from geotrek.altimetry.helpers import AltimetryHelper
 from geotrek.trekking.tests.factories import TrekFactory
 from geotrek.trekking.models import Trek
 
@@ -19,3 +22,36 @@ class AltimetryMixinTest(TestCase):
         self.assertTrue(os.listdir(basefolder))
         directory = os.listdir(basefolder)
         self.assertIn('%s-%s-%s.png' % (Trek._meta.model_name, str(trek.pk), get_language()), directory)
+
+    def test_prepare_elevation_chart(self):
+        trek = TrekFactory.create(published=True)
+        path = trek.get_elevation_chart_path('en')
+        if os.path.exists(path):
+            os.remove(path)
+        self.assertTrue(trek.prepare_elevation_chart('en'))
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+        # Up-to-date chart is not rendered again
+        self.assertFalse(trek.prepare_elevation_chart('en'))
+
+    def test_prepare_elevation_chart_keeps_language(self):
+        trek = TrekFactory.create(published=True)
+        path = trek.get_elevation_chart_path('fr')
+        if os.path.exists(path):
+            os.remove(path)
+        with translation.override('en'):
+            self.assertTrue(trek.prepare_elevation_chart('fr'))
+            self.assertEqual(get_language(), 'en')
+
+    def test_profile_svg_without_language(self):
+        languages = []
+
+        def gettext(message):
+            languages.append(get_language())
+            return message
+
+        profile = [[0, 0, 0, 10], [10, 0, 10, 20]]
+        with translation.override('fr'), mock.patch('geotrek.altimetry.helpers._', gettext):
+            AltimetryHelper.profile_svg(profile, None)
+        # Labels are translated in active language
+        self.assertEqual(languages, ['fr', 'fr', 'fr'])
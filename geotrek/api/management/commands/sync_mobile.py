@@ -19,6 +19,7 @@ from django.http import StreamingHttpResponse
 from django.test.client import RequestFactory
 from django.utils import translation
 from django.utils.translation import gettext as _
+from geotrek.altimetry.helpers import AltimetryHelper
 from geotrek.common.models import FileType  # NOQA
 from geotrek.common import models as common_models
 from geotrek.common.functions import GeometryType
@@ -319,7 +320,7 @@ class Command(BaseCommand):
                 self.sync_media_file(desk.resized_picture, prefix=trek.pk, directory=url_trek,
                                      zipfile=trekid_zipfile)
         for lang in self.languages:
-            trek.prepare_elevation_chart(lang, self.referer)
+            trek.prepare_elevation_chart(lang)
             url_media = '/{}{}'.format(trek.pk, settings.MEDIA_URL)
             self.sync_file(trek.get_elevation_chart_url_png(lang), settings.MEDIA_ROOT,
                            url_media, directory=url_trek, zipfile=trekid_zipfile)
@@ -330,7 +331,7 @@ class Command(BaseCommand):
             for desk in child.information_desks.all().annotate(geom_type=GeometryType("geom")).filter(geom_type="POINT"):
                 self.sync_media_file(desk.resized_picture, prefix=trek.pk, directory=url_trek, zipfile=trekid_zipfile)
             for lang in self.languages:
-                child.prepare_elevation_chart(lang, self.referer)
+                child.prepare_elevation_chart(lang)
                 url_media = '/{}{}'.format(trek.pk, settings.MEDIA_URL)
                 self.sync_file(child.get_elevation_chart_url_png(lang), settings.MEDIA_ROOT,
                                url_media, directory=url_trek, zipfile=trekid_zipfile)
@@ -342,6 +343,11 @@ class Command(BaseCommand):
         if self.portal:
             treks = treks.filter(Q(portal__name__in=self.portal) | Q(portal=None))
 
+        # Compute elevation profiles of charts at once
+        AltimetryHelper.elevation_profiles(treks)
+        if settings.TREKKING_TOPOLOGY_ENABLED:
+            # Compute POIs of all treks with one query
+            treks = trekking_models.POI.prefetch_overlapping(treks)
         for trek in treks:
             self.sync_trek_by_pk_media(trek)
 
@@ -383,22 +389,11 @@ class Command(BaseCommand):
             self.stdout.write("\x1b[36m**\x1b[0m \x1b[1mnolang/{}/tiles/\x1b[0m ...".format(trek.pk), ending="")
             self.stdout._out.flush()
 
-        def _radius2bbox(lng, lat, radius):
-            return (lng - radius, lat - radius,
-                    lng + radius, lat + radius)
-
         tiles = ZipTilesBuilder(zipfile, prefix='/{}/tiles/'.format(trek.pk), **self.builder_args)
 
-        geom = trek.geom
-        if geom.geom_type == 'MultiLineString':
-            geom = geom[0]  # FIXME
-        geom.transform(4326)
-
-        for (lng, lat) in geom.coords:
-            large = _radius2bbox(lng, lat, settings.MOBILE_TILES_RADIUS_LARGE)
-            small = _radius2bbox(lng, lat, settings.MOBILE_TILES_RADIUS_SMALL)
-            tiles.add_coverage(bbox=large, zoomlevels=settings.MOBILE_TILES_LOW_ZOOMS)
-            tiles.add_coverage(bbox=small, zoomlevels=settings.MOBILE_TILES_HIGH_ZOOMS)
+        geom = trek.geom.transform(4326, clone=True)
+        tiles.add_geometry_coverage(geom, settings.MOBILE_TILES_RADIUS_LARGE, settings.MOBILE_TILES_LOW_ZOOMS)
+        tiles.add_geometry_coverage(geom, settings.MOBILE_TILES_RADIUS_SMALL, settings.MOBILE_TILES_HIGH_ZOOMS)
 
         tiles.run()
 
@@ -841,10 +841,13 @@ class NoPaginationTestCase(BaseApiTest):
         )
         response = TrekViewSet.as_view({"get": "list"})(request)
         self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.data, list)
-        self.assertIsInstance(response.data[0], dict)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), self.nb_treks)
+        self.assertIsInstance(data[0], dict)
         self.assertEqual(
-            len(response.data[0].get("geometry").get("coordinates")[0]),
+            len(data[0].get("geometry").get("coordinates")[0]),
             3,
         )
 
@@ -858,16 +861,83 @@ class NoPaginationTestCase(BaseApiTest):
         )
         response = TrekViewSet.as_view({"get": "list"})(request)
         self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.data, dict)
-        self.assertEqual(sorted(response.data.keys()), GEOJSON_COLLECTION_STRUCTURE)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertIsInstance(data, dict)
+        self.assertEqual(sorted(data.keys()), GEOJSON_COLLECTION_STRUCTURE)
         self.assertEqual(
-            len(response.data.get("features")), self.nb_treks, response.data
+            len(data.get("features")), self.nb_treks, data
         )
         self.assertEqual(
-            sorted(response.data.get("features")[0].get("properties").keys()),
+            sorted(data.get("features")[0].get("properties").keys()),
             TREK_PROPERTIES_GEOJSON_STRUCTURE,
         )
 
+    def test_no_page_same_as_paginated(self):
+        response = self.client.get(reverse("apiv2:trek-list"), {"page_size": 100})
+        paginated = response.json()["results"]
+        response = self.client.get(reverse("apiv2:trek-list"), {"no_page": "true"})
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), paginated)
+
+
+class CursorPaginationTestCase(BaseApiTest):
+    """
+    Integration tests for cursor pagination.
+    """
+
+    def get_all_ids(self, endpoint, params=None):
+        response = self.client.get(reverse(endpoint), dict(params or {}, no_page='true'))
+        return sorted(item['id'] for item in response.json())
+
+    def walk(self, endpoint, params=None):
+        ids = []
+        response = self.client.get(reverse(endpoint), dict(params or {}, cursor='', page_size=4))
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn('count', data)
+            self.assertIsNone(data['previous'])
+            ids += [item['id'] for item in data.get('results', data.get('features'))]
+            if not data['next']:
+                return ids
+            response = self.client.get(data['next'])
+
+    def test_walk_all_pages(self):
+        ids = self.walk('apiv2:trek-list')
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), self.get_all_ids('apiv2:trek-list'))
+
+    def test_walk_all_pages_geojson(self):
+        ids = self.walk('apiv2:poi-list', {'format': 'geojson'})
+        self.assertEqual(sorted(ids), self.get_all_ids('apiv2:poi-list'))
+
+    def test_ordered_by_update_date(self):
+        trek = self.treks[0]
+        trek.save()
+        ids = self.walk('apiv2:trek-list')
+        self.assertEqual(ids[-1], trek.pk)
+
+    def test_string_primary_key(self):
+        zoning_factory.CityFactory.create_batch(5)
+        ids = self.walk('apiv2:city-list')
+        self.assertEqual(sorted(ids), self.get_all_ids('apiv2:city-list'))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('apiv2:trek-list'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_specific_ordering_is_kept(self):
+        later = tourism_factory.TouristicEventFactory.create(begin_date='2100-01-02', end_date='2100-01-02')
+        sooner = tourism_factory.TouristicEventFactory.create(begin_date='2100-01-01', end_date='2100-01-01')
+        later.save()
+        response = self.client.get(reverse('apiv2:touristicevent-list'), {'cursor': ''})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        # Events are paginated by page numbers
+        self.assertIn('count', data)
+        ids = [item['id'] for item in data['results']]
+        self.assertLess(ids.index(sooner.pk), ids.index(later.pk))
+
 
 class APIAccessAnonymousTestCase(BaseApiTest):
     """ TestCase for anonymous API profile """
@@ -3015,6 +3085,61 @@ class LanguageOrderingTestCase(TestCase):
         self.assert_ordered_by_language('apiv2:course-list', order_en, 'en')
 
 
+class FullTextSearchFilterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.trek1 = trek_factory.TrekFactory(
+            name_en="Around the lake", name_fr="Tour du lac", description_en="<p>A walk near the water</p>",
+            description_fr="<p>Une balade pr&egrave;s de l'&eacute;tang</p>", published_en=True, published_fr=True)
+        cls.trek2 = trek_factory.TrekFactory(
+            name_en="Summit", name_fr="Sommet", ambiance_en="<p>View on the lakes from the summit</p>",
+            published_en=True, published_fr=True)
+        cls.trek3 = trek_factory.TrekFactory(name_en="Forest", name_fr="Forêt", published_en=True, published_fr=True)
+        cls.poi = trek_factory.POIFactory(name_en="Lakeside", description_en="<p>Beach</p>", published_en=True)
+        cls.content = tourism_factory.TouristicContentFactory(
+            name_en="Hostel", description_teaser_en="Rooms near the lake", published_en=True)
+
+    def tearDown(self):
+        clear_internal_user_cache()
+        super().tearDown()
+
+    def get_ids(self, endpoint, params):
+        response = self.client.get(reverse(endpoint), params)
+        self.assertEqual(response.status_code, 200)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_search_stems_words_and_strips_html(self):
+        ids = self.get_ids('apiv2:trek-list', {'q': 'lakes', 'language': 'en'})
+        self.assertCountEqual(ids, [self.trek1.pk, self.trek2.pk])
+
+    def test_search_is_language_aware_and_ignores_accents(self):
+        self.assertEqual(self.get_ids('apiv2:trek-list', {'q': 'etang', 'language': 'fr'}), [self.trek1.pk])
+        self.assertEqual(self.get_ids('apiv2:trek-list', {'q': 'FORET', 'language': 'fr'}), [self.trek3.pk])
+        self.assertEqual(self.get_ids('apiv2:trek-list', {'q': 'etang', 'language': 'en'}), [])
+
+    def test_search_matches_prefixes_of_all_words(self):
+        self.assertEqual(self.get_ids('apiv2:trek-list', {'q': 'arou lak', 'language': 'en'}), [self.trek1.pk])
+        self.assertEqual(self.get_ids('apiv2:trek-list', {'q': 'lake forest', 'language': 'en'}), [])
+        self.assertEqual(self.get_ids('apiv2:trek-list', {'q': '&!', 'language': 'en'}), [])
+
+    def test_search_ordered_by_rank(self):
+        # Name has a higher weight than ambiance
+        ids = self.get_ids('apiv2:trek-list', {'q': 'lake', 'language': 'en', 'ordering': 'rank'})
+        self.assertEqual(ids, [self.trek1.pk, self.trek2.pk])
+
+    def test_search_updated_with_object(self):
+        self.trek3.name_en = "Lake forest"
+        self.trek3.save()
+        ids = self.get_ids('apiv2:trek-list', {'q': 'forest lake', 'language': 'en'})
+        self.assertEqual(ids, [self.trek3.pk])
+        self.trek3.delete(force=True)
+        self.assertFalse(common_models.SearchDocument.objects.filter(model='trekking.trek', object_id=self.trek3.pk).exists())
+
+    def test_search_pois_and_touristic_contents(self):
+        self.assertEqual(self.get_ids('apiv2:poi-list', {'q': 'lakeside', 'language': 'en'}), [self.poi.pk])
+        self.assertEqual(self.get_ids('apiv2:touristiccontent-list', {'q': 'lake', 'language': 'en'}), [self.content.pk])
+
+
 class WebLinksCategoryTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -4647,3 +4772,57 @@ class GenericCacheTestCase(APITestCase):
             response = self.client.get(reverse('apiv2:practice-detail', args=(self.practice.pk,)))
         data = response.json()
         self.assertTrue(data['pictogram'].startswith('http://'))
+
+
+class ListCacheTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.content = tourism_factory.TouristicContentFactory.create(published=True)
+
+    def test_list_cache_is_used(self):
+        response = self.client.get(reverse('apiv2:touristiccontent-list'))
+        self.assertEqual(response.status_code, 200)
+        # When cache is used, only last update and count are queried
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('apiv2:touristiccontent-list'))
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_list_cache_invalidated_on_change(self):
+        response = self.client.get(reverse('apiv2:touristiccontent-list'))
+        etag = response['ETag']
+        tourism_factory.TouristicContentFactory.create(published=True)
+        response = self.client.get(reverse('apiv2:touristiccontent-list'))
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_list_conditional_request(self):
+        response = self.client.get(reverse('apiv2:touristiccontent-list'))
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get(reverse('apiv2:touristiccontent-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(reverse('apiv2:touristiccontent-list'), {'language': 'en'},
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_modified_after_delete(self):
+        response = self.client.get(reverse('apiv2:touristiccontent-list'))
+        etag = response['ETag']
+        # Hard delete, which does not change last update date of contents
+        tourism_models.TouristicContent.objects.filter(pk=self.content.pk).delete()
+        response = self.client.get(reverse('apiv2:touristiccontent-list'), HTTP_IF_NONE_MATCH=etag,
+                                   HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_event_list_modified_next_day(self):
+        with freeze_time("2020-01-01 12:00:00"):
+            tourism_factory.TouristicEventFactory.create(begin_date="2020-01-01", end_date="2020-01-01")
+            response = self.client.get(reverse('apiv2:touristicevent-list'))
+            self.assertEqual(response.json()['count'], 1)
+            etag = response['ETag']
+            response = self.client.get(reverse('apiv2:touristicevent-list'), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+        with freeze_time("2020-01-02 12:00:00"):
+            response = self.client.get(reverse('apiv2:touristicevent-list'), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['count'], 0)
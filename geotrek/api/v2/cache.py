@@ -1,5 +1,7 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework_extensions.cache.mixins import RetrieveCacheResponseMixin as BaseRetrieveCacheResponseMixin, \
-    ListCacheResponseMixin as BaseListCacheResponseMixin
+    BaseCacheResponseMixin
 
 from geotrek.api.v2.decorators import cache_response_detail, cache_response_list
 
@@ -10,7 +12,25 @@ class RetrieveCacheResponseMixin(BaseRetrieveCacheResponseMixin):
         return super().retrieve(request, *args, **kwargs)
 
 
-class ListCacheResponseMixin(BaseListCacheResponseMixin):
-    @cache_response_list()
+class ListCacheResponseMixin(BaseCacheResponseMixin):
+    """
+    Cache list responses, add ETag header and answer 304 to conditional requests.
+    No Last-Modified header is sent: last update date of listed objects does not change
+    when an object is deleted, whereas cache key (hence ETag) does.
+    """
+
     def list(self, request, *args, **kwargs):
+        etag = quote_etag(self.list_cache_key_func())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if self.is_streamed_list():
+                # Streamed responses are not stored in cache
+                response = super().list(request, *args, **kwargs)
+            else:
+                response = self.cached_list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    @cache_response_list()
+    def cached_list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -1,3 +1,4 @@
+import re
 from datetime import date, datetime
 from distutils.util import strtobool
 
@@ -5,15 +6,17 @@ import coreschema
 from coreapi.document import Field
 from django.conf import settings
 from django.contrib.gis.db.models import Collect
-from django.db.models import Exists, OuterRef
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import CharField, Exists, F, Func, OuterRef, Subquery, Value
 from django.db.models.query_utils import Q
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language, gettext_lazy as _
 from django_filters import ModelMultipleChoiceFilter
 from django_filters import rest_framework as filters
 from django_filters.widgets import CSVWidget
 from rest_framework.filters import BaseFilterBackend
 from rest_framework_gis.filters import DistanceToPointFilter, InBBOXFilter
 
+from geotrek.common.models import SearchDocument
 from geotrek.tourism.models import TouristicEventOrganizer, TouristicContent, TouristicContentType, TouristicEvent, \
     TouristicEventPlace, TouristicEventType
 from geotrek.trekking.models import ServiceType, Trek, POI
@@ -23,6 +26,33 @@ if 'geotrek.outdoor' in settings.INSTALLED_APPS:
     from geotrek.outdoor.models import Course, Site
 
 
+def _search(request, queryset):
+    """Filter queryset by full-text search ``q`` query param, in current language.
+
+    Documents are maintained by database triggers (see ``ft_search_vector()``), words
+    are matched by prefix. Results are sorted by relevance if ``ordering`` is ``rank``.
+    """
+    words = re.findall(r'\w+', request.GET.get('q', ''))
+    if not words:
+        return queryset.none()
+    language = get_language()
+    if language not in settings.MODELTRANSLATION_LANGUAGES:
+        language = settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+    query = SearchQuery(
+        Func(Value(' & '.join('{}:*'.format(word) for word in words)), function='unaccent', output_field=CharField()),
+        config=Func(Value(language), function='ft_search_config', output_field=CharField()),
+        search_type='raw',
+    )
+    documents = SearchDocument.objects.filter(
+        model=queryset.model._meta.label_lower, language=language, object_id=OuterRef('pk'), vector=query
+    )
+    queryset = queryset.filter(Exists(documents))
+    if request.GET.get('ordering') == 'rank':
+        rank = documents.annotate(rank=SearchRank(F('vector'), query)).values('rank')[:1]
+        queryset = queryset.annotate(search_rank=Subquery(rank)).order_by('-search_rank', *queryset.query.order_by)
+    return queryset
+
+
 class GeotrekQueryParamsFilter(BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
         ids = request.GET.get('ids')
@@ -225,6 +255,9 @@ class GeotrekPOIFilter(BaseFilterBackend):
         courses = request.GET.get('courses', None)
         if courses is not None:
             qs = qs.filter(pk__in=self.get_pois_to_filter_outdoor_objects(Course, courses))
+        q = request.GET.get('q')
+        if q:
+            qs = _search(request, qs)
         return qs
 
     def get_pois_to_filter_outdoor_objects(self, model, elems):
@@ -258,6 +291,16 @@ class GeotrekPOIFilter(BaseFilterBackend):
                     title=_("Courses"),
                     description=_("Filter by one or multiple Course id. It will show only the POIs related to this outdoor Course. If multiple courses, they should be separated by commas.")
                 )
+            ), Field(
+                name='q', required=False, location='query', schema=coreschema.String(
+                    title=_("Query string"),
+                    description=_('Filter by words contained in name or description (full-text search ignoring case and accents).')
+                )
+            ), Field(
+                name='ordering', required=False, location='query', schema=coreschema.String(
+                    title=_("Ordering"),
+                    description=_('Use "rank" to sort results by relevance for the query string.')
+                )
             ),
         )
 
@@ -376,17 +419,13 @@ class GeotrekZoningAndThemeFilter(BaseFilterBackend):
                 qs = qs.filter(parent_sites__themes__in=themes.split(','))
             if portals:
                 qs = qs.filter(parent_sites__portal__in=portals.split(','))
-            if q:
-                qs = qs.filter(
-                    Q(name__icontains=q) | Q(description__icontains=q)
-                )
         else:
             if themes:
                 qs = qs.filter(themes__in=themes.split(','))
             if portals:
                 qs = qs.filter(portal__in=portals.split(','))
-            if q:
-                qs = qs.filter(Q(name__icontains=q) | Q(description__icontains=q) | Q(description_teaser__icontains=q))
+        if q:
+            qs = _search(request, qs)
         return qs
 
     def _get_schema_fields(self, view):
@@ -419,7 +458,12 @@ class GeotrekZoningAndThemeFilter(BaseFilterBackend):
             ), Field(
                 name='q', required=False, location='query', schema=coreschema.String(
                     title=_("Query string"),
-                    description=_('Filter by some case-insensitive text contained in name, description teaser or description.')
+                    description=_('Filter by words contained in name, description teaser or description (full-text search ignoring case and accents).')
+                )
+            ), Field(
+                name='ordering', required=False, location='query', schema=coreschema.String(
+                    title=_("Ordering"),
+                    description=_('Use "rank" to sort results by relevance for the query string.')
                 )
             )
         )
@@ -729,10 +773,7 @@ class GeotrekTrekQueryParamsFilter(BaseFilterBackend):
             qs = qs.filter(practice__in=practices.split(','))
         q = request.GET.get('q')
         if q:
-            qs = qs.filter(
-                Q(name__icontains=q) | Q(description__icontains=q)
-                | Q(description_teaser__icontains=q) | Q(ambiance__icontains=q)
-            )
+            qs = _search(request, qs)
         return qs
 
     def get_schema_fields(self, view):
@@ -836,7 +877,12 @@ class GeotrekTrekQueryParamsFilter(BaseFilterBackend):
             ), Field(
                 name='q', required=False, location='query', schema=coreschema.String(
                     title=_("Query string"),
-                    description=_('Filter by some case-insensitive text contained in name, description, description teaser or ambiance.')
+                    description=_('Filter by words contained in name, description, description teaser or ambiance (full-text search ignoring case and accents).')
+                )
+            ), Field(
+                name='ordering', required=False, location='query', schema=coreschema.String(
+                    title=_("Ordering"),
+                    description=_('Use "rank" to sort results by relevance for the query string.')
                 )
             ),
         )
@@ -866,24 +912,14 @@ class GeotrekSiteFilter(GeotrekZoningAndThemeFilter):
         if root_sites_only:
             # Being a root node <=> having no parent
             queryset = queryset.filter(parent=None)
-        practices_in_hierarchy = request.GET.get('practices_in_hierarchy')
-        # TODO Optimize this filter by finding an alternative to queryset iterating
-        if practices_in_hierarchy:
-            wanted_practices = set(map(int, practices_in_hierarchy.split(',')))
-            for site in queryset:
-                # Exclude if practices in hierarchy don't match any wanted practices
-                found_practices = site.super_practices_id
-                if found_practices.isdisjoint(wanted_practices):
-                    queryset = queryset.exclude(id=site.pk)
-        # TODO Optimize this filter by finding an alternative to queryset iterating
-        ratings_in_hierarchy = request.GET.get('ratings_in_hierarchy')
-        if ratings_in_hierarchy:
-            wanted_ratings = set(map(int, ratings_in_hierarchy.split(',')))
-            for site in queryset:
-                # Exclude if ratings in hierarchy don't match any wanted ratings
-                found_ratings = site.super_ratings_id
-                if found_ratings.isdisjoint(wanted_ratings):
-                    queryset = queryset.exclude(id=site.pk)
+        # Values in hierarchy of sites are precomputed by triggers
+        for field in ('practices_in_hierarchy', 'ratings_in_hierarchy'):
+            values = request.GET.get(field)
+            if values:
+                q = Q()
+                for value in set(map(int, values.split(','))):
+                    q |= Q(**{'{}__contains'.format(field): [value]})
+                queryset = queryset.filter(q)
         types = request.GET.get('types')
         if types:
             queryset = queryset.filter(type__in=types.split(','))
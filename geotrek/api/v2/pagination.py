@@ -1,9 +1,18 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections import OrderedDict
+from datetime import datetime
 
+import coreschema
+from coreapi.document import Field
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
 from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class FasterPaginator(Paginator):
@@ -19,20 +28,107 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 1000
     django_paginator_class = FasterPaginator
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+    cursor = None
 
     def get_paginated_response(self, data):
+        if self.cursor is not None:
+            links = [('next', self.get_next_cursor_link()), ('previous', None)]
+        else:
+            links = [('count', self.page.paginator.count), ('next', self.get_next_link()),
+                     ('previous', self.get_previous_link())]
         if self.request.query_params.get('format', 'json') == 'geojson':
-            return Response(OrderedDict([
-                ('type', 'FeatureCollection'),
-                ('count', self.page.paginator.count),
-                ('next', self.get_next_link()),
-                ('previous', self.get_previous_link()),
-                ('features', data['features'])
-            ]))
+            return Response(OrderedDict([('type', 'FeatureCollection')] + links + [('features', data['features'])]))
+        elif self.cursor is not None:
+            return Response(OrderedDict(links + [('results', data)]))
         else:
             return super().get_paginated_response(data)
 
     def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = None
         if 'no_page' in request.query_params:
             return None
+        if self.cursor_query_param in request.query_params and self.can_paginate_by_cursor(queryset, view):
+            return self.paginate_queryset_by_cursor(queryset, request)
         return super().paginate_queryset(queryset, request, view)
+
+    def get_schema_fields(self, view):
+        return super().get_schema_fields(view) + [
+            Field(
+                name=self.cursor_query_param, required=False, location='query', schema=coreschema.String(
+                    title=_("Cursor"),
+                    description=_("Paginate by cursor, ordering objects by update date. Use an empty value to get first page, "
+                                  "then follow next links. Faster than page numbers for large lists. Ignored for lists "
+                                  "with a specific ordering.")
+                )
+            )
+        ]
+
+    # Keyset pagination: objects are ordered by (date_update, pk) when possible, and
+    # the cursor is the position of the last object of the page, so each page is
+    # fetched with an indexed range query instead of an OFFSET scan.
+
+    def can_paginate_by_cursor(self, queryset, view):
+        """
+        Cursor replaces ordering of objects, so it is used only if the list is ordered
+        by fields of ``view.pagination_ordering``, which only make page numbers reliable.
+        Other lists (e.g. events by date, search results by rank) are paginated by page numbers.
+        """
+        if getattr(view, 'ordering', None):
+            return False
+        replaceable = getattr(view, 'pagination_ordering', ('pk', 'id'))
+        return all(isinstance(field, str) and field.lstrip('-') in replaceable for field in queryset.query.order_by)
+
+    def get_cursor_fields(self, queryset):
+        try:
+            queryset.model._meta.get_field('date_update')
+        except FieldDoesNotExist:
+            return ('pk', )
+        return ('date_update', 'pk')
+
+    def encode_cursor(self, values):
+        raw = '|'.join(value.isoformat() if isinstance(value, datetime) else str(value) for value in values)
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, encoded, model):
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode((encoded + '=' * (-len(encoded) % 4)).encode()).decode()
+            *dates, pk = raw.split('|', len(self.cursor_fields) - 1)
+            if len(dates) != len(self.cursor_fields) - 1:
+                raise ValueError(raw)
+            return [datetime.fromisoformat(date) for date in dates] + [model._meta.pk.to_python(pk)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        self.request = request
+        self.cursor_fields = self.get_cursor_fields(queryset)
+        self.cursor = self.decode_cursor(request.query_params[self.cursor_query_param], queryset.model)
+        queryset = queryset.order_by(*self.cursor_fields)
+        if self.cursor:
+            after = Q()
+            for i, field in enumerate(self.cursor_fields):
+                condition = Q(**{'{}__gt'.format(field): self.cursor[i]})
+                for previous_field, value in zip(self.cursor_fields[:i], self.cursor):
+                    condition &= Q(**{previous_field: value})
+                after |= condition
+            queryset = queryset.filter(after)
+        else:
+            self.cursor = []
+        page_size = self.get_page_size(request)
+        objects = list(queryset[:page_size + 1])
+        self.has_next = len(objects) > page_size
+        objects = objects[:page_size]
+        if objects:
+            last = objects[-1]
+            self.next_cursor = [getattr(last, field) for field in self.cursor_fields]
+        return objects
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_cursor))
@@ -6,11 +6,12 @@ from rest_framework.permissions import IsAuthenticated
 from geotrek.api.v2 import serializers as api_serializers, \
     viewsets as api_viewsets, \
     filters as api_filters
+from geotrek.api.v2.cache import ListCacheResponseMixin
 from geotrek.api.v2.functions import Length3D
 from geotrek.core import models as core_models
 
 
-class PathViewSet(api_viewsets.GeotrekGeometricViewset):
+class PathViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     """
     Use HTTP basic authentication to access this endpoint.
     """
@@ -4,11 +4,12 @@ from django.db.models import F
 from django.db.models.query import Prefetch
 from geotrek.api.v2 import serializers as api_serializers, \
     viewsets as api_viewsets, filters as api_filters
+from geotrek.api.v2.cache import ListCacheResponseMixin
 from geotrek.common.models import Attachment
 from geotrek.infrastructure import models as infra_models
 
 
-class InfrastructureViewSet(api_viewsets.GeotrekGeometricViewset):
+class InfrastructureViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.NearbyContentFilter,
         api_filters.UpdateOrCreateDateFilter,
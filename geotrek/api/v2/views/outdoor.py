@@ -6,11 +6,12 @@ from django.utils.translation import activate
 
 from geotrek.api.v2 import serializers as api_serializers, \
     filters as api_filters, viewsets as api_viewsets
+from geotrek.api.v2.cache import ListCacheResponseMixin
 from geotrek.common.models import Attachment, HDViewPoint
 from geotrek.outdoor import models as outdoor_models
 
 
-class SiteViewSet(api_viewsets.GeotrekGeometricViewset):
+class SiteViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.GeotrekSiteFilter,
         api_filters.NearbyContentFilter,
@@ -18,6 +19,7 @@ class SiteViewSet(api_viewsets.GeotrekGeometricViewset):
         api_filters.GeotrekRatingsFilter
     )
     serializer_class = api_serializers.SiteSerializer
+    pagination_ordering = ('name', 'pk')
 
     def get_queryset(self):
         activate(self.request.GET.get('language'))
@@ -80,7 +82,7 @@ class OutdoorRatingViewSet(api_viewsets.GeotrekViewSet):
         .order_by('order', 'name', 'pk')  # Required for reliable pagination
 
 
-class CourseViewSet(api_viewsets.GeotrekGeometricViewset):
+class CourseViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.GeotrekCourseFilter,
         api_filters.NearbyContentFilter,
@@ -88,6 +90,7 @@ class CourseViewSet(api_viewsets.GeotrekGeometricViewset):
         api_filters.GeotrekRatingsFilter
     )
     serializer_class = api_serializers.CourseSerializer
+    pagination_ordering = ('name', 'pk')
 
     def get_queryset(self):
         activate(self.request.GET.get('language'))
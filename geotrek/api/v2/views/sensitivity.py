@@ -1,12 +1,11 @@
 from django.conf import settings
 from django.contrib.gis.db.models.functions import Transform
-from django.db.models import F, Case, When, Prefetch
+from django.db.models import F, Prefetch
 from django_filters.rest_framework.backends import DjangoFilterBackend
 
 from geotrek.common.models import Attachment
 from geotrek.api.v2 import serializers as api_serializers, \
     viewsets as api_viewsets
-from geotrek.common.functions import GeometryType, Buffer, Area
 from geotrek.sensitivity import models as sensitivity_models
 from ..filters import GeotrekQueryParamsFilter, GeotrekQueryParamsDimensionFilter, GeotrekInBBoxFilter, GeotrekSensitiveAreaFilter, NearbyContentFilter, UpdateOrCreateDateFilter
 
@@ -42,20 +41,17 @@ class SensitiveAreaViewSet(api_viewsets.GeotrekGeometricViewset):
                 'rules',
                 Prefetch('attachments', queryset=Attachment.objects.select_related('license', 'filetype', 'filetype__structure'))
             )
-            .alias(geom_type=GeometryType(F('geom')))
         )
         if 'bubble' in self.request.GET:
             queryset = queryset.annotate(geom_transformed=Transform(F('geom'), settings.API_SRID))
         else:
-            queryset = queryset.annotate(geom_transformed=Case(
-                When(geom_type='POINT', then=Transform(Buffer(F('geom'), F('species__radius'), 4), settings.API_SRID)),
-                default=Transform(F('geom'), settings.API_SRID)
-            ))
+            # Buffered geometry in API SRID is computed by triggers
+            queryset = queryset.annotate(geom_transformed=F('geom_api')).defer('geom')
         # Ensure smaller areas are at the end of the list, ie above bigger areas on the map
         # to ensure we can select every area in case of overlapping
         # Second sort key pk is required for reliable pagination
-        queryset = queryset.order_by(Area('geom_transformed').desc(), 'pk')
-        return queryset.defer('geom')
+        queryset = queryset.order_by('-geom_api_area', 'pk')
+        return queryset.defer('geom_buffered', 'geom_api', 'openair_texts')
 
 
 class SportPracticeViewSet(api_viewsets.GeotrekViewSet):
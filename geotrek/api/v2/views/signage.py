@@ -4,11 +4,12 @@ from django.db.models import F
 from django.db.models.query import Prefetch
 from geotrek.api.v2 import serializers as api_serializers, \
     viewsets as api_viewsets, filters as api_filters
+from geotrek.api.v2.cache import ListCacheResponseMixin
 from geotrek.common.models import Attachment
 from geotrek.signage import models as signage_models
 
 
-class SignageViewSet(api_viewsets.GeotrekGeometricViewset):
+class SignageViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (api_filters.NearbyContentFilter, api_filters.UpdateOrCreateDateFilter)
     serializer_class = api_serializers.SignageSerializer
     queryset = signage_models.Signage.objects.existing() \
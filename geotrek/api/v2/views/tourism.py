@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.conf import settings
 from django.contrib.gis.db.models.functions import Transform
 from django.db.models import F
@@ -9,6 +11,7 @@ from rest_framework.response import Response
 
 from geotrek.api.v2 import serializers as api_serializers, \
     filters as api_filters, viewsets as api_viewsets
+from geotrek.api.v2.cache import ListCacheResponseMixin
 from geotrek.api.v2.decorators import cache_response_detail
 from geotrek.common.models import Attachment
 from geotrek.tourism import models as tourism_models
@@ -34,13 +37,14 @@ class TouristicContentCategoryViewSet(api_viewsets.GeotrekViewSet):
         return Response(serializer.data)
 
 
-class TouristicContentViewSet(api_viewsets.GeotrekGeometricViewset):
+class TouristicContentViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.GeotrekTouristicContentFilter,
         api_filters.NearbyContentFilter,
         api_filters.UpdateOrCreateDateFilter
     )
     serializer_class = api_serializers.TouristicContentSerializer
+    pagination_ordering = ('name', 'pk')
 
     def get_queryset(self):
         activate(self.request.GET.get('language'))
@@ -82,7 +86,7 @@ class TouristicEventTypeViewSet(api_viewsets.GeotrekViewSet):
     queryset = tourism_models.TouristicEventType.objects.order_by('pk')  # Required for reliable pagination
 
 
-class TouristicEventViewSet(api_viewsets.GeotrekGeometricViewset):
+class TouristicEventViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.GeotrekTouristicEventFilter,
         api_filters.NearbyContentFilter,
@@ -102,6 +106,10 @@ class TouristicEventViewSet(api_viewsets.GeotrekGeometricViewset):
             .annotate(geom_transformed=Transform(F('geom'), settings.API_SRID)) \
             .order_by('begin_date')  # Required for reliable pagination
 
+    def get_list_cache_key(self):
+        """ past events are filtered out by default, so list may change every day """
+        return f"{super().get_list_cache_key()}:{date.today().isoformat()}"
+
 
 class TouristicEventPlaceViewSet(api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
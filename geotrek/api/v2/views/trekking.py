@@ -8,6 +8,7 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 from geotrek.api.v2 import filters as api_filters, serializers as api_serializers, viewsets as api_viewsets
+from geotrek.api.v2.cache import ListCacheResponseMixin
 from geotrek.api.v2.decorators import cache_response_detail
 from geotrek.api.v2.functions import Length3D
 from geotrek.api.v2.renderers import SVGProfileRenderer
@@ -20,7 +21,7 @@ class WebLinkCategoryViewSet(api_viewsets.GeotrekViewSet):
     queryset = trekking_models.WebLinkCategory.objects.all()
 
 
-class TrekViewSet(api_viewsets.GeotrekGeometricViewset):
+class TrekViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.GeotrekTrekQueryParamsFilter,
         api_filters.NearbyContentFilter,
@@ -28,12 +29,14 @@ class TrekViewSet(api_viewsets.GeotrekGeometricViewset):
         api_filters.GeotrekRatingsFilter
     )
     serializer_class = api_serializers.TrekSerializer
+    pagination_ordering = ('name', 'pk')
 
     def get_queryset(self):
         activate(self.request.GET.get('language'))
         return trekking_models.Trek.objects.existing() \
             .select_related('topo_object') \
             .prefetch_related('topo_object__aggregations', 'accessibilities',
+                              *trekking_models.Trek.zoning_prefetches(),
                               Prefetch('attachments',
                                        queryset=Attachment.objects.select_related('license', 'filetype', 'filetype__structure')),
                               Prefetch('attachments_accessibility',
@@ -159,7 +162,7 @@ class DifficultyViewSet(api_viewsets.GeotrekViewSet):
         return Response(serializer.data)
 
 
-class POIViewSet(api_viewsets.GeotrekGeometricViewset):
+class POIViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (
         api_filters.GeotrekPOIFilter,
         api_filters.NearbyContentFilter,
@@ -219,7 +222,7 @@ class ServiceTypeViewSet(api_viewsets.GeotrekViewSet):
         return Response(serializer.data)
 
 
-class ServiceViewSet(api_viewsets.GeotrekGeometricViewset):
+class ServiceViewSet(ListCacheResponseMixin, api_viewsets.GeotrekGeometricViewset):
     filter_backends = api_viewsets.GeotrekGeometricViewset.filter_backends + (api_filters.NearbyContentFilter, api_filters.UpdateOrCreateDateFilter, api_filters.GeotrekServiceFilter)
     serializer_class = api_serializers.ServiceSerializer
     queryset = trekking_models.Service.objects.all() \
@@ -1,16 +1,21 @@
+import json
 from hashlib import md5
 
 from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import translation
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from mapentity.renderers import GeoJSONRenderer
 from rest_framework import viewsets, renderers
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.utils import encoders
 
 from geotrek.api.v2 import pagination as api_pagination, filters as api_filters
 from geotrek.api.v2.cache import RetrieveCacheResponseMixin
 from geotrek.api.v2.serializers import override_serializer
+from geotrek.common.utils.geojson import buffered, geojson_collection, iterate_in_chunks, json_array
 
 
 class GeotrekViewSet(RetrieveCacheResponseMixin, viewsets.ReadOnlyModelViewSet):
@@ -24,6 +29,8 @@ class GeotrekViewSet(RetrieveCacheResponseMixin, viewsets.ReadOnlyModelViewSet):
     authentication_classes = [BasicAuthentication, SessionAuthentication]
     renderer_classes = [renderers.JSONRenderer, renderers.BrowsableAPIRenderer, ] if settings.DEBUG else [renderers.JSONRenderer, ]
     lookup_value_regex = r'\d+'
+    # Ordering fields set only for reliable pagination, replaced by cursor pagination
+    pagination_ordering = ('pk', 'id')
 
     def get_ordered_query_params(self):
         """ Get multi value query params sorted by key """
@@ -48,12 +55,54 @@ class GeotrekViewSet(RetrieveCacheResponseMixin, viewsets.ReadOnlyModelViewSet):
         """ cache key md5 for retrieve viewset action """
         return md5(self.get_object_cache_key(kwargs.get('kwargs').get('pk')).encode("utf-8")).hexdigest()
 
+    def get_list_last_update_and_count(self):
+        """ return last update date and objects count of listed model, computed once per request """
+        if not hasattr(self, '_list_last_update_and_count'):
+            self._list_last_update_and_count = self.get_queryset().model.last_update_and_count
+        return self._list_last_update_and_count
+
+    def get_list_cache_key(self):
+        """ return list cache key based on last update and objects count of listed model """
+        last_update_and_count = self.get_list_last_update_and_count()
+        last_update = last_update_and_count.get('last_update')
+        last_update = last_update.isoformat() if last_update else '0000-00-00'
+        return f"{self.get_base_cache_string()}:{last_update}:{last_update_and_count.get('count')}"
+
+    def list_cache_key_func(self, **kwargs):
+        """ cache key md5 for list viewset action """
+        return md5(self.get_list_cache_key().encode("utf-8")).hexdigest()
+
     def get_serializer_context(self):
         return {
             'request': self.request,
             'kwargs': self.kwargs
         }
 
+    def is_streamed_list(self):
+        """ Lists without pagination are streamed (see ``streaming_list()``) """
+        return 'no_page' in self.request.query_params and self.request.accepted_renderer.format in ('json', 'geojson')
+
+    def list(self, request, *args, **kwargs):
+        if self.is_streamed_list():
+            return self.streaming_list(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def streaming_list(self, queryset):
+        """ Serialize and send objects by chunks, to keep memory usage low on large lists """
+        geojson = self.request.accepted_renderer.format == 'geojson'
+        language = translation.get_language()
+
+        def items():
+            # Rendered after the view returned
+            with translation.override(language):
+                for objects in iterate_in_chunks(queryset):
+                    data = self.get_serializer(objects, many=True).data
+                    for item in (data['features'] if geojson else data):
+                        yield json.dumps(item, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+        content = geojson_collection(items()) if geojson else json_array(items())
+        return StreamingHttpResponse(buffered(content), content_type=self.request.accepted_renderer.media_type)
+
 
 class GeotrekGeometricViewset(GeotrekViewSet):
     filter_backends = GeotrekViewSet.filter_backends + (
@@ -1,6 +1,10 @@
 import datetime
+from hashlib import md5
+from io import StringIO
 
-from django.contrib.gis.db.models.functions import Transform
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch, prefetch_related_objects
 from django.urls import reverse
 from django.utils import translation
 from django.utils.timezone import utc, make_aware
@@ -10,7 +14,15 @@ from django.utils.xmlutils import SimplerXMLGenerator
 from mapentity.serializers import plain_text
 
 
-from geotrek.cirkwi.models import CirkwiTag
+from geotrek.common.models import Attachment
+from geotrek.common.utils.geojson import iterate_in_chunks
+from geotrek.trekking.models import POI
+
+
+def pictures_prefetch():
+    """ Prefetch pictures of objects, as returned by ``PicturesMixin.pictures`` """
+    pictures = Attachment.objects.filter(is_image=True).exclude(title='mapimage').order_by('-starred', 'attachment_file')
+    return Prefetch('attachments', queryset=pictures, to_attr='_pictures')
 
 
 def timestamp(dt):
@@ -19,10 +31,22 @@ def timestamp(dt):
 
 
 class CirkwiPOISerializer:
-    def __init__(self, request, stream, get_params=None):
-        self.xml = SimplerXMLGenerator(stream, 'utf8')
+    root = 'pois'
+    # Rendered XML fragments of objects are cached until objects are updated, or until
+    # timeout to take changes of related objects (categories, labels...) into account
+    cache_timeout = 24 * 3600
+    chunk_size = 200
+
+    def __init__(self, request, get_params=None):
         self.request = request
-        self.stream = stream
+        self.get_params = get_params or {}
+
+    def render(self, serialize, *args):
+        """ Return the XML written by ``serialize(*args)`` as a string """
+        self.stream = StringIO()
+        self.xml = SimplerXMLGenerator(self.stream, 'utf8')
+        serialize(*args)
+        return self.stream.getvalue()
 
     def serialize_field(self, name, value, attrs={}):
         if not value and not attrs:
@@ -51,55 +75,109 @@ class CirkwiPOISerializer:
         self.xml.endElement('images')
         self.xml.endElement('medias')
 
+    def serialize_poi(self, poi):
+        self.xml.startElement('poi', {
+            'date_creation': timestamp(poi.date_insert),
+            'date_modification': timestamp(poi.date_update),
+            'id_poi': str(poi.pk),
+        })
+        if poi.type.cirkwi:
+            self.xml.startElement('categories', {})
+            self.serialize_field('categorie', str(poi.type.cirkwi.eid), {'nom': poi.type.cirkwi.name})
+            self.xml.endElement('categories')
+        orig_lang = translation.get_language()
+        self.xml.startElement('informations', {})
+        for lang in poi.published_langs:
+            translation.activate(lang)
+            self.xml.startElement('information', {'langue': lang})
+            self.serialize_field('titre', poi.name)
+            self.serialize_field('description', plain_text(poi.description))
+            self.serialize_medias(self.request, poi.serializable_pictures)
+            self.xml.endElement('information')
+        translation.activate(orig_lang)
+        self.xml.endElement('informations')
+        self.xml.startElement('adresse', {})
+        self.xml.startElement('position', {})
+        coords = poi.geom.transform(4326, clone=True).coords
+        self.serialize_field('lat', round(coords[1], 7))
+        self.serialize_field('lng', round(coords[0], 7))
+        self.xml.endElement('position')
+        self.xml.endElement('adresse')
+        self.xml.endElement('poi')
+
     def serialize_pois(self, pois):
-        if not pois:
-            return
         for poi in pois:
-            self.xml.startElement('poi', {
-                'date_creation': timestamp(poi.date_insert),
-                'date_modification': timestamp(poi.date_update),
-                'id_poi': str(poi.pk),
-            })
-            if poi.type.cirkwi:
-                self.xml.startElement('categories', {})
-                self.serialize_field('categorie', str(poi.type.cirkwi.eid), {'nom': poi.type.cirkwi.name})
-                self.xml.endElement('categories')
-            orig_lang = translation.get_language()
-            self.xml.startElement('informations', {})
-            for lang in poi.published_langs:
-                translation.activate(lang)
-                self.xml.startElement('information', {'langue': lang})
-                self.serialize_field('titre', poi.name)
-                self.serialize_field('description', plain_text(poi.description))
-                self.serialize_medias(self.request, poi.serializable_pictures)
-                self.xml.endElement('information')
-            translation.activate(orig_lang)
-            self.xml.endElement('informations')
-            self.xml.startElement('adresse', {})
-            self.xml.startElement('position', {})
-            coords = poi.geom.transform(4326, clone=True).coords
-            self.serialize_field('lat', round(coords[1], 7))
-            self.serialize_field('lng', round(coords[0], 7))
-            self.xml.endElement('position')
-            self.xml.endElement('adresse')
-            self.xml.endElement('poi')
-
-    def serialize(self, pois):
+            self.serialize_poi(poi)
+
+    def serialize_object(self, poi):
+        self.serialize_poi(poi)
+
+    def start_document(self):
         self.xml.startDocument()
-        self.xml.startElement('pois', {'version': '2'})
-        self.serialize_pois(pois)
-        self.xml.endElement('pois')
+        self.xml.startElement(self.root, {'version': '2'})
+
+    def end_document(self):
+        self.xml.endElement(self.root)
         self.xml.endDocument()
 
+    def prefetch(self, objects):
+        """ Fetch what is needed to compute cache keys of a chunk of objects """
+        pass
+
+    def prefetch_rendered(self, objects):
+        """ Fetch related objects of a chunk of objects to render, with one query by relation """
+        prefetch_related_objects(objects, pictures_prefetch())
+
+    def get_cache_params(self, obj):
+        """ Everything but the object itself which changes its XML fragment """
+        return self.request.build_absolute_uri('/')
+
+    def get_cache_key(self, obj):
+        params = md5(self.get_cache_params(obj).encode()).hexdigest()
+        return 'cirkwi_{}_{}_{}_{}_{}'.format(obj._meta.label_lower, obj.pk, obj.date_update.timestamp(),
+                                              get_language(), params)
+
+    def serialize_objects(self, objects):
+        """
+        Yield XML fragments of objects, by chunks. Fragments of objects which did not change
+        are read from cache, other objects are rendered after prefetching their related objects.
+        """
+        cache = caches['fat']
+        for chunk in iterate_in_chunks(objects, self.chunk_size):
+            self.prefetch(chunk)
+            keys = {self.get_cache_key(obj): obj for obj in chunk}
+            fragments = cache.get_many(keys.keys())
+            missing = {key: obj for key, obj in keys.items() if key not in fragments}
+            if missing:
+                self.prefetch_rendered(list(missing.values()))
+                rendered = {key: self.render(self.serialize_object, obj) for key, obj in missing.items()}
+                cache.set_many(rendered, timeout=self.cache_timeout)
+                fragments.update(rendered)
+            for key in keys:
+                yield fragments[key]
+
+    def serialize(self, objects):
+        """ Return an iterator over the XML document, to be streamed """
+        language = get_language()
+
+        def document():
+            with translation.override(language):
+                yield self.render(self.start_document)
+                yield from self.serialize_objects(objects)
+                yield self.render(self.end_document)
+
+        return document()
+
 
 class CirkwiTrekSerializer(CirkwiPOISerializer):
     ADDITIONNAL_INFO = ('departure', 'arrival', 'ambiance', 'access', 'accessibility_infrastructure',
                         'advised_parking', 'public_transport', 'advice')
 
-    def __init__(self, request, stream, get_params=None):
-        super().__init__(request, stream, get_params)
-        self.request = request
-        self.exclude_pois = get_params.get('withoutpois', None)
+    root = 'circuits'
+
+    def __init__(self, request, get_params=None):
+        super().__init__(request, get_params)
+        self.exclude_pois = self.get_params.get('withoutpois', None)
 
     def serialize_additionnal_info(self, trek, name):
         value = getattr(trek, name)
@@ -153,13 +231,14 @@ class CirkwiTrekSerializer(CirkwiPOISerializer):
             self.serialize_field('description', plain_text(description))
 
     def serialize_tags(self, trek):
-        tag_ids = list(trek.themes.filter(cirkwi_id__isnull=False).values_list('cirkwi_id', flat=True))
-        tag_ids += trek.accessibilities.filter(cirkwi_id__isnull=False).values_list('cirkwi_id', flat=True)
+        # Read tags from prefetched themes and accessibilities
+        tags = [theme.cirkwi for theme in trek.themes.all() if theme.cirkwi_id]
+        tags += [accessibility.cirkwi for accessibility in trek.accessibilities.all() if accessibility.cirkwi_id]
         if trek.difficulty and trek.difficulty.cirkwi_id:
-            tag_ids.append(trek.difficulty.cirkwi_id)
-        if tag_ids:
+            tags.append(trek.difficulty.cirkwi)
+        if tags:
             self.xml.startElement('tags_publics', {})
-            for tag in CirkwiTag.objects.filter(id__in=tag_ids):
+            for tag in sorted({tag.pk: tag for tag in tags}.values(), key=lambda tag: tag.name):
                 self.serialize_field('tag_public', '', {'id': str(tag.eid), 'nom': tag.name})
             self.xml.endElement('tags_publics')
 
@@ -171,46 +250,71 @@ class CirkwiTrekSerializer(CirkwiPOISerializer):
             self.serialize_field('description', value)
             self.xml.endElement('information_complementaire')
 
-    # TODO: parking location (POI?), points_reference
-    def serialize(self, treks):
-        self.xml.startDocument()
-        self.xml.startElement('circuits', {'version': '2'})
+    def get_pois(self, trek):
+        if self.exclude_pois:
+            return []
+        if not hasattr(trek, 'cirkwi_pois'):
+            trek.cirkwi_pois = list(trek.published_pois.select_related('type__cirkwi'))
+        return trek.cirkwi_pois
+
+    def prefetch(self, treks):
+        """ Fetch published POIs of a chunk of treks, with one query if treks topologies are enabled """
+        if self.exclude_pois or not settings.TREKKING_TOPOLOGY_ENABLED:
+            return
+        pois = POI.objects.existing().filter(published=True).select_related('type__cirkwi')
+        overlapping = POI.overlapping_by_topology(treks, all_objects=pois)
+        prefetch_related_objects(treks, 'pois_excluded')
         for trek in treks:
-            self.xml.startElement('circuit', {
-                'date_creation': timestamp(trek.date_insert),
-                'date_modification': timestamp(trek.date_update),
-                'id_circuit': str(trek.pk),
-            })
-            orig_lang = translation.get_language()
-            self.xml.startElement('informations', {})
-            for lang in trek.published_langs:
-                translation.activate(lang)
-                self.xml.startElement('information', {'langue': lang})
-                self.serialize_field('titre', trek.name)
-                self.serialize_description(trek)
-                self.serialize_medias(self.request, trek.serializable_pictures)
-                if any([getattr(trek, name) for name in self.ADDITIONNAL_INFO]):
-                    self.xml.startElement('informations_complementaires', {})
-                    for name in self.ADDITIONNAL_INFO:
-                        self.serialize_additionnal_info(trek, name)
-                    self.serialize_labels(trek)
-                    self.xml.endElement('informations_complementaires')
-                self.serialize_tags(trek)
-                self.xml.endElement('information')
-            translation.activate(orig_lang)
-            self.xml.endElement('informations')
-            self.serialize_field('distance', int(trek.length))
-            self.serialize_locomotions(trek)
-            kml_url = reverse('trekking:trek_kml_detail',
-                              kwargs={'lang': get_language(), 'pk': trek.pk, 'slug': trek.slug})
-            self.serialize_field('fichier_trace', '', {'url': self.request.build_absolute_uri(kml_url)})
-            self.xml.startElement('tracking_information', {})
-            self.serialize_tracking_info(trek)
-            self.xml.endElement('tracking_information')
-            if not self.exclude_pois and trek.published_pois:
-                self.xml.startElement('pois', {})
-                self.serialize_pois(trek.published_pois.annotate(transformed_geom=Transform('geom', 4326)))
-                self.xml.endElement('pois')
-            self.xml.endElement('circuit')
-        self.xml.endElement('circuits')
-        self.xml.endDocument()
+            excluded = {poi.pk for poi in trek.pois_excluded.all()}
+            trek.cirkwi_pois = [poi for poi in overlapping[trek.pk] if poi.pk not in excluded]
+
+    def prefetch_rendered(self, treks):
+        prefetch_related_objects(treks, 'portal', 'source', 'labels', 'themes__cirkwi', 'accessibilities__cirkwi',
+                                 pictures_prefetch())
+        pois = [poi for trek in treks for poi in self.get_pois(trek)]
+        prefetch_related_objects(pois, pictures_prefetch())
+
+    def get_cache_params(self, trek):
+        """ Fragments of treks include their POIs """
+        pois = ','.join('{}:{}'.format(poi.pk, poi.date_update.timestamp()) for poi in self.get_pois(trek))
+        return '{}:{}:{}'.format(super().get_cache_params(trek), bool(self.exclude_pois), pois)
+
+    # TODO: parking location (POI?), points_reference
+    def serialize_object(self, trek):
+        self.xml.startElement('circuit', {
+            'date_creation': timestamp(trek.date_insert),
+            'date_modification': timestamp(trek.date_update),
+            'id_circuit': str(trek.pk),
+        })
+        orig_lang = translation.get_language()
+        self.xml.startElement('informations', {})
+        for lang in trek.published_langs:
+            translation.activate(lang)
+            self.xml.startElement('information', {'langue': lang})
+            self.serialize_field('titre', trek.name)
+            self.serialize_description(trek)
+            self.serialize_medias(self.request, trek.serializable_pictures)
+            if any([getattr(trek, name) for name in self.ADDITIONNAL_INFO]):
+                self.xml.startElement('informations_complementaires', {})
+                for name in self.ADDITIONNAL_INFO:
+                    self.serialize_additionnal_info(trek, name)
+                self.serialize_labels(trek)
+                self.xml.endElement('informations_complementaires')
+            self.serialize_tags(trek)
+            self.xml.endElement('information')
+        translation.activate(orig_lang)
+        self.xml.endElement('informations')
+        self.serialize_field('distance', int(trek.length))
+        self.serialize_locomotions(trek)
+        kml_url = reverse('trekking:trek_kml_detail',
+                          kwargs={'lang': get_language(), 'pk': trek.pk, 'slug': trek.slug})
+        self.serialize_field('fichier_trace', '', {'url': self.request.build_absolute_uri(kml_url)})
+        self.xml.startElement('tracking_information', {})
+        self.serialize_tracking_info(trek)
+        self.xml.endElement('tracking_information')
+        pois = self.get_pois(trek)
+        if pois:
+            self.xml.startElement('pois', {})
+            self.serialize_pois(pois)
+            self.xml.endElement('pois')
+        self.xml.endElement('circuit')
@@ -1,4 +1,5 @@
 import datetime
+from unittest import mock
 
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -56,7 +57,7 @@ class CirkwiTests(TranslationResetMixin, TestCase):
             'poi_description': self.poi.description.replace('<p>', '').replace('</p>', ''),
         }
         self.assertXMLEqual(
-            response.content.decode(),
+            response.getvalue().decode(),
             '<?xml version="1.0" encoding="utf8"?>\n'
             '<circuits version="2">'
             '<circuit date_creation="1388534400" date_modification="{date_update}" id_circuit="{pk}">'
@@ -107,6 +108,20 @@ class CirkwiTests(TranslationResetMixin, TestCase):
             '</circuit>'
             '</circuits>'.format(**attrs))
 
+    def test_export_circuits_reuses_cached_fragments(self):
+        response = self.client.get('/api/cirkwi/circuits.xml')
+        self.assertTrue(response.streaming)
+        content = response.getvalue()
+        with mock.patch('geotrek.cirkwi.serializers.CirkwiTrekSerializer.serialize_object') as serialize_object:
+            response = self.client.get('/api/cirkwi/circuits.xml')
+            self.assertEqual(response.getvalue(), content)
+        serialize_object.assert_not_called()
+        # Trek is rendered again when one of its POIs is updated
+        self.poi.name = "Updated POI"
+        self.poi.save()
+        response = self.client.get('/api/cirkwi/circuits.xml')
+        self.assertIn(b'<titre>Updated POI</titre>', response.getvalue())
+
     def test_export_pois(self):
         response = self.client.get('/api/cirkwi/pois.xml')
         self.assertEqual(response.status_code, 200)
@@ -117,7 +132,7 @@ class CirkwiTests(TranslationResetMixin, TestCase):
             'date_update': timestamp(self.poi.date_update),
         }
         self.assertXMLEqual(
-            response.content.decode(),
+            response.getvalue().decode(),
             '<?xml version="1.0" encoding="utf8"?>\n'
             '<pois version="2">'
             '<poi id_poi="{pk}" date_modification="{date_update}" date_creation="1388534400">'
@@ -141,7 +156,7 @@ class CirkwiTests(TranslationResetMixin, TestCase):
             'picture': f'http://testserver{self.poi.resized_pictures[0][1].url}'
         }
         self.assertXMLEqual(
-            response.content.decode(),
+            response.getvalue().decode(),
             '<?xml version="1.0" encoding="utf8"?>\n'
             '<pois version="2">'
             '<poi id_poi="{pk}" date_modification="{date_update}" date_creation="1388534400">'
@@ -169,7 +184,7 @@ class CirkwiTests(TranslationResetMixin, TestCase):
             'picture': f'http://testserver{self.trek.resized_pictures[0][1].url}'
         }
         self.assertXMLEqual(
-            response.content.decode(),
+            response.getvalue().decode(),
             '<?xml version="1.0" encoding="utf8"?>\n'
             '<circuits version="2">'
             '<circuit date_creation="1388534400" date_modification="{date_update}" id_circuit="{pk}">'
@@ -224,7 +239,7 @@ class CirkwiTests(TranslationResetMixin, TestCase):
             'date_update': timestamp(self.poi.date_update),
         }
         self.assertXMLEqual(
-            response.content.decode(),
+            response.getvalue().decode(),
             '<?xml version="1.0" encoding="utf8"?>\n'
             '<pois version="2">'
             '<poi id_poi="{pk}" date_modification="{date_update}" date_creation="1388534400">'
@@ -245,20 +260,20 @@ class CirkwiTests(TranslationResetMixin, TestCase):
         # We found one trek with the portal
         response = self.client.get(f'/api/cirkwi/circuits.xml?portals={portal.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<circuits version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<circuits version="2"/>')
         other_portal = TargetPortalFactory.create()
         # We found no treks with the other portal's id
         response = self.client.get(f'/api/cirkwi/circuits.xml?portals={other_portal.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                       '<circuits version="2"/>')
+        self.assertXMLEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                          '<circuits version="2"/>')
 
         # We found treks when we ask for the other portal's id and portal's id
         response = self.client.get(f'/api/cirkwi/circuits.xml?portals={other_portal.pk},{portal.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<circuits version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<circuits version="2"/>')
 
     def test_trek_filter_structures(self):
         structure = StructureFactory.create()
@@ -268,19 +283,19 @@ class CirkwiTests(TranslationResetMixin, TestCase):
         # We found one trek with the structure
         response = self.client.get(f'/api/cirkwi/circuits.xml?structures={structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<circuits version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<circuits version="2"/>')
         other_structure = StructureFactory.create()
         # We found no treks with the other structure's id
         response = self.client.get(f'/api/cirkwi/circuits.xml?structures={other_structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                       '<circuits version="2"/>')
+        self.assertXMLEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                          '<circuits version="2"/>')
 
         response = self.client.get(f'/api/cirkwi/circuits.xml?structures={other_structure.pk},{structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<circuits version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<circuits version="2"/>')
 
     def test_poi_filter_structures(self):
         structure = StructureFactory.create()
@@ -290,21 +305,21 @@ class CirkwiTests(TranslationResetMixin, TestCase):
         # We found one trek with the structure
         response = self.client.get(f'/api/cirkwi/pois.xml?structures={structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<pois version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<pois version="2"/>')
         other_structure = StructureFactory.create()
         # We found no treks with the other structure's id
         response = self.client.get(f'/api/cirkwi/pois.xml?structures={other_structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                       '<pois version="2"/>')
+        self.assertXMLEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                          '<pois version="2"/>')
 
         response = self.client.get(f'/api/cirkwi/pois.xml?structures={other_structure.pk},{structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<pois version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<pois version="2"/>')
 
         response = self.client.get(f'/api/cirkwi/pois.xml?structures={other_structure.pk}&structures={structure.pk}')
         self.assertEqual(response.status_code, 200)
-        self.assertXMLNotEqual(response.content.decode(), '<?xml version="1.0" encoding="utf8"?>\n'
-                                                          '<pois version="2"/>')
+        self.assertXMLNotEqual(response.getvalue().decode(), '<?xml version="1.0" encoding="utf8"?>\n'
+                                                             '<pois version="2"/>')
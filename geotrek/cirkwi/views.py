@@ -1,6 +1,7 @@
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
 from django.views.generic import ListView
+from geotrek.common.utils.geojson import buffered
 from geotrek.trekking.models import Trek, POI
 from geotrek.cirkwi.filters import CirkwiPOIFilterSet, CirkwiTrekFilterSet
 from geotrek.cirkwi.serializers import CirkwiTrekSerializer, CirkwiPOISerializer
@@ -13,14 +14,12 @@ class CirkwiTrekView(ListView):
         qs = Trek.objects.existing()
         qs = qs.filter(published=True)
         qs = CirkwiTrekFilterSet(self.request.GET, queryset=qs).qs
-        return qs
+        return qs.select_related('structure', 'practice__cirkwi', 'difficulty__cirkwi')
 
     def get(self, request):
-        response = HttpResponse(content_type='application/xml')
-        serializer = CirkwiTrekSerializer(request, response, request.GET)
+        serializer = CirkwiTrekSerializer(request, request.GET)
         treks = self.get_queryset()
-        serializer.serialize(treks)
-        return response
+        return StreamingHttpResponse(buffered(serializer.serialize(treks)), content_type='application/xml')
 
 
 class CirkwiPOIView(ListView):
@@ -30,11 +29,9 @@ class CirkwiPOIView(ListView):
         qs = POI.objects.existing()
         qs = qs.filter(published=True)
         qs = CirkwiPOIFilterSet(self.request.GET, queryset=qs).qs
-        return qs
+        return qs.select_related('type__cirkwi')
 
     def get(self, request):
-        response = HttpResponse(content_type='application/xml')
-        serializer = CirkwiPOISerializer(request, response, request.GET)
+        serializer = CirkwiPOISerializer(request, request.GET)
         pois = self.get_queryset()
-        serializer.serialize(pois)
-        return response
+        return StreamingHttpResponse(buffered(serializer.serialize(pois)), content_type='application/xml')
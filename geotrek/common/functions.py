@@ -34,6 +34,16 @@ class EndPoint(GeoFunc):
     output_field = PointField()
 
 
+class X(GeoFunc):
+    """ ST_X postgis function """
+    output_field = FloatField()
+
+
+class Y(GeoFunc):
+    """ ST_Y postgis function """
+    output_field = FloatField()
+
+
 class Buffer(GeomOutputGeoFunc):
     """ ST_Buffer postgis function """
     pass
@@ -1,7 +1,13 @@
 import logging
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from django.conf import settings
+from django.contrib.gis.geos import GeometryCollection, Polygon
 from landez import TilesManager
 from landez.sources import DownloadError
 
@@ -11,21 +17,67 @@ from geotrek.common import views
 logger = logging.getLogger(__name__)
 
 
+def _tiles_projection(coords):
+    """ Project WGS84 coordinates to Web Mercator tile coordinates at zoom level 0 """
+    coords = np.asarray(coords, dtype=np.float64)
+    x = (coords[:, 0] + 180.0) / 360.0
+    sin_lat = np.clip(np.sin(np.radians(coords[:, 1])), -0.9999, 0.9999)
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    return np.column_stack([x, y])
+
+
+def tiles_coverage(geom, radius, zoomlevels, scheme='wmts'):
+    """
+    Return the set of tiles ``(z, x, y)`` intersecting ``geom`` (in WGS84) buffered by
+    ``radius`` degrees.
+
+    The simplified geometry is buffered once, projected to tile coordinates with NumPy,
+    then rasterized row by row: each row of tiles covers the columns spanned by the parts
+    of the area within this row.
+    """
+    area = geom.simplify(radius / 10).buffer(radius)
+    polygons = list(area) if isinstance(area, GeometryCollection) else [area]
+    tiles = set()
+    for polygon in polygons:
+        if polygon.empty:
+            continue
+        rings = [_tiles_projection(ring.coords) for ring in polygon]
+        for z in zoomlevels:
+            n = 2 ** z
+            projected = Polygon(*[ring * n for ring in rings])
+            xmin, ymin, xmax, ymax = projected.extent
+            for row in range(max(int(ymin), 0), min(int(ymax), n - 1) + 1):
+                strip = projected.intersection(Polygon.from_bbox((xmin, row, xmax, row + 1)))
+                if strip.empty:
+                    continue
+                y = n - 1 - row if scheme == 'tms' else row
+                for part in (list(strip) if isinstance(strip, GeometryCollection) else [strip]):
+                    part_xmin, part_ymin, part_xmax, part_ymax = part.extent
+                    for x in range(max(int(part_xmin), 0), min(int(part_xmax), n - 1) + 1):
+                        tiles.add((z, x, y))
+    return tiles
+
+
 class ZipTilesBuilder:
     def __init__(self, zipfile, prefix="", **builder_args):
         self.zipfile = zipfile
         self.prefix = prefix
         builder_args['tile_format'] = self.format_from_url(builder_args['tiles_url'])
-        self.tm = TilesManager(**builder_args)
+        self.builder_args = builder_args
+        self.tm = self.tiles_manager()
+        # Tiles managers of download threads (see ``fetch()``)
+        self.local = threading.local()
+        self.tiles = set()
 
+    def tiles_manager(self):
+        tm = TilesManager(**self.builder_args)
         if not isinstance(settings.MOBILE_TILES_URL, str) and len(settings.MOBILE_TILES_URL) > 1:
             for url in settings.MOBILE_TILES_URL[1:]:
-                args = builder_args
+                args = dict(self.builder_args)
                 args['tiles_url'] = url
                 args['tile_format'] = self.format_from_url(args['tiles_url'])
-                self.tm.add_layer(TilesManager(**args), opacity=1)
-
-        self.tiles = set()
+                tm.add_layer(TilesManager(**args), opacity=1)
+        return tm
 
     def format_from_url(self, url):
         """
@@ -41,18 +93,59 @@ class ZipTilesBuilder:
     def add_coverage(self, bbox, zoomlevels):
         self.tiles |= set(self.tm.tileslist(bbox, zoomlevels))
 
-    def run(self):
+    def add_geometry_coverage(self, geom, radius, zoomlevels):
+        """ Add tiles around ``geom`` (in WGS84), within ``radius`` degrees """
+        self.tiles |= tiles_coverage(geom, radius, zoomlevels, scheme=self.tm.tile_scheme)
+
+    def prepare_cache(self):
+        """
+        Remove tiles older than ``MOBILE_TILES_CACHE_EXPIRATION`` days from the local tiles
+        store (shared between runs), so that they are downloaded again, and create folders
+        of missing tiles before downloading them concurrently.
+        """
+        caches = [tm.cache for tm in [self.tm] + [layer for layer, opacity in self.tm._layers]]
+        caches = [cache for cache in caches if hasattr(cache, 'tile_fullpath')]
+        expiration = settings.MOBILE_TILES_CACHE_EXPIRATION
+        oldest = time.time() - expiration * 24 * 3600 if expiration is not None else None
+        folders = set()
         for tile in self.tiles:
-            name = '{prefix}{0}/{1}/{2}{ext}'.format(
-                *tile,
-                prefix=self.prefix,
-                ext=settings.MOBILE_TILES_EXTENSION or self.tm._tile_extension
-            )
-            try:
-                data = self.tm.tile(tile)
-            except DownloadError:
-                logger.warning("Failed to download tile %s" % name)
-            else:
+            for cache in caches:
+                path = cache.tile_fullpath(tile)
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    folders.add(os.path.dirname(path))
+                    continue
+                if oldest is not None and mtime < oldest:
+                    os.remove(path)
+        for folder in folders:
+            os.makedirs(folder, exist_ok=True)
+
+    def fetch(self, tile):
+        # Landez tiles managers are not meant to be shared between threads (readers, caches
+        # and blending of layers are instance state), so each thread uses its own
+        tm = getattr(self.local, 'tm', None)
+        if tm is None:
+            tm = self.local.tm = self.tiles_manager()
+        try:
+            return tm.tile(tile)
+        except DownloadError:
+            logger.warning("Failed to download tile %s/%s/%s" % tile)
+            return None
+
+    def run(self):
+        self.prepare_cache()
+        tiles = sorted(self.tiles)
+        # Tiles are read from local store or downloaded by a bounded pool, then written in order
+        with ThreadPoolExecutor(max_workers=settings.MOBILE_TILES_DOWNLOAD_WORKERS) as executor:
+            for tile, data in zip(tiles, executor.map(self.fetch, tiles)):
+                if data is None:
+                    continue
+                name = '{prefix}{0}/{1}/{2}{ext}'.format(
+                    *tile,
+                    prefix=self.prefix,
+                    ext=settings.MOBILE_TILES_EXTENSION or self.tm._tile_extension
+                )
                 self.zipfile.writestr(name, data)
 
 
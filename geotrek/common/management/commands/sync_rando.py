@@ -1,6 +1,9 @@
 import argparse
+import hashlib
+import json
 import logging
 import filecmp
+import multiprocessing
 import os
 import stat
 import shutil
@@ -11,6 +14,7 @@ from zipfile import ZipFile
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.db.models import Q
 from django.http import StreamingHttpResponse
 from django.test.client import RequestFactory
@@ -48,8 +52,44 @@ from geotrek.tourism import urls  # NOQA
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_NAME = 'manifest.json'
+
+# Options changing the content of synced files
+MANIFEST_OPTIONS = ('url', 'rando_url', 'source', 'portal', 'skip_pdf', 'skip_dem', 'skip_profile_png',
+                    'with_events', 'content_categories', 'with_signages', 'with_infrastructures', 'with_dives')
+
+# Objects to sync in worker processes, inherited from the main process
+_parallel_sync = None
+
+
+def _sync_object_in_worker(index):
+    command, lang, sync_object, objects = _parallel_sync
+    translation.activate(lang)
+    return command.sync_unit(lang, sync_object, objects[index])
+
+
+class ZipEntries:
+    """ Collect files to add to a zip file, so that they are added by the main process """
+
+    def __init__(self, root):
+        self.root = root
+        self.entries = []
+
+    def namelist(self):
+        return [arcname for filename, arcname in self.entries]
+
+    def write(self, filename, arcname):
+        self.entries.append((os.path.relpath(filename, self.root), arcname))
+
 
 class Command(BaseCommand):
+    successfull = True
+    incremental = False
+    processes = 1
+    manifest = None
+    previous_manifest = None
+    unit = None
+
     def add_arguments(self, parser):
         parser.add_argument('path')
         parser.add_argument('--empty-tmp-folder', dest='empty_tmp_folder', action='store_true', default=False,
@@ -79,12 +119,136 @@ class Command(BaseCommand):
                             default=False, help='include infrastructures')
         parser.add_argument('--with-dives', action='store_true', dest='with_dives',
                             default=False, help='include dives')
+        parser.add_argument('--incremental', action='store_true', dest='incremental', default=False,
+                            help='Keep a manifest of synced objects and do not render again objects '
+                                 'unchanged since previous sync')
+        parser.add_argument('--processes', type=int, dest='processes', default=1,
+                            help='Number of processes used to render objects')
         parser.add_argument('--task', default=None, help=argparse.SUPPRESS)
 
     def mkdirs(self, name):
         dirname = os.path.dirname(name)
         if not os.path.exists(dirname):
-            os.makedirs(dirname)
+            os.makedirs(dirname, exist_ok=True)
+
+    def record(self, name, digest=None):
+        """ Keep track of a synced file, for the manifest """
+        if self.unit is not None:
+            self.unit['files'][name] = digest
+        elif self.manifest is not None:
+            self.manifest['files'][name] = digest
+
+    def previous_digest(self, name):
+        if self.previous_manifest is None:
+            return None
+        return self.previous_manifest['files'].get(name)
+
+    def related_signature(self, *querysets):
+        """ Identify the state of objects rendered with an object, to detect their changes """
+        related = [sorted((pk, date_update.isoformat()) for pk, date_update in qs.values_list('pk', 'date_update'))
+                   for qs in querysets]
+        return hashlib.md5(json.dumps(related).encode('utf-8')).hexdigest()
+
+    def object_signature(self, obj, signature=None):
+        values = [obj.date_update.isoformat()]
+        if signature:
+            values.append(signature(obj))
+        return hashlib.md5(json.dumps(values).encode('utf-8')).hexdigest()
+
+    def load_manifest(self):
+        empty = {'params': self.manifest_params, 'files': {}, 'objects': {}}
+        try:
+            with open(os.path.join(self.dst_root, MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+        except (IOError, ValueError):
+            return empty
+        if manifest.get('params') != self.manifest_params:
+            return empty
+        return manifest
+
+    def write_manifest(self):
+        with open(os.path.join(self.tmp_root, MANIFEST_NAME), 'w') as f:
+            json.dump(self.manifest, f)
+
+    def reuse_unit(self, key, signature):
+        """ Link files of an object unchanged since previous sync, return False if not possible """
+        previous = self.previous_manifest['objects'].get(key)
+        if previous is None or previous['signature'] != signature:
+            return False
+        if not all(os.path.isfile(os.path.join(self.dst_root, name)) for name in previous['files']):
+            return False
+        for name in previous['files']:
+            dst = os.path.join(self.tmp_root, name)
+            self.mkdirs(dst)
+            try:
+                os.link(os.path.join(self.dst_root, name), dst)
+            except FileExistsError:
+                pass
+        if self.verbosity == 2:
+            self.stdout.write("{key} unchanged".format(key=key))
+        self.add_unit(key, previous)
+        return True
+
+    def add_unit(self, key, unit):
+        """ Add files of an object synced apart into global zip file and manifest """
+        for name, arcname in unit['zip']:
+            if arcname not in self.zipfile.namelist():
+                self.zipfile.write(os.path.join(self.tmp_root, name), arcname)
+        if not unit.get('successfull', True):
+            self.successfull = False
+        if self.manifest is not None:
+            self.manifest['files'].update(unit['files'])
+            if unit.get('successfull', True):
+                self.manifest['objects'][key] = {
+                    'signature': unit['signature'],
+                    'files': unit['files'],
+                    'zip': unit['zip'],
+                }
+
+    def sync_unit(self, lang, sync_object, obj):
+        """ Call ``sync_object(lang, obj)`` and return files it synced """
+        zipfile, self.zipfile = self.zipfile, ZipEntries(self.tmp_root)
+        successfull, self.successfull = self.successfull, True
+        self.unit = {'files': {}}
+        try:
+            sync_object(lang, obj)
+            unit = self.unit
+            unit['zip'] = self.zipfile.entries
+            unit['successfull'] = self.successfull
+        finally:
+            self.zipfile = zipfile
+            self.successfull = successfull
+            self.unit = None
+        return unit
+
+    def sync_objects(self, lang, sync_object, objects, signature=None):
+        """
+        Call ``sync_object(lang, obj)`` for each object. With ``--incremental``, objects whose
+        update date (and ``signature(obj)`` if given) did not change since previous sync are not
+        rendered again. With ``--processes``, other objects are rendered by worker processes.
+        """
+        global _parallel_sync
+        todo = []
+        for obj in objects:
+            key = '{model}:{pk}:{lang}'.format(model=obj._meta.label_lower, pk=obj.pk, lang=lang)
+            obj_signature = self.object_signature(obj, signature) if self.manifest is not None else None
+            if self.incremental and self.reuse_unit(key, obj_signature):
+                continue
+            todo.append((key, obj_signature, obj))
+        if self.processes > 1 and len(todo) > 1:
+            # Each worker opens its own database connection
+            connections.close_all()
+            _parallel_sync = (self, lang, sync_object, [obj for key, obj_signature, obj in todo])
+            try:
+                with multiprocessing.get_context('fork').Pool(self.processes) as pool:
+                    units = pool.map(_sync_object_in_worker, range(len(todo)))
+            finally:
+                _parallel_sync = None
+        else:
+            units = (self.sync_unit(lang, sync_object, obj) for key, obj_signature, obj in todo)
+        for (key, obj_signature, obj), unit in zip(todo, units):
+            unit['signature'] = obj_signature
+            self.add_unit(key, unit)
 
     def get_params_portal(self, params):
         if self.portal:
@@ -125,25 +289,14 @@ class Command(BaseCommand):
 
         trek_file = os.path.join(self.tmp_root, zipname)
 
-        def _radius2bbox(lng, lat, radius):
-            return (lng - radius, lat - radius,
-                    lng + radius, lat + radius)
-
         self.mkdirs(trek_file)
 
         zipfile = ZipFile(trek_file, 'w')
         tiles = common_sync.ZipTilesBuilder(zipfile, **self.builder_args)
 
-        geom = trek.geom
-        if geom.geom_type == 'MultiLineString':
-            geom = geom[0]  # FIXME
-        geom.transform(4326)
-
-        for (lng, lat) in geom.coords:
-            large = _radius2bbox(lng, lat, settings.MOBILE_TILES_RADIUS_LARGE)
-            small = _radius2bbox(lng, lat, settings.MOBILE_TILES_RADIUS_SMALL)
-            tiles.add_coverage(bbox=large, zoomlevels=settings.MOBILE_TILES_LOW_ZOOMS)
-            tiles.add_coverage(bbox=small, zoomlevels=settings.MOBILE_TILES_HIGH_ZOOMS)
+        geom = trek.geom.transform(4326, clone=True)
+        tiles.add_geometry_coverage(geom, settings.MOBILE_TILES_RADIUS_LARGE, settings.MOBILE_TILES_LOW_ZOOMS)
+        tiles.add_geometry_coverage(geom, settings.MOBILE_TILES_RADIUS_SMALL, settings.MOBILE_TILES_HIGH_ZOOMS)
 
         tiles.run()
         self.close_zip(zipfile, zipname)
@@ -184,9 +337,16 @@ class Command(BaseCommand):
             content = content.replace(b'\\u2029', b'\\n')
         f.write(content)
         f.close()
+        digest = hashlib.sha1(content).hexdigest()
+        self.record(name, digest)
         oldfilename = os.path.join(self.dst_root, name)
+        previous_digest = self.previous_digest(name)
+        if previous_digest is not None:
+            unchanged = previous_digest == digest
+        else:
+            unchanged = os.path.isfile(oldfilename) and filecmp.cmp(fullname, oldfilename)
         # If new file is identical to old one, don't recreate it. This will help backup
-        if os.path.isfile(oldfilename) and filecmp.cmp(fullname, oldfilename):
+        if unchanged and os.path.isfile(oldfilename):
             os.unlink(fullname)
             os.link(oldfilename, fullname)
             if self.verbosity == 2:
@@ -264,7 +424,11 @@ class Command(BaseCommand):
                 self.stdout.write("\x1b[36m{lang}\x1b[0m \x1b[1m{url}/{name}\x1b[0m \x1b[31mfile does not exist\x1b[0m".format(lang=lang, url=url, name=name))
             return
         if not os.path.isfile(dst):
-            os.link(src, dst)
+            try:
+                os.link(src, dst)
+            except FileExistsError:  # Linked meanwhile by another process
+                pass
+        self.record(os.path.join(url, name))
         if zipfile:
             zipfile.write(dst, os.path.join(url, name))
         if self.verbosity == 2:
@@ -299,6 +463,7 @@ class Command(BaseCommand):
         if uptodate:
             stat = os.stat(oldzipfilename)
             os.utime(zipfilename, (stat.st_atime, stat.st_mtime))
+        self.record(name)
 
         if self.verbosity == 2:
             if uptodate:
@@ -371,6 +536,7 @@ class Command(BaseCommand):
                                obj.slug + '.pdf')
             self.mkdirs(dst)
             os.link(src, dst)
+            self.record(os.path.relpath(dst, self.tmp_root))
             if self.verbosity == 2:
                 self.stdout.write("\x1b[36m{lang}\x1b[0m \x1b[1m{dst}\x1b[0m \x1b[32mcopied\x1b[0m".format(lang=lang,
                                                                                                            dst=dst))
@@ -438,7 +604,7 @@ class Command(BaseCommand):
         if not os.path.exists(self.dst_root):
             return
         existing = set([os.path.basename(p) for p in os.listdir(self.dst_root)])
-        remaining = existing - set(('api', 'media', 'meta', 'static', 'zip'))
+        remaining = existing - set(('api', 'media', 'meta', 'static', 'zip', MANIFEST_NAME))
         if remaining:
             raise CommandError("Destination directory contains extra data")
 
@@ -491,6 +657,14 @@ class Command(BaseCommand):
         self.with_infrastructures = options.get('with_infrastructures', False)
         self.with_dives = options.get('with_dives', False)
         self.celery_task = options.get('task', None)
+        self.incremental = options.get('incremental', False)
+        self.processes = options.get('processes', 1)
+        if self.incremental:
+            params = [settings.VERSION, settings.USE_BOOKLET_PDF, settings.ONLY_EXTERNAL_PUBLIC_PDF,
+                      {option: options.get(option) for option in MANIFEST_OPTIONS}]
+            self.manifest_params = hashlib.md5(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+            self.previous_manifest = self.load_manifest()
+            self.manifest = {'params': self.manifest_params, 'files': {}, 'objects': {}}
 
         if self.source is not None:
             self.source = self.source.split(',')
@@ -517,6 +691,8 @@ class Command(BaseCommand):
         with tempfile.TemporaryDirectory(dir=sync_rando_tmp_dir) as tmp_dir:
             self.tmp_root = tmp_dir
             self.sync()
+            if self.manifest is not None:
+                self.write_manifest()
             if self.celery_task:
                 self.celery_task.update_state(
                     state='PROGRESS',
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.23 on 2026-10-17 14:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0036_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentDownload',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048)),
+                ('etag', models.CharField(blank=True, default='', max_length=256)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('attachment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='download', to='common.attachment')),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+    ]
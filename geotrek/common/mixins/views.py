@@ -1,20 +1,26 @@
+import csv
 import os
 from io import BytesIO
 from urllib.parse import urljoin
 
 from django.conf import settings
-from django.http import HttpResponseNotFound, HttpResponse
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignKey, ManyToManyField
+from django.http import HttpResponseNotFound, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import translation
 from django.utils.functional import classproperty
 from django.utils.translation import gettext as _
 from django.views import static
+from mapentity import serializers as mapentity_serializers
 from mapentity import views as mapentity_views
 from mapentity.helpers import suffix_for
 from pdfimpose import PageList
 
 from geotrek.common.models import TargetPortal, FileType, Attachment
 from geotrek.common.utils import logger
+from geotrek.common.utils.geojson import CHUNK_SIZE, iterate_in_chunks
 from geotrek.common.utils.portals import smart_get_template_by_portal
 
 
@@ -135,6 +141,102 @@ class CustomColumnsMixin:
             return columns
 
 
+class _Echo:
+    """ File-like object returning written values, to stream lines of a csv writer """
+    def write(self, value):
+        return value
+
+
+class ExportObjects:
+    """
+    Iterable of objects exported by a ``StreamingFormatMixin`` view, read by chunks.
+    Like a queryset, single objects can be fetched with ``get()``.
+    """
+    def __init__(self, view):
+        self.view = view
+
+    def __iter__(self):
+        return self.view.get_export_objects()
+
+    def get(self, **kwargs):
+        obj = self.view.get_export_queryset().get(**kwargs)
+        self.view.prepare_export_objects([obj])
+        return obj
+
+
+class StreamingFormatMixin:
+    """
+    Export lists without loading all objects at once: objects are read by chunks,
+    with related objects of exported columns (foreign keys, many-to-many fields,
+    precomputed zones of topologies) loaded in bulk, and CSV rows are streamed.
+
+    Lookups of ``export_prefetches`` are prefetched for each chunk.
+    """
+    export_prefetches = []
+    export_chunk_size = CHUNK_SIZE
+
+    def get_export_related(self):
+        """ Return lookups of ``select_related()`` and ``prefetch_related()`` needed by columns """
+        model = self.get_model()
+        select_related, prefetch_related = [], list(self.export_prefetches)
+        for column in self.columns:
+            try:
+                field = model._meta.get_field(column)
+            except FieldDoesNotExist:
+                continue
+            if isinstance(field, ForeignKey):
+                select_related.append(column)
+            elif isinstance(field, (ManyToManyField, GenericForeignKey)):
+                prefetch_related.append(column)
+        if {'cities', 'districts', 'areas'} & set(self.columns) and hasattr(model, 'city_intersections'):
+            prefetch_related += model.zoning_prefetches()
+        return select_related, prefetch_related
+
+    def get_export_queryset(self):
+        select_related, prefetch_related = self.get_export_related()
+        return self.get_queryset().select_related(*select_related).prefetch_related(*prefetch_related)
+
+    def prefetch_export(self, objects):
+        """ Hook to load lookups of exported objects in bulk, for each chunk """
+        pass
+
+    def prepare_export_objects(self, objects):
+        self.prefetch_export(objects)
+
+    def get_export_objects(self):
+        for objects in iterate_in_chunks(self.get_export_queryset(), self.export_chunk_size):
+            self.prepare_export_objects(objects)
+            yield from objects
+
+    def get_csv_lines(self, columns):
+        model = self.get_model()
+        serializer = mapentity_serializers.CSVSerializer()
+        getters = serializer.getters_csv(columns, model, True)
+        yield serializer.get_csv_header(columns, model)
+        for obj in self.get_export_objects():
+            yield [getters[column](obj, column) for column in columns]
+
+    def csv_view(self, request, context, **kwargs):
+        writer = csv.writer(_Echo())
+        lines = self.get_csv_lines(list(self.columns))
+        return StreamingHttpResponse((writer.writerow(line) for line in lines), content_type='text/csv')
+
+    def shape_view(self, request, context, **kwargs):
+        serializer = mapentity_serializers.ZipShapeSerializer()
+        response = HttpResponse(content_type='application/zip')
+        serializer.serialize(queryset=ExportObjects(self), model=self.get_model(),
+                             stream=response, fields=self.columns)
+        response['Content-length'] = str(len(response.content))
+        return response
+
+    def gpx_view(self, request, context, **kwargs):
+        serializer = mapentity_serializers.GPXSerializer()
+        response = HttpResponse(content_type='application/gpx+xml')
+        serializer.serialize(ExportObjects(self), model=self.get_model(), stream=response,
+                             gpx_field=settings.MAPENTITY_CONFIG['GPX_FIELD_NAME'])
+        return response
+
+
 class BookletMixin:
     def get(self, request, pk, slug, lang=None):
         response = super().get(request, pk, slug)
@@ -8,6 +8,8 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import Q
 from django.template.defaultfilters import slugify
@@ -380,3 +382,43 @@ class HDViewPoint(TimeStampedModelMixin, MapEntityMixin):
 
     def get_annotate_url(self):
         return reverse('common:hdviewpoint_annotate', args=[self.pk])
+
+
+class SearchDocument(models.Model):
+    """
+    Full-text search vector of an object in a language, maintained by database
+    triggers (see ``ft_search_vector()``) and used by API v2 ``q`` filter.
+    """
+    model = models.CharField(max_length=128)  # Model label, e.g. "trekking.trek"
+    object_id = models.IntegerField()
+    language = models.CharField(max_length=10)
+    vector = SearchVectorField()
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id', 'language'], name='common_searchdocument_unique'),
+        ]
+        indexes = [
+            GinIndex(fields=['vector'], name='common_searchdocument_vector_idx'),
+        ]
+
+    def __str__(self):
+        return "{} {} ({})".format(self.model, self.object_id, self.language)
+
+
+class AttachmentDownload(models.Model):
+    """
+    HTTP validators of an attachment file downloaded by a parser, sent by next imports
+    to download the file again only if it was modified (see ``AttachmentParserMixin``).
+    """
+    attachment = models.OneToOneField(Attachment, on_delete=models.CASCADE, related_name='download')
+    url = models.URLField(max_length=2048)
+    etag = models.CharField(max_length=256, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+
+    class Meta:
+        default_permissions = ()
+
+    def __str__(self):
+        return self.url
@@ -1,4 +1,5 @@
 from io import BytesIO
+import hashlib
 import importlib
 import json
 import os
@@ -14,21 +15,27 @@ import xlrd
 import xml.etree.ElementTree as ET
 from functools import reduce
 from collections import Iterable
-from time import sleep
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import sleep, time
 from PIL import Image, UnidentifiedImageError
 
+import ftplib
 from ftplib import FTP
 from os.path import dirname
+from shutil import rmtree
 from urllib.parse import urlparse
 
 from django.contrib.gis.geos import GEOSGeometry, WKBWriter
-from django.db import models, connection
+from django.db import models, connection, transaction
 from django.db.models.fields import NOT_PROVIDED
+from django.db.models.signals import post_save, pre_save
 from django.db.utils import DatabaseError, InternalError
 from django.contrib.auth import get_user_model
 from django.contrib.gis.gdal import DataSource, GDALException, CoordTransform
 from django.contrib.gis.geos import Point, Polygon
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ObjectDoesNotExist, ValidationError
 from django.core.files.base import ContentFile
 from django.template.loader import render_to_string
 from django.utils import translation
@@ -38,8 +45,8 @@ from django.conf import settings
 from paperclip.models import attachment_upload, random_suffix_regexp
 
 from geotrek.authent.models import default_structure
-from geotrek.common.models import FileType, Attachment, License
-from geotrek.common.utils.parsers import add_http_prefix
+from geotrek.common.models import FileType, Attachment, AttachmentDownload, License
+from geotrek.common.utils.parsers import add_http_prefix, prefetch
 from geotrek.common.utils.translation import get_translated_fields
 
 
@@ -73,6 +80,10 @@ class Parser:
     """
     provider: Allow to differentiate multiple Parser for the same model
     default_language: Allow to define which language this parser will populate by default
+    bulk: Parse rows by chunks of bulk_size rows, fetching existing objects of a chunk with
+          one query, and saving them with bulk queries when the model allows it
+    lookup_preload_size: Tables referenced by natural keys are loaded at start to resolve
+          their values without queries if they have at most this number of rows
     """
     label = None
     model = None
@@ -97,6 +108,9 @@ class Parser:
     natural_keys = {}
     field_options = {}
     default_language = None
+    bulk = False
+    bulk_size = 500
+    lookup_preload_size = 1000
 
     def __init__(self, progress_cb=None, user=None, encoding='utf8'):
         self.warnings = {}
@@ -105,6 +119,9 @@ class Parser:
         self.nb_created = 0
         self.nb_updated = 0
         self.nb_unmodified = 0
+        self.nb_lookups = 0
+        self.nb_lookup_hits = 0
+        self.lookup_cache = {}
         self.progress_cb = progress_cb
         self.user = user
         self.structure = user and user.profile.structure or default_structure()
@@ -322,6 +339,14 @@ class Parser:
         return updated
 
     def parse_obj(self, row, operation):
+        update_fields = self.parse_local_fields(row, operation)
+        if update_fields is None:
+            return
+        self.save_obj(operation, update_fields)
+        self.parse_related_fields(row, operation, update_fields)
+
+    def parse_local_fields(self, row, operation):
+        """Set fields stored in model table, returns updated fields or None if row is invalid"""
         try:
             update_fields = self.parse_fields(row, self.fields)
             update_fields += self.parse_fields(row, self.constant_fields)
@@ -329,13 +354,19 @@ class Parser:
                 update_fields.remove('id')  # Can't update primary key
         except RowImportError as warnings:
             self.add_warning(str(warnings))
-            return
+            return None
+        if hasattr(self.model, 'provider') and self.provider is not None and operation == "created" and not self.obj.provider:
+            self.obj.provider = self.provider
+        return update_fields
+
+    def save_obj(self, operation, update_fields):
         if operation == "created":
-            if hasattr(self.model, 'provider') and self.provider is not None and not self.obj.provider:
-                self.obj.provider = self.provider
             self.obj.save()
         else:
             self.obj.save(update_fields=update_fields)
+
+    def parse_related_fields(self, row, operation, update_fields):
+        """Set m2m fields and non fields (object must be saved), and count object"""
         update_fields += self.parse_fields(row, self.m2m_fields)
         update_fields += self.parse_fields(row, self.m2m_constant_fields)
         update_fields += self.parse_fields(row, self.non_fields, non_field=True)
@@ -362,6 +393,40 @@ class Parser:
         self.eid_val = eid_val
         return {self.eid: eid_val}
 
+    def get_existing_objects(self, **eid_kwargs):
+        objects = self.model.objects.filter(**eid_kwargs)
+        if hasattr(self.model, 'provider') and self.provider is not None:
+            objects = objects.filter(provider__exact=self.provider)
+        return objects
+
+    def select_objects(self, eid_kwargs, objects):
+        """Returns objects to parse for current row and operation, or None if row is skipped"""
+        if len(objects) == 0 and self.update_only:
+            if self.warn_on_missing_objects:
+                self.add_warning(_("Bad value '{eid_val}' for field '{eid_src}'. No object with this identifier").format(eid_val=self.eid_val, eid_src=self.eid_src))
+            return None, None
+        elif len(objects) == 0:
+            obj = self.model(**eid_kwargs)
+            if hasattr(obj, 'structure'):
+                obj.structure = self.structure
+            return [obj], "created"
+        elif len(objects) >= 2 and not self.duplicate_eid_allowed:
+            self.add_warning(_("Bad value '{eid_val}' for field '{eid_src}'. Multiple objects with this identifier").format(eid_val=self.eid_val, eid_src=self.eid_src))
+            return None, None
+        _objects = []
+        for obj in objects:
+            if not hasattr(obj, 'structure') or obj.structure == self.structure or self.user is None or self.user.has_perm('authent.can_bypass_structure'):
+                _objects.append(obj)
+            else:
+                self.to_delete.discard(obj.pk)
+                self.add_warning(_("Bad ownership '{structure}' for object '{eid_val}'.").format(structure=obj.structure.name, eid_val=self.eid_val))
+        return _objects, "updated"
+
+    def end_row(self):
+        self.nb_success += 1  # FIXME
+        if self.progress_cb:
+            self.progress_cb(float(self.line) / self.nb, self.line, self.eid_val)
+
     def parse_row(self, row):
         self.eid_val = None
         self.line += 1
@@ -374,38 +439,153 @@ class Parser:
             except RowImportError as warnings:
                 self.add_warning(str(warnings))
                 return
-            objects = self.model.objects.filter(**eid_kwargs)
-            if hasattr(self.model, 'provider') and self.provider is not None:
-                objects = objects.filter(provider__exact=self.provider)
-        if len(objects) == 0 and self.update_only:
-            if self.warn_on_missing_objects:
-                self.add_warning(_("Bad value '{eid_val}' for field '{eid_src}'. No object with this identifier").format(eid_val=self.eid_val, eid_src=self.eid_src))
+            objects = self.get_existing_objects(**eid_kwargs)
+        objects, operation = self.select_objects(eid_kwargs, objects)
+        if objects is None:
             return
-        elif len(objects) == 0:
-            obj = self.model(**eid_kwargs)
-            if hasattr(obj, 'structure'):
-                obj.structure = self.structure
-            objects = [obj]
-            operation = "created"
-        elif len(objects) >= 2 and not self.duplicate_eid_allowed:
-            self.add_warning(_("Bad value '{eid_val}' for field '{eid_src}'. Multiple objects with this identifier").format(eid_val=self.eid_val, eid_src=self.eid_src))
-            return
-        else:
-            _objects = []
-            for obj in objects:
-                if not hasattr(obj, 'structure') or obj.structure == self.structure or self.user is None or self.user.has_perm('authent.can_bypass_structure'):
-                    _objects.append(obj)
-                else:
-                    self.to_delete.discard(obj.pk)
-                    self.add_warning(_("Bad ownership '{structure}' for object '{eid_val}'.").format(structure=obj.structure.name, eid_val=self.eid_val))
-            objects = _objects
-            operation = "updated"
         for self.obj in objects:
             self.parse_obj(row, operation)
             self.to_delete.discard(self.obj.pk)
-        self.nb_success += 1  # FIXME
-        if self.progress_cb:
-            self.progress_cb(float(self.line) / self.nb, self.line, self.eid_val)
+        self.end_row()
+
+    def can_bulk_save(self):
+        """
+        Bulk queries neither call save() nor send signals, so they are used only for
+        models (and parsers) which do nothing more when saving objects.
+        """
+        return (
+            type(self).parse_obj is Parser.parse_obj
+            and type(self).save_obj is Parser.save_obj
+            and self.model.save is models.Model.save
+            and not self.model._meta.parents
+            and not pre_save.has_listeners(self.model)
+            and not post_save.has_listeners(self.model)
+        )
+
+    def parse_rows(self, rows):
+        """
+        Parse a chunk of rows: existing objects of all rows are fetched with one query,
+        and objects are saved with bulk queries if possible (see ``can_bulk_save()``).
+        Rows sharing the same eid are parsed in separate batches, so that an object
+        created by a row is updated by the next ones, as in ``parse_row()``.
+        """
+        batch, eids = [], set()
+        for row in rows:
+            self.eid_val = None
+            self.line += 1
+            eid_kwargs = {}
+            if self.eid is not None:
+                try:
+                    eid_kwargs = self.get_eid_kwargs(row)
+                except RowImportError as warnings:
+                    self.add_warning(str(warnings))
+                    continue
+            key = self.get_eid_key(self.eid_val)
+            if self.eid is not None and key in eids:
+                self.parse_batch(batch)
+                batch, eids = [], set()
+            batch.append((self.line, row, eid_kwargs, self.eid_val, getattr(self, 'eid_src', None)))
+            eids.add(key)
+        last_line = self.line
+        self.parse_batch(batch)
+        self.line = last_line
+
+    def get_eid_key(self, eid_val):
+        if self.eid is None:
+            return None
+        return self.model._meta.get_field(self.eid).get_prep_value(eid_val)
+
+    def parse_batch(self, batch):
+        existing = {}
+        if self.eid is not None and batch:
+            eid_vals = [eid_val for line, row, eid_kwargs, eid_val, eid_src in batch]
+            for obj in self.get_existing_objects(**{'{}__in'.format(self.eid): eid_vals}):
+                existing.setdefault(self.get_eid_key(getattr(obj, self.eid)), []).append(obj)
+        bulk_save = self.can_bulk_save()
+        parsed = []
+        for self.line, row, eid_kwargs, self.eid_val, self.eid_src in batch:
+            objects, operation = self.select_objects(eid_kwargs, existing.get(self.get_eid_key(self.eid_val), []))
+            if objects is None:
+                continue
+            # Objects matched by the row are kept, even if the row fails
+            for obj in objects:
+                self.to_delete.discard(obj.pk)
+            parsed_objects = []
+            try:
+                if bulk_save:
+                    for self.obj in objects:
+                        update_fields = self.parse_local_fields(row, operation)
+                        if update_fields is not None:
+                            parsed_objects.append((self.obj, operation, update_fields))
+                else:
+                    with transaction.atomic():
+                        for self.obj in objects:
+                            self.parse_obj(row, operation)
+            except (DatabaseError, ValueImportError, RowImportError) as e:
+                self.add_row_error(e)
+                continue
+            parsed.append((self.line, row, self.eid_val, parsed_objects))
+        if bulk_save:
+            parsed = self.bulk_save_rows(parsed)
+        for self.line, row, self.eid_val, parsed_objects in parsed:
+            try:
+                with transaction.atomic():
+                    for self.obj, operation, update_fields in parsed_objects:
+                        self.parse_related_fields(row, operation, update_fields)
+            except (DatabaseError, ValueImportError, RowImportError) as e:
+                self.add_row_error(e)
+                continue
+            self.end_row()
+
+    def add_row_error(self, error):
+        """Report error of a row parsed in bulk mode, as parse() does in row by row mode"""
+        if isinstance(error, DatabaseError) and settings.DEBUG:
+            raise error
+        self.add_warning(str(error))
+
+    def bulk_save_rows(self, parsed):
+        """
+        Save objects of parsed rows with bulk queries. If the database rejects them,
+        rows are saved one by one, so that only invalid rows are reported and skipped.
+        Return parsed rows which were saved.
+        """
+        try:
+            with transaction.atomic():
+                self.bulk_save_objs([obj_parsed for line, row, eid_val, parsed_objects in parsed for obj_parsed in parsed_objects])
+            return parsed
+        except DatabaseError:
+            pass
+        saved = []
+        for self.line, row, self.eid_val, parsed_objects in parsed:
+            for obj, operation, update_fields in parsed_objects:
+                if operation == "created":
+                    obj.pk = None  # May have been set before rollback
+            try:
+                with transaction.atomic():
+                    self.bulk_save_objs(parsed_objects)
+            except DatabaseError as e:
+                self.add_row_error(e)
+                continue
+            saved.append((self.line, row, self.eid_val, parsed_objects))
+        return saved
+
+    def bulk_save_objs(self, parsed_objects):
+        created = [obj for obj, operation, update_fields in parsed_objects if operation == "created"]
+        if created:
+            self.model.objects.bulk_create(created)
+        updated, fields = [], set()
+        for obj, operation, update_fields in parsed_objects:
+            if operation == "updated" and update_fields:
+                updated.append(obj)
+                fields.update(update_fields)
+        if updated:
+            # bulk_update() does not set fields updated automatically
+            for field in self.model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    for obj in updated:
+                        field.pre_save(obj, False)
+                    fields.add(field.name)
+            self.model.objects.bulk_update(updated, fields)
 
     def report(self, output_format='txt'):
         context = {
@@ -415,6 +595,8 @@ class Parser:
             'nb_updated': self.nb_updated,
             'nb_deleted': len(self.to_delete) if self.delete else None,
             'nb_unmodified': self.nb_unmodified,
+            'nb_lookups': self.nb_lookups,
+            'nb_lookup_hits': self.nb_lookup_hits,
             'warnings': self.warnings,
         }
         return render_to_string('common/parser_report.{output_format}'.format(output_format=output_format), context)
@@ -442,6 +624,64 @@ class Parser:
                 val = mapping[val]
         return val
 
+    def get_lookup_key(self, model, fields):
+        key = [model, translation.get_language()]
+        for name, value in sorted(fields.items()):
+            try:
+                value = model._meta.get_field(name).get_prep_value(value)
+            except (FieldDoesNotExist, TypeError, ValueError, ValidationError):
+                pass
+            key.append((name, value))
+        return tuple(key)
+
+    def lookup(self, model, fields, create=False):
+        """
+        Returns (object, created) for object matching fields, object being None if it does
+        not exist and create is False. Found objects are memoized for the whole import.
+        """
+        self.nb_lookups += 1
+        key = self.get_lookup_key(model, fields)
+        try:
+            obj = self.lookup_cache.get(key)
+        except TypeError:  # Unhashable value (or unsaved object)
+            key = obj = None
+        if obj is not None:
+            self.nb_lookup_hits += 1
+            return obj, False
+        created = False
+        if create:
+            obj, created = model.objects.get_or_create(**fields)
+        else:
+            try:
+                obj = model.objects.get(**fields)
+            except model.DoesNotExist:
+                return None, False
+        if key is not None:
+            self.lookup_cache[key] = obj
+        return obj, created
+
+    def preload_lookups(self):
+        """Fill lookup cache with small tables referenced by natural keys"""
+        for dst, natural_key in self.natural_keys.items():
+            if self.field_options.get(dst, {}).get('fk') or '__' in natural_key:
+                continue
+            try:
+                field = self.model._meta.get_field(dst)
+            except FieldDoesNotExist:
+                continue
+            if not isinstance(field, (models.ForeignKey, models.ManyToManyField)):
+                continue
+            model = field.remote_field.model
+            objects = list(model.objects.all()[:self.lookup_preload_size + 1])
+            if len(objects) > self.lookup_preload_size:
+                continue
+            preloaded = {}
+            for obj in objects:
+                key = self.get_lookup_key(model, {natural_key: getattr(obj, natural_key)})
+                # Duplicated values are left to model.objects.get() to raise an error
+                preloaded[key] = None if key in preloaded else obj
+            self.lookup_cache.update({key: obj for key, obj in preloaded.items() if obj is not None})
+
     def filter_fk(self, src, val, model, field, mapping=None, partial=False, create=False, fk=None, **kwargs):
         val = self.get_mapping(src, val, mapping, partial)
         if val is None:
@@ -449,16 +689,12 @@ class Parser:
         fields = {field: val}
         if fk:
             fields[fk] = getattr(self.obj, fk)
-        if create:
-            val, created = model.objects.get_or_create(**fields)
-            if created:
-                self.add_warning(_("{model} '{val}' did not exist in Geotrek-Admin and was automatically created").format(model=model._meta.verbose_name.title(), val=val))
-            return val
-        try:
-            return model.objects.get(**fields)
-        except model.DoesNotExist:
+        obj, created = self.lookup(model, fields, create)
+        if created:
+            self.add_warning(_("{model} '{val}' did not exist in Geotrek-Admin and was automatically created").format(model=model._meta.verbose_name.title(), val=obj))
+        elif obj is None:
             self.add_warning(_("{model} '{val}' does not exists in Geotrek-Admin. Please add it").format(model=model._meta.verbose_name.title(), val=val))
-            return None
+        return obj
 
     def filter_m2m(self, src, val, model, field, mapping=None, partial=False, create=False, fk=None, **kwargs):
         if not val:
@@ -475,17 +711,13 @@ class Parser:
             fields = {field: subval}
             if fk:
                 fields[fk] = getattr(self.obj, fk)
-            if create:
-                subval, created = model.objects.get_or_create(**fields)
-                if created:
-                    self.add_warning(_("{model} '{val}' did not exist in Geotrek-Admin and was automatically created").format(model=model._meta.verbose_name.title(), val=subval))
-                dst.append(subval)
-                continue
-            try:
-                dst.append(model.objects.get(**fields))
-            except model.DoesNotExist:
+            obj, created = self.lookup(model, fields, create)
+            if created:
+                self.add_warning(_("{model} '{val}' did not exist in Geotrek-Admin and was automatically created").format(model=model._meta.verbose_name.title(), val=obj))
+            elif obj is None:
                 self.add_warning(_("{model} '{val}' does not exists in Geotrek-Admin. Please add it").format(model=model._meta.verbose_name.title(), val=subval))
                 continue
+            dst.append(obj)
         return dst
 
     def get_to_delete_kwargs(self):
@@ -517,6 +749,7 @@ class Parser:
         return kwargs
 
     def start(self):
+        self.preload_lookups()
         kwargs = self.get_to_delete_kwargs()
         if kwargs is None:
             self.to_delete = set()
@@ -535,11 +768,17 @@ class Parser:
         if self.filename and not os.path.exists(self.filename):
             raise GlobalImportError(_("File does not exists at: {filename}").format(filename=self.filename))
         self.start()
-        for i, row in enumerate(self.next_row()):
-            if limit and i >= limit:
+        if self.bulk:
+            rows = self.next_chunk(limit)
+            parse = self.parse_rows
+        else:
+            rows = self.next_row()
+            parse = self.parse_row
+        for i, row in enumerate(rows):
+            if not self.bulk and limit and i >= limit:
                 break
             try:
-                self.parse_row(row)
+                parse(row)
             except DatabaseError as e:
                 if settings.DEBUG:
                     raise
@@ -553,11 +792,24 @@ class Parser:
                 self.add_warning(str(e))
         self.end()
 
-    def request_or_retry(self, url, verb='get', **kwargs):
+    def next_chunk(self, limit=None):
+        """Yield lists of bulk_size rows"""
+        chunk = []
+        for i, row in enumerate(self.next_row()):
+            if limit and i >= limit:
+                break
+            chunk.append(row)
+            if len(chunk) >= self.bulk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def request_or_retry(self, url, verb='get', session=None, **kwargs):
         try_get = settings.PARSER_NUMBER_OF_TRIES
         assert try_get > 0
         while try_get:
-            action = getattr(requests, verb)
+            action = getattr(session or requests, verb)
             response = action(url, allow_redirects=True, **kwargs)
             if response.status_code in settings.PARSER_RETRY_HTTP_STATUS:
                 logger.info("Failed to fetch url {}. Retrying ...".format(url))
@@ -565,6 +817,9 @@ class Parser:
                 try_get -= 1
             elif response.status_code == 200:
                 return response
+            elif response.status_code == 304 and {'If-None-Match', 'If-Modified-Since'} & set(kwargs.get('headers', {})):
+                # Answer to a conditional request, content was not modified
+                return response
             else:
                 break
         logger.warning("Failed to fetch {} after {} times. Status code : {}.".format(url, settings.PARSER_NUMBER_OF_TRIES, response.status_code))
@@ -661,7 +916,137 @@ class AtomParser(Parser):
             yield row
 
 
+class PaginatedParser(Parser):
+    """
+    Parser of a remote source split into pages, described by ``get_first_page()`` and
+    ``get_next_page()``. Next pages are fetched by a background thread, up to
+    ``prefetch_pages`` pages ahead, while rows of current page are imported.
+
+    If ``pages_cache`` is True, fetched pages are stored on disk until the end of the import,
+    so that an interrupted import is resumed from stored pages, skipping rows of pages
+    already imported (unless ``delete`` is True, as all rows are needed to find objects to
+    delete). Pages not written for PARSER_PAGES_CACHE_TTL seconds are discarded.
+    """
+    prefetch_pages = None  # PARSER_PREFETCH_PAGES setting by default
+    pages_cache = False
+
+    def get_first_page(self):
+        """Returns request of first page: dict with url and request_or_retry() kwargs"""
+        raise NotImplementedError
+
+    def get_next_page(self, page, root):
+        """Returns request of page following page (root being its content), None if it is the last one"""
+        raise NotImplementedError
+
+    def get_nb(self, root):
+        raise NotImplementedError
+
+    def page_rows(self):
+        return self.items
+
+    def fetch_page(self, page):
+        response = self.request_or_retry(page['url'], **page.get('kwargs', {}))
+        return response.json()
+
+    @property
+    def pages_cache_dir(self):
+        key = '{}.{}|{}|{}'.format(type(self).__module__, type(self).__qualname__, self.url, self.provider)
+        return os.path.join(settings.TMP_DIR, 'parsers', hashlib.sha1(key.encode()).hexdigest())
+
+    def write_cache_file(self, name, content):
+        path = os.path.join(self.pages_cache_dir, name)
+        os.makedirs(self.pages_cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(content, f)
+        os.replace(path + '.tmp', path)
+
+    def clear_expired_caches(self):
+        """Remove pages stored by interrupted imports of any parser, if they are too old"""
+        basefolder = os.path.join(settings.TMP_DIR, 'parsers')
+        if not os.path.isdir(basefolder):
+            return
+        for name in os.listdir(basefolder):
+            path = os.path.join(basefolder, name)
+            try:
+                expired = os.path.getmtime(path) < time() - settings.PARSER_PAGES_CACHE_TTL
+            except FileNotFoundError:
+                continue
+            if expired:
+                logger.info("Remove expired pages stored in {}".format(path))
+                rmtree(path, ignore_errors=True)
+
+    def read_cache(self):
+        """Returns pages stored by an interrupted import, and index of last imported one"""
+        pages = []
+        if not self.pages_cache:
+            return pages, -1
+        self.clear_expired_caches()
+        while True:
+            path = os.path.join(self.pages_cache_dir, '{:06d}.json'.format(len(pages)))
+            if not os.path.exists(path):
+                break
+            with open(path) as f:
+                pages.append(json.load(f))
+        try:
+            with open(os.path.join(self.pages_cache_dir, 'state.json')) as f:
+                imported = json.load(f)['imported']
+        except FileNotFoundError:
+            imported = -1
+        return pages, imported
+
+    def next_pages(self, page, cached_pages):
+        """Yield (index, content) of stored pages, then of pages fetched from page"""
+        for index, cached_page in enumerate(cached_pages):
+            yield index, cached_page['root']
+            page = self.get_next_page(cached_page['page'], cached_page['root'])
+        index = len(cached_pages)
+        while page is not None:
+            root = self.fetch_page(page)
+            if self.pages_cache:
+                self.write_cache_file('{:06d}.json'.format(index), {'page': page, 'root': root})
+            yield index, root
+            page = self.get_next_page(page, root)
+            index += 1
+
+    def next_row(self):
+        cached_pages, imported = self.read_cache()
+        if cached_pages:
+            logger.info("Resume import from {} stored pages ({} already imported)".format(len(cached_pages), imported + 1))
+        pages = self.next_pages(self.get_first_page(), cached_pages)
+        prefetch_pages = settings.PARSER_PREFETCH_PAGES if self.prefetch_pages is None else self.prefetch_pages
+        if prefetch_pages:
+            pages = prefetch(pages, prefetch_pages)
+        ends = []  # (index of page, number of rows yielded until its end)
+        nb_rows = 0
+        for index, self.root in pages:
+            self.nb = self.get_nb(self.root)
+            # Rows yielded so far have been parsed (self.line)
+            while ends and ends[0][1] <= self.line:
+                imported = ends.pop(0)[0]
+                if self.pages_cache:
+                    self.write_cache_file('state.json', {'imported': imported})
+            if index <= imported and not self.delete:
+                continue
+            for row in self.page_rows():
+                yield row
+                nb_rows += 1
+            ends.append((index, nb_rows))
+
+    def end(self):
+        try:
+            super().end()
+        finally:
+            # Import is complete, even if deleting objects failed
+            if self.pages_cache:
+                rmtree(self.pages_cache_dir, ignore_errors=True)
+
+
 class AttachmentParserMixin:
+    """
+    Attachments of a row are checked and downloaded concurrently by PARSER_ATTACHMENTS_WORKERS
+    threads, sharing an HTTP session and FTP connections. HTTP validators (ETag, Last-Modified)
+    of downloaded files are stored, so that next imports download them again only if modified.
+    """
     download_attachments = True
     base_url = ''
     delete_attachments = True
@@ -669,6 +1054,16 @@ class AttachmentParserMixin:
     non_fields = {
         'attachments': _("Attachments"),
     }
+    attachment_executor = None
+    attachment_session = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attachment_futures = {}
+        self.attachment_contents = {}
+        self.attachment_validators = {}
+        self.ftp_connections = {}
+        self.ftp_lock = Lock()
 
     def start(self):
         super().start()
@@ -683,37 +1078,146 @@ class AttachmentParserMixin:
                 raise GlobalImportError(_("FileType '{name}' does not exists in "
                                           "Geotrek-Admin. Please add it").format(name=self.filetype_name))
         self.creator, created = get_user_model().objects.get_or_create(username='import', defaults={'is_active': False})
+        workers = settings.PARSER_ATTACHMENTS_WORKERS
+        if workers:
+            self.attachment_executor = ThreadPoolExecutor(max_workers=workers)
+            self.attachment_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=workers)
+            self.attachment_session.mount('http://', adapter)
+            self.attachment_session.mount('https://', adapter)
+
+    def end(self):
+        if self.attachment_executor is not None:
+            self.attachment_executor.shutdown()
+            self.attachment_executor = None
+        if self.attachment_session is not None:
+            self.attachment_session.close()
+            self.attachment_session = None
+        for ftp in self.ftp_connections.values():
+            self.close_ftp(ftp)
+        self.ftp_connections = {}
+        super().end()
 
     def filter_attachments(self, src, val):
         if not val:
             return []
         return [(subval.strip(), '', '') for subval in val.split(self.separator) if subval.strip()]
 
-    def has_size_changed(self, url, attachment):
-        parsed_url = urlparse(url)
-        if parsed_url.scheme == 'ftp':
-            directory = dirname(parsed_url.path)
+    def get_attachment_name(self, url):
+        basename, ext = os.path.splitext(os.path.basename(url))
+        return '%s%s' % (basename[:128], ext)
 
+    def is_attachment_named(self, attachment, name):
+        upload_name, ext = os.path.splitext(attachment_upload(attachment, name))
+        regexp = f"{upload_name}({random_suffix_regexp()})?(_[a-zA-Z0-9]{{7}})?{ext}"
+        return re.search(r"^{regexp}$".format(regexp=regexp), attachment.attachment_file.name)
+
+    def get_validators(self, attachment, url):
+        """Returns HTTP headers of a conditional request for attachment file, if known"""
+        try:
+            download = attachment.download
+        except ObjectDoesNotExist:
+            return {}
+        if download.url != url:
+            return {}
+        headers = {}
+        if download.etag:
+            headers['If-None-Match'] = download.etag
+        if download.last_modified:
+            headers['If-Modified-Since'] = download.last_modified
+        return headers
+
+    def keep_validators(self, url, response):
+        headers = getattr(response, 'headers', None)
+        if not isinstance(headers, Mapping):
+            return
+        validators = {
+            'etag': headers.get('ETag') or '',
+            'last_modified': headers.get('Last-Modified') or '',
+        }
+        if validators['etag'] or validators['last_modified']:
+            self.attachment_validators[url] = validators
+
+    def save_validators(self, attachment, url):
+        validators = self.attachment_validators.get(url)
+        if validators and attachment.pk:
+            AttachmentDownload.objects.update_or_create(attachment=attachment, defaults=dict(url=url, **validators))
+
+    def close_ftp(self, ftp):
+        try:
+            ftp.quit()
+        except Exception:
+            ftp.close()
+
+    def get_ftp(self, parsed_url):
+        key = (parsed_url.hostname, parsed_url.username)
+        if key not in self.ftp_connections:
             ftp = FTP(parsed_url.hostname)
             ftp.login(user=parsed_url.username, passwd=parsed_url.password)
-            ftp.cwd(directory)
-            size = ftp.size(parsed_url.path.split('/')[-1:][0])
+            self.ftp_connections[key] = ftp
+        return self.ftp_connections[key]
+
+    def get_ftp_size(self, parsed_url):
+        """Returns size of remote file, reconnecting once if kept connection was lost (e.g. timeout)"""
+        directory = dirname(parsed_url.path)
+        filename = parsed_url.path.split('/')[-1:][0]
+        key = (parsed_url.hostname, parsed_url.username)
+        with self.ftp_lock:
+            for attempt in range(2):
+                try:
+                    ftp = self.get_ftp(parsed_url)
+                    ftp.cwd(directory)
+                    return ftp.size(filename)
+                except ftplib.all_errors as e:
+                    error = e
+                    ftp = self.ftp_connections.pop(key, None)
+                    if ftp is not None:
+                        self.close_ftp(ftp)
+        raise ValueImportError('Failed to load attachment: {exc}'.format(exc=error))
+
+    def has_size_changed(self, url, attachment):
+        parsed_url = urlparse(url)
+        if parsed_url.scheme == 'ftp':
+            size = self.get_ftp_size(parsed_url)
             return size != attachment.attachment_file.size
 
         if parsed_url.scheme == 'http' or parsed_url.scheme == 'https':
             try:
-                response = self.request_or_retry(url, verb='head')
+                response = self.request_or_retry(url, verb='head', session=self.attachment_session)
             except (requests.exceptions.ConnectionError, DownloadImportError) as e:
                 raise ValueImportError('Failed to load attachment: {exc}'.format(exc=e))
             size = response.headers.get('content-length')
             try:
-                return size is not None and int(size) != attachment.attachment_file.size
+                changed = size is not None and int(size) != attachment.attachment_file.size
             except FileNotFoundError:
                 pass
+            else:
+                if not changed:
+                    self.keep_validators(url, response)
+                return changed
 
         return True
 
-    def download_attachment(self, url):
+    def is_attachment_modified(self, url, attachment, headers):
+        """
+        Returns True if remote file differs from attachment file. If validators of the file
+        are known, content is requested conditionally (and kept if modified), otherwise
+        size of remote file is compared.
+        """
+        if not headers:
+            return self.has_size_changed(url, attachment)
+        try:
+            response = self.request_or_retry(url, session=self.attachment_session, headers=headers)
+        except (requests.exceptions.ConnectionError, DownloadImportError) as e:
+            raise ValueImportError('Failed to load attachment: {exc}'.format(exc=e))
+        if response.status_code == 304:
+            return False
+        # Content was sent although validators of stored file were given: it changed
+        self.keep_validators(url, response)
+        self.attachment_contents[url] = response.content
+        return True
+
+    def fetch_attachment(self, url):
         parsed_url = urlparse(url)
         if parsed_url.scheme == 'ftp':
             try:
@@ -724,24 +1228,58 @@ class AttachmentParserMixin:
         else:
             if self.download_attachments:
                 try:
-                    response = self.request_or_retry(url)
+                    response = self.request_or_retry(url, session=self.attachment_session)
                 except (DownloadImportError, requests.exceptions.ConnectionError) as e:
                     raise ValueImportError('Failed to load attachment: {exc}'.format(exc=e))
                 if response.status_code != requests.codes.ok:
                     self.add_warning(_("Failed to download '{url}'").format(url=url))
                     return None
+                self.keep_validators(url, response)
                 return response.content
             return None
 
+    def download_attachment(self, url):
+        if url in self.attachment_contents:
+            return self.attachment_contents.pop(url)
+        future = self.attachment_futures.pop(('fetch_attachment', url, None), None)
+        if future is not None:
+            return future.result()
+        return self.fetch_attachment(url)
+
+    def check_attachment_modified(self, url, attachment):
+        future = self.attachment_futures.pop(('is_attachment_modified', url, attachment.pk), None)
+        if future is not None:
+            return future.result()
+        return self.is_attachment_modified(url, attachment, self.get_validators(attachment, url))
+
+    def prefetch_attachments(self, attachments_data, attachments_to_delete):
+        """Submit checks and downloads of attachments to workers"""
+        if self.attachment_executor is None:
+            return
+        for attachment_data in attachments_data:
+            url = self.base_url + attachment_data[0]
+            name = self.get_attachment_name(url)
+            for attachment in attachments_to_delete:
+                if self.is_attachment_named(attachment, name):
+                    key = ('is_attachment_modified', url, attachment.pk)
+                    args = (url, attachment, self.get_validators(attachment, url))
+                    break
+            else:
+                if urlparse(url).scheme not in ('http', 'https', 'ftp'):
+                    continue
+                key = ('fetch_attachment', url, None)
+                args = (url, )
+            if key not in self.attachment_futures:
+                self.attachment_futures[key] = self.attachment_executor.submit(getattr(self, key[0]), *args)
+
     def check_attachment_updated(self, attachments_to_delete, updated, **kwargs):
         found = False
+        url = kwargs.get('url')
         for attachment in attachments_to_delete:
-            upload_name, ext = os.path.splitext(attachment_upload(attachment, kwargs.get('name')))
-            existing_name = attachment.attachment_file.name
-            regexp = f"{upload_name}({random_suffix_regexp()})?(_[a-zA-Z0-9]{{7}})?{ext}"
-            if re.search(r"^{regexp}$".format(regexp=regexp), existing_name) and not self.has_size_changed(kwargs.get('url'), attachment):
+            if self.is_attachment_named(attachment, kwargs.get('name')) and not self.check_attachment_modified(url, attachment):
                 found = True
                 attachments_to_delete.remove(attachment)
+                self.save_validators(attachment, url)
                 if (
                         kwargs.get('author') != attachment.author
                         or kwargs.get('legend') != attachment.legend
@@ -801,6 +1339,7 @@ class AttachmentParserMixin:
                 pass
             attachment.attachment_file.save(name, f, save=False)
             attachment.is_image = attachment.is_an_image()
+            attachment.download_url = url
         else:
             attachment.attachment_link = url
         return True, updated
@@ -822,13 +1361,14 @@ class AttachmentParserMixin:
 
     def generate_attachments(self, src, val, attachments_to_delete, updated):
         attachments = []
-        for attachment_data in self.filter_attachments(src, val):
+        attachments_data = list(self.filter_attachments(src, val))
+        self.prefetch_attachments(attachments_data, attachments_to_delete)
+        for attachment_data in attachments_data:
             url = self.base_url + attachment_data[0]
             legend = attachment_data[1] or ""
             author = attachment_data[2] or ""
             title = attachment_data[3] if len(attachment_data) > 3 else ""
-            basename, ext = os.path.splitext(os.path.basename(url))
-            name = '%s%s' % (basename[:128], ext)
+            name = self.get_attachment_name(url)
             found, updated = self.check_attachment_updated(attachments_to_delete, updated, name=name, url=url,
                                                            legend=legend, author=author, title=title)
             if found:
@@ -845,20 +1385,29 @@ class AttachmentParserMixin:
 
     def save_attachments(self, src, val):
         updated = False
-        attachments_to_delete = list(Attachment.objects.attachments_for_object(self.obj))
-        updated, attachments = self.generate_attachments(src, val, attachments_to_delete, updated)
-        Attachment.objects.bulk_create(attachments)
-        # TODO : attachments from parsers should be resized
-        #  See https://github.com/makinacorpus/django-paperclip/blob/master/paperclip/models.py#L124
-        # `bulk_create` does not call this `save` method
+        attachments_to_delete = list(Attachment.objects.attachments_for_object(self.obj).select_related('download'))
+        try:
+            updated, attachments = self.generate_attachments(src, val, attachments_to_delete, updated)
+            Attachment.objects.bulk_create(attachments)
+            # TODO : attachments from parsers should be resized
+            #  See https://github.com/makinacorpus/django-paperclip/blob/master/paperclip/models.py#L124
+            # `bulk_create` does not call this `save` method
+            for attachment in attachments:
+                if hasattr(attachment, 'download_url'):
+                    self.save_validators(attachment, attachment.download_url)
+        finally:
+            self.attachment_futures = {}
+            self.attachment_contents = {}
+            self.attachment_validators = {}
         self.remove_attachments(attachments_to_delete)
         return updated
 
 
-class TourInSoftParser(AttachmentParserMixin, Parser):
+class TourInSoftParser(AttachmentParserMixin, PaginatedParser):
     version_tourinsoft = 2
     separator = '#'
     separator2 = '|'
+    page_size = 1000
 
     @property
     def items(self):
@@ -866,28 +1415,32 @@ class TourInSoftParser(AttachmentParserMixin, Parser):
             return self.root['value']
         return self.root['d']['results']
 
-    def get_nb(self):
+    def get_nb(self, root):
         if self.version_tourinsoft == 3:
-            return int(self.root['odata.count'])
-        return int(self.root['d']['__count'])
+            return int(root['odata.count'])
+        return int(root['d']['__count'])
 
-    def next_row(self):
-        skip = 0
-        while True:
-            params = {
-                '$format': 'json',
-                '$inlinecount': 'allpages',
-                '$top': 1000,
-                '$skip': skip,
-            }
-            response = self.request_or_retry(self.url, params=params)
-            self.root = response.json()
-            self.nb = self.get_nb()
-            for row in self.items:
-                yield {self.normalize_field_name(src): val for src, val in row.items()}
-            skip += 1000
-            if skip >= self.nb:
-                return
+    def get_page(self, skip):
+        params = {
+            '$format': 'json',
+            '$inlinecount': 'allpages',
+            '$top': self.page_size,
+            '$skip': skip,
+        }
+        return {'url': self.url, 'kwargs': {'params': params}, 'skip': skip}
+
+    def get_first_page(self):
+        return self.get_page(0)
+
+    def get_next_page(self, page, root):
+        skip = page['skip'] + self.page_size
+        if skip >= self.get_nb(root):
+            return None
+        return self.get_page(skip)
+
+    def page_rows(self):
+        for row in self.items:
+            yield {self.normalize_field_name(src): val for src, val in row.items()}
 
     def filter_attachments(self, src, val):
         if not val:
@@ -1261,7 +1814,7 @@ class GeotrekAggregatorParser:
         return render_to_string('common/parser_report_aggregator.{output_format}'.format(output_format=output_format), context)
 
 
-class GeotrekParser(AttachmentParserMixin, Parser):
+class GeotrekParser(AttachmentParserMixin, PaginatedParser):
     """
     url_categories: url of the categories in api v2 (example: 'category': '/api/v2/touristiccontent_category/')
     replace_fields: Replace fields which have not the same name in the api v2 compare to models (geom => geometry in api v2)
@@ -1353,13 +1906,14 @@ class GeotrekParser(AttachmentParserMixin, Parser):
 
     def generate_attachments(self, src, val, attachments_to_delete, updated):
         attachments = []
-        for url, legend, author, license in self.filter_attachments(src, val):
+        attachments_data = list(self.filter_attachments(src, val))
+        self.prefetch_attachments(attachments_data, attachments_to_delete)
+        for url, legend, author, license in attachments_data:
             url = self.base_url + url
             legend = legend or ""
             author = author or ""
             license = License.objects.get_or_create(label=license)[0] if license else None
-            basename, ext = os.path.splitext(os.path.basename(url))
-            name = '%s%s' % (basename[:128], ext)
+            name = self.get_attachment_name(url)
             found, updated = self.check_attachment_updated(attachments_to_delete, updated, name=name, url=url,
                                                            legend=legend, author=author)
             if found:
@@ -1437,11 +1991,11 @@ class GeotrekParser(AttachmentParserMixin, Parser):
         geom = GEOSGeometry(geom)
         return geom
 
-    def next_row(self):
-        """Returns next row.
-        Geotrek API is paginated, run until "next" is empty
-        :returns row
-        """
+    def get_nb(self, root):
+        return int(root['count'])
+
+    def get_first_page(self):
+        """Geotrek API is paginated, run until "next" is empty"""
         portals = self.portals_filter
         updated_after = None
 
@@ -1454,26 +2008,15 @@ class GeotrekParser(AttachmentParserMixin, Parser):
             'updated_after': updated_after
         }
         self.params_used = params
-        response = self.request_or_retry(self.next_url, params=params)
-        self.root = response.json()
-        self.nb = int(self.root['count'])
-
-        for row in self.items:
-            yield row
-        self.next_url = self.root['next']
-
-        while self.next_url:
-            response = self.request_or_retry(self.next_url)
-            self.root = response.json()
-            self.nb = int(self.root['count'])
+        return {'url': self.next_url, 'kwargs': {'params': params}}
 
-            for row in self.items:
-                yield row
-
-            self.next_url = self.root['next']
+    def get_next_page(self, page, root):
+        if not root['next']:
+            return None
+        return {'url': root['next']}
 
 
-class ApidaeBaseParser(Parser):
+class ApidaeBaseParser(PaginatedParser):
     """Parser to import "anything" from APIDAE"""
     separator = None
     api_key = None
@@ -1492,26 +2035,30 @@ class ApidaeBaseParser(Parser):
             return []
         return self.root['objetsTouristiques']
 
-    def next_row(self):
-        while True:
-            params = {
-                'apiKey': self.api_key,
-                'projetId': self.project_id,
-                'selectionIds': [self.selection_id],
-                'count': self.size,
-                'first': self.skip,
-                'responseFields': self.responseFields
-            }
-            if self.locales:
-                params['locales'] = self.locales
-            response = self.request_or_retry(self.url, params={'query': json.dumps(params)})
-            self.root = response.json()
-            self.nb = int(self.root['numFound'])
-            for row in self.items:
-                yield row
-            self.skip += self.size
-            if self.skip >= self.nb:
-                return
+    def get_nb(self, root):
+        return int(root['numFound'])
+
+    def get_page(self, skip):
+        params = {
+            'apiKey': self.api_key,
+            'projetId': self.project_id,
+            'selectionIds': [self.selection_id],
+            'count': self.size,
+            'first': skip,
+            'responseFields': self.responseFields
+        }
+        if self.locales:
+            params['locales'] = self.locales
+        return {'url': self.url, 'kwargs': {'params': {'query': json.dumps(params)}}, 'skip': skip}
+
+    def get_first_page(self):
+        return self.get_page(self.skip)
+
+    def get_next_page(self, page, root):
+        skip = page['skip'] + self.size
+        if skip >= self.get_nb(root):
+            return None
+        return self.get_page(skip)
 
     def normalize_field_name(self, name):
         return name
@@ -38,3 +38,71 @@ BEGIN
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
+
+-------------------------------------------------------------------------------
+-- Full-text search documents (used by API v2 q filter)
+-------------------------------------------------------------------------------
+
+-- Text search configuration of a language, "simple" (no stemming) if not available
+CREATE FUNCTION {{ schema_geotrek }}.ft_search_config(lang text) RETURNS regconfig AS $$
+DECLARE
+    config text;
+BEGIN
+    config := CASE split_part(lower(lang), '-', 1)
+        WHEN 'ar' THEN 'arabic'
+        WHEN 'da' THEN 'danish'
+        WHEN 'de' THEN 'german'
+        WHEN 'el' THEN 'greek'
+        WHEN 'en' THEN 'english'
+        WHEN 'es' THEN 'spanish'
+        WHEN 'fi' THEN 'finnish'
+        WHEN 'fr' THEN 'french'
+        WHEN 'hu' THEN 'hungarian'
+        WHEN 'it' THEN 'italian'
+        WHEN 'nb' THEN 'norwegian'
+        WHEN 'nl' THEN 'dutch'
+        WHEN 'no' THEN 'norwegian'
+        WHEN 'pt' THEN 'portuguese'
+        WHEN 'ro' THEN 'romanian'
+        WHEN 'ru' THEN 'russian'
+        WHEN 'sv' THEN 'swedish'
+        WHEN 'tr' THEN 'turkish'
+        ELSE 'simple'
+    END;
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = config) THEN
+        config := 'simple';
+    END IF;
+    RETURN config::regconfig;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Strip HTML tags and entities (keeping base letter of accented ones), and accents
+CREATE FUNCTION {{ schema_geotrek }}.ft_search_text(content text) RETURNS text AS $$
+    SELECT unaccent(
+        regexp_replace(
+            regexp_replace(
+                regexp_replace(coalesce($1, ''), '<[^>]*>', ' ', 'g'),
+                '&([a-zA-Z])(acute|grave|circ|uml|tilde|cedil|ring|slash);', '\1', 'g'),
+            '&#?[a-zA-Z0-9]+;', ' ', 'g'));
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION {{ schema_geotrek }}.ft_search_vector(lang text, name text, teaser text, body text) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector(ft_search_config($1), ft_search_text($2)), 'A')
+        || setweight(to_tsvector(ft_search_config($1), ft_search_text($3)), 'B')
+        || setweight(to_tsvector(ft_search_config($1), ft_search_text($4)), 'C');
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION {{ schema_geotrek }}.ft_search_document_update(model text, object_id integer, lang text, vector tsvector) RETURNS void AS $$
+    INSERT INTO common_searchdocument (model, object_id, language, vector)
+    VALUES ($1, $2, $3, $4)
+    ON CONFLICT (model, object_id, language) DO UPDATE SET vector = EXCLUDED.vector;
+$$ LANGUAGE sql;
+
+-- Arguments are model label and primary key column of the table
+CREATE FUNCTION {{ schema_geotrek }}.search_document_d() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    DELETE FROM common_searchdocument
+    WHERE model = TG_ARGV[0] AND object_id = (to_jsonb(OLD) ->> TG_ARGV[1])::integer;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
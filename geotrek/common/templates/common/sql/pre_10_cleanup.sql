@@ -4,3 +4,8 @@ DROP FUNCTION IF EXISTS ft_date_insert() CASCADE;
 DROP FUNCTION IF EXISTS ft_date_update() CASCADE;
 DROP FUNCTION IF EXISTS ft_uuid_insert() CASCADE;
 DROP FUNCTION IF EXISTS flatten_geometrycollection_iu() CASCADE;
+DROP FUNCTION IF EXISTS ft_search_config(text) CASCADE;
+DROP FUNCTION IF EXISTS ft_search_text(text) CASCADE;
+DROP FUNCTION IF EXISTS ft_search_vector(text, text, text, text) CASCADE;
+DROP FUNCTION IF EXISTS ft_search_document_update(text, integer, text, tsvector) CASCADE;
+DROP FUNCTION IF EXISTS search_document_d() CASCADE;
@@ -1,4 +1,6 @@
+import csv
 import os
+from io import StringIO
 
 from unittest import mock
 
@@ -6,7 +8,8 @@ from django.contrib import messages
 from django.contrib.auth.models import Permission, User
 from django.shortcuts import get_object_or_404
 from django.test.utils import override_settings
-from django.utils import translation
+from django.utils import html, translation
+from django.utils.encoding import force_str
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext as _
 from django.conf import settings
@@ -267,6 +270,26 @@ class CommonTest(AuthentFixturesTest, TranslationResetMixin, MapEntityTest):
         self.assertEqual(response.status_code, 302)
         self.assertTrue(self.model.objects.get(pk=obj.pk).published)
 
+    def test_no_html_in_csv(self):
+        # Same as mapentity test, for streamed exports
+        if self.model is None:
+            return  # Abstract test should not run
+
+        self.modelfactory.create()
+
+        response = self.client.get(self.model.get_format_list_url() + '?format=csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get('Content-Type'), 'text/csv')
+
+        lines = list(csv.reader(StringIO(response.getvalue().decode("utf-8")), delimiter=','))
+
+        # There should be one more line in the csv than in the items: this is the header line
+        self.assertEqual(len(lines), self.model.objects.all().count() + 1)
+
+        for line in lines:
+            for col in line:
+                self.assertEqual(force_str(col), html.strip_tags(force_str(col)))
+
     def test_custom_columns_mixin_on_list(self):
         # Assert columns equal mandatory columns plus custom extra columns
         if self.model is None:
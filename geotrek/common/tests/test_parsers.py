@@ -1,5 +1,6 @@
 import json
 import os
+import time
 import urllib
 from io import StringIO
 from shutil import rmtree
@@ -22,13 +23,14 @@ from geotrek.common.models import Attachment, FileType, Organism, Theme
 from geotrek.common.parsers import (AttachmentParserMixin, DownloadImportError,
                                     ExcelParser, GeotrekAggregatorParser,
                                     GeotrekParser, OpenSystemParser,
+                                    PaginatedParser, Parser,
                                     TourInSoftParser, TourismSystemParser,
                                     ValueImportError, XmlParser)
 from geotrek.common.tests.factories import ThemeFactory
 from geotrek.common.tests.mixins import GeotrekParserTestMixin
 from geotrek.common.utils.testdata import get_dummy_img
 from geotrek.trekking.models import POI, Trek
-from geotrek.trekking.parsers import GeotrekTrekParser
+from geotrek.trekking.parsers import GeotrekTrekParser, TrekParser
 from geotrek.trekking.tests.factories import TrekFactory
 
 
@@ -188,6 +190,220 @@ class ParserTests(TestCase):
         self.assertIn("Bad value 'Structure' for field STRUCTURE. Should contain ['foo']", output.getvalue())
 
 
+class OrganismBulkParser(Parser):
+    model = Organism
+    fields = {
+        'organism': 'nOm',
+        'structure': 'structure'
+    }
+    natural_keys = {
+        'structure': 'name'
+    }
+    eid = 'organism'
+    url = 'https://test.fr/organisms'
+    bulk = True
+    bulk_size = 2
+    rows = []
+
+    def next_row(self):
+        self.nb = len(self.rows)
+        yield from self.rows
+
+
+class OrganismNoBulkSaveParser(OrganismBulkParser):
+    bulk_size = 10
+
+    def save_obj(self, operation, update_fields):
+        super().save_obj(operation, update_fields)
+
+
+class BulkParserTests(TestCase):
+    def setUp(self):
+        StructureFactory.create(name='Structure')
+        Organism.objects.create(organism='Existing')
+        OrganismBulkParser.rows = [
+            {'NOM': 'Existing', 'STRUCTURE': 'Structure'},
+            {'NOM': 'New', 'STRUCTURE': 'Structure'},
+            {'NOM': 'New', 'STRUCTURE': 'Structure'},
+        ]
+
+    def test_bulk(self):
+        parser = OrganismBulkParser()
+        parser.parse()
+        self.assertEqual(parser.warnings, {})
+        self.assertEqual(Organism.objects.count(), 2)
+        self.assertEqual(list(Organism.objects.values_list('structure__name', flat=True)), ['Structure', 'Structure'])
+        self.assertEqual((parser.line, parser.nb_success), (3, 3))
+        self.assertEqual((parser.nb_created, parser.nb_updated, parser.nb_unmodified), (1, 1, 1))
+
+    def test_bulk_same_as_row_by_row(self):
+        parser = OrganismBulkParser()
+        parser.bulk = False
+        parser.parse()
+        self.assertEqual(Organism.objects.count(), 2)
+        self.assertEqual((parser.nb_created, parser.nb_updated, parser.nb_unmodified), (1, 1, 1))
+
+    def test_bulk_limit(self):
+        parser = OrganismBulkParser()
+        parser.parse(limit=1)
+        self.assertEqual(parser.line, 1)
+        self.assertFalse(Organism.objects.filter(organism='New').exists())
+
+    @mock.patch('geotrek.common.parsers.Parser.save_obj')
+    def test_bulk_save(self, mocked):
+        OrganismBulkParser().parse()
+        mocked.assert_not_called()
+        self.assertTrue(Organism.objects.filter(organism='New').exists())
+
+    def test_bulk_save_invalid_row(self):
+        OrganismBulkParser.rows.insert(1, {'NOM': 'x' * 200, 'STRUCTURE': 'Structure'})
+        parser = OrganismBulkParser()
+        parser.parse()
+        self.assertEqual(list(parser.warnings.keys()), ['Line 2'])
+        self.assertEqual(list(Organism.objects.values_list('organism', flat=True)), ['Existing', 'New'])
+        self.assertEqual((parser.line, parser.nb_success), (4, 3))
+        self.assertEqual((parser.nb_created, parser.nb_updated, parser.nb_unmodified), (1, 1, 1))
+
+    def test_invalid_row_does_not_delete_chunk(self):
+        Organism.objects.create(organism='Other')
+        OrganismNoBulkSaveParser.rows = [
+            {'NOM': 'Existing', 'STRUCTURE': 'Structure'},
+            {'NOM': 'x' * 200, 'STRUCTURE': 'Structure'},
+            {'NOM': 'Other', 'STRUCTURE': 'Structure'},
+            {'NOM': 'New', 'STRUCTURE': 'Structure'},
+        ]
+        for parser_class in (OrganismBulkParser, OrganismNoBulkSaveParser):
+            with self.subTest(parser=parser_class.__name__):
+                parser = parser_class()
+                parser.rows = OrganismNoBulkSaveParser.rows
+                parser.delete = True
+                parser.parse()
+                self.assertEqual(list(parser.warnings.keys()), ['Line 2'])
+                self.assertEqual(list(Organism.objects.values_list('organism', flat=True)), ['Existing', 'New', 'Other'])
+                self.assertEqual(parser.nb_success, 3)
+
+    def test_no_bulk_save_if_model_save_overridden(self):
+        self.assertTrue(OrganismBulkParser().can_bulk_save())
+        self.assertFalse(TrekParser().can_bulk_save())
+
+
+class LookupParserTests(TestCase):
+    def setUp(self):
+        StructureFactory.create(name='Structure')
+        OrganismBulkParser.rows = [
+            {'NOM': 'First', 'STRUCTURE': 'Structure'},
+            {'NOM': 'Second', 'STRUCTURE': 'Structure'},
+            {'NOM': 'Third', 'STRUCTURE': 'Missing'},
+        ]
+
+    def test_preloaded_lookups(self):
+        parser = OrganismBulkParser()
+        parser.parse()
+        self.assertEqual((parser.nb_lookups, parser.nb_lookup_hits), (3, 2))
+        self.assertIn("2/3 related values resolved from cache.", parser.report())
+        self.assertIn("Structure 'Missing' does not exists in Geotrek-Admin. Please add it", parser.report())
+
+    def test_memoized_lookups(self):
+        parser = OrganismBulkParser()
+        parser.lookup_preload_size = 0
+        parser.parse()
+        self.assertEqual((parser.nb_lookups, parser.nb_lookup_hits), (3, 1))
+
+    def test_created_once(self):
+        parser = OrganismBulkParser()
+        parser.field_options = {'structure': {'create': True}}
+        OrganismBulkParser.rows[0]['STRUCTURE'] = 'Missing'
+        parser.parse()
+        self.assertEqual((parser.nb_lookups, parser.nb_lookup_hits), (3, 2))
+        self.assertEqual(Organism.objects.filter(structure__name='Missing').count(), 2)
+        self.assertEqual(len(parser.warnings), 1)
+
+
+class OrganismPaginatedParser(PaginatedParser):
+    model = Organism
+    fields = {'organism': 'name'}
+    eid = 'organism'
+    url = 'https://test.fr/organisms'
+    prefetch_pages = 2
+    pages = [
+        [{'name': 'a'}, {'name': 'b'}],
+        [{'name': 'c'}],
+    ]
+    failing = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched = []
+
+    @property
+    def items(self):
+        return self.root['rows']
+
+    def normalize_field_name(self, name):
+        return name
+
+    def get_nb(self, root):
+        return sum(len(page) for page in self.pages)
+
+    def get_first_page(self):
+        return {'url': self.url, 'index': 0}
+
+    def get_next_page(self, page, root):
+        if page['index'] + 1 >= len(self.pages):
+            return None
+        return {'url': self.url, 'index': page['index'] + 1}
+
+    def fetch_page(self, page):
+        self.fetched.append(page['index'])
+        return {'rows': self.pages[page['index']]}
+
+    def filter_organism(self, src, val):
+        if val == self.failing:
+            raise RuntimeError("Interrupted")
+        return val
+
+
+@override_settings(TMP_DIR=mkdtemp('geotrek_test'))
+class PaginatedParserTests(TestCase):
+    def test_prefetched_pages(self):
+        parser = OrganismPaginatedParser()
+        parser.parse()
+        self.assertEqual(parser.fetched, [0, 1])
+        self.assertEqual(list(Organism.objects.values_list('organism', flat=True)), ['a', 'b', 'c'])
+
+    def test_resume(self):
+        parser = OrganismPaginatedParser()
+        parser.pages_cache = True
+        parser.failing = 'c'
+        with self.assertRaisesRegex(RuntimeError, "Interrupted"):
+            parser.parse()
+        self.assertTrue(os.path.exists(os.path.join(parser.pages_cache_dir, 'state.json')))
+        parser = OrganismPaginatedParser()
+        parser.pages_cache = True
+        parser.parse()
+        # Pages are read from disk and rows of first page are not imported again
+        self.assertEqual(parser.fetched, [])
+        self.assertEqual(parser.line, 1)
+        self.assertEqual(Organism.objects.count(), 3)
+        self.assertFalse(os.path.exists(parser.pages_cache_dir))
+
+    @override_settings(PARSER_PAGES_CACHE_TTL=3600)
+    def test_expired_pages_are_not_resumed(self):
+        parser = OrganismPaginatedParser()
+        parser.pages_cache = True
+        parser.failing = 'c'
+        with self.assertRaisesRegex(RuntimeError, "Interrupted"):
+            parser.parse()
+        expired = time.time() - 7200
+        os.utime(parser.pages_cache_dir, (expired, expired))
+        parser = OrganismPaginatedParser()
+        parser.pages_cache = True
+        parser.parse()
+        self.assertEqual(parser.fetched, [0, 1])
+        self.assertEqual(parser.line, 3)
+        self.assertFalse(os.path.exists(parser.pages_cache_dir))
+
+
 class ThemeParser(ExcelParser):
     """Parser used in MultilangParserTests, using Theme because it has a translated field"""
     model = Theme
@@ -265,6 +481,29 @@ class AttachmentParserTests(TestCase):
         if os.path.exists(settings.MEDIA_ROOT):
             rmtree(settings.MEDIA_ROOT)
 
+    @mock.patch('geotrek.common.parsers.FTP')
+    def test_ftp_reconnect(self, mocked):
+        lost, new = mock.MagicMock(), mock.MagicMock()
+        lost.size.side_effect = EOFError()
+        new.size.return_value = 42
+        mocked.side_effect = [lost, new]
+        parser = AttachmentParser()
+        self.assertEqual(parser.get_ftp_size(urllib.parse.urlparse('ftp://test.url.com/dir/file.jpg')), 42)
+        self.assertEqual(mocked.call_count, 2)
+        lost.quit.assert_called_once_with()
+        # New connection is kept
+        self.assertEqual(parser.get_ftp_size(urllib.parse.urlparse('ftp://test.url.com/dir/file.jpg')), 42)
+        self.assertEqual(mocked.call_count, 2)
+
+    @mock.patch('geotrek.common.parsers.FTP')
+    def test_ftp_reconnect_fail(self, mocked):
+        mocked.return_value.size.side_effect = EOFError("Lost")
+        parser = AttachmentParser()
+        with self.assertRaisesRegex(ValueImportError, "Failed to load attachment: Lost"):
+            parser.get_ftp_size(urllib.parse.urlparse('ftp://test.url.com/dir/file.jpg'))
+        self.assertEqual(mocked.call_count, 2)
+        self.assertEqual(parser.ftp_connections, {})
+
     @mock.patch('requests.get')
     def test_attachment(self, mocked):
         mocked.return_value.status_code = 200
@@ -427,6 +666,52 @@ class AttachmentParserTests(TestCase):
         self.assertEqual(attachment.legend, 'legend')
         self.assertEqual(attachment.author, 'name')
 
+    @override_settings(PARSER_ATTACHMENTS_WORKERS=2)
+    @mock.patch('requests.Session.get')
+    def test_attachment_conditional_request(self, mocked_get):
+        mocked_get.return_value.status_code = 200
+        mocked_get.return_value.content = get_dummy_img()
+        mocked_get.return_value.headers = {'ETag': '"v1"'}
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'organism.xls')
+        call_command('import', 'geotrek.common.tests.test_parsers.AttachmentParser', filename, verbosity=0)
+        attachment = Attachment.objects.get()
+        self.assertEqual(attachment.download.etag, '"v1"')
+        mocked_get.return_value.status_code = 304
+        call_command('import', 'geotrek.common.tests.test_parsers.AttachmentParser', filename, verbosity=0)
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertEqual(mocked_get.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(Attachment.objects.get().pk, attachment.pk)
+
+    @override_settings(PARSER_ATTACHMENTS_WORKERS=2)
+    @mock.patch('requests.Session.get')
+    def test_attachment_conditional_request_modified(self, mocked_get):
+        mocked_get.return_value.status_code = 200
+        mocked_get.return_value.content = get_dummy_img()
+        mocked_get.return_value.headers = {'ETag': '"v1"'}
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'organism.xls')
+        call_command('import', 'geotrek.common.tests.test_parsers.AttachmentParser', filename, verbosity=0)
+        mocked_get.return_value.content = get_dummy_img() + b'modified'
+        mocked_get.return_value.headers = {'ETag': '"v2"'}
+        call_command('import', 'geotrek.common.tests.test_parsers.AttachmentParser', filename, verbosity=0)
+        # Modified content is not downloaded twice
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertEqual(Attachment.objects.get().download.etag, '"v2"')
+
+    @mock.patch('requests.Session.get')
+    def test_attachment_conditional_request_modified_same_size(self, mocked_get):
+        mocked_get.return_value.status_code = 200
+        mocked_get.return_value.content = get_dummy_img() + b'original'
+        mocked_get.return_value.headers = {'ETag': '"v1"'}
+        filename = os.path.join(os.path.dirname(__file__), 'data', 'organism.xls')
+        call_command('import', 'geotrek.common.tests.test_parsers.AttachmentParser', filename, verbosity=0)
+        mocked_get.return_value.content = get_dummy_img() + b'modified'
+        mocked_get.return_value.headers = {'ETag': '"v2"'}
+        call_command('import', 'geotrek.common.tests.test_parsers.AttachmentParser', filename, verbosity=0)
+        attachment = Attachment.objects.get()
+        self.assertEqual(attachment.download.etag, '"v2"')
+        with attachment.attachment_file.open('rb') as f:
+            self.assertEqual(f.read(), get_dummy_img() + b'modified')
+
     @mock.patch('requests.get')
     @mock.patch('requests.head')
     def test_attachment_updated_file_not_found(self, mocked_head, mocked_get):
@@ -4,17 +4,21 @@ import json
 from landez.sources import DownloadError
 from unittest import mock
 import shutil
+import tempfile
+import threading
 from io import StringIO
 import zipfile
 
 from django.conf import settings
-from django.test import TestCase
-from django.contrib.gis.geos import LineString
+from django.test import TestCase, TransactionTestCase
+from django.contrib.gis.geos import LineString, Point
+from landez import TilesManager
 from django.core import management
 from django.core.management.base import CommandError
 from django.http import HttpResponse, StreamingHttpResponse
 from django.test.utils import override_settings
 
+from geotrek.common.helpers_sync import ZipTilesBuilder, tiles_coverage
 from geotrek.common.tests.factories import FileTypeFactory, RecordSourceFactory, TargetPortalFactory, AttachmentFactory, ThemeFactory
 from geotrek.common.utils.testdata import get_dummy_uploaded_image
 from geotrek.core.tests.factories import PathFactory
@@ -23,6 +27,7 @@ from geotrek.sensitivity.tests.factories import SensitiveAreaFactory, SportPract
 from geotrek.signage.tests.factories import SignageFactory
 from geotrek.tourism.tests.factories import InformationDeskFactory, TouristicContentFactory, TouristicEventFactory
 from geotrek.trekking.tests.factories import TrekFactory, TrekWithPublishedPOIsFactory
+from geotrek.trekking import helpers_sync as trekking_sync
 from geotrek.trekking import models as trekking_models
 
 
@@ -149,6 +154,91 @@ class SyncRandoTilesTest(VarTmpTestCase):
         self.assertIn("zip/tiles/{pk}.zip".format(pk=trek.pk), output.getvalue())
 
 
+@override_settings(MOBILE_TILES_URL='http://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png')
+class ZipTilesBuilderTest(TestCase):
+    def setUp(self):
+        self.tiles_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tiles_dir.cleanup)
+
+    def build(self):
+        with tempfile.TemporaryFile() as f, zipfile.ZipFile(f, 'w') as zfile:
+            builder = ZipTilesBuilder(zfile, prefix='tiles/', tiles_url=settings.MOBILE_TILES_URL,
+                                      tiles_dir=self.tiles_dir.name)
+            builder.add_coverage(bbox=(1.3, 43.6, 1.31, 43.61), zoomlevels=[12, 13])
+            builder.run()
+            output = sorted(zfile.namelist())
+        return builder, output
+
+    @mock.patch('landez.sources.TileDownloader.tile', return_value=b'I am a png')
+    def test_tiles_are_downloaded_once(self, mock_download):
+        builder, names = self.build()
+        self.assertEqual(len(names), len(builder.tiles))
+        self.assertEqual(mock_download.call_count, len(builder.tiles))
+        # Tiles are kept in local store for next runs
+        self.build()
+        self.assertEqual(mock_download.call_count, len(builder.tiles))
+
+    @mock.patch('landez.sources.TileDownloader.tile', return_value=b'I am a png')
+    def test_expired_tiles_are_downloaded_again(self, mock_download):
+        builder, names = self.build()
+        tile = sorted(builder.tiles)[0]
+        path = builder.tm.cache.tile_fullpath(tile)
+        os.utime(path, (0, 0))
+        self.build()
+        self.assertEqual(mock_download.call_count, len(builder.tiles) + 1)
+        with override_settings(MOBILE_TILES_CACHE_EXPIRATION=None):
+            os.utime(path, (0, 0))
+            self.build()
+        self.assertEqual(mock_download.call_count, len(builder.tiles) + 1)
+
+    @mock.patch('landez.sources.TileDownloader.tile', side_effect=DownloadError)
+    def test_failed_tiles_are_skipped(self, mock_download):
+        builder, names = self.build()
+        self.assertEqual(names, [])
+
+    @override_settings(MOBILE_TILES_DOWNLOAD_WORKERS=2)
+    def test_tiles_managers_are_not_shared_between_threads(self):
+        managers = {}
+
+        def tile(tm, tile):
+            managers.setdefault(threading.get_ident(), set()).add(id(tm))
+            return b'I am a png'
+
+        with mock.patch('landez.TilesManager.tile', autospec=True, side_effect=tile):
+            builder, names = self.build()
+        self.assertEqual(len(names), len(builder.tiles))
+        ids = [tm_id for tm_ids in managers.values() for tm_id in tm_ids]
+        # One tiles manager by thread, other than the one of the builder
+        self.assertTrue(all(len(tm_ids) == 1 for tm_ids in managers.values()))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertNotIn(id(builder.tm), ids)
+
+
+class TilesCoverageTest(TestCase):
+    def test_point_coverage_within_bbox(self):
+        tm = TilesManager()
+        coverage = tiles_coverage(Point(1.3, 43.6, srid=4326), 0.01, [13, 14, 15])
+        bbox_tiles = set(tm.tileslist((1.29, 43.59, 1.31, 43.61), [13, 14, 15]))
+        self.assertTrue(coverage)
+        self.assertTrue(coverage <= bbox_tiles)
+        for z in (13, 14, 15):
+            self.assertIn(tm.tileslist((1.2999, 43.5999, 1.3001, 43.6001), [z])[0], coverage)
+
+    def test_line_coverage_contains_vertices_tiles(self):
+        tm = TilesManager()
+        line = LineString([(1.3, 43.6), (1.35, 43.62), (1.4, 43.7)], srid=4326)
+        coverage = tiles_coverage(line, 0.005, [15, 16])
+        for lng, lat in line.coords:
+            for z in (15, 16):
+                self.assertIn(tm.tileslist((lng - 0.0001, lat - 0.0001, lng + 0.0001, lat + 0.0001), [z])[0], coverage)
+        self.assertEqual({z for z, x, y in coverage}, {15, 16})
+
+    def test_tms_scheme(self):
+        coverage = tiles_coverage(Point(1.3, 43.6, srid=4326), 0.01, [13])
+        coverage_tms = tiles_coverage(Point(1.3, 43.6, srid=4326), 0.01, [13], scheme='tms')
+        self.assertEqual(coverage_tms, {(z, x, 2 ** z - 1 - y) for z, x, y in coverage})
+
+
 class SyncRandoFailTest(VarTmpTestCase):
     def test_fail_directory_not_empty(self):
         os.makedirs(os.path.join(settings.TMP_DIR, 'sync_rando', 'tmp_sync', 'other'))
@@ -250,6 +340,42 @@ class SyncTest(VarTmpTestCase):
                                 skip_pdf=True, verbosity=2, stdout=output)
         self.assertIn("unchanged", output.getvalue())
 
+    @mock.patch('geotrek.trekking.models.Trek.prepare_map_image')
+    def test_sync_incremental(self, mock_prepare):
+        dst = os.path.join(settings.TMP_DIR, 'sync_rando', 'tmp_sync')
+        gpx = os.path.join(dst, 'api', 'en', 'treks', str(self.trek.pk), '%s.gpx' % self.trek.slug)
+        with mock.patch('geotrek.trekking.helpers_sync.SyncRando.sync_trek_gpx', autospec=True,
+                        side_effect=trekking_sync.SyncRando.sync_trek_gpx) as mock_gpx:
+            management.call_command('sync_rando', dst, url='http://localhost:8000', skip_tiles=True, languages='en',
+                                    skip_pdf=True, incremental=True, verbosity=2, stdout=StringIO())
+            self.assertEqual(mock_gpx.call_count, 1)
+            with open(os.path.join(dst, 'manifest.json')) as f:
+                manifest = json.load(f)
+            self.assertIn('trekking.trek:{}:en'.format(self.trek.pk), manifest['objects'])
+            inode = os.stat(gpx).st_ino
+
+            # Unchanged trek files are reused
+            output = StringIO()
+            management.call_command('sync_rando', dst, url='http://localhost:8000', skip_tiles=True, languages='en',
+                                    skip_pdf=True, incremental=True, verbosity=2, stdout=output)
+            self.assertEqual(mock_gpx.call_count, 1)
+            self.assertIn('trekking.trek:{}:en unchanged'.format(self.trek.pk), output.getvalue())
+            self.assertEqual(os.stat(gpx).st_ino, inode)
+            zfile = zipfile.ZipFile(os.path.join(dst, 'zip', 'treks', 'en', 'global.zip'))
+            self.assertIn('api/en/treks/{}/pois.geojson'.format(self.trek.pk), zfile.namelist())
+
+            # Modified trek is synced again
+            self.trek.save()
+            management.call_command('sync_rando', dst, url='http://localhost:8000', skip_tiles=True, languages='en',
+                                    skip_pdf=True, incremental=True, verbosity=2, stdout=StringIO())
+            self.assertEqual(mock_gpx.call_count, 2)
+
+            # So are treks whose related objects changed
+            self.trek.pois.first().save()
+            management.call_command('sync_rando', dst, url='http://localhost:8000', skip_tiles=True, languages='en',
+                                    skip_pdf=True, incremental=True, verbosity=2, stdout=StringIO())
+            self.assertEqual(mock_gpx.call_count, 3)
+
     @override_settings(THUMBNAIL_COPYRIGHT_FORMAT='*' * 300)
     def test_sync_pictures_long_title_legend_author(self):
         with mock.patch('geotrek.trekking.models.Trek.prepare_map_image'):
@@ -317,6 +443,47 @@ class SyncTest(VarTmpTestCase):
         self.assertTrue(os.path.exists(os.path.join(settings.TMP_DIR, 'sync_rando', 'tmp_sync', 'api', 'fr', 'treks', str(trek_2.pk), 'fr_2.kml')))
 
 
+class SyncParallelTest(TransactionTestCase):
+    """
+    Use of TransactionTestCase because worker processes open their own database connection,
+    and see only committed data.
+    """
+    def setUp(self):
+        self.dst = os.path.join(settings.TMP_DIR, 'sync_rando', 'tmp_sync')
+        self.dst_parallel = os.path.join(settings.TMP_DIR, 'sync_rando', 'tmp_sync_parallel')
+        for dst in (self.dst, self.dst_parallel):
+            if os.path.exists(dst):
+                shutil.rmtree(dst)
+            self.addCleanup(shutil.rmtree, dst, ignore_errors=True)
+        TrekWithPublishedPOIsFactory.create(published=True)
+        TrekWithPublishedPOIsFactory.create(published=True)
+
+    def read_tree(self, root):
+        """ Return content of synced files by relative path, zip files by entry """
+        tree = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith('.zip'):
+                    with zipfile.ZipFile(path) as zfile:
+                        content = {name: zfile.read(name) for name in zfile.namelist()}
+                else:
+                    with open(path, 'rb') as f:
+                        content = f.read()
+                tree[os.path.relpath(path, root)] = content
+        return tree
+
+    @mock.patch('geotrek.trekking.models.Trek.prepare_map_image')
+    def test_sync_processes(self, mock_prepare):
+        management.call_command('sync_rando', self.dst, url='http://localhost:8000', skip_tiles=True, languages='en',
+                                skip_pdf=True, skip_profile_png=True, verbosity=0)
+        management.call_command('sync_rando', self.dst_parallel, url='http://localhost:8000', skip_tiles=True,
+                                languages='en', skip_pdf=True, skip_profile_png=True, processes=2, verbosity=0)
+        tree = self.read_tree(self.dst)
+        self.assertIn(os.path.join('zip', 'treks', 'en', 'global.zip'), tree)
+        self.assertDictEqual(self.read_tree(self.dst_parallel), tree)
+
+
 class SyncComplexTest(VarTmpTestCase):
     @classmethod
     def setUpTestData(cls):
@@ -1,13 +1,20 @@
+import json
 import os
 
 from django.conf import settings
-from django.contrib.gis.geos import Point
+from django.contrib.gis.geos import LineString, Point
 from django.test import SimpleTestCase, TestCase, override_settings
 
+from geotrek.core.models import Path
+from geotrek.core.tests.factories import PathFactory
+
+from ..models import Theme
 from ..parsers import Parser
 from ..utils import uniquify, format_coordinates, spatial_reference, simplify_coords
+from ..utils.geojson import buffered, geojson_collection, geojson_features, iterate_in_chunks
 from ..utils.import_celery import create_tmp_destination, subclasses
 from ..utils.parsers import add_http_prefix
+from .factories import ThemeFactory
 
 
 class UtilsTest(TestCase):
@@ -100,3 +107,27 @@ class UtilsParsersTest(SimpleTestCase):
 
     def test_add_http_prefix_with_prefix(self):
         self.assertEqual('http://test.com', add_http_prefix('http://test.com'))
+
+
+class GeoJSONUtilsTest(TestCase):
+    def test_buffered(self):
+        self.assertEqual(list(buffered(['ab', 'cd', 'e'], size=3)), ['abcd', 'e'])
+        self.assertEqual(list(buffered([], size=3)), [])
+
+    def test_iterate_in_chunks_keeps_order(self):
+        themes = [ThemeFactory(label=label) for label in 'cab']
+        queryset = Theme.objects.filter(pk__in=[theme.pk for theme in themes]).order_by('label')
+        chunks = list(iterate_in_chunks(queryset, chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual([theme.label for chunk in chunks for theme in chunk], ['a', 'b', 'c'])
+
+    def test_geojson_features(self):
+        path = PathFactory(name="Path \"1\"", geom=LineString((700000, 6600000), (700100, 6600100), srid=settings.SRID))
+        features = list(geojson_features(Path.objects.filter(pk=path.pk), ['id', 'name'], precision=3))
+        feature = json.loads(features[0])
+        self.assertEqual(feature['properties'], {'id': path.pk, 'name': 'Path "1"'})
+        self.assertEqual(feature['geometry']['type'], 'LineString')
+        self.assertEqual(feature['geometry']['coordinates'][0], [3.0, 46.5])
+        collection = json.loads(''.join(geojson_collection(features)))
+        self.assertEqual(collection['type'], 'FeatureCollection')
+        self.assertEqual(len(collection['features']), 1)
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.contrib.gis.db.models.functions import AsGeoJSON, Transform
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
+
+# Rows fetched at once from server-side cursors
+CHUNK_SIZE = 2000
+# Characters sent at once by streaming responses
+BUFFER_SIZE = 64 * 1024
+
+
+def buffered(chunks, size=BUFFER_SIZE):
+    """ Group small strings into larger ones to limit the number of writes """
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iterate_in_chunks(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over queryset objects, fetching them by chunks of primary keys, keeping
+    ordering. Contrary to ``iterator()``, ``prefetch_related()`` lookups are kept.
+    """
+    pks = list(queryset.values_list('pk', flat=True))
+    for i in range(0, len(pks), chunk_size):
+        chunk = pks[i:i + chunk_size]
+        objects = {obj.pk: obj for obj in queryset.filter(pk__in=chunk)}
+        yield [objects[pk] for pk in chunk if pk in objects]
+
+
+def json_array(items):
+    """ Yield the JSON encoding of an iterable of already encoded items """
+    yield '['
+    for i, item in enumerate(items):
+        yield item if i == 0 else ',' + item
+    yield ']'
+
+
+def geojson_features(queryset, properties, geometry='geom', srid=None, precision=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield GeoJSON features of queryset objects, one string by feature.
+
+    Geometries are encoded by PostGIS (``ST_AsGeoJSON``) and properties read with
+    ``values_list()`` through a server-side cursor, so that neither model instances
+    nor GEOS geometries are built.
+    """
+    srid = srid or settings.API_SRID
+    if precision is None:
+        precision = settings.MAPENTITY_CONFIG['GEOJSON_PRECISION']
+    if isinstance(geometry, str):
+        geometry = F(geometry)
+    if srid != settings.SRID:
+        geometry = Transform(geometry, srid)
+    rows = queryset.annotate(geojson_geometry=AsGeoJSON(geometry, precision=precision))
+    rows = rows.values_list('geojson_geometry', *properties)
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for geom, *values in rows.iterator(chunk_size=chunk_size):
+        yield '{"type":"Feature","geometry":%s,"properties":%s}' % (
+            geom or 'null', encoder.encode(dict(zip(properties, values)))
+        )
+
+
+def geojson_collection(features):
+    """ Yield the GeoJSON feature collection of an iterable of encoded features """
+    yield '{"type":"FeatureCollection","features":'
+    yield from json_array(features)
+    yield '}'
+
+
+class StreamingGeoJSONResponse(StreamingHttpResponse):
+    def __init__(self, features, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(buffered(geojson_collection(features)), **kwargs)
+
+
+def geojson_layer_response(features, cache=None, cache_key=None, timeout=None):
+    """
+    Return the feature collection of a map layer. If ``cache_key`` is given, the
+    collection is rendered once from encoded features, and the response is cached;
+    otherwise it is streamed.
+    """
+    if not cache_key:
+        return StreamingGeoJSONResponse(features)
+    response = cache.get(cache_key)
+    if response is None:
+        response = HttpResponse(''.join(geojson_collection(features)), content_type='application/json')
+        cache.set(cache_key, response, timeout)
+    return response
@@ -1,5 +1,49 @@
+from queue import Full, Queue
+from threading import Event, Thread
+
+
 def add_http_prefix(url):
     if url.startswith('http'):
         return url
     else:
         return 'http://' + url
+
+
+def prefetch(iterable, size):
+    """
+    Iterate over iterable in a background thread, which keeps up to ``size`` items ahead
+    of the consumer. Exceptions are raised in the consumer thread.
+    """
+    items = Queue(maxsize=size)
+    stopped = Event()
+    end = object()
+
+    def put(item, exc=None):
+        while not stopped.is_set():
+            try:
+                items.put((item, exc), timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(end)
+        except Exception as exc:
+            put(end, exc)
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, exc = items.get()
+            if exc is not None:
+                raise exc
+            if item is end:
+                return
+            yield item
+    finally:
+        stopped.set()
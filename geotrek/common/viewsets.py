@@ -1,12 +1,20 @@
+from django.core.cache import caches
+from mapentity.decorators import view_cache_latest
+from mapentity.registry import app_settings
 from mapentity.views import MapEntityViewSet
 from rest_framework import permissions
 
+from geotrek.common.utils.geojson import geojson_features, geojson_layer_response
+
 
 class GeotrekMapentityViewSet(MapEntityViewSet):
     """ Custom MapentityViewSet for geotrek. """
 
     permission_classes = [permissions.DjangoModelPermissionsOrAnonReadOnly]
     mapentity_list_class = []
+    # Properties of GeoJSON layer features, set to render the layer from the database
+    # without serializer (see ``geojson_layer()``)
+    geojson_layer_properties = None
 
     def get_columns(self):
         return self.mapentity_list_class.columns
@@ -21,3 +29,31 @@ class GeotrekMapentityViewSet(MapEntityViewSet):
             # this permit to optimize data serialization with only required columns
             context['request'].query_params['fields'] = ','.join(columns)
         return context
+
+    def geojson_layer(self):
+        """
+        Render GeoJSON layer with geometries encoded by PostGIS, reading objects with a
+        server-side cursor, to keep memory usage low on large layers. The layer is
+        cached if the view defines ``view_cache_key()`` and is not filtered, streamed
+        otherwise.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        features = geojson_features(queryset, self.geojson_layer_properties)
+        cache = caches[app_settings['GEOJSON_LAYERS_CACHE_BACKEND']]
+        cache_key = None
+        # Do not cache filtered layers, parameters starting with _ are not filters
+        with_filters = any(not param.startswith('_') for param in self.request.GET.keys())
+        if hasattr(self, 'view_cache_key') and not with_filters:
+            cache_key = self.view_cache_key()
+        return geojson_layer_response(features, cache=cache, cache_key=cache_key)
+
+    @view_cache_latest()
+    def geojson_layer_list(self, request, *args, **kwargs):
+        """ Same Last-Modified and Cache-Control headers as mapentity list view """
+        return self.geojson_layer()
+
+    def list(self, request, *args, **kwargs):
+        if self.geojson_layer_properties and self.format_kwarg == 'geojson':
+            kwargs.setdefault('format', self.format_kwarg)
+            return self.geojson_layer_list(request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
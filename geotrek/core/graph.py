@@ -1,10 +1,12 @@
+import heapq
 import math
+import threading
+from array import array
 from collections import defaultdict
 
+import numpy as np
 
-def path_modifier(path):
-    length = 0.0 if math.isnan(path.length) else path.length
-    return {"id": path.pk, "length": length}
+from geotrek.common.functions import EndPoint, StartPoint, X, Y
 
 
 def get_key_optimizer():
@@ -13,6 +15,17 @@ def get_key_optimizer():
     return lambda x: mapping[x]
 
 
+def path_graph_rows(qs):
+    """
+    Return ``(pk, start_x, start_y, end_x, end_y, length)`` tuples of paths,
+    computed by the database to avoid loading geometries.
+    """
+    return qs.annotate(
+        start_x=X(StartPoint('geom')), start_y=Y(StartPoint('geom')),
+        end_x=X(EndPoint('geom')), end_y=Y(EndPoint('geom')),
+    ).values_list('pk', 'start_x', 'start_y', 'end_x', 'end_y', 'length')
+
+
 def graph_edges_nodes_of_qs(qs):
     """
     return a graph on the form:
@@ -31,27 +44,332 @@ def graph_edges_nodes_of_qs(qs):
 
     coord_point are tuple of float
     """
+    return PathGraph.from_queryset(qs).as_dict()
 
-    key_modifier = get_key_optimizer()
-    value_modifier = path_modifier
 
-    edges = defaultdict(dict)
-    nodes = defaultdict(dict)
+class PathGraph:
+    """
+    Compact graph of the path network, stored in flat arrays.
 
-    for path in qs:
-        coords = path.geom.coords
-        start_point, end_point = coords[0], coords[-1]
-        k_start_point, k_end_point = key_modifier(start_point), key_modifier(end_point)
+    Nodes are path extremities, numbered from 0 in order of appearance. Edge ``i``
+    is the path ``edge_pks[i]``, going from ``edge_starts[i]`` to ``edge_ends[i]``,
+    with length ``edge_lengths[i]``. Removed edges keep their slot with a pk of -1,
+    and the slot is reused by the next insertion.
 
-        v_path = value_modifier(path)
-        v_path['nodes_id'] = [k_start_point, k_end_point]
-        edge_id = v_path['id']
+    Adjacency is stored in CSR form as ``csr = (offsets, nodes, edges, lengths)``:
+    neighbours of node ``n`` are ``nodes[offsets[n]:offsets[n + 1]]``, reached
+    through the edge slots ``edges[offsets[n]:offsets[n + 1]]``. It is rebuilt
+    (vectorized) on first use after an update.
+    """
 
-        nodes[k_start_point][k_end_point] = edge_id
-        nodes[k_end_point][k_start_point] = edge_id
-        edges[edge_id] = v_path
+    def __init__(self, latest=None):
+        self.latest = latest
+        self.node_ids = {}
+        self.node_count = 0
+        self.edge_index = {}
+        self.edge_pks = array('q')
+        self.edge_starts = array('q')
+        self.edge_ends = array('q')
+        self.edge_lengths = array('d')
+        self._free_slots = []
+        self._csr = None
+        self._dict = None
 
-    return {
-        'edges': dict(edges),
-        'nodes': dict(nodes),
-    }
+    @classmethod
+    def from_rows(cls, rows, latest=None):
+        graph = cls(latest=latest)
+        for row in rows:
+            graph.update_edge(*row)
+        return graph
+
+    @classmethod
+    def from_queryset(cls, qs, latest=None):
+        return cls.from_rows(path_graph_rows(qs), latest=latest)
+
+    def _node_id(self, x, y):
+        node = self.node_ids.get((x, y))
+        if node is None:
+            node = self.node_ids[(x, y)] = self.node_count
+            self.node_count += 1
+        return node
+
+    def _changed(self):
+        self._csr = None
+        self._dict = None
+
+    def add_edge(self, edge_id, start_node, end_node, length):
+        """ Insert or update an edge between two existing node ids. """
+        if length is None or math.isnan(length):
+            length = 0.0
+        i = self.edge_index.get(edge_id)
+        if i is None:
+            if self._free_slots:
+                i = self._free_slots.pop()
+                self.edge_pks[i] = edge_id
+                self.edge_starts[i] = start_node
+                self.edge_ends[i] = end_node
+                self.edge_lengths[i] = length
+            else:
+                i = len(self.edge_pks)
+                self.edge_pks.append(edge_id)
+                self.edge_starts.append(start_node)
+                self.edge_ends.append(end_node)
+                self.edge_lengths.append(length)
+            self.edge_index[edge_id] = i
+        else:
+            self.edge_starts[i] = start_node
+            self.edge_ends[i] = end_node
+            self.edge_lengths[i] = length
+        self.node_count = max(self.node_count, start_node + 1, end_node + 1)
+        self._changed()
+
+    def update_edge(self, edge_id, start_x, start_y, end_x, end_y, length):
+        """ Insert or update a path from its extremities coordinates. """
+        self.add_edge(edge_id, self._node_id(start_x, start_y), self._node_id(end_x, end_y), length)
+
+    def remove_edge(self, edge_id):
+        i = self.edge_index.pop(edge_id, None)
+        if i is None:
+            return
+        self.edge_pks[i] = -1
+        self._free_slots.append(i)
+        self._changed()
+
+    def edge(self, edge_id):
+        """ Return ``(start_node, end_node, length)`` of an edge. """
+        i = self.edge_index[edge_id]
+        return self.edge_starts[i], self.edge_ends[i], self.edge_lengths[i]
+
+    def __contains__(self, edge_id):
+        return edge_id in self.edge_index
+
+    def __len__(self):
+        return len(self.edge_index)
+
+    def copy(self):
+        """ Return an independent copy of the graph, to be updated while this one is read. """
+        graph = PathGraph(latest=self.latest)
+        graph.node_ids = dict(self.node_ids)
+        graph.node_count = self.node_count
+        graph.edge_index = dict(self.edge_index)
+        graph.edge_pks = array('q', self.edge_pks)
+        graph.edge_starts = array('q', self.edge_starts)
+        graph.edge_ends = array('q', self.edge_ends)
+        graph.edge_lengths = array('d', self.edge_lengths)
+        graph._free_slots = list(self._free_slots)
+        return graph
+
+    def refresh(self, qs, latest):
+        """
+        Apply changes of paths updated since last refresh. ``qs`` is the queryset of
+        paths belonging to the graph (i.e. non draft ones).
+        """
+        from geotrek.core.models import Path
+
+        changed = Path.include_invisible.filter(date_update__gte=self.latest).values_list('pk', flat=True)
+        changed = set(changed)
+        kept = set()
+        for row in path_graph_rows(qs.filter(pk__in=changed)):
+            self.update_edge(*row)
+            kept.add(row[0])
+        for pk in changed - kept:
+            self.remove_edge(pk)
+        # Deleted paths are not returned by the query above
+        if len(self) != qs.count():
+            existing = set(qs.values_list('pk', flat=True))
+            for pk in set(self.edge_index) - existing:
+                self.remove_edge(pk)
+        self.latest = latest
+
+    @property
+    def csr(self):
+        if self._csr is None:
+            pks = np.array(self.edge_pks, dtype=np.int64)
+            starts = np.array(self.edge_starts, dtype=np.int64)
+            ends = np.array(self.edge_ends, dtype=np.int64)
+            edges = np.flatnonzero(pks >= 0)
+            starts, ends = starts[edges], ends[edges]
+            # Both directions, once for loops
+            backward = starts != ends
+            sources = np.concatenate([starts, ends[backward]])
+            targets = np.concatenate([ends, starts[backward]])
+            refs = np.concatenate([edges, edges[backward]])
+            order = np.argsort(sources, kind='stable')
+            offsets = np.zeros(self.node_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=self.node_count), out=offsets[1:])
+            self._csr = (offsets, targets[order], refs[order], np.array(self.edge_lengths, dtype=np.float64))
+        return self._csr
+
+    def as_dict(self):
+        """ Return the graph in the format expected by ``dijkstra.js``. """
+        if self._dict is None:
+            # Renumber nodes from 1, skipping those of removed edges
+            key_modifier = get_key_optimizer()
+            nodes = defaultdict(dict)
+            edges = {}
+            for i, pk in enumerate(self.edge_pks):
+                if pk < 0:
+                    continue
+                start, end = key_modifier(self.edge_starts[i]), key_modifier(self.edge_ends[i])
+                nodes[start][end] = pk
+                nodes[end][start] = pk
+                edges[pk] = {'id': pk, 'length': self.edge_lengths[i], 'nodes_id': [start, end]}
+            self._dict = {
+                'edges': edges,
+                'nodes': dict(nodes),
+            }
+        return self._dict
+
+    def _dijkstra(self, origins, destinations):
+        """
+        Multi-source shortest path on nodes.
+
+        ``origins`` and ``destinations`` map node ids to the extra cost needed
+        to reach them from the source point or the destination point.
+        Returns ``(cost, last_node, predecessors)``, or ``(inf, None, {})``.
+        """
+        offsets, targets, refs, lengths = self.csr
+        distances = dict(origins)
+        predecessors = {}
+        heap = [(cost, node) for node, cost in origins.items()]
+        heapq.heapify(heap)
+        best_cost, best_node = math.inf, None
+        visited = set()
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost >= best_cost:
+                break
+            if node in visited:
+                continue
+            visited.add(node)
+            if node in destinations and cost + destinations[node] < best_cost:
+                best_cost, best_node = cost + destinations[node], node
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbour, i = int(targets[k]), int(refs[k])
+                new_cost = cost + lengths[i]
+                if new_cost < distances.get(neighbour, math.inf):
+                    distances[neighbour] = new_cost
+                    predecessors[neighbour] = (node, self.edge_pks[i])
+                    heapq.heappush(heap, (new_cost, neighbour))
+        return best_cost, best_node, predecessors
+
+    def shortest_path(self, start, end):
+        """
+        Return the shortest way between two points located on paths, as a list of
+        ``(path_pk, start_position, end_position)``, together with its length.
+
+        ``start`` and ``end`` are ``(path_pk, position)`` couples, where position is
+        between 0.0 and 1.0. Return ``(None, None)`` if points are not connected.
+        """
+        start_edge, start_position = start
+        end_edge, end_position = end
+        start_a, start_b, start_length = self.edge(start_edge)
+        end_a, end_b, end_length = self.edge(end_edge)
+
+        origins = {}
+        for node, cost in ((start_a, start_position * start_length),
+                           (start_b, (1 - start_position) * start_length)):
+            origins[node] = min(cost, origins.get(node, math.inf))
+        destinations = {}
+        for node, cost in ((end_a, end_position * end_length),
+                           (end_b, (1 - end_position) * end_length)):
+            destinations[node] = min(cost, destinations.get(node, math.inf))
+
+        cost, last_node, predecessors = self._dijkstra(origins, destinations)
+
+        # Both points on the same path: staying on it may be the shortest way
+        if start_edge == end_edge:
+            direct_cost = abs(end_position - start_position) * start_length
+            if direct_cost <= cost:
+                return [(start_edge, start_position, end_position)], direct_cost
+
+        if last_node is None:
+            return None, None
+
+        # Walk back through the graph
+        nodes = [last_node]
+        steps = []
+        while nodes[-1] in predecessors:
+            previous, edge_id = predecessors[nodes[-1]]
+            steps.append((edge_id, previous, nodes[-1]))
+            nodes.append(previous)
+        steps.reverse()
+        first_node = nodes[-1]
+
+        # Leave the start path towards the first node
+        first_position = 0.0 if first_node == start_a and \
+            (first_node != start_b or start_position <= 0.5) else 1.0
+        # Join the end path from the last node
+        last_position = 0.0 if last_node == end_a and \
+            (last_node != end_b or end_position <= 0.5) else 1.0
+
+        result = []
+        if start_position != first_position:
+            result.append((start_edge, start_position, first_position))
+        for edge_id, from_node, to_node in steps:
+            edge_start, edge_end, _length = self.edge(edge_id)
+            if from_node == edge_start and to_node == edge_end:
+                result.append((edge_id, 0.0, 1.0))
+            else:
+                result.append((edge_id, 1.0, 0.0))
+        if end_position != last_position or not result:
+            result.append((end_edge, last_position, end_position))
+        return result, cost
+
+    def route(self, steps):
+        """
+        Return the shortest way passing through all ``steps`` (a list of
+        ``(path_pk, position)`` couples), serialized as expected by
+        ``Topology.deserialize``, together with its total length.
+
+        Raise ``ValueError`` if a step is not on the graph or steps are not connected.
+        """
+        if len(steps) < 2:
+            raise ValueError("At least two steps are required")
+        for path_pk, position in steps:
+            if path_pk not in self:
+                raise ValueError("Unknown path %s" % path_pk)
+            if not 0.0 <= position <= 1.0:
+                raise ValueError("Invalid position %s" % position)
+
+        serialized = []
+        total_length = 0.0
+        for start, end in zip(steps[:-1], steps[1:]):
+            parts, length = self.shortest_path(start, end)
+            if parts is None:
+                raise ValueError("No path found between steps")
+            serialized.append({
+                'offset': 0,
+                'paths': [part[0] for part in parts],
+                'positions': {str(i): [part[1], part[2]] for i, part in enumerate(parts)},
+            })
+            total_length += length
+        return serialized, total_length
+
+
+_path_graph_cache = {}
+_path_graph_lock = threading.Lock()
+
+
+def get_path_graph():
+    """
+    Return the graph of non-draft paths, kept in memory and incrementally
+    updated when paths are created, modified or deleted.
+
+    Returned graphs are never modified afterwards: updates are applied to a copy,
+    which replaces the cached graph, so that requests can route without lock.
+    """
+    from geotrek.core.models import Path
+
+    latest = Path.no_draft_latest_updated()
+    qs = Path.objects.exclude(draft=True)
+    with _path_graph_lock:
+        graph = _path_graph_cache.get('graph')
+        if graph is None or graph.latest is None or latest is None:
+            graph = PathGraph.from_queryset(qs, latest=latest)
+            _path_graph_cache['graph'] = graph
+        elif graph.latest != latest:
+            graph = graph.copy()
+            graph.refresh(qs, latest)
+            _path_graph_cache['graph'] = graph
+    return graph
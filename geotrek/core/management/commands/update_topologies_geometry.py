@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from geotrek.core.models import Topology
+
+
+class Command(BaseCommand):
+    help = 'Compute geometry of topologies flagged for update (see TOPOLOGY_GEOMETRY_UPDATE_ASYNC).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, dest='batch_size',
+                            default=settings.TOPOLOGY_GEOMETRY_UPDATE_BATCH_SIZE,
+                            help='Number of topologies updated in each transaction')
+
+    def handle(self, *args, **options):
+        count = Topology.update_deferred_geometries(options['batch_size'], skip_locked=True)
+        if options['verbosity'] >= 1:
+            self.stdout.write("{} topologies updated".format(count))
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_auto_20230503_0837'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topology',
+            index=models.Index(condition=models.Q(('geom_need_update', True)), fields=['id'], name='topology_geom_need_update_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_topology_geom_need_update_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topology',
+            index=models.Index(fields=['date_update', 'id'], name='topology_update_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='path',
+            index=models.Index(fields=['date_update', 'id'], name='path_update_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import functools
 import json
 import logging
+from contextlib import contextmanager
 from geotrek.common.signals import log_cascade_deletion
 import simplekml
 import uuid
@@ -10,8 +11,9 @@ from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import Point, fromstr, LineString, GEOSGeometry
 from django.contrib.postgres.indexes import GistIndex
 from django.core.mail import mail_managers
-from django.db import connection, connections, DEFAULT_DB_ALIAS
-from django.db.models import ProtectedError
+from django.db import connection, connections, transaction, DEFAULT_DB_ALIAS
+from django.db.models import ProtectedError, Q
+from django.db.models.expressions import RawSQL
 from django.db.models.query import QuerySet
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
@@ -26,13 +28,40 @@ from geotrek.core.managers import PathManager, PathInvisibleManager, TopologyMan
     TrailManager
 from geotrek.common.mixins.models import (TimeStampedModelMixin, NoDeleteMixin, AddPropertyMixin,
                                           CheckBoxActionMixin, GeotrekMapEntityMixin)
-from geotrek.common.utils import classproperty, simplify_coords, sqlfunction, uniquify
+from geotrek.common.utils import classproperty, simplify_coords, sqlfunction
 from geotrek.zoning.mixins import ZoningPropertiesMixin
 from mapentity.serializers import plain_text
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def deferred_topologies_geometry():
+    """
+    Within this block, triggers only flag topologies whose geometry has to be
+    updated, and they are computed once at the end of it, or in a Celery worker
+    after commit if ``TOPOLOGY_GEOMETRY_UPDATE_ASYNC`` is set.
+    """
+    if not settings.TREKKING_TOPOLOGY_ENABLED:
+        yield
+        return
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ft_topologies_geometry_deferred()")
+            nested = cursor.fetchone()[0]
+            cursor.execute("SELECT set_config('geotrek.defer_topologies_geometry', 'on', true)")
+        yield
+        if nested:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('geotrek.defer_topologies_geometry', 'off', true)")
+        if settings.TOPOLOGY_GEOMETRY_UPDATE_ASYNC:
+            from geotrek.core.tasks import update_topologies_geometry
+            transaction.on_commit(lambda: update_topologies_geometry.delay())
+        else:
+            Topology.update_deferred_geometries()
+
+
 class Path(CheckBoxActionMixin, ZoningPropertiesMixin, AddPropertyMixin, GeotrekMapEntityMixin, AltimetryMixin,
            TimeStampedModelMixin, StructureRelated, ClusterableModel):
     """ Path model. Spatial indexes disabled because managed in Meta.indexes """
@@ -126,6 +155,8 @@ class Path(CheckBoxActionMixin, ZoningPropertiesMixin, AddPropertyMixin, Geotrek
             GistIndex(name='path_geom_gist_idx', fields=['geom']),
             GistIndex(name='path_geom_cadastre_gist_idx', fields=['geom_cadastre']),
             GistIndex(name='path_geom_3d_gist_idx', fields=['geom_3d']),
+            # Keyset pagination of API (see StandardResultsSetPagination)
+            models.Index(name='path_update_idx', fields=['date_update', 'id']),
             # some other complex indexes can't be created by django and are created in migrations
             # Gist (ST_STARTPOINT(geom)) and (ST_ENDPOINT(geom))
         ]
@@ -216,6 +247,12 @@ class Path(CheckBoxActionMixin, ZoningPropertiesMixin, AddPropertyMixin, Geotrek
         return self
 
     def save(self, *args, **kwargs):
+        # Topologies may be updated by several triggers, compute their geometry once
+        with deferred_topologies_geometry():
+            self._save(*args, **kwargs)
+        self.reload()
+
+    def _save(self, *args, **kwargs):
         # If the path was reversed, we have to invert related topologies
         if self.is_reversed:
             for aggr in self.aggregations.all():
@@ -235,7 +272,6 @@ class Path(CheckBoxActionMixin, ZoningPropertiesMixin, AddPropertyMixin, Geotrek
                 msg = f'Caught {exc.__class__.__name__}: {exc}'
                 logger.warning(f"Error mail managers didn't work ({msg})")
         super().save(*args, **kwargs)
-        self.reload()
 
     def delete(self, *args, **kwargs):
         if not settings.TREKKING_TOPOLOGY_ENABLED:
@@ -383,6 +419,10 @@ class Topology(ZoningPropertiesMixin, AddPropertyMixin, AltimetryMixin,
         indexes = [
             GistIndex(name='topology_geom_gist_idx', fields=['geom']),
             GistIndex(name='topology_geom_3d_gist_idx', fields=['geom_3d']),
+            # Queue of topologies whose geometry has to be computed
+            models.Index(name='topology_geom_need_update_idx', fields=['id'], condition=Q(geom_need_update=True)),
+            # Keyset pagination of API (see StandardResultsSetPagination)
+            models.Index(name='topology_update_idx', fields=['date_update', 'id']),
         ]
 
     def __init__(self, *args, **kwargs):
@@ -433,61 +473,107 @@ class Topology(ZoningPropertiesMixin, AddPropertyMixin, AltimetryMixin,
             self.reload()
         return aggr
 
+    @classmethod
+    def overlapping_positions(cls, topology_pks, kind=None, by_topology=False):
+        """ Return rows (pk, position) of topologies overlapping specified topologies, ordered by
+            position along them, or rows (topology pk, pk, position) ordered by topology if
+            ``by_topology`` is set. Topologies pks are sent as an array parameter.
+        """
+        source = 'pa.topology_id, ' if by_topology else ''
+        sql = """
+        -- Concerned aggregations, along with (start, end)
+        WITH paths_aggr AS (SELECT a.topo_object_id AS topology_id, a.path_id, a.start_position AS start,
+                                   a.end_position AS end, a.order AS path_order
+                            FROM %(aggregations_table)s a
+                            WHERE a.topo_object_id = ANY(%%(topologies)s))
+        -- Retrieve primary keys, with their first position along concerned aggregations
+        SELECT %(source)s t.id,
+               min(pa.path_order + CASE WHEN pa.start > pa.end THEN (1 - a.start_position) ELSE a.start_position END) AS position
+        FROM %(topology_table)s t, %(aggregations_table)s a, paths_aggr pa
+        WHERE a.path_id = pa.path_id AND a.topo_object_id = t.id
+          AND least(a.start_position, a.end_position) <= greatest(pa.start, pa.end)
+          AND greatest(a.start_position, a.end_position) >= least(pa.start, pa.end)
+          AND %(extra_condition)s
+        GROUP BY %(source)s t.id
+        ORDER BY %(source)s position;
+        """ % {
+            'topology_table': Topology._meta.db_table,
+            'aggregations_table': PathAggregation._meta.db_table,
+            'source': source,
+            'extra_condition': 'true' if kind is None else 't.kind = %(kind)s',
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'topologies': list(topology_pks), 'kind': kind})
+            return cursor.fetchall()
+
+    @classmethod
+    def ordered_by_pks(cls, all_objects, pk_list):
+        """ Return objects of specified pks, preserving pk list order
+        """
+        table = all_objects.model._meta.db_table
+        column = all_objects.model._meta.pk.column
+        ordering = RawSQL('array_position(%%s, "%s"."%s")' % (table, column), (list(pk_list), ))
+        return all_objects.filter(pk__in=pk_list).annotate(ordering=ordering).order_by('ordering')
+
     @classmethod
     def overlapping(cls, queryset, all_objects=None):
         """ Return a Topology queryset overlapping specified topologies.
         """
         if all_objects is None:
             all_objects = cls.objects.existing()
+            prefetched = getattr(queryset, '_prefetched_overlapping', {}).get(all_objects.model)
+            if prefetched is not None:
+                return prefetched
         is_generic = all_objects.model.KIND == Topology.KIND
         single_input = isinstance(queryset, QuerySet)
 
         if single_input:
-            topology_pks = [str(pk) for pk in queryset.values_list('pk', flat=True)]
+            topology_pks = list(queryset.values_list('pk', flat=True))
         else:
-            topology_pks = [str(queryset.pk)]
+            topology_pks = [queryset.pk]
 
         if len(topology_pks) == 0:
             return all_objects.filter(pk__in=[])
 
-        sql = """
-        WITH topologies AS (SELECT id FROM %(topology_table)s WHERE id IN (%(topology_list)s)),
-        -- Concerned aggregations
-             aggregations AS (SELECT * FROM %(aggregations_table)s a, topologies t
-                              WHERE a.topo_object_id = t.id),
-        -- Concerned paths along with (start, end)
-             paths_aggr AS (SELECT a.start_position AS start, a.end_position AS end, p.id, a.order AS order
-                            FROM %(paths_table)s p, aggregations a
-                            WHERE a.path_id = p.id
-                            ORDER BY a.order)
-        -- Retrieve primary keys
-        SELECT t.id
-        FROM %(topology_table)s t, %(aggregations_table)s a, paths_aggr pa
-        WHERE a.path_id = pa.id AND a.topo_object_id = t.id
-          AND least(a.start_position, a.end_position) <= greatest(pa.start, pa.end)
-          AND greatest(a.start_position, a.end_position) >= least(pa.start, pa.end)
-          AND %(extra_condition)s
-        ORDER BY (pa.order + CASE WHEN pa.start > pa.end THEN (1 - a.start_position) ELSE a.start_position END);
-        """ % {
-            'topology_table': Topology._meta.db_table,
-            'aggregations_table': PathAggregation._meta.db_table,
-            'paths_table': Path._meta.db_table,
-            'topology_list': ','.join(topology_pks),
-            'extra_condition': 'true' if is_generic else "kind = '%s'" % all_objects.model.KIND
-        }
+        result = cls.overlapping_positions(topology_pks, None if is_generic else all_objects.model.KIND)
+        pk_list = [row[0] for row in result]
+        return cls.ordered_by_pks(all_objects, pk_list)
 
-        cursor = connection.cursor()
-        cursor.execute(sql)
-        result = cursor.fetchall()
-        pk_list = uniquify([row[0] for row in result])
+    @classmethod
+    def overlapping_by_topology(cls, topologies, all_objects=None):
+        """ Return objects overlapping each of specified topologies, computed with one query,
+            as a dict {topology pk: [objects ordered along topology]}.
+        """
+        if all_objects is None:
+            all_objects = cls.objects.existing()
+        is_generic = all_objects.model.KIND == Topology.KIND
+        topology_pks = [topology.pk for topology in topologies]
+        result = cls.overlapping_positions(topology_pks, None if is_generic else all_objects.model.KIND,
+                                           by_topology=True) if topology_pks else []
+        objects = all_objects.in_bulk({row[1] for row in result})
+        overlapping = {pk: [] for pk in topology_pks}
+        for topology_pk, pk, position in result:
+            if pk in objects:
+                overlapping[topology_pk].append(objects[pk])
+        return overlapping
 
-        # Return a QuerySet and preserve pk list order
-        # http://stackoverflow.com/a/1310188/141895
-        ordering = 'CASE %s END' % ' '.join(['WHEN %s.id=%s THEN %s' % (Topology._meta.db_table, id_, i)
-                                             for i, id_ in enumerate(pk_list)])
-        queryset = all_objects.filter(pk__in=pk_list).extra(
-            select={'ordering': ordering}, order_by=('ordering',))
-        return queryset
+    @classmethod
+    def prefetch_overlapping(cls, topologies):
+        """ Compute objects overlapping each of specified topologies with one query, and keep
+            them so that ``overlapping(topology)`` returns them without query (prefetch-style).
+        """
+        topologies = list(topologies)
+        all_objects = cls.objects.existing()
+        overlapping = cls.overlapping_by_topology(topologies, all_objects)
+        for topology in topologies:
+            objects = overlapping[topology.pk]
+            queryset = cls.ordered_by_pks(all_objects, [obj.pk for obj in objects])
+            queryset._result_cache = objects
+            queryset._prefetch_done = True
+            if not hasattr(topology, '_prefetched_overlapping'):
+                topology._prefetched_overlapping = {}
+            topology._prefetched_overlapping[all_objects.model] = queryset
+        return topologies
 
     def mutate(self, other):
         """
@@ -509,19 +595,39 @@ class Topology(ZoningPropertiesMixin, AddPropertyMixin, AltimetryMixin,
         # In this case, the trigger will create them, so ignore them here.
         if other.ispoint():
             aggrs = aggrs[:1]
-        PathAggregation.objects.bulk_create([
-            PathAggregation(
-                path=aggr.path,
-                topo_object=self,
-                start_position=aggr.start_position,
-                end_position=aggr.end_position,
-                order=aggr.order
-            )
-            for aggr in aggrs
-        ])
+        # Junction points triggers may add aggregations, compute geometry once
+        with deferred_topologies_geometry():
+            PathAggregation.objects.bulk_create([
+                PathAggregation(
+                    path=aggr.path,
+                    topo_object=self,
+                    start_position=aggr.start_position,
+                    end_position=aggr.end_position,
+                    order=aggr.order
+                )
+                for aggr in aggrs
+            ])
         self.reload()
         return self
 
+    @classmethod
+    def update_deferred_geometries(cls, batch_size=None, skip_locked=False):
+        """
+        Compute geometry of topologies flagged by triggers (see ``deferred_topologies_geometry()``),
+        by batches of ``batch_size`` topologies, each one in its own transaction, or all at once.
+        With ``skip_locked`` (workers), topologies locked by another transaction are left to it,
+        and batches are computed until no other flagged topology remains.
+        Return the number of updated topologies.
+        """
+        total = 0
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("SELECT update_geometry_of_topologies(%s, %s)", [batch_size, skip_locked])
+                count = cursor.fetchone()[0]
+            total += count
+            if batch_size is None or count == 0 or (not skip_locked and count < batch_size):
+                return total
+
     def reload(self):
         """
         Reload into instance all computed attributes in triggers.
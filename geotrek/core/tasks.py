@@ -0,0 +1,12 @@
+from celery import shared_task
+from django.conf import settings
+
+from geotrek.core.models import Topology
+
+
+@shared_task(name='geotrek.core.update-topologies-geometry')
+def update_topologies_geometry(batch_size=None):
+    """
+    celery shared task - compute geometry of topologies flagged for update
+    """
+    return Topology.update_deferred_geometries(batch_size or settings.TOPOLOGY_GEOMETRY_UPDATE_BATCH_SIZE, skip_locked=True)
@@ -66,16 +66,54 @@ AFTER INSERT OR UPDATE OR DELETE ON core_pathaggregation
 FOR EACH ROW EXECUTE PROCEDURE ft_topologies_paths_geometry();
 
 
+-------------------------------------------------------------------------------
+-- Queue of topologies whose geometry needs update
+-------------------------------------------------------------------------------
+
+-- When geotrek.defer_topologies_geometry is set to 'on' in a transaction,
+-- topologies are only flagged with geom_need_update, and their geometry is
+-- computed later by update_geometry_of_topologies().
+CREATE FUNCTION {{ schema_geotrek }}.ft_topologies_geometry_deferred() RETURNS boolean AS $$
+BEGIN
+    RETURN COALESCE(current_setting('geotrek.defer_topologies_geometry', true), '') = 'on';
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Update geometry of at most max_count flagged topologies (all if NULL).
+-- Return the number of updated topologies. Workers computing deferred
+-- geometries use skip_locked, to skip topologies being updated by another
+-- transaction, which will compute them (or queue them again) itself.
+CREATE FUNCTION {{ schema_geotrek }}.update_geometry_of_topologies(max_count integer, skip_locked boolean) RETURNS integer AS $$
+DECLARE
+    topology_id integer;
+    t_count integer := 0;
+BEGIN
+    IF skip_locked THEN
+        FOR topology_id IN SELECT id FROM core_topology WHERE geom_need_update = TRUE
+                           ORDER BY id LIMIT max_count FOR UPDATE SKIP LOCKED LOOP
+            PERFORM update_geometry_of_topology(topology_id);
+            t_count := t_count + 1;
+        END LOOP;
+    ELSE
+        FOR topology_id IN SELECT id FROM core_topology WHERE geom_need_update = TRUE
+                           ORDER BY id LIMIT max_count FOR UPDATE LOOP
+            PERFORM update_geometry_of_topology(topology_id);
+            t_count := t_count + 1;
+        END LOOP;
+    END IF;
+    RETURN t_count;
+END;
+$$ LANGUAGE plpgsql;
+
+
 DROP TRIGGER IF EXISTS core_pathaggregation_geometry_statement_tgr ON core_pathaggregation;
 DROP FUNCTION IF EXISTS ft_topologies_paths_geometry_statement() CASCADE;
 
 CREATE FUNCTION {{ schema_geotrek }}.ft_topologies_paths_geometry_statement() RETURNS trigger SECURITY DEFINER AS $$
-DECLARE
-    rec record;
 BEGIN
-    FOR rec IN SELECT * FROM core_topology WHERE geom_need_update = TRUE LOOP
-        PERFORM update_geometry_of_topology(rec.id);
-    END LOOP;
+    IF NOT ft_topologies_geometry_deferred() THEN
+        PERFORM update_geometry_of_topologies(NULL, FALSE);
+    END IF;
 
     RETURN NULL;
 END;
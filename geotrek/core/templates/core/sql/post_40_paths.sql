@@ -51,7 +51,11 @@ BEGIN
                GROUP BY e.id, e."offset"
                HAVING BOOL_OR(et.start_position != et.end_position) OR e."offset" = 0.0
     LOOP
-        PERFORM update_geometry_of_topology(eid);
+        IF ft_topologies_geometry_deferred() THEN
+            UPDATE core_topology SET geom_need_update = TRUE WHERE id = eid;
+        ELSE
+            PERFORM update_geometry_of_topology(eid);
+        END IF;
     END LOOP;
 
     -- Special case of point geometries with offset != 0
@@ -30,6 +30,10 @@ DROP FUNCTION IF EXISTS ft_path_interpolate(integer, geometry) CASCADE;
 DROP FUNCTION IF EXISTS ft_evenements_troncons_geometry() CASCADE;
 DROP FUNCTION IF EXISTS ft_topologies_paths_geometry() CASCADE;
 
+DROP FUNCTION IF EXISTS ft_topologies_geometry_deferred() CASCADE;
+DROP FUNCTION IF EXISTS update_geometry_of_topologies(integer) CASCADE;
+DROP FUNCTION IF EXISTS update_geometry_of_topologies(integer, boolean) CASCADE;
+
 DROP FUNCTION IF EXISTS ft_evenements_troncons_junction_point_iu() CASCADE;
 DROP FUNCTION IF EXISTS ft_topologies_paths_junction_point_iu() CASCADE;
 
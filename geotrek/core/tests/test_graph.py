@@ -1,3 +1,4 @@
+import json
 from unittest import skipIf
 
 from django.conf import settings
@@ -6,8 +7,8 @@ from django.test import TestCase
 from django.urls import reverse
 from mapentity.tests.factories import UserFactory
 
-from geotrek.core.graph import graph_edges_nodes_of_qs
-from geotrek.core.models import Path
+from geotrek.core.graph import PathGraph, get_path_graph, graph_edges_nodes_of_qs
+from geotrek.core.models import Path, Topology
 from geotrek.core.tests.factories import PathFactory
 
 
@@ -96,3 +97,164 @@ class SimpleGraph(TestCase):
         PathFactory(geom=LineString((0, 0), (1, 1)))
         response = self.client.get(self.url)
         self.assertNotEqual(response['Cache-Control'], None)
+
+
+class PathGraphRouteTest(TestCase):
+    def setUp(self):
+        #   1     2     3
+        # A --- B --- C --- D
+        #        \         /
+        #         ---- 4 --
+        self.graph = PathGraph()
+        self.graph.add_edge(1, 0, 1, 100)
+        self.graph.add_edge(2, 1, 2, 100)
+        self.graph.add_edge(3, 2, 3, 100)
+        self.graph.add_edge(4, 3, 1, 500)
+
+    def test_route_same_path(self):
+        serialized, length = self.graph.route([(1, 0.2), (1, 0.8)])
+        self.assertEqual(serialized, [{'offset': 0, 'paths': [1], 'positions': {'0': [0.2, 0.8]}}])
+        self.assertAlmostEqual(length, 60)
+
+    def test_route_through_paths(self):
+        serialized, length = self.graph.route([(1, 0.5), (3, 0.5)])
+        self.assertEqual(serialized, [{'offset': 0, 'paths': [1, 2, 3],
+                                       'positions': {'0': [0.5, 1.0], '1': [0.0, 1.0], '2': [0.0, 0.5]}}])
+        self.assertAlmostEqual(length, 200)
+
+    def test_route_backwards(self):
+        serialized, length = self.graph.route([(3, 0.5), (1, 0.5)])
+        self.assertEqual(serialized, [{'offset': 0, 'paths': [3, 2, 1],
+                                       'positions': {'0': [0.5, 0.0], '1': [1.0, 0.0], '2': [1.0, 0.5]}}])
+        self.assertAlmostEqual(length, 200)
+
+    def test_route_with_via_step(self):
+        serialized, length = self.graph.route([(1, 0.0), (4, 0.5), (3, 1.0)])
+        self.assertEqual(serialized, [
+            {'offset': 0, 'paths': [1, 4], 'positions': {'0': [0.0, 1.0], '1': [1.0, 0.5]}},
+            {'offset': 0, 'paths': [4], 'positions': {'0': [0.5, 0.0]}},
+        ])
+        self.assertAlmostEqual(length, 600)
+
+    def test_route_not_connected(self):
+        self.graph.add_edge(5, 10, 11, 100)
+        with self.assertRaisesRegex(ValueError, 'No path found'):
+            self.graph.route([(1, 0.5), (5, 0.5)])
+
+    def test_route_unknown_path(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown path'):
+            self.graph.route([(1, 0.5), (42, 0.5)])
+
+
+class PathGraphUpdateTest(TestCase):
+    def setUp(self):
+        self.graph = PathGraph.from_rows([
+            (1, 0., 0., 1., 0., 1.),
+            (2, 1., 0., 2., 0., 1.),
+        ])
+
+    def test_nodes_are_shared(self):
+        self.assertEqual(self.graph.node_count, 3)
+        self.assertEqual(self.graph.edge(1), (0, 1, 1.))
+        self.assertEqual(self.graph.edge(2), (1, 2, 1.))
+
+    def test_csr(self):
+        offsets, nodes, edges, lengths = self.graph.csr
+        self.assertEqual(offsets.tolist(), [0, 1, 3, 4])
+        self.assertEqual(sorted(nodes[offsets[1]:offsets[2]].tolist()), [0, 2])
+
+    def test_update_edge(self):
+        self.graph.update_edge(2, 1., 0., 3., 0., 2.)
+        self.assertEqual(self.graph.edge(2), (1, 3, 2.))
+        self.assertEqual(len(self.graph), 2)
+        offsets, nodes, edges, lengths = self.graph.csr
+        self.assertEqual(offsets.tolist(), [0, 1, 3, 3, 4])
+
+    def test_remove_and_insert_edge(self):
+        self.graph.remove_edge(1)
+        self.assertNotIn(1, self.graph)
+        self.assertDictEqual(self.graph.as_dict(), {
+            'nodes': {1: {2: 2}, 2: {1: 2}},
+            'edges': {2: {'id': 2, 'length': 1., 'nodes_id': [1, 2]}},
+        })
+        self.graph.update_edge(3, 2., 0., 0., 0., 2.)
+        # Slot of removed edge is reused
+        self.assertEqual(len(self.graph.edge_pks), 2)
+        serialized, length = self.graph.route([(2, 0.), (3, 1.)])
+        self.assertEqual(serialized[0]['paths'], [2, 3])
+        self.assertAlmostEqual(length, 3.)
+
+    def test_copy_is_independent(self):
+        self.graph.csr
+        graph = self.graph.copy()
+        graph.update_edge(3, 2., 0., 3., 0., 1.)
+        graph.remove_edge(1)
+        self.assertEqual(set(self.graph.edge_index), {1, 2})
+        self.assertEqual(self.graph.node_count, 3)
+        self.assertEqual(self.graph.csr[0].tolist(), [0, 1, 3, 4])
+        self.assertEqual(set(graph.edge_index), {2, 3})
+        serialized, length = graph.route([(2, 0.), (3, 1.)])
+        self.assertEqual(serialized[0]['paths'], [2, 3])
+
+
+@skipIf(not settings.TREKKING_TOPOLOGY_ENABLED, 'Test with dynamic segmentation only')
+class PathGraphRefreshTest(TestCase):
+    def test_refresh(self):
+        path_1 = PathFactory(geom=LineString((0, 0), (10, 0)))
+        path_2 = PathFactory(geom=LineString((10, 0), (20, 0)))
+        qs = Path.objects.exclude(draft=True)
+        graph = PathGraph.from_queryset(qs, latest=Path.no_draft_latest_updated())
+        self.assertEqual(len(graph), 2)
+
+        path_3 = PathFactory(geom=LineString((20, 0), (30, 0)))
+        path_2.draft = True
+        path_2.save()
+        path_1.delete()
+        graph.refresh(qs, Path.no_draft_latest_updated())
+        self.assertEqual(set(graph.edge_index), {path_3.pk})
+        self.assertEqual(graph.latest, Path.no_draft_latest_updated())
+
+    def test_cached_graph_is_replaced(self):
+        path_1 = PathFactory(geom=LineString((0, 0), (10, 0)))
+        graph = get_path_graph()
+        self.assertIn(path_1.pk, graph)
+        path_2 = PathFactory(geom=LineString((10, 0), (20, 0)))
+        new_graph = get_path_graph()
+        self.assertIsNot(new_graph, graph)
+        self.assertIn(path_2.pk, new_graph)
+        # Graph used by running requests is left untouched
+        self.assertNotIn(path_2.pk, graph)
+
+
+@skipIf(not settings.TREKKING_TOPOLOGY_ENABLED, 'Test with dynamic segmentation only')
+class RouteViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.url = reverse('core:path-drf-route')
+        cls.path_1 = PathFactory(geom=LineString((0, 0), (10, 0)))
+        cls.path_2 = PathFactory(geom=LineString((10, 0), (20, 0)))
+
+    def setUp(self):
+        self.client.force_login(user=self.user)
+
+    def test_route(self):
+        steps = [{'path': self.path_1.pk, 'position': 0.5}, {'path': self.path_2.pk, 'position': 0.5}]
+        response = self.client.get(self.url, {'steps': json.dumps(steps)})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['serialized'], [{'offset': 0, 'paths': [self.path_1.pk, self.path_2.pk],
+                                               'positions': {'0': [0.5, 1.0], '1': [0.0, 0.5]}}])
+        self.assertAlmostEqual(data['length'], 10)
+        topology = Topology.deserialize(data['serialized'])
+        self.assertEqual([aggr.path for aggr in topology.aggregations.all()], [self.path_1, self.path_2])
+
+    def test_route_ignores_draft_paths(self):
+        draft = PathFactory(geom=LineString((20, 0), (30, 0)), draft=True)
+        steps = [{'path': self.path_1.pk, 'position': 0.5}, {'path': draft.pk, 'position': 0.5}]
+        response = self.client.get(self.url, {'steps': json.dumps(steps)})
+        self.assertEqual(response.status_code, 400)
+
+    def test_route_invalid_steps(self):
+        response = self.client.get(self.url, {'steps': 'foo'})
+        self.assertEqual(response.status_code, 400)
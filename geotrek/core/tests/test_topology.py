@@ -1,8 +1,10 @@
 import json
 import math
-from unittest import skipIf
+from io import StringIO
+from unittest import mock, skipIf
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.conf import settings
 from django.db import connections, DEFAULT_DB_ALIAS
 from django.contrib.gis.geos import Point, LineString
@@ -11,7 +13,7 @@ from geotrek.common.tests.mixins import dictfetchall
 from geotrek.common.utils import dbnow
 from geotrek.core.tests.factories import (PathFactory, PathAggregationFactory,
                                           TopologyFactory)
-from geotrek.core.models import Path, Topology, PathAggregation
+from geotrek.core.models import Path, Topology, PathAggregation, deferred_topologies_geometry
 
 
 @skipIf(not settings.TREKKING_TOPOLOGY_ENABLED, 'Test with dynamic segmentation only')
@@ -257,6 +259,55 @@ class TopologyMutateTest(TestCase):
         self.assertEqual(len(topology2.paths.all()), 3)
 
 
+@skipIf(not settings.TREKKING_TOPOLOGY_ENABLED, 'Test with dynamic segmentation only')
+class TopologyDeferredGeometryTest(TestCase):
+    def setUp(self):
+        self.path = PathFactory.create(geom=LineString((0, 0), (10, 0)))
+        self.topology = TopologyFactory.create(paths=[(self.path, 0, 1)])
+
+    def move_path(self):
+        self.path.geom = LineString((0, 0), (20, 0))
+        self.path.save()
+
+    def test_geometry_computed_at_end_of_block(self):
+        with deferred_topologies_geometry():
+            PathAggregation.objects.filter(topo_object=self.topology).update(end_position=0.5)
+            topology = Topology.objects.get(pk=self.topology.pk)
+            self.assertTrue(topology.geom_need_update)
+            self.assertEqual(topology.geom.length, 10)
+        topology = Topology.objects.get(pk=self.topology.pk)
+        self.assertFalse(topology.geom_need_update)
+        self.assertEqual(topology.geom.length, 5)
+
+    def test_path_save_updates_topologies(self):
+        self.move_path()
+        self.topology.reload()
+        self.assertEqual(self.topology.geom.length, 20)
+
+    @override_settings(TOPOLOGY_GEOMETRY_UPDATE_ASYNC=True)
+    def test_path_save_queues_topologies(self):
+        with mock.patch('geotrek.core.tasks.update_topologies_geometry.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.move_path()
+        delay.assert_called_once_with()
+        topology = Topology.objects.get(pk=self.topology.pk)
+        self.assertTrue(topology.geom_need_update)
+        self.assertEqual(topology.geom.length, 10)
+        self.assertEqual(Topology.update_deferred_geometries(batch_size=1), 1)
+        topology.reload()
+        self.assertEqual(topology.geom.length, 20)
+
+    @override_settings(TOPOLOGY_GEOMETRY_UPDATE_ASYNC=True)
+    def test_command_updates_topologies(self):
+        TopologyFactory.create(paths=[(self.path, 0, 0.5)])
+        self.move_path()
+        self.assertEqual(Topology.objects.filter(geom_need_update=True).count(), 2)
+        output = StringIO()
+        call_command('update_topologies_geometry', batch_size=1, stdout=output)
+        self.assertIn('2 topologies updated', output.getvalue())
+        self.assertFalse(Topology.objects.filter(geom_need_update=True).exists())
+
+
 @skipIf(not settings.TREKKING_TOPOLOGY_ENABLED, 'Test with dynamic segmentation only')
 class TopologyPointTest(TestCase):
 
@@ -904,3 +955,19 @@ class TopologyOverlappingTest(TestCase):
         from geotrek.trekking.models import Trek
         overlaps = Topology.overlapping(Trek.objects.all())
         self.assertEqual(list(overlaps), [])
+
+    def test_overlapping_by_topology_sorts_by_order_of_progression(self):
+        with self.assertNumQueries(2):
+            overlaps = Topology.overlapping_by_topology([self.topo1, self.topo2, self.point1])
+        self.assertEqual(overlaps[self.topo1.pk], [self.topo1, self.point2, self.point3, self.point1, self.topo2])
+        self.assertEqual(overlaps[self.topo2.pk], [self.topo2, self.point1, self.point3, self.point2, self.topo1])
+        self.assertIn(self.point1, overlaps[self.point1.pk])
+
+    def test_prefetch_overlapping(self):
+        topologies = Topology.prefetch_overlapping(Topology.objects.filter(pk__in=[self.topo1.pk, self.topo2.pk]))
+        with self.assertNumQueries(0):
+            overlaps = [list(Topology.overlapping(topology)) for topology in topologies]
+        self.assertIn([self.topo1, self.point2, self.point3, self.point1, self.topo2], overlaps)
+        # Prefetched objects can still be filtered
+        overlaps = Topology.overlapping(topologies[0]).filter(pk__in=[self.point1.pk, self.point2.pk])
+        self.assertEqual(len(overlaps), 2)
@@ -559,6 +559,35 @@ class PathViewsTest(CommonTest):
         response = self.client.get(obj.get_layer_url(), {"_no_draft": "true"})
         self.assertEqual(len(response.json()['features']), 2)
 
+    def test_path_layer_properties(self):
+        obj = self.modelfactory(name="")
+        response = self.client.get(obj.get_layer_url())
+        feature = response.json()['features'][0]
+        self.assertEqual(feature['type'], 'Feature')
+        self.assertEqual(feature['geometry']['type'], 'LineString')
+        self.assertEqual(feature['properties'], {'id': obj.pk, 'name': 'path %s' % obj.pk, 'draft': False})
+
+    def test_path_layer_not_modified(self):
+        obj = self.modelfactory()
+        response = self.client.get(obj.get_layer_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        response = self.client.get(obj.get_layer_url(), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_filtered_path_layer_not_cached(self):
+        obj = self.modelfactory(name="Foo")
+        self.modelfactory(name="Bar")
+        response = self.client.get(obj.get_layer_url())
+        self.assertEqual(len(response.json()['features']), 2)
+        response = self.client.get(obj.get_layer_url(), {"name": "Foo"})
+        self.assertEqual(len(response.json()['features']), 1)
+        self.assertEqual(response.json()['features'][0]['properties']['id'], obj.pk)
+        # Cached unfiltered layer is still complete
+        response = self.client.get(obj.get_layer_url())
+        self.assertEqual(len(response.json()['features']), 2)
+
     def test_draft_path_layer_cache(self):
         """
 
@@ -798,7 +827,7 @@ class TrailViewsTest(CommonTest):
     def test_perfs_export_csv(self):
         self.modelfactory.create()
         with self.assertNumQueries(11):
-            self.client.get(self.model.get_format_list_url() + '?format=csv')
+            self.client.get(self.model.get_format_list_url() + '?format=csv').getvalue()
 
 
 @skipIf(not settings.TREKKING_TOPOLOGY_ENABLED, 'Test with dynamic segmentation only')
@@ -1,3 +1,4 @@
+import json
 import logging
 from collections import defaultdict
 
@@ -5,7 +6,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import permission_required
 from django.contrib.gis.db.models.functions import Transform
-from django.core.cache import caches
+from django.contrib.gis.geos import Point
 from django.db.models import Sum, Prefetch
 from django.http import HttpResponseRedirect
 from django.http.response import HttpResponse
@@ -26,7 +27,7 @@ from rest_framework.response import Response
 
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.functions import Length
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.mixins.forms import FormsetMixin
 from geotrek.common.permissions import PublicOrReadPermMixin
 from geotrek.common.viewsets import GeotrekMapentityViewSet
@@ -67,7 +68,7 @@ class PathList(CustomColumnsMixin, MapEntityList):
     searchable_columns = ['id', 'name']
 
 
-class PathFormatList(MapEntityFormat, PathList):
+class PathFormatList(StreamingFormatMixin, MapEntityFormat, PathList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'valid', 'visible', 'name', 'comments', 'departure', 'arrival',
@@ -75,11 +76,6 @@ class PathFormatList(MapEntityFormat, PathList):
         'date_insert', 'date_update', 'length_2d', 'uuid',
     ] + AltimetryMixin.COLUMNS
 
-    def get_queryset(self):
-        return super().get_queryset() \
-            .select_related('structure', 'comfort', 'source', 'stake') \
-            .prefetch_related('usages', 'networks')
-
 
 class PathDetail(MapEntityDetail):
     model = Path
@@ -116,7 +112,7 @@ class PathDocument(MapEntityDocument):
 
     def get_context_data(self, *args, **kwargs):
         language = self.request.LANGUAGE_CODE
-        self.get_object().prepare_elevation_chart(language, self.request.build_absolute_uri('/'))
+        self.get_object().prepare_elevation_chart(language)
         return super().get_context_data(*args, **kwargs)
 
 
@@ -233,6 +229,7 @@ class PathViewSet(GeotrekMapentityViewSet):
     geojson_serializer_class = PathGeojsonSerializer
     filterset_class = PathFilterSet
     mapentity_list_class = PathList
+    geojson_layer_properties = ('id', 'name', 'draft')
 
     def view_cache_key(self):
         """Used by the ``view_cache_response_content`` decorator."""
@@ -264,8 +261,6 @@ class PathViewSet(GeotrekMapentityViewSet):
                 select={'name': "CASE WHEN name IS NULL OR name = '' THEN CONCAT(%s || ' ' || id) ELSE name END"},
                 select_params=(_("path"),)
             )
-
-            qs = qs.annotate(api_geom=Transform('geom', settings.API_SRID))
             qs = qs.only("id", "name", "draft")
 
         else:
@@ -282,23 +277,35 @@ class PathViewSet(GeotrekMapentityViewSet):
     @action(methods=['GET'], detail=False, url_path='graph.json', renderer_classes=[JSONRenderer, BrowsableAPIRenderer])
     def graph(self, request, *args, **kwargs):
         """ Return a graph of the path. """
-        cache = caches['fat']
-        key = 'path_graph_json'
-
-        result = cache.get(key)
-        latest = Path.no_draft_latest_updated()
-
-        if result and latest:
-            cache_latest, graph = result
-            # Not empty and still valid
-            if cache_latest and cache_latest >= latest:
-                return Response(graph)
-
-        # cache does not exist or is not up-to-date, rebuild the graph and cache it
-        graph = graph_lib.graph_edges_nodes_of_qs(Path.objects.exclude(draft=True))
-
-        cache.set(key, (latest, graph))
-        return Response(graph)
+        return Response(graph_lib.get_path_graph().as_dict())
+
+    @action(methods=['GET'], detail=False, url_path='route', renderer_classes=[JSONRenderer, BrowsableAPIRenderer])
+    def route(self, request, *args, **kwargs):
+        """
+        Return the shortest way through the given steps, serialized as a topology.
+
+        ``steps`` is a JSON list of points, each one given either on a path
+        (``{"path": 12, "position": 0.3}``) or by its coordinates in API_SRID
+        (``{"lng": 3.4, "lat": 44.2}``). The first and last ones are the start
+        and end points, the others are via markers.
+        """
+        try:
+            steps = json.loads(request.GET.get('steps', ''))
+            if not isinstance(steps, list):
+                raise ValueError(_("Steps should be a list"))
+            route_steps = []
+            for step in steps:
+                if 'path' in step:
+                    route_steps.append((int(step['path']), float(step['position'])))
+                else:
+                    point = Point(float(step['lng']), float(step['lat']), srid=settings.API_SRID)
+                    closest = Path.closest(point)
+                    position, offset = closest.interpolate(point)
+                    route_steps.append((closest.pk, position))
+            serialized, length = graph_lib.get_path_graph().route(route_steps)
+        except (ValueError, TypeError, KeyError, IndexError) as exc:
+            return Response({'error': '%s' % exc}, status=400)
+        return Response({'serialized': serialized, 'length': length})
 
     @method_decorator(permission_required('core.change_path'))
     @action(methods=['POST'], detail=False, renderer_classes=[JSONRenderer])
@@ -349,7 +356,7 @@ class TrailList(CustomColumnsMixin, MapEntityList):
     searchable_columns = ['id', 'name', 'departure', 'arrival', ]
 
 
-class TrailFormatList(MapEntityFormat, TrailList):
+class TrailFormatList(StreamingFormatMixin, MapEntityFormat, TrailList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'name', 'comments',
@@ -29,8 +29,10 @@ class SyncRando:
         if self.global_sync.portal:
             dives = dives.filter(Q(portal__name=self.global_sync.portal) | Q(portal=None))
 
-        for dive in dives:
-            self.sync_detail(lang, dive)
+        self.global_sync.sync_objects(lang, self.sync_detail, dives, signature=self.signature)
+
+    def signature(self, dive):
+        return self.global_sync.related_signature(dive.pois, dive.services, dive.attachments.all())
 
     def sync_pois(self, lang, dive):
         params = {'format': 'geojson'}
@@ -11,7 +11,7 @@ from rest_framework import permissions as rest_permissions, viewsets
 
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.mixins.api import APIViewSet
-from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, MetaMixin
+from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, MetaMixin, StreamingFormatMixin
 from geotrek.common.models import RecordSource, TargetPortal
 from geotrek.common.views import DocumentPublic, DocumentBookletPublic, MarkupPublic
 from geotrek.common.viewsets import GeotrekMapentityViewSet
@@ -33,7 +33,7 @@ class DiveList(CustomColumnsMixin, FlattenPicturesMixin, MapEntityList):
     searchable_columns = ['id', 'name']
 
 
-class DiveFormatList(MapEntityFormat, DiveList):
+class DiveFormatList(StreamingFormatMixin, MapEntityFormat, DiveList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'eid', 'structure', 'name', 'departure',
@@ -2,8 +2,11 @@ import logging
 import os
 import traceback
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
+from uuid import UUID
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -25,6 +28,8 @@ logger = logging.getLogger(__name__)
 
 
 class SuricateParser(SuricateGestionRequestManager):
+    # Number of reports saved at once by get_alerts()
+    batch_size = 500
 
     def __init__(self):
         super().__init__()
@@ -72,10 +77,30 @@ class SuricateParser(SuricateGestionRequestManager):
         for manager in WorkflowManager.objects.all():
             manager.notify_new_reports(reports)
 
+    def preload_references(self):
+        """Fetch statuses, activities, magnitudes and categories once for all reports"""
+        self.statuses = {status.identifier: status for status in ReportStatus.objects.all()}
+        self.activities = {activity.identifier: activity for activity in ReportActivity.objects.all()}
+        self.magnitudes = {magnitude.suricate_label: magnitude for magnitude in ReportProblemMagnitude.objects.all()}
+        self.categories = {category.label: category for category in ReportCategory.objects.all()}
+        self.workflow_manager = WorkflowManager.objects.first()
+
+    def get_magnitude(self, label):
+        if label not in self.magnitudes:
+            self.magnitudes[label] = ReportProblemMagnitude.objects.create(suricate_label=label)
+            logger.info(f"Created new feedback magnitude - label: {label}")
+        return self.magnitudes[label]
+
+    def get_category(self, label):
+        if label not in self.categories:
+            self.categories[label] = ReportCategory.objects.create(label=label)
+            logger.info(f"Created new feedback category - label: {label}")
+        return self.categories[label]
+
     def parse_report(self, report):
         """
         Parse a JSON report from Suricate API
-        :return: returns True if and only if this report is imported (it is in bbox) and is new
+        :return: returns report fields if and only if this report is imported (it is in bbox)
         """
         # Parse geom
         rep_gps = Point(report["gpslongitude"], report["gpslatitude"], srid=4326)
@@ -83,7 +108,7 @@ class SuricateParser(SuricateGestionRequestManager):
         rep_point = Point(rep_srid.coords)
 
         # Parse status
-        rep_status = ReportStatus.objects.get(identifier=report["statut"])
+        rep_status = self.statuses[report["statut"]]
 
         # Keep or discard
         should_import = rep_point.within(self.bbox) and rep_status.identifier != 'created'
@@ -93,80 +118,79 @@ class SuricateParser(SuricateGestionRequestManager):
             should_update_status = rep_status.identifier != 'waiting' or report["uid"] not in self.existing_uuids  # Do not override internal statuses with Waiting status
 
         if should_import:
-            # Parse dates
-            rep_updated = self.parse_date(report["updated"])
-            rep_creation = self.parse_date(report["datedepot"])
-
-            # Parse magnitude
-            rep_magnitude, created = ReportProblemMagnitude.objects.get_or_create(
-                suricate_label=report["ampleur"]
-            )
-            if created:
-                logger.info(
-                    f"Created new feedback magnitude - label: {report['ampleur']}"
-                )
-
-            # Parse category
-            rep_category, created = ReportCategory.objects.get_or_create(
-                label=report["type"]
-            )
-            if created:
-                logger.info(f"Created new feedback category - label: {report['type']}")
-
-            # Parse activity
-            rep_activity = ReportActivity.objects.get(identifier=report["idactivite"])
-
-            # Create report object
             fields = {
                 "locked": bool(report["locked"]),
                 "email": report["emaildeposant"],
                 "comment": report["commentaire"],
                 "geom": rep_point,
                 "origin": report["origin"],
-                "activity": rep_activity,
-                "category": rep_category,
-                "problem_magnitude": rep_magnitude,
-                "created_in_suricate": rep_creation,
-                "last_updated_in_suricate": rep_updated,
+                "activity": self.activities[report["idactivite"]],
+                "category": self.get_category(report["type"]),
+                "problem_magnitude": self.get_magnitude(report["ampleur"]),
+                "created_in_suricate": self.parse_date(report["datedepot"]),
+                "last_updated_in_suricate": self.parse_date(report["updated"]),
                 "eid": str(report["shortkeylink"])
             }
-
             if should_update_status:
                 fields["status"] = rep_status
+            return fields
 
-            report_obj, created = Report.objects.update_or_create(
-                external_uuid=report["uid"], defaults=fields
-            )
-
-            if created:
-                logger.info(
-                    f"New report - id: {report['uid']}, location: {report_obj.geom}"
-                )
+    def save_reports(self, reports):
+        """
+        Create or update a list of JSON reports from Suricate API with bulk queries, keyed on
+        their external UUID, then their messages and documents.
+        Bulk queries do not call Report.save(), so new reports are assigned to workflow
+        manager here, as in workflow mode.
+        :return: returns primary keys of created reports
+        """
+        parsed = []
+        for report in reports:
+            fields = self.parse_report(report)
+            if fields is not None:
+                parsed.append((report, UUID(report["uid"]), fields))
+        existing = Report.objects.in_bulk([uuid for report, uuid, fields in parsed], field_name='external_uuid')
+        created, updated, update_fields = {}, {}, set()
+        imported = []
+        for report, uuid, fields in parsed:
+            report_obj = created.get(uuid) or existing.get(uuid)
+            if report_obj is None:
+                report_obj = created[uuid] = Report(external_uuid=uuid, **fields)
+                if report_obj.status.identifier in ['filed'] and not settings.SURICATE_WORKFLOW_SETTINGS.get("SKIP_MANAGER_MODERATION"):
+                    report_obj.assigned_user = self.workflow_manager.user
             else:
-                self.to_delete.discard(report_obj.pk)
-
-            # Parse documents attached to report
-            self.create_documents(report["documents"], report_obj)
-
-            # Parse messages attached to report
-            self.create_messages(report["messages"], report_obj)
-
-            return report_obj.pk if created else 0
+                for name, value in fields.items():
+                    setattr(report_obj, name, value)
+                if report_obj.pk:
+                    updated[uuid] = report_obj
+                    update_fields.update(fields)
+            imported.append((report, report_obj))
+            self.imported_uuids.add(uuid)
+        if created:
+            Report.objects.bulk_create(created.values())
+            for report_obj in created.values():
+                logger.info(f"New report - id: {report_obj.formatted_external_uuid}, location: {report_obj.geom}")
+        if updated:
+            # bulk_update() does not set fields updated automatically
+            date_update = Report._meta.get_field('date_update')
+            for report_obj in updated.values():
+                date_update.pre_save(report_obj, False)
+            Report.objects.bulk_update(updated.values(), update_fields | {'date_update'})
+
+        self.create_messages(imported)
+        self.create_documents(imported)
+        return [report_obj.pk for report_obj in created.values()]
 
     def before_get_alerts(self, verbosity=1):
-        pk_and_uuid = Report.objects.values_list('pk', 'external_uuid')
-        if pk_and_uuid:
-            pks, uuids = zip(*pk_and_uuid)
-            self.existing_uuids = list(map(lambda x: "".join(str(x).upper().rsplit("-", 1)), uuids))  # Format UUIDs as they are found in Suricate
-            self.to_delete = set(pks)
-        else:
-            self.existing_uuids = []
-            self.to_delete = set()
+        uuids = Report.objects.exclude(external_uuid=None).values_list('external_uuid', flat=True)
+        self.existing_uuids = set(map(lambda x: "".join(str(x).upper().rsplit("-", 1)), uuids))  # Format UUIDs as they are found in Suricate
+        self.imported_uuids = set()
+        self.preload_references()
         if verbosity >= 1:
             logger.info("Starting reports parsing from Suricate\n")
 
     def after_get_alerts(self, reports_created, should_notify):
-        Report.objects.filter(pk__in=self.to_delete).delete()
+        # Reports which are not in Suricate anymore, or not imported anymore (relocated outside of bbox)
+        Report.objects.exclude(external_uuid__in=self.imported_uuids).delete()
         if reports_created and should_notify:
             self.send_workflow_manager_new_reports_email(reports_created)
 
@@ -185,10 +209,9 @@ class SuricateParser(SuricateGestionRequestManager):
         if verbosity >= 2:
             logger.info(f"Processing report {report['uid']}\n")
         self.before_get_alerts(verbosity)
-        self.to_delete = set()
-        report_created = self.parse_report(report)
+        report_created = self.save_reports([report])
         if verbosity >= 1:
-            logger.info(f"Created : {report_created}")
+            logger.info(f"Created : {report_created[0] if report_created else 0}")
 
     def get_alerts(self, verbosity=1, should_notify=True):
         """
@@ -198,80 +221,127 @@ class SuricateParser(SuricateGestionRequestManager):
         self.before_get_alerts(verbosity)
         data = self.get_suricate("wsGetAlerts")
         total_reports = len(data["alertes"])
-        current_report = 1
         reports_created = set()
         # Parse alerts
-        for report in data["alertes"]:
+        for start in range(0, total_reports, self.batch_size):
+            reports = data["alertes"][start:start + self.batch_size]
             if verbosity == 2:
-                logger.info(f"Processing report {report['uid']} - {current_report}/{total_reports} \n")
-            report_created = self.parse_report(report)
-            if report_created:
-                reports_created.add(report_created)
-            current_report += 1
+                for current_report, report in enumerate(reports, start + 1):
+                    logger.info(f"Processing report {report['uid']} - {current_report}/{total_reports} \n")
+            reports_created.update(self.save_reports(reports))
         if verbosity >= 1:
             logger.info(f"Parsed {total_reports} reports from Suricate\n")
         if settings.SURICATE_WORKFLOW_SETTINGS.get("SKIP_MANAGER_MODERATION"):
             should_notify = False
         self.after_get_alerts(reports_created, should_notify)
 
-    def create_documents(self, documents, parent):
-        """Parse documents list from Suricate Rest API"""
-        for document in documents:
-
-            file_id = document["id"]
-            file_url = document["url"]
-            uid, ext = os.path.splitext(os.path.basename(file_url))
-            uid = uid + str(file_id)
-            parsed_url = urlparse(file_url)
-
-            attachment, created = Attachment.objects.get_or_create(
-                object_id=parent.pk,
-                title=uid,
-                content_type=ContentType.objects.get_for_model(parent),
-                defaults={
-                    'filetype': self.filetype,
-                    'creator': self.creator
+    def create_documents(self, reports):
+        """
+        Parse documents lists of reports and of their messages from Suricate Rest API,
+        and download missing files
+        """
+        content_type = ContentType.objects.get_for_model(Report)
+        attachments = {
+            (attachment.object_id, attachment.title): attachment
+            for attachment in Attachment.objects.filter(content_type=content_type,
+                                                        object_id__in=[parent.pk for report, parent in reports])
+        }
+        to_download, seen = [], set()
+        for report, parent in reports:
+            documents = report["documents"] + [document for message in report["messages"] for document in message["documents"]]
+            for document in documents:
+                file_id = document["id"]
+                file_url = document["url"]
+                uid, ext = os.path.splitext(os.path.basename(file_url))
+                uid = uid + str(file_id)
+                parsed_url = urlparse(file_url)
+                if (parent.pk, uid) in seen:
+                    continue
+                seen.add((parent.pk, uid))
+
+                attachment = attachments.get((parent.pk, uid))
+                if attachment is None:
+                    attachment = attachments[parent.pk, uid] = Attachment.objects.create(
+                        object_id=parent.pk,
+                        title=uid,
+                        content_type=content_type,
+                        filetype=self.filetype,
+                        creator=self.creator
+                    )
+                attachment_final_name = attachment.prepare_file_suffix(basename=uid + ext)
+                attachment_final_path = attachment_upload(attachment, attachment_final_name)
+                # If attachment is either new or had a failed download last time => download file
+                # If attachment isn't new and was downloaded before => skip this file
+
+                if attachment.attachment_file.storage.exists(attachment_final_path):
+                    continue
+
+                if parsed_url.scheme in ('http', 'https'):
+                    to_download.append((attachment, attachment_final_name, file_url))
+        self.download_documents(to_download)
+
+    def download_documents(self, documents):
+        """
+        Download files of attachments, with PARSER_ATTACHMENTS_WORKERS requests at once.
+        Files are saved in order, at most twice as many files as workers being kept in memory.
+        """
+        workers = settings.PARSER_ATTACHMENTS_WORKERS
+        if not workers:
+            for attachment, name, url in documents:
+                self.save_document(attachment, name, url)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for attachment, name, url in documents:
+                pending.append((attachment, name, url, executor.submit(self.get_attachment_from_suricate, url)))
+                if len(pending) >= 2 * workers:
+                    self.save_document(*pending.popleft())
+            while pending:
+                self.save_document(*pending.popleft())
+
+    def save_document(self, attachment, name, url, future=None):
+        try:
+            response = future.result() if future else self.get_attachment_from_suricate(url)
+            if response.status_code in [200, 201]:
+                f = ContentFile(response.content)
+                attachment.attachment_file.save(name, f, save=False)
+            attachment.save(**{'skip_file_save': True})
+        except Exception as e:
+            logger.error(f"Could not download image : {url} \n{e}\n{traceback.format_exc()}")
+
+    def create_messages(self, reports):
+        """Parse messages lists of reports from Suricate Rest API, and save them with bulk queries"""
+        identifier = AttachedMessage._meta.get_field('identifier')
+        messages = {
+            (message.identifier, message.date, message.report_id): message
+            for message in AttachedMessage.objects.filter(report__in=[parent for report, parent in reports])
+        }
+        created, updated = {}, {}
+        for report, parent in reports:
+            for message in report["messages"]:
+                # Parse date
+                msg_creation = self.parse_date(message["date"])
+
+                # Parse fields
+                fields = {
+                    "author": message["redacteur"],
+                    "content": message["texte"],
+                    "type": message["type"],
                 }
-            )
-            attachment_final_name = attachment.prepare_file_suffix(basename=uid + ext)
-            attachment_final_path = attachment_upload(attachment, attachment_final_name)
-            # If attachment is either new or had a failed download last time => download file
-            # If attachment isn't new and was downloaded before => skip this file
-
-            if attachment.attachment_file.storage.exists(attachment_final_path):
-                continue
-
-            if parsed_url.scheme in ('http', 'https'):
-                response = self.get_attachment_from_suricate(file_url)
-                try:
-                    if response.status_code in [200, 201]:
-                        f = ContentFile(response.content)
-                        attachment.attachment_file.save(attachment_final_name, f, save=False)
-                    attachment.save(**{'skip_file_save': True})
-                except Exception as e:
-                    logger.error(f"Could not download image : {file_url} \n{e}\n{traceback.format_exc()}")
-
-    def create_messages(self, messages, parent):
-        """Parse messages list from Suricate Rest API"""
-        for message in messages:
-            # Parse date
-            msg_creation = self.parse_date(message["date"])
-
-            # Parse fields
-            fields = {
-                "author": message["redacteur"],
-                "content": message["texte"],
-                "type": message["type"],
-            }
-
-            # Create message object
-            message_obj, created = AttachedMessage.objects.update_or_create(
-                identifier=message["id"], date=msg_creation, report=parent, defaults=fields
-            )
-            if created:
-                logger.info(
-                    f"New Message - id: {message['id']}, parent: {parent.external_uuid}"
-                )
 
-            # Parse documents attached to message
-            self.create_documents(message["documents"], parent)
+                key = (identifier.to_python(message["id"]), msg_creation, parent.pk)
+                message_obj = messages.get(key)
+                if message_obj is None:
+                    message_obj = messages[key] = created[key] = AttachedMessage(
+                        identifier=key[0], date=msg_creation, report=parent, **fields
+                    )
+                    logger.info(
+                        f"New Message - id: {message['id']}, parent: {parent.external_uuid}"
+                    )
+                elif any(getattr(message_obj, name) != value for name, value in fields.items()):
+                    for name, value in fields.items():
+                        setattr(message_obj, name, value)
+                    if message_obj.pk:
+                        updated[key] = message_obj
+        AttachedMessage.objects.bulk_create(created.values())
+        AttachedMessage.objects.bulk_update(updated.values(), ['author', 'content', 'type'])
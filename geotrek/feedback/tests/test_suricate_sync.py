@@ -322,6 +322,30 @@ class SuricateAPITests(SuricateTests):
             # No attachments are missing their image file
             self.assertTrue(atta.attachment_file.storage.exists(atta.attachment_file.name))
 
+    @override_settings(SURICATE_WORKFLOW_ENABLED=True, PARSER_ATTACHMENTS_WORKERS=2)
+    @mock.patch("geotrek.feedback.parsers.SuricateParser.batch_size", 3)
+    @mock.patch("geotrek.feedback.parsers.logger")
+    @mock.patch("geotrek.feedback.helpers.requests.get")
+    def test_get_alerts_by_batches_and_download_attachments_concurrently(self, mocked_get, mocked_logger):
+        """Test reports are saved by batches, and attachments downloaded by several workers"""
+        self.build_get_request_patch(mocked_get, cause_JPG_error=False)
+        call_command("sync_suricate", verbosity=2)
+        self.assertEqual(Report.objects.count(), 8)
+        self.assertEqual(AttachedMessage.objects.count(), 44)
+        self.assertEqual(Attachment.objects.count(), 6)
+        for atta in Attachment.objects.all():
+            self.assertTrue(atta.attachment_file.storage.exists(atta.attachment_file.name))
+        r = Report.objects.get(external_uuid="7EE5DF25-5056-AA2B-DDBEEFA5768CD53E")
+        r.comment = ""
+        r.save()
+        # Second sync updates reports, without duplicating messages nor attachments
+        call_command("sync_suricate", verbosity=2)
+        r.refresh_from_db()
+        self.assertEqual(r.comment, "Lames cassées")
+        self.assertEqual(Report.objects.count(), 8)
+        self.assertEqual(AttachedMessage.objects.count(), 44)
+        self.assertEqual(Attachment.objects.count(), 6)
+
     @override_settings(PAPERCLIP_ENABLE_LINK=False)
     @override_settings(SURICATE_WORKFLOW_ENABLED=True)
     def test_sync_needs_paperclip_enabled(self):
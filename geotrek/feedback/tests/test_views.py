@@ -494,7 +494,7 @@ class SuricateViewPermissions(AuthentFixturesMixin, TestCase):
         response = self.client.get('/report/list/export/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get('Content-Type'), 'text/csv')
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         dict_from_csv = dict(list(reader)[0])
         column_names = list(dict_from_csv.keys())
         self.assertIn("Courriel", column_names)
@@ -507,7 +507,7 @@ class SuricateViewPermissions(AuthentFixturesMixin, TestCase):
         response = self.client.get('/report/list/export/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get('Content-Type'), 'text/csv')
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         dict_from_csv = dict(list(reader)[0])
         column_names = list(dict_from_csv.keys())
         self.assertNotIn("Courriel", column_names)
@@ -520,7 +520,7 @@ class SuricateViewPermissions(AuthentFixturesMixin, TestCase):
         response = self.client.get('/report/list/export/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get('Content-Type'), 'text/csv')
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         dict_from_csv = dict(list(reader)[0])
         column_names = list(dict_from_csv.keys())
         self.assertIn("Courriel", column_names)
@@ -533,7 +533,7 @@ class SuricateViewPermissions(AuthentFixturesMixin, TestCase):
         response = self.client.get('/report/list/export/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get('Content-Type'), 'text/csv')
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         dict_from_csv = dict(list(reader)[0])
         column_names = list(dict_from_csv.keys())
         self.assertIn("Courriel", column_names)
@@ -25,7 +25,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from geotrek.common.mixins.api import APIViewSet
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.models import Attachment, FileType
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 
@@ -73,7 +73,7 @@ class ReportList(CustomColumnsMixin, mapentity_views.MapEntityList):
         return context
 
 
-class ReportFormatList(mapentity_views.MapEntityFormat, ReportList):
+class ReportFormatList(StreamingFormatMixin, mapentity_views.MapEntityFormat, ReportList):
     mandatory_columns = ['id', 'email']
     default_extra_columns = [
         'activity', 'comment', 'category',
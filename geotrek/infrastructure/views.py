@@ -5,7 +5,7 @@ from mapentity.views import (MapEntityList, MapEntityFormat, MapEntityDetail, Ma
 
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.mixins.api import APIViewSet
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 from geotrek.core.models import AltimetryMixin
 from geotrek.core.views import CreateFromTopologyMixin
@@ -24,7 +24,7 @@ class InfrastructureList(CustomColumnsMixin, MapEntityList):
     searchable_columns = ['id', 'name']
 
 
-class InfrastructureFormatList(MapEntityFormat, InfrastructureList):
+class InfrastructureFormatList(StreamingFormatMixin, MapEntityFormat, InfrastructureList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'id', 'name', 'type', 'condition', 'description', 'accessibility',
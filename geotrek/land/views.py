@@ -3,7 +3,7 @@ from django.contrib.gis.db.models.functions import Transform
 from mapentity.views import (MapEntityList, MapEntityFormat, MapEntityDetail, MapEntityDocument,
                              MapEntityCreate, MapEntityUpdate, MapEntityDelete)
 
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 from geotrek.core.models import AltimetryMixin
 from geotrek.core.views import CreateFromTopologyMixin
@@ -25,7 +25,7 @@ class PhysicalEdgeList(CustomColumnsMixin, CreateFromTopologyMixin, MapEntityLis
     default_extra_columns = ['length', 'length_2d']
 
 
-class PhysicalEdgeFormatList(MapEntityFormat, PhysicalEdgeList):
+class PhysicalEdgeFormatList(StreamingFormatMixin, MapEntityFormat, PhysicalEdgeList):
     mandatory_columns = ['id', 'physical_type']
     default_extra_columns = [
         'date_insert', 'date_update',
@@ -80,7 +80,7 @@ class LandEdgeList(CustomColumnsMixin, MapEntityList):
     default_extra_columns = ['length', 'length_2d']
 
 
-class LandEdgeFormatList(MapEntityFormat, LandEdgeList):
+class LandEdgeFormatList(StreamingFormatMixin, MapEntityFormat, LandEdgeList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'land_type', 'owner', 'agreement', 'date_insert', 'date_update',
@@ -133,7 +133,7 @@ class CompetenceEdgeList(CustomColumnsMixin, MapEntityList):
     default_extra_columns = ['length', 'length_2d']
 
 
-class CompetenceEdgeFormatList(MapEntityFormat, CompetenceEdgeList):
+class CompetenceEdgeFormatList(StreamingFormatMixin, MapEntityFormat, CompetenceEdgeList):
     mandatory_columns = ['id', 'organization']
     default_extra_columns = [
         'date_insert', 'date_update',
@@ -186,7 +186,7 @@ class WorkManagementEdgeList(CustomColumnsMixin, MapEntityList):
     default_extra_columns = ['length', 'length_2d']
 
 
-class WorkManagementEdgeFormatList(MapEntityFormat, WorkManagementEdgeList):
+class WorkManagementEdgeFormatList(StreamingFormatMixin, MapEntityFormat, WorkManagementEdgeList):
     mandatory_columns = ['id', 'organization']
     default_extra_columns = [
         'date_insert', 'date_update', 'cities', 'districts', 'areas', 'uuid', 'length_2d'
@@ -238,7 +238,7 @@ class SignageManagementEdgeList(CustomColumnsMixin, MapEntityList):
     default_extra_columns = ['length', 'length_2d']
 
 
-class SignageManagementEdgeFormatList(MapEntityFormat, SignageManagementEdgeList):
+class SignageManagementEdgeFormatList(StreamingFormatMixin, MapEntityFormat, SignageManagementEdgeList):
     mandatory_columns = ['id', 'organization']
     default_extra_columns = [
         'date_insert', 'date_update', 'cities', 'districts', 'areas', 'uuid', 'length_2d'
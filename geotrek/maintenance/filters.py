@@ -139,6 +139,8 @@ class InterventionFilterSet(AltimetryInterventionFilterSet, ZoningFilterSet, Str
                                                         lookup_expr='intersects')
     city = InterventionIntersectionFilterCity(label=_('City'), required=False, lookup_expr='intersects')
     district = InterventionIntersectionFilterDistrict(label=_('District'), required=False, lookup_expr='intersects')
+    total_manday = OptionalRangeFilter(label=_('mandays'))
+    total_cost = OptionalRangeFilter(label=_('total cost'))
 
     class Meta(StructureRelatedFilterSet.Meta):
         model = Intervention
@@ -161,6 +163,7 @@ class ProjectFilterSet(StructureRelatedFilterSet):
     district = ProjectIntersectionFilterDistrict(label=_('District'), lookup_expr='intersects', required=False)
     area_type = ProjectIntersectionFilterRestrictedAreaType(label=_('Restricted area type'), lookup_expr='intersects', required=False)
     area = ProjectIntersectionFilterRestrictedArea(label=_('Restricted area'), lookup_expr='intersects', required=False)
+    interventions_total_cost = OptionalRangeFilter(label=_('interventions total cost'))
 
     class Meta(StructureRelatedFilterSet.Meta):
         model = Project
@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0022_auto_20230503_0837'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intervention',
+            name='total_manday',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Mandays'),
+        ),
+        migrations.AddField(
+            model_name='intervention',
+            name='total_cost_mandays',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Mandays cost'),
+        ),
+        migrations.AddField(
+            model_name='intervention',
+            name='total_cost',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Total cost'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='interventions_total_cost',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Interventions total cost'),
+        ),
+        # Initial values, then maintained by triggers (see post_10_interventions.sql)
+        migrations.RunSQL("""
+            UPDATE maintenance_intervention i SET
+                total_manday = m.total_manday,
+                total_cost_mandays = m.total_cost_mandays
+            FROM (SELECT md.intervention_id, SUM(md.nb_days)::float AS total_manday,
+                         SUM(md.nb_days * j.cost)::float AS total_cost_mandays
+                  FROM maintenance_manday md JOIN maintenance_interventionjob j ON md.job_id = j.id
+                  GROUP BY md.intervention_id) m
+            WHERE m.intervention_id = i.id;
+            UPDATE maintenance_intervention SET
+                total_cost = total_cost_mandays + COALESCE(material_cost, 0)
+                             + COALESCE(heliport_cost, 0) + COALESCE(subcontract_cost, 0);
+            UPDATE maintenance_project p SET interventions_total_cost = i.total_cost
+            FROM (SELECT project_id, SUM(total_cost) AS total_cost
+                  FROM maintenance_intervention WHERE NOT deleted GROUP BY project_id) i
+            WHERE i.project_id = p.id;
+        """, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -49,6 +49,10 @@ class Intervention(ZoningPropertiesMixin, AddPropertyMixin, GeotrekMapEntityMixi
     material_cost = models.FloatField(default=0.0, blank=True, null=True, verbose_name=_("Material cost"))
     heliport_cost = models.FloatField(default=0.0, blank=True, null=True, verbose_name=_("Heliport cost"))
     subcontract_cost = models.FloatField(default=0.0, blank=True, null=True, verbose_name=_("Subcontract cost"))
+    # Denormalized costs of mandays and total cost, updated via triggers.
+    total_manday = models.FloatField(editable=False, default=0.0, verbose_name=_("Mandays"))
+    total_cost_mandays = models.FloatField(editable=False, default=0.0, verbose_name=_("Mandays cost"))
+    total_cost = models.FloatField(editable=False, default=0.0, verbose_name=_("Total cost"))
 
     # AltimetryMixin for denormalized fields from related topology, updated via trigger.
     length = models.FloatField(editable=True, default=0.0, null=True, blank=True, verbose_name=_("3D Length"))
@@ -103,6 +107,9 @@ class Intervention(ZoningPropertiesMixin, AddPropertyMixin, GeotrekMapEntityMixi
         if self.pk:
             fromdb = self.__class__.objects.get(pk=self.pk)
             self.area = fromdb.area
+            self.total_manday = fromdb.total_manday
+            self.total_cost_mandays = fromdb.total_cost_mandays
+            self.total_cost = fromdb.total_cost
             AltimetryMixin.reload(self, fromdb)
             TimeStampedModelMixin.reload(self, fromdb)
             NoDeleteMixin.reload(self, fromdb)
@@ -191,39 +198,6 @@ class Intervention(ZoningPropertiesMixin, AddPropertyMixin, GeotrekMapEntityMixi
 
         return Trail.objects.filter(pk__in=s)
 
-    @property
-    def total_manday(self):
-        total = 0.0
-        for md in self.manday_set.all():
-            total += float(md.nb_days)
-        return total
-
-    @classproperty
-    def total_manday_verbose_name(cls):
-        return _("Mandays")
-
-    @property
-    def total_cost_mandays(self):
-        total = 0.0
-        for md in self.manday_set.all():
-            total += md.cost
-        return total
-
-    @classproperty
-    def total_cost_mandays_verbose_name(cls):
-        return _("Mandays cost")
-
-    @property
-    def total_cost(self):
-        return self.total_cost_mandays + \
-            (self.material_cost or 0) + \
-            (self.heliport_cost or 0) + \
-            (self.subcontract_cost or 0)
-
-    @classproperty
-    def total_cost_verbose_name(cls):
-        return _("Total cost")
-
     @classproperty
     def geomfield(cls):
         return Topology._meta.get_field('geom')
@@ -445,6 +419,9 @@ class Project(ZoningPropertiesMixin, AddPropertyMixin, GeotrekMapEntityMixin, Ti
                                         verbose_name=_("Project manager"))
     founders = models.ManyToManyField(Organism, through='Funding', verbose_name=_("Founders"))
     eid = models.CharField(verbose_name=_("External id"), max_length=1024, blank=True, null=True)
+    # Denormalized total cost of interventions, updated via triggers.
+    interventions_total_cost = models.FloatField(editable=False, default=0.0,
+                                                 verbose_name=_("Interventions total cost"))
 
     objects = ProjectManager()
 
@@ -564,18 +541,6 @@ class Project(ZoningPropertiesMixin, AddPropertyMixin, GeotrekMapEntityMixin, Ti
     def period_verbose_name(cls):
         return _("Period")
 
-    @property
-    def interventions_total_cost(self):
-        total = 0
-        qs = self.interventions.existing()
-        for i in qs.prefetch_related('manday_set', 'manday_set__job'):
-            total += i.total_cost
-        return total
-
-    @classproperty
-    def interventions_total_cost_verbose_name(cls):
-        return _("Interventions total cost")
-
     def __str__(self):
         return "%s - %s" % (self.begin_year, self.name)
 
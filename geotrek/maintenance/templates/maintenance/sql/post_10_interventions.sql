@@ -110,3 +110,106 @@ $$ LANGUAGE plpgsql;
 CREATE TRIGGER maintenance_intervention_area_iu_tgr
 BEFORE INSERT OR UPDATE OF width, height ON maintenance_intervention
 FOR EACH ROW EXECUTE PROCEDURE update_area_intervention();
+
+
+-------------------------------------------------------------------------------
+-- Denormalized costs
+-------------------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.update_costs_intervention() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    SELECT COALESCE(SUM(m.nb_days), 0), COALESCE(SUM(m.nb_days * j.cost), 0)
+    FROM maintenance_manday m JOIN maintenance_interventionjob j ON m.job_id = j.id
+    WHERE m.intervention_id = NEW.id INTO NEW.total_manday, NEW.total_cost_mandays;
+
+    NEW.total_cost := NEW.total_cost_mandays + COALESCE(NEW.material_cost, 0)
+                      + COALESCE(NEW.heliport_cost, 0) + COALESCE(NEW.subcontract_cost, 0);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintenance_intervention_costs_iu_tgr
+BEFORE INSERT OR UPDATE ON maintenance_intervention
+FOR EACH ROW EXECUTE PROCEDURE update_costs_intervention();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.update_costs_manday() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    -- Costs are computed again by update_costs_intervention()
+    IF TG_OP = 'INSERT' THEN
+        UPDATE maintenance_intervention SET total_cost = total_cost WHERE id = NEW.intervention_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE maintenance_intervention SET total_cost = total_cost WHERE id = OLD.intervention_id;
+    ELSE
+        UPDATE maintenance_intervention SET total_cost = total_cost
+        WHERE id IN (OLD.intervention_id, NEW.intervention_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintenance_manday_costs_iud_tgr
+AFTER INSERT OR UPDATE OR DELETE ON maintenance_manday
+FOR EACH ROW EXECUTE PROCEDURE update_costs_manday();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.update_costs_interventionjob() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    UPDATE maintenance_intervention SET total_cost = total_cost
+    WHERE id IN (SELECT intervention_id FROM maintenance_manday WHERE job_id = NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintenance_interventionjob_costs_u_tgr
+AFTER UPDATE OF cost ON maintenance_interventionjob
+FOR EACH ROW WHEN (OLD.cost IS DISTINCT FROM NEW.cost)
+EXECUTE PROCEDURE update_costs_interventionjob();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.update_costs_project() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    SELECT COALESCE(SUM(total_cost), 0) FROM maintenance_intervention
+    WHERE project_id = NEW.id AND deleted = FALSE INTO NEW.interventions_total_cost;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintenance_project_costs_iu_tgr
+BEFORE INSERT OR UPDATE ON maintenance_project
+FOR EACH ROW EXECUTE PROCEDURE update_costs_project();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.update_costs_intervention_project() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    -- Total cost is computed again by update_costs_project()
+    IF TG_OP = 'INSERT' THEN
+        UPDATE maintenance_project SET interventions_total_cost = interventions_total_cost
+        WHERE id = NEW.project_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE maintenance_project SET interventions_total_cost = interventions_total_cost
+        WHERE id = OLD.project_id;
+    ELSE
+        UPDATE maintenance_project SET interventions_total_cost = interventions_total_cost
+        WHERE id IN (OLD.project_id, NEW.project_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintenance_intervention_project_costs_i_tgr
+AFTER INSERT ON maintenance_intervention
+FOR EACH ROW WHEN (NEW.project_id IS NOT NULL)
+EXECUTE PROCEDURE update_costs_intervention_project();
+
+CREATE TRIGGER maintenance_intervention_project_costs_u_tgr
+AFTER UPDATE ON maintenance_intervention
+FOR EACH ROW WHEN (OLD.total_cost IS DISTINCT FROM NEW.total_cost
+                   OR OLD.project_id IS DISTINCT FROM NEW.project_id
+                   OR OLD.deleted IS DISTINCT FROM NEW.deleted)
+EXECUTE PROCEDURE update_costs_intervention_project();
+
+CREATE TRIGGER maintenance_intervention_project_costs_d_tgr
+AFTER DELETE ON maintenance_intervention
+FOR EACH ROW WHEN (OLD.project_id IS NOT NULL)
+EXECUTE PROCEDURE update_costs_intervention_project();
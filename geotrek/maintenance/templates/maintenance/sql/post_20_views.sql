@@ -20,9 +20,9 @@ SELECT a.id,
        a.heliport_cost AS "Heliport cost",
        a.subcontract_cost AS "Subcontract cost",
        j.job AS "Job",
-       j.cost AS "Mandays",
-       j.nb_days AS "Cost",
-       (a.material_cost+a.heliport_cost+a.subcontract_cost)::float AS "Total cost",
+       a.total_manday AS "Mandays",
+       a.total_cost_mandays AS "Cost",
+       a.total_cost AS "Total cost",
        h.name AS "Project",
        CASE
            WHEN k.app_label = 'core' THEN 'Tronçons'
@@ -62,9 +62,7 @@ LEFT JOIN
      GROUP BY c.id) i ON a.id = i.id
 LEFT JOIN
     (SELECT a.id,
-            sum(b.nb_days)nb_days,
-            max(c.job) job,
-            sum(c.cost) "cost"
+            max(c.job) job
      FROM maintenance_intervention a
      JOIN maintenance_manday b ON a.id = b.intervention_id
      JOIN maintenance_interventionjob c ON c.id= b.job_id
@@ -92,6 +90,7 @@ SELECT a.id,
        a.begin_year AS "Begin year",
        a.end_year AS "End year",
        a.global_cost AS "Global cost",
+       a.interventions_total_cost AS "Interventions total cost",
        a."constraint" AS "Constraint",
        h.organism AS "Project owner",
        j.organism AS "Project manager",
@@ -9,6 +9,9 @@ ALTER TABLE maintenance_intervention ALTER COLUMN area SET DEFAULT 0;
 ALTER TABLE maintenance_intervention ALTER COLUMN material_cost SET DEFAULT 0.0;
 ALTER TABLE maintenance_intervention ALTER COLUMN heliport_cost SET DEFAULT 0.0;
 ALTER TABLE maintenance_intervention ALTER COLUMN subcontract_cost SET DEFAULT 0.0;
+ALTER TABLE maintenance_intervention ALTER COLUMN total_manday SET DEFAULT 0.0;
+ALTER TABLE maintenance_intervention ALTER COLUMN total_cost_mandays SET DEFAULT 0.0;
+ALTER TABLE maintenance_intervention ALTER COLUMN total_cost SET DEFAULT 0.0;
 -- stake
 -- status
 --type
@@ -77,6 +80,7 @@ ALTER TABLE maintenance_project ALTER COLUMN comments SET DEFAULT '';
 -- project_manager
 -- founders
 -- eid
+ALTER TABLE maintenance_project ALTER COLUMN interventions_total_cost SET DEFAULT 0.0;
 ALTER TABLE maintenance_project ALTER COLUMN date_insert SET DEFAULT now();
 ALTER TABLE maintenance_project ALTER COLUMN date_update SET DEFAULT now();
 -- structure
@@ -7,6 +7,11 @@ DROP FUNCTION IF EXISTS update_altimetry_intervention() CASCADE;
 DROP FUNCTION IF EXISTS update_area_intervention() CASCADE;
 DROP FUNCTION IF EXISTS delete_related_intervention_blade() CASCADE;
 DROP FUNCTION IF EXISTS delete_related_intervention_report() CASCADE;
+DROP FUNCTION IF EXISTS update_costs_intervention() CASCADE;
+DROP FUNCTION IF EXISTS update_costs_manday() CASCADE;
+DROP FUNCTION IF EXISTS update_costs_interventionjob() CASCADE;
+DROP FUNCTION IF EXISTS update_costs_project() CASCADE;
+DROP FUNCTION IF EXISTS update_costs_intervention_project() CASCADE;
 
 -- 20
 
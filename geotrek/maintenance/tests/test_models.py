@@ -60,6 +60,7 @@ class InterventionTest(TestCase):
         i = InterventionFactory.create()
         md = ManDayFactory.create(intervention=i, nb_days=5)
         ManDayFactory.create(intervention=i, nb_days=8)
+        i.reload()
         self.assertEqual(i.total_manday, 14)  # intervention haz a default manday
         clear_internal_user_cache()
         manday_pk = md.pk
@@ -297,8 +298,32 @@ class InterventionTest(TestCase):
             subcontract_cost=4
             # implicit 1 manday x 500 €
         )
+        interv.reload()
         self.assertEqual(interv.total_cost, 507)
 
+    def test_costs_follow_mandays_and_jobs(self):
+        interv = InterventionFactory.create(material_cost=10, heliport_cost=None, subcontract_cost=0)
+        ManDay.objects.filter(intervention=interv).delete()
+        job = InterventionJobFactory.create(cost=100)
+        manday = ManDayFactory.create(intervention=interv, job=job, nb_days=2)
+        ManDayFactory.create(intervention=interv, job=job, nb_days=0.5)
+        interv.reload()
+        self.assertEqual(interv.total_manday, 2.5)
+        self.assertEqual(interv.total_cost_mandays, 250)
+        self.assertEqual(interv.total_cost, 260)
+
+        job.cost = 200
+        job.save()
+        manday.delete()
+        interv.reload()
+        self.assertEqual(interv.total_manday, 0.5)
+        self.assertEqual(interv.total_cost_mandays, 100)
+        self.assertEqual(interv.total_cost, 110)
+
+        interv.heliport_cost = 5
+        interv.save()
+        self.assertEqual(interv.total_cost, 115)
+
     def test_disorders_display(self):
         interv = InterventionFactory.create()
         interv.disorders.add(InterventionDisorderFactory.create(disorder="foobar"))
@@ -361,3 +386,22 @@ class ProjectModelTest(TestCase):
         project.interventions.add(intervention_blade)
         project.interventions.add(intervention_course)
         self.assertQuerysetEqual(list(project.trails), ['trail_1', 'trail_2', 'trail_signage'], ordered=False, transform=str)
+
+    def test_interventions_total_cost(self):
+        project = ProjectFactory.create()
+        interv1 = InterventionFactory.create(project=project, material_cost=10)
+        interv2 = InterventionFactory.create(project=project, material_cost=20)
+        InterventionFactory.create(material_cost=40)
+        interv1.reload()
+        interv2.reload()
+        project.refresh_from_db()
+        self.assertEqual(project.interventions_total_cost, interv1.total_cost + interv2.total_cost)
+
+        interv2.delete()
+        project.refresh_from_db()
+        self.assertEqual(project.interventions_total_cost, interv1.total_cost)
+
+        interv1.project = None
+        interv1.save()
+        project.refresh_from_db()
+        self.assertEqual(project.interventions_total_cost, 0)
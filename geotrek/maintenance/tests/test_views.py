@@ -13,6 +13,7 @@ from django.contrib.gis.geos import Point, LineString, GeometryCollection
 from django.contrib.gis import gdal
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils.formats import number_format
 
 from geotrek.common.tests import CommonTest
 from mapentity.tests.factories import SuperUserFactory
@@ -425,7 +426,7 @@ class InterventionViewsTest(CommonTest):
         self.assertEqual(response.get('Content-Type'), 'text/csv')
 
         # Read the csv
-        lines = list(csv.reader(StringIO(response.content.decode("utf-8")), delimiter=','))
+        lines = list(csv.reader(StringIO(response.getvalue().decode("utf-8")), delimiter=','))
         index_line = lines[0].index('On')
         self.assertEqual(lines[1][index_line],
                          f'Path: {path_AB.name} ({path_AB.pk}), Path: {path_CD.name} ({path_CD.pk})')
@@ -717,7 +718,7 @@ class TestDetailedJobCostsExports(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get('Content-Type'), 'text/csv')
-        return csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        return csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
 
     def test_detailed_mandays_export(self):
         '''Test detailed intervention job costs are exported properly, and follow data changes'''
@@ -813,6 +814,29 @@ class TestInterventionTargetExports(TestCase):
         self.assertEqual(response.get('Content-Type'), 'text/csv')
 
         # Assert right format in CSV
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         for row in reader:
             self.assertEqual(row["On"], f"Path: {self.path.name} ({self.path.pk})")
+
+    def test_csv_costs_content(self):
+        project = ProjectFactory.create()
+        intervention = InterventionFactory(target=self.path, project=project, material_cost=12.5, heliport_cost=None)
+        ManDayFactory.create(intervention=intervention, nb_days=2)
+        ManDayFactory.create(intervention=intervention, nb_days=0.5)
+        intervention = Intervention.objects.get(pk=intervention.pk)
+        self.assertEqual(intervention.total_manday, 3.5)  # with default manday of factory
+        self.assertEqual(intervention.total_cost, 12.5 + sum(manday.cost for manday in intervention.manday_set.all()))
+
+        response = self.client.get('/intervention/list/export/', params={'format': 'csv'})
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
+        row = {row['ID']: row for row in reader}[str(intervention.pk)]
+        self.assertEqual(row['Mandays'], number_format(intervention.total_manday))
+        self.assertEqual(row['Mandays cost'], number_format(intervention.total_cost_mandays))
+        self.assertEqual(row['Total cost'], number_format(intervention.total_cost))
+
+        project.refresh_from_db()
+        self.assertEqual(project.interventions_total_cost, intervention.total_cost)
+        response = self.client.get('/project/list/export/', params={'format': 'csv'})
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
+        row = {row['ID']: row for row in reader}[str(project.pk)]
+        self.assertEqual(row['Interventions total cost'], number_format(project.interventions_total_cost))
@@ -11,7 +11,7 @@ from mapentity.views import (MapEntityList, MapEntityFormat, MapEntityDetail, Ma
 from geotrek.altimetry.models import AltimetryMixin
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.mixins.forms import FormsetMixin
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 from .filters import InterventionFilterSet, ProjectFilterSet
 from .forms import (InterventionForm, ProjectForm,
@@ -40,7 +40,7 @@ class InterventionList(CustomColumnsMixin, MapEntityList):
     unorderable_columns = ['target']
 
 
-class InterventionFormatList(MapEntityFormat, InterventionList):
+class InterventionFormatList(StreamingFormatMixin, MapEntityFormat, InterventionList):
 
     @classmethod
     def build_cost_column_name(cls, job_name):
@@ -194,7 +194,7 @@ class ProjectList(CustomColumnsMixin, MapEntityList):
     unorderable_columns = ['period', ]
 
 
-class ProjectFormatList(MapEntityFormat, ProjectList):
+class ProjectFormatList(StreamingFormatMixin, MapEntityFormat, ProjectList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'name', 'period', 'type', 'domain', 'constraint', 'global_cost',
@@ -27,26 +27,24 @@ class SiteFilterSet(ZoningFilterSet, StructureRelatedFilterSet):
             'web_links', 'type', 'orientation', 'wind', 'provider'
         ]
 
-    def filter_orientation(self, qs, name, values):
+    def filter_in_hierarchy(self, qs, name, values):
+        # Values of sites and their descendants are precomputed by triggers
         q = Q()
         for value in values:
-            q |= Q(**{'{}__contains'.format(name): value})
-        return qs.filter(q).get_ancestors(include_self=True)
+            q |= Q(**{'{}_in_hierarchy__contains'.format(name): [value]})
+        return qs.filter(q)
+
+    def filter_orientation(self, qs, name, values):
+        return self.filter_in_hierarchy(qs, name, values)
 
     def filter_super(self, qs, name, values):
-        if not values:
-            return qs
-        return qs.filter(**{'{}__in'.format(name): values}).get_ancestors(include_self=True)
+        return self.filter_in_hierarchy(qs, 'practices', [value.pk for value in values])
 
     def filter_sector(self, qs, name, values):
-        if not values:
-            return qs
-        return qs.filter(practice__sector__in=values).get_ancestors(include_self=True)
+        return self.filter_in_hierarchy(qs, 'sectors', [value.pk for value in values])
 
     def filter_manager(self, qs, name, values):
-        if not values:
-            return qs
-        return qs.filter(managers__in=values).get_ancestors(include_self=True)
+        return self.filter_in_hierarchy(qs, 'managers', [value.pk for value in values])
 
 
 class CourseFilterSet(ZoningFilterSet, StructureRelatedFilterSet):
@@ -0,0 +1,71 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outdoor', '0045_alter_rating_color'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='site',
+            name='practices_in_hierarchy',
+            field=models.JSONField(default=list, editable=False, verbose_name='Practices in hierarchy'),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='ratings_in_hierarchy',
+            field=models.JSONField(default=list, editable=False, verbose_name='Ratings in hierarchy'),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='sectors_in_hierarchy',
+            field=models.JSONField(default=list, editable=False, verbose_name='Sectors in hierarchy'),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='orientation_in_hierarchy',
+            field=models.JSONField(default=list, editable=False, verbose_name='Orientation in hierarchy'),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='wind_in_hierarchy',
+            field=models.JSONField(default=list, editable=False, verbose_name='Wind in hierarchy'),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='managers_in_hierarchy',
+            field=models.JSONField(default=list, editable=False, verbose_name='Managers in hierarchy'),
+        ),
+        # Initial values, then maintained by triggers (see post_50_hierarchy.sql)
+        migrations.RunSQL("""
+            UPDATE outdoor_site s SET
+                practices_in_hierarchy = COALESCE((
+                    SELECT jsonb_agg(DISTINCT d.practice_id ORDER BY d.practice_id)
+                    FROM outdoor_site d
+                    WHERE d.tree_id = s.tree_id AND d.lft BETWEEN s.lft AND s.rght
+                    AND d.practice_id IS NOT NULL), '[]'::jsonb),
+                ratings_in_hierarchy = COALESCE((
+                    SELECT jsonb_agg(DISTINCT r.rating_id ORDER BY r.rating_id)
+                    FROM outdoor_site d JOIN outdoor_site_ratings r ON r.site_id = d.id
+                    WHERE d.tree_id = s.tree_id AND d.lft BETWEEN s.lft AND s.rght), '[]'::jsonb),
+                sectors_in_hierarchy = COALESCE((
+                    SELECT jsonb_agg(DISTINCT p.sector_id ORDER BY p.sector_id)
+                    FROM outdoor_site d JOIN outdoor_practice p ON p.id = d.practice_id
+                    WHERE d.tree_id = s.tree_id AND d.lft BETWEEN s.lft AND s.rght
+                    AND p.sector_id IS NOT NULL), '[]'::jsonb),
+                orientation_in_hierarchy = COALESCE((
+                    SELECT jsonb_agg(DISTINCT o.value ORDER BY o.value)
+                    FROM outdoor_site d, jsonb_array_elements_text(d.orientation) o
+                    WHERE d.tree_id = s.tree_id AND d.lft BETWEEN s.lft AND s.rght), '[]'::jsonb),
+                wind_in_hierarchy = COALESCE((
+                    SELECT jsonb_agg(DISTINCT w.value ORDER BY w.value)
+                    FROM outdoor_site d, jsonb_array_elements_text(d.wind) w
+                    WHERE d.tree_id = s.tree_id AND d.lft BETWEEN s.lft AND s.rght), '[]'::jsonb),
+                managers_in_hierarchy = COALESCE((
+                    SELECT jsonb_agg(DISTINCT m.organism_id ORDER BY m.organism_id)
+                    FROM outdoor_site d JOIN outdoor_site_managers m ON m.site_id = d.id
+                    WHERE d.tree_id = s.tree_id AND d.lft BETWEEN s.lft AND s.rght), '[]'::jsonb);
+        """, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -212,6 +212,13 @@ class Site(ZoningPropertiesMixin, AddPropertyMixin, PicturesMixin, PublishableMi
     managers = models.ManyToManyField(Organism, verbose_name=_("Managers"), blank=True)
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     view_points = GenericRelation('common.HDViewPoint', related_query_name='site')
+    # Values of the site and its descendants, updated via triggers
+    practices_in_hierarchy = models.JSONField(editable=False, default=list, verbose_name=_("Practices in hierarchy"))
+    ratings_in_hierarchy = models.JSONField(editable=False, default=list, verbose_name=_("Ratings in hierarchy"))
+    sectors_in_hierarchy = models.JSONField(editable=False, default=list, verbose_name=_("Sectors in hierarchy"))
+    orientation_in_hierarchy = models.JSONField(editable=False, default=list, verbose_name=_("Orientation in hierarchy"))
+    wind_in_hierarchy = models.JSONField(editable=False, default=list, verbose_name=_("Wind in hierarchy"))
+    managers_in_hierarchy = models.JSONField(editable=False, default=list, verbose_name=_("Managers in hierarchy"))
 
     check_structure_in_forms = False
 
@@ -223,6 +230,8 @@ class Site(ZoningPropertiesMixin, AddPropertyMixin, PicturesMixin, PublishableMi
         ordering = ('name', )
         indexes = [
             GistIndex(name='site_geom_3d_gist_idx', fields=['geom_3d']),
+            # Keyset pagination of API (see StandardResultsSetPagination)
+            models.Index(name='site_update_idx', fields=['date_update', 'id']),
         ]
 
     class MPTTMeta:
@@ -255,15 +264,12 @@ class Site(ZoningPropertiesMixin, AddPropertyMixin, PicturesMixin, PublishableMi
     @property
     def super_practices_id(self):
         """ Return practices of itself and its descendants as ids """
-        practices_id = self.get_descendants(include_self=True) \
-            .exclude(practice=None) \
-            .values_list('practice_id', flat=True)
-        return set(practices_id)
+        return set(self.practices_in_hierarchy)
 
     @property
     def super_practices(self):
         """ Return practices of itself and its descendants as objects """
-        return Practice.objects.filter(id__in=self.super_practices_id)  # Sorted and unique
+        return Practice.objects.filter(id__in=self.practices_in_hierarchy)  # Sorted and unique
 
     @property
     def super_practices_display(self):
@@ -280,41 +286,32 @@ class Site(ZoningPropertiesMixin, AddPropertyMixin, PicturesMixin, PublishableMi
     @property
     def super_ratings_id(self):
         """ Return ratings of itself and its descendants as ids """
-        ratings_id = self.get_descendants(include_self=True) \
-            .exclude(ratings=None) \
-            .values_list('ratings', flat=True)
-        return set(ratings_id)
+        return set(self.ratings_in_hierarchy)
 
     @property
     def super_ratings(self):
         """ Return ratings of itself and its descendants as objects """
-        return Rating.objects.filter(id__in=self.super_ratings_id)  # Sorted and unique
+        return Rating.objects.filter(id__in=self.ratings_in_hierarchy)  # Sorted and unique
 
     @property
     def super_sectors(self):
         """ Return sectors of itself and its descendants """
-        sectors_id = self.get_descendants(include_self=True) \
-            .exclude(practice=None) \
-            .values_list('practice__sector_id', flat=True)
-        return Sector.objects.filter(id__in=sectors_id)  # Sorted and unique
+        return Sector.objects.filter(id__in=self.sectors_in_hierarchy)  # Sorted and unique
 
     @property
     def super_orientation(self):
         """ Return orientation of itself and its descendants """
-        orientation = set(sum(self.get_descendants(include_self=True).values_list('orientation', flat=True), []))
-        return [o for o, _o in self.ORIENTATION_CHOICES if o in orientation]  # Sorting
+        return [o for o, _o in self.ORIENTATION_CHOICES if o in self.orientation_in_hierarchy]  # Sorting
 
     @property
     def super_wind(self):
         """ Return wind of itself and its descendants """
-        wind = set(sum(self.get_descendants(include_self=True).values_list('wind', flat=True), []))
-        return [o for o, _o in self.WIND_CHOICES if o in wind]  # Sorting
+        return [o for o, _o in self.WIND_CHOICES if o in self.wind_in_hierarchy]  # Sorting
 
     @property
     def super_managers(self):
         """ Return managers of itself and its descendants """
-        sites = self.get_descendants(include_self=True)
-        return Organism.objects.filter(site__in=sites)  # Sorted and unique
+        return Organism.objects.filter(id__in=self.managers_in_hierarchy)  # Sorted and unique
 
     @property
     def published_labels(self):
@@ -435,6 +432,8 @@ class Course(ZoningPropertiesMixin, AddPropertyMixin, PublishableMixin, GeotrekM
         indexes = [
             GistIndex(name='course_points_ref_gist_idx', fields=['points_reference']),
             GistIndex(name='course_geom_3d_gist_idx', fields=['geom_3d']),
+            # Keyset pagination of API (see StandardResultsSetPagination)
+            models.Index(name='course_update_idx', fields=['date_update', 'id']),
         ]
 
     def __str__(self):
@@ -0,0 +1,52 @@
+-------------------------------------------------------------------------------
+-- Full-text search documents
+-------------------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.search_site_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    {% for lang in MODELTRANSLATION_LANGUAGES %}
+    PERFORM ft_search_document_update('outdoor.site', NEW.id, '{{ lang }}',
+        ft_search_vector('{{ lang }}', NEW.name_{{ lang }}, NEW.description_teaser_{{ lang }}, concat_ws(' ', NEW.description_{{ lang }}, NEW.ambiance_{{ lang }})));
+    {% endfor %}
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER outdoor_site_40_search_iu_tgr
+AFTER INSERT OR UPDATE OF {% for lang in MODELTRANSLATION_LANGUAGES %}name_{{ lang }}, description_teaser_{{ lang }}, description_{{ lang }}, ambiance_{{ lang }}{% if not forloop.last %}, {% endif %}{% endfor %} ON outdoor_site
+FOR EACH ROW EXECUTE PROCEDURE search_site_iu();
+
+CREATE TRIGGER outdoor_site_40_search_d_tgr
+AFTER DELETE ON outdoor_site
+FOR EACH ROW EXECUTE PROCEDURE search_document_d('outdoor.site', 'id');
+
+{% for lang in MODELTRANSLATION_LANGUAGES %}
+SELECT ft_search_document_update('outdoor.site', id, '{{ lang }}',
+    ft_search_vector('{{ lang }}', name_{{ lang }}, description_teaser_{{ lang }}, concat_ws(' ', description_{{ lang }}, ambiance_{{ lang }})))
+FROM outdoor_site;
+{% endfor %}
+
+
+CREATE FUNCTION {{ schema_geotrek }}.search_course_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    {% for lang in MODELTRANSLATION_LANGUAGES %}
+    PERFORM ft_search_document_update('outdoor.course', NEW.id, '{{ lang }}',
+        ft_search_vector('{{ lang }}', NEW.name_{{ lang }}, NULL, NEW.description_{{ lang }}));
+    {% endfor %}
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER outdoor_course_40_search_iu_tgr
+AFTER INSERT OR UPDATE OF {% for lang in MODELTRANSLATION_LANGUAGES %}name_{{ lang }}, description_{{ lang }}{% if not forloop.last %}, {% endif %}{% endfor %} ON outdoor_course
+FOR EACH ROW EXECUTE PROCEDURE search_course_iu();
+
+CREATE TRIGGER outdoor_course_40_search_d_tgr
+AFTER DELETE ON outdoor_course
+FOR EACH ROW EXECUTE PROCEDURE search_document_d('outdoor.course', 'id');
+
+{% for lang in MODELTRANSLATION_LANGUAGES %}
+SELECT ft_search_document_update('outdoor.course', id, '{{ lang }}',
+    ft_search_vector('{{ lang }}', name_{{ lang }}, NULL, description_{{ lang }}))
+FROM outdoor_course;
+{% endfor %}
@@ -0,0 +1,163 @@
+-------------------------------------------------------------------------------
+-- Values of sites rolled up from their descendants
+-------------------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.outdoor_site_hierarchy(site outdoor_site) RETURNS outdoor_site AS $$
+BEGIN
+    -- Values of the site itself, and values already rolled up by its children
+    SELECT COALESCE(jsonb_agg(t.id ORDER BY t.id), '[]'::jsonb) INTO site.practices_in_hierarchy
+    FROM (SELECT site.practice_id AS id
+          UNION SELECT jsonb_array_elements_text(c.practices_in_hierarchy)::integer
+          FROM outdoor_site c WHERE c.parent_id = site.id) t
+    WHERE t.id IS NOT NULL;
+
+    SELECT COALESCE(jsonb_agg(t.id ORDER BY t.id), '[]'::jsonb) INTO site.ratings_in_hierarchy
+    FROM (SELECT r.rating_id AS id FROM outdoor_site_ratings r WHERE r.site_id = site.id
+          UNION SELECT jsonb_array_elements_text(c.ratings_in_hierarchy)::integer
+          FROM outdoor_site c WHERE c.parent_id = site.id) t;
+
+    SELECT COALESCE(jsonb_agg(DISTINCT p.sector_id ORDER BY p.sector_id), '[]'::jsonb) INTO site.sectors_in_hierarchy
+    FROM outdoor_practice p
+    WHERE p.id IN (SELECT jsonb_array_elements_text(site.practices_in_hierarchy)::integer)
+    AND p.sector_id IS NOT NULL;
+
+    SELECT COALESCE(jsonb_agg(t.value ORDER BY t.value), '[]'::jsonb) INTO site.orientation_in_hierarchy
+    FROM (SELECT jsonb_array_elements_text(site.orientation) AS value
+          UNION SELECT jsonb_array_elements_text(c.orientation_in_hierarchy)
+          FROM outdoor_site c WHERE c.parent_id = site.id) t;
+
+    SELECT COALESCE(jsonb_agg(t.value ORDER BY t.value), '[]'::jsonb) INTO site.wind_in_hierarchy
+    FROM (SELECT jsonb_array_elements_text(site.wind) AS value
+          UNION SELECT jsonb_array_elements_text(c.wind_in_hierarchy)
+          FROM outdoor_site c WHERE c.parent_id = site.id) t;
+
+    SELECT COALESCE(jsonb_agg(t.id ORDER BY t.id), '[]'::jsonb) INTO site.managers_in_hierarchy
+    FROM (SELECT m.organism_id AS id FROM outdoor_site_managers m WHERE m.site_id = site.id
+          UNION SELECT jsonb_array_elements_text(c.managers_in_hierarchy)::integer
+          FROM outdoor_site c WHERE c.parent_id = site.id) t;
+
+    RETURN site;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE FUNCTION {{ schema_geotrek }}.outdoor_site_hierarchy_refresh(site_pk integer) RETURNS void SECURITY DEFINER AS $$
+DECLARE
+    site outdoor_site;
+BEGIN
+    SELECT * FROM outdoor_site WHERE id = site_pk INTO site;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+    site := outdoor_site_hierarchy(site);
+    -- Triggers roll up changed values to the ancestors of the site
+    UPDATE outdoor_site SET
+        practices_in_hierarchy = site.practices_in_hierarchy,
+        ratings_in_hierarchy = site.ratings_in_hierarchy,
+        sectors_in_hierarchy = site.sectors_in_hierarchy,
+        orientation_in_hierarchy = site.orientation_in_hierarchy,
+        wind_in_hierarchy = site.wind_in_hierarchy,
+        managers_in_hierarchy = site.managers_in_hierarchy
+    WHERE id = site_pk
+    AND (practices_in_hierarchy, ratings_in_hierarchy, sectors_in_hierarchy,
+         orientation_in_hierarchy, wind_in_hierarchy, managers_in_hierarchy)
+        IS DISTINCT FROM
+        (site.practices_in_hierarchy, site.ratings_in_hierarchy, site.sectors_in_hierarchy,
+         site.orientation_in_hierarchy, site.wind_in_hierarchy, site.managers_in_hierarchy);
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE FUNCTION {{ schema_geotrek }}.outdoor_site_hierarchy_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    NEW := outdoor_site_hierarchy(NEW);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER outdoor_site_50_hierarchy_i_tgr
+BEFORE INSERT ON outdoor_site
+FOR EACH ROW EXECUTE PROCEDURE outdoor_site_hierarchy_iu();
+
+-- Shifts of lft and rght columns by MPTT do not change the hierarchy
+CREATE TRIGGER outdoor_site_50_hierarchy_u_tgr
+BEFORE UPDATE OF parent_id, practice_id, orientation, wind, practices_in_hierarchy, ratings_in_hierarchy,
+    sectors_in_hierarchy, orientation_in_hierarchy, wind_in_hierarchy, managers_in_hierarchy ON outdoor_site
+FOR EACH ROW WHEN (
+    (OLD.parent_id, OLD.practice_id, OLD.orientation, OLD.wind, OLD.practices_in_hierarchy, OLD.ratings_in_hierarchy,
+     OLD.sectors_in_hierarchy, OLD.orientation_in_hierarchy, OLD.wind_in_hierarchy, OLD.managers_in_hierarchy)
+    IS DISTINCT FROM
+    (NEW.parent_id, NEW.practice_id, NEW.orientation, NEW.wind, NEW.practices_in_hierarchy, NEW.ratings_in_hierarchy,
+     NEW.sectors_in_hierarchy, NEW.orientation_in_hierarchy, NEW.wind_in_hierarchy, NEW.managers_in_hierarchy)
+)
+EXECUTE PROCEDURE outdoor_site_hierarchy_iu();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.outdoor_site_hierarchy_parent_iud() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM outdoor_site_hierarchy_refresh(OLD.parent_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM outdoor_site_hierarchy_refresh(NEW.parent_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER outdoor_site_50_hierarchy_parent_i_tgr
+AFTER INSERT ON outdoor_site
+FOR EACH ROW WHEN (NEW.parent_id IS NOT NULL)
+EXECUTE PROCEDURE outdoor_site_hierarchy_parent_iud();
+
+CREATE TRIGGER outdoor_site_50_hierarchy_parent_u_tgr
+AFTER UPDATE OF parent_id, practices_in_hierarchy, ratings_in_hierarchy, sectors_in_hierarchy,
+    orientation_in_hierarchy, wind_in_hierarchy, managers_in_hierarchy ON outdoor_site
+FOR EACH ROW WHEN (
+    (OLD.parent_id, OLD.practices_in_hierarchy, OLD.ratings_in_hierarchy, OLD.sectors_in_hierarchy,
+     OLD.orientation_in_hierarchy, OLD.wind_in_hierarchy, OLD.managers_in_hierarchy)
+    IS DISTINCT FROM
+    (NEW.parent_id, NEW.practices_in_hierarchy, NEW.ratings_in_hierarchy, NEW.sectors_in_hierarchy,
+     NEW.orientation_in_hierarchy, NEW.wind_in_hierarchy, NEW.managers_in_hierarchy)
+)
+EXECUTE PROCEDURE outdoor_site_hierarchy_parent_iud();
+
+CREATE TRIGGER outdoor_site_50_hierarchy_parent_d_tgr
+AFTER DELETE ON outdoor_site
+FOR EACH ROW WHEN (OLD.parent_id IS NOT NULL)
+EXECUTE PROCEDURE outdoor_site_hierarchy_parent_iud();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.outdoor_site_hierarchy_m2m_iud() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM outdoor_site_hierarchy_refresh(OLD.site_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM outdoor_site_hierarchy_refresh(NEW.site_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER outdoor_site_ratings_50_hierarchy_iud_tgr
+AFTER INSERT OR UPDATE OR DELETE ON outdoor_site_ratings
+FOR EACH ROW EXECUTE PROCEDURE outdoor_site_hierarchy_m2m_iud();
+
+CREATE TRIGGER outdoor_site_managers_50_hierarchy_iud_tgr
+AFTER INSERT OR UPDATE OR DELETE ON outdoor_site_managers
+FOR EACH ROW EXECUTE PROCEDURE outdoor_site_hierarchy_m2m_iud();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.outdoor_practice_hierarchy_u() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    PERFORM outdoor_site_hierarchy_refresh(id) FROM outdoor_site
+    WHERE practices_in_hierarchy @> jsonb_build_array(NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER outdoor_practice_50_hierarchy_u_tgr
+AFTER UPDATE OF sector_id ON outdoor_practice
+FOR EACH ROW WHEN (OLD.sector_id IS DISTINCT FROM NEW.sector_id)
+EXECUTE PROCEDURE outdoor_practice_hierarchy_u();
@@ -79,6 +79,12 @@ ALTER TABLE outdoor_site ALTER COLUMN accessibility SET DEFAULT '';
 -- managers
 ALTER TABLE outdoor_site ALTER COLUMN uuid SET DEFAULT gen_random_uuid();
 ALTER TABLE outdoor_site ALTER COLUMN provider SET DEFAULT '';
+ALTER TABLE outdoor_site ALTER COLUMN practices_in_hierarchy SET DEFAULT '[]'::JSON;
+ALTER TABLE outdoor_site ALTER COLUMN ratings_in_hierarchy SET DEFAULT '[]'::JSON;
+ALTER TABLE outdoor_site ALTER COLUMN sectors_in_hierarchy SET DEFAULT '[]'::JSON;
+ALTER TABLE outdoor_site ALTER COLUMN orientation_in_hierarchy SET DEFAULT '[]'::JSON;
+ALTER TABLE outdoor_site ALTER COLUMN wind_in_hierarchy SET DEFAULT '[]'::JSON;
+ALTER TABLE outdoor_site ALTER COLUMN managers_in_hierarchy SET DEFAULT '[]'::JSON;
 
 -- OrderedCourseChild
 ---------------------
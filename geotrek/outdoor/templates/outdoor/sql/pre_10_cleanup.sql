@@ -6,3 +6,17 @@ DROP FUNCTION IF EXISTS elevation_outdoor_iu() CASCADE;
 
 DROP VIEW IF EXISTS v_outdoor_sites CASCADE;
 DROP VIEW IF EXISTS v_outdoor_courses CASCADE;
+
+--40
+
+DROP FUNCTION IF EXISTS search_site_iu() CASCADE;
+DROP FUNCTION IF EXISTS search_course_iu() CASCADE;
+
+--50
+
+DROP FUNCTION IF EXISTS outdoor_site_hierarchy(outdoor_site) CASCADE;
+DROP FUNCTION IF EXISTS outdoor_site_hierarchy_refresh(integer) CASCADE;
+DROP FUNCTION IF EXISTS outdoor_site_hierarchy_iu() CASCADE;
+DROP FUNCTION IF EXISTS outdoor_site_hierarchy_parent_iud() CASCADE;
+DROP FUNCTION IF EXISTS outdoor_site_hierarchy_m2m_iud() CASCADE;
+DROP FUNCTION IF EXISTS outdoor_practice_hierarchy_u() CASCADE;
@@ -123,6 +123,9 @@ class SiteSuperTest(TestCase):
             orientation=[],
             wind=[]
         )
+        # Values in hierarchy are updated by triggers when descendants change
+        for site in (cls.alone, cls.parent, cls.child, cls.grandchild1, cls.grandchild2):
+            site.refresh_from_db()
 
     def test_super_practices_descendants(self):
         self.assertQuerysetEqual(self.parent.super_practices, ['<Practice: Aaa>', '<Practice: Bbb>'])
@@ -150,7 +153,7 @@ class SiteSuperTest(TestCase):
 
     def test_super_managers_descendants(self):
         self.assertQuerysetEqual(self.parent.super_managers,
-                                 ['<Organism: a>', '<Organism: b>', '<Organism: b>', '<Organism: c>'])
+                                 ['<Organism: a>', '<Organism: b>', '<Organism: c>'])
 
     def test_super_managers_ascendants(self):
         self.assertQuerysetEqual(self.grandchild2.super_managers, [])
@@ -162,6 +165,40 @@ class SiteSuperTest(TestCase):
         self.assertEqual(self.grandchild1.super_practices_display, "Bbb")
         self.assertEqual(self.grandchild2.super_practices_display, "")
 
+    def test_super_ratings_descendants(self):
+        rating = RatingFactory(scale__practice=self.child.practice)
+        self.grandchild2.ratings.set([rating])
+        self.parent.refresh_from_db()
+        self.assertEqual(self.parent.super_ratings_id, {rating.pk})
+        self.grandchild2.ratings.clear()
+        self.parent.refresh_from_db()
+        self.assertEqual(self.parent.super_ratings_id, set())
+
+    def test_super_values_follow_moved_site(self):
+        self.child.parent = self.alone
+        self.child.save()
+        self.parent.refresh_from_db()
+        self.alone.refresh_from_db()
+        self.assertEqual(self.parent.super_orientation, ['N', 'S'])
+        self.assertQuerysetEqual(self.parent.super_practices, ['<Practice: Bbb>'])
+        self.assertQuerysetEqual(self.parent.super_managers, ['<Organism: a>', '<Organism: b>'])
+        self.assertEqual(self.alone.super_orientation, ['N', 'E', 'S'])
+        self.assertQuerysetEqual(self.alone.super_practices, ['<Practice: Aaa>', '<Practice: Bbb>'])
+
+    def test_super_values_follow_deleted_site(self):
+        self.grandchild1.delete()
+        self.child.refresh_from_db()
+        self.parent.refresh_from_db()
+        self.assertQuerysetEqual(self.child.super_practices, ['<Practice: Aaa>'])
+        self.assertQuerysetEqual(self.parent.super_practices, ['<Practice: Aaa>', '<Practice: Bbb>'])
+
+    def test_super_sectors_follow_practice_sector(self):
+        practice = self.child.practice
+        practice.sector = SectorFactory(name='Cxx')
+        practice.save()
+        self.parent.refresh_from_db()
+        self.assertQuerysetEqual(self.parent.super_sectors, ['<Sector: Bxx>', '<Sector: Cxx>'])
+
 
 class SectorTest(TestCase):
     def test_sector_str(self):
@@ -8,7 +8,7 @@ from mapentity.views import (MapEntityList, MapEntityDetail, MapEntityDocument,
 
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.mixins.api import APIViewSet
-from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin
+from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.views import DocumentBookletPublic, DocumentPublic, MarkupPublic
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 from .filters import SiteFilterSet, CourseFilterSet
@@ -106,7 +106,7 @@ class SiteMarkupPublic(SiteDocumentPublicMixin, MarkupPublic):
     pass
 
 
-class SiteFormatList(MapEntityFormat, SiteList):
+class SiteFormatList(StreamingFormatMixin, MapEntityFormat, SiteList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'name', 'practice', 'description',
@@ -224,7 +224,7 @@ class CourseMarkupPublic(CourseDocumentPublicMixin, MarkupPublic):
     pass
 
 
-class CourseFormatList(MapEntityFormat, CourseList):
+class CourseFormatList(StreamingFormatMixin, MapEntityFormat, CourseList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'name', 'parent_sites', 'description', 'advice', 'equipment', 'accessibility',
@@ -1,6 +1,9 @@
 from datetime import date
 from calendar import monthrange
 
+from django.conf import settings
+from pyopenair.factory import wkt2openair
+
 
 def openair_atimes(month: int) -> str:
     """Format month number to OpenAir ATime item
@@ -37,3 +40,36 @@ def openair_atimes_concat(row) -> str:
         if months_fields[i]:
             aatimes_list.append(openair_atimes(i + 1))
     return '{{{{{}}}}}'.format(','.join(aatimes_list))
+
+
+def openair_area(area) -> str:
+    """Export sensitive area into OpenAir format
+
+    :param area: Sensitive area, with its species
+    :return: OpenAir airspace
+    :rtype: str
+    """
+    radius = area.species.radius or settings.SENSITIVITY_DEFAULT_RADIUS
+    geom = area.geom
+    if geom.geom_type == 'Point':
+        geom = geom.buffer(radius, 4)
+    geom = geom.transform(4326, clone=True)
+    geom = geom.simplify(0.001, preserve_topology=True)
+    other = {}
+    other['*AUID'] = f"GUId=! UId=! Id=(Identifiant-GeoTrek-sentivity) {str(area.pk)}"
+    adescr = (area.species.name,)
+    if area.publication_date:
+        adescr += (f"(published on {area.publication_date.strftime('%d/%m/%Y')})",)
+    other['*ADescr'] = " ".join(adescr)
+    other['*ATimes'] = openair_atimes_concat(area)
+    data = {
+        'wkt': geom.wkt,
+        'an': area.species.name,
+        'ac': 'ZSM',
+        'ah_unit': 'm',
+        'ah_alti': radius,
+        'ah_mode': 'AGL',
+        'al_mode': 'SFC',
+        'other': other
+    }
+    return wkt2openair(**data)
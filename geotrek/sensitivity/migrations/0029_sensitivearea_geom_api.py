@@ -0,0 +1,41 @@
+import django.contrib.gis.db.models.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_geom_api(apps, schema_editor):
+    schema_editor.execute("""
+        UPDATE sensitivity_sensitivearea a SET geom_api = CASE
+            WHEN GeometryType(a.geom) = 'POINT'
+            THEN ST_Transform(ST_Buffer(a.geom, COALESCE(s.radius, %s), 4), %s)
+            ELSE ST_Transform(a.geom, %s)
+        END
+        FROM sensitivity_species s WHERE s.id = a.species_id
+    """, (settings.SENSITIVITY_DEFAULT_RADIUS, settings.API_SRID, settings.API_SRID))
+    schema_editor.execute("UPDATE sensitivity_sensitivearea SET geom_api_area = COALESCE(ST_Area(geom_api), 0)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensitivity', '0028_alter_sensitivearea_structure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sensitivearea',
+            name='geom_api',
+            field=django.contrib.gis.db.models.fields.GeometryField(editable=False, null=True, srid=settings.API_SRID),
+        ),
+        migrations.AddField(
+            model_name='sensitivearea',
+            name='geom_api_area',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sensitivearea',
+            name='openair_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(set_geom_api, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensitivity', '0029_sensitivearea_geom_api'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='sensitivearea',
+            name='openair_text',
+        ),
+        # Filled in every language when areas are saved (and by 0032 for existing ones)
+        migrations.AddField(
+            model_name='sensitivearea',
+            name='openair_texts',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensitivity', '0030_sensitivearea_openair_texts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sensitivearea',
+            index=models.Index(fields=['date_update', 'id'], name='sensitivearea_update_idx'),
+        ),
+    ]
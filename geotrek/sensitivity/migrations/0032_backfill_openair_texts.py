@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import migrations
+
+from geotrek.sensitivity.helpers import openair_area
+
+
+def species_names(cursor, lang):
+    """Names of species in given language, translated columns do not exist on first install"""
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns WHERE table_name='sensitivity_species' AND column_name='name_{}'".format(lang)
+    )
+    if not cursor.fetchone():
+        return {}
+    cursor.execute('SELECT id, name_{} FROM sensitivity_species'.format(lang))
+    return {pk: name for pk, name in cursor.fetchall() if name}
+
+
+def forward(apps, schema_editor):
+    SensitiveArea = apps.get_model('sensitivity', 'SensitiveArea')
+    with schema_editor.connection.cursor() as cursor:
+        names = {lang: species_names(cursor, lang) for lang in settings.MODELTRANSLATION_LANGUAGES}
+    for area in SensitiveArea.objects.select_related('species').iterator():
+        default_name = area.species.name
+        openair_texts = {}
+        for lang in settings.MODELTRANSLATION_LANGUAGES:
+            area.species.name = names[lang].get(area.species.pk, default_name)
+            openair_texts[lang] = openair_area(area)
+        SensitiveArea.objects.filter(pk=area.pk).update(openair_texts=openair_texts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensitivity', '0031_date_update_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
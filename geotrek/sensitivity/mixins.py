@@ -1,10 +1,7 @@
 import logging
 
-from django.conf import settings
-from django.contrib.gis.db.models.functions import Transform
-from django.db.models import F, Case, When, Prefetch
+from django.db.models import Prefetch
 from geotrek.common.models import Attachment
-from geotrek.common.functions import GeometryType, Buffer, Area
 
 logger = logging.getLogger(__name__)
 
@@ -29,24 +26,8 @@ class SensitiveAreaQueryset:
                     ),
                 )
             )
-            .annotate(geom_type=GeometryType(F("geom")))
-            .annotate(
-                geom2d_transformed=Case(
-                    When(
-                        geom_type="POINT",
-                        then=Transform(
-                            Buffer(F("geom"), F("species__radius"), 4),
-                            settings.API_SRID,
-                        ),
-                    ),
-                    When(
-                        geom_type__in=("POLYGON", "MULTIPOLYGON"),
-                        then=Transform(F("geom"), settings.API_SRID),
-                    ),
-                )
-            )
-            .annotate(area=Area("geom2d_transformed"))
-            .order_by("-area")
+            # Ensure smaller areas are at the end of the list, ie above bigger areas on the map
+            .order_by("-geom_api_area")
         )
 
         if "practices" in self.request.GET:
@@ -8,17 +8,17 @@ import logging
 from django.conf import settings
 from django.contrib.gis.db import models
 from django.contrib.gis.geos import GEOSGeometry, Polygon
+from django.utils import translation
 from django.utils.translation import pgettext_lazy, gettext_lazy as _
 
 from mapentity.serializers import plain_text
-from pyopenair.factory import wkt2openair
 
 from geotrek.authent.models import StructureRelated
 from geotrek.common.mixins.models import (OptionalPictogramMixin, NoDeleteMixin, TimeStampedModelMixin,
                                           AddPropertyMixin, GeotrekMapEntityMixin, get_uuid_duplication)
 from geotrek.common.utils import intersecting, classproperty, queryset_or_model
 from geotrek.sensitivity.managers import SensitiveAreaManager
-from geotrek.sensitivity.helpers import openair_atimes_concat
+from geotrek.sensitivity.helpers import openair_area
 from geotrek.core.models import simplify_coords
 
 logger = logging.getLogger(__name__)
@@ -93,11 +93,36 @@ class Species(TimeStampedModelMixin, OptionalPictogramMixin):
     def pretty_practices(self):
         return ", ".join([str(practice) for practice in self.practices.all()])
 
+    @classmethod
+    def openair_fields(cls):
+        """Fields of species which are part of OpenAir exports of its areas"""
+        return ['name_{}'.format(lang) for lang in settings.MODELTRANSLATION_LANGUAGES] + \
+            ['period{:02}'.format(p) for p in range(1, 13)] + ['radius']
+
+    def save(self, *args, **kwargs):
+        fields = self.openair_fields()
+        fromdb = Species.objects.filter(pk=self.pk).values(*fields).first() if self.pk else None
+        super().save(*args, **kwargs)
+        if fromdb is None:
+            return
+        areas = self.sensitivearea_set.all()
+        if fromdb == {field: getattr(self, field) for field in fields}:
+            # Only fill exports missing in some languages
+            areas = areas.exclude(openair_texts__has_keys=list(settings.MODELTRANSLATION_LANGUAGES))
+        for area in areas:
+            area.species = self
+            area.update_openair()
+
 
 class SensitiveArea(GeotrekMapEntityMixin, StructureRelated, TimeStampedModelMixin, NoDeleteMixin,
                     AddPropertyMixin):
     geom = models.GeometryField(srid=settings.SRID)
     geom_buffered = models.GeometryField(srid=settings.SRID, editable=False)
+    # Geometry in API SRID, with points buffered by species radius, and its area, updated via triggers
+    geom_api = models.GeometryField(srid=settings.API_SRID, editable=False, null=True)
+    geom_api_area = models.FloatField(editable=False, default=0.0)
+    # OpenAir exports by language, updated when area or its species are saved
+    openair_texts = models.JSONField(editable=False, default=dict)
     species = models.ForeignKey(Species, verbose_name=_("Species or regulatory area"), on_delete=models.PROTECT)
     published = models.BooleanField(verbose_name=_("Published"), default=False, help_text=_("Visible on Geotrek-rando"))
     publication_date = models.DateField(verbose_name=_("Publication date"), null=True, blank=True, editable=False)
@@ -122,6 +147,10 @@ class SensitiveArea(GeotrekMapEntityMixin, StructureRelated, TimeStampedModelMix
         permissions = (
             ("import_sensitivearea", "Can import Sensitive area"),
         )
+        indexes = [
+            # Keyset pagination of API (see StandardResultsSetPagination)
+            models.Index(name='sensitivearea_update_idx', fields=['date_update', 'id']),
+        ]
 
     def __str__(self):
         return self.species.name
@@ -152,8 +181,30 @@ class SensitiveArea(GeotrekMapEntityMixin, StructureRelated, TimeStampedModelMix
             # Update computed values
             fromdb = self.__class__.objects.get(pk=self.pk)
             self.geom_buffered = fromdb.geom_buffered
+            self.geom_api = fromdb.geom_api
+            self.geom_api_area = fromdb.geom_api_area
         return self
 
+    def update_openair(self):
+        """
+        Store OpenAir exports of the area in every language, which cannot be computed in triggers.
+        """
+        self.openair_texts = {}
+        for language in settings.MODELTRANSLATION_LANGUAGES:
+            with translation.override(language):
+                self.openair_texts[language] = self.openair()
+        SensitiveArea.objects.filter(pk=self.pk).update(openair_texts=self.openair_texts)
+
+    def get_openair_text(self):
+        """
+        Return stored OpenAir export of the area in current language, rendered without
+        being stored if missing (read only, as it is used by GET requests).
+        """
+        language = translation.get_language()
+        if language in self.openair_texts:
+            return self.openair_texts[language]
+        return self.openair()
+
     def save(self, *args, **kwargs):
         if self.publication_date is None and self.published:
             self.publication_date = datetime.date.today()
@@ -161,6 +212,7 @@ class SensitiveArea(GeotrekMapEntityMixin, StructureRelated, TimeStampedModelMix
             self.publication_date = None
         super().save(*args, **kwargs)
         self.reload()
+        self.update_openair()
 
     @property
     def any_published(self):
@@ -225,31 +277,7 @@ class SensitiveArea(GeotrekMapEntityMixin, StructureRelated, TimeStampedModelMix
 
     def openair(self):
         """Exports sensitivearea into OpenAir format"""
-        geom = self.geom
-        if geom.geom_type == 'Point':
-            geom = geom.buffer(self.species.radius or settings.SENSITIVITY_DEFAULT_RADIUS, 4)
-        geom = geom.transform(4326, clone=True)
-        geom = geom.simplify(0.001, preserve_topology=True)
-        other = {}
-        other['*AUID'] = f"GUId=! UId=! Id=(Identifiant-GeoTrek-sentivity) {str(self.pk)}"
-        adescr = (self.species.name,)
-        if self.publication_date:
-            adescr += (f"(published on {self.publication_date.strftime('%d/%m/%Y')})",)
-        other['*ADescr'] = " ".join(adescr)
-        other['*ATimes'] = openair_atimes_concat(self)
-        wkt = geom.wkt
-        data = {
-            'wkt': wkt,
-            'an': self.species.name,
-            'ac': 'ZSM',
-            'ah_unit': 'm',
-            'ah_alti': self.species.radius or settings.SENSITIVITY_DEFAULT_RADIUS,
-            'ah_mode': 'AGL',
-            'al_mode': 'SFC',
-            # 'comment': self.species.name + ' (published on '+self.publication_date.strftime("%d/%m/%Y")+')',
-            'other': other
-        }
-        return wkt2openair(**data)
+        return openair_area(self)
 
     def is_public(self):
         return self.published
@@ -1,11 +1,11 @@
 from django.conf import settings
 from django.contrib.gis.geos import Point, Polygon, MultiPolygon
 
-from geotrek.common.parsers import Parser, ShapeParser, RowImportError, ValueImportError
+from geotrek.common.parsers import PaginatedParser, ShapeParser, RowImportError, ValueImportError
 from .models import SensitiveArea, Species, SportPractice
 
 
-class BiodivParser(Parser):
+class BiodivParser(PaginatedParser):
     model = SensitiveArea
     label = "Biodiv'Sports"
     url = 'https://biodiv-sports.fr/api/v2/sensitivearea/?format=json&bubble&period=ignore'
@@ -13,7 +13,6 @@ class BiodivParser(Parser):
     separator = None
     delete = True
     practices = None
-    next_url = ''
     fields = {
         'eid': 'id',
         'geom': 'geometry',
@@ -46,7 +45,10 @@ class BiodivParser(Parser):
         kwargs['eid__isnull'] = False
         return kwargs
 
-    def next_row(self):
+    def get_nb(self, root):
+        return int(root['count'])
+
+    def get_first_page(self):
         response = self.request_or_retry('https://biodiv-sports.fr/api/v2/sportpractice/')
         for practice in response.json()['results']:
             defaults = {'name_' + lang: practice['name'][lang] for lang in practice['name'].keys() if lang in settings.MODELTRANSLATION_LANGUAGES}
@@ -54,21 +56,17 @@ class BiodivParser(Parser):
         bbox = Polygon.from_bbox(settings.SPATIAL_EXTENT)
         bbox.srid = settings.SRID
         bbox.transform(4326)  # WGS84
-        self.next_url = self.url
-        while self.next_url:
-            params = {
-                'in_bbox': ','.join([str(coord) for coord in bbox.extent]),
-            }
-            if self.practices:
-                params['practices'] = ','.join([str(practice) for practice in self.practices])
-            response = self.request_or_retry(self.next_url, params=params)
-
-            self.root = response.json()
-            self.nb = int(self.root['count'])
-
-            for row in self.items:
-                yield row
-            self.next_url = self.root['next']
+        params = {
+            'in_bbox': ','.join([str(coord) for coord in bbox.extent]),
+        }
+        if self.practices:
+            params['practices'] = ','.join([str(practice) for practice in self.practices])
+        return {'url': self.url, 'kwargs': {'params': params}}
+
+    def get_next_page(self, page, root):
+        if not root['next']:
+            return None
+        return {'url': root['next'], 'kwargs': page['kwargs']}
 
     def normalize_field_name(self, name):
         return name
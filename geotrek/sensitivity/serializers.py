@@ -76,8 +76,8 @@ class SensitiveAreaAPISerializer(TranslatedModelSerializer):
 
 
 class SensitiveAreaAPIGeojsonSerializer(GeoFeatureModelSerializer, SensitiveAreaAPISerializer):
-    # Annotated geom field with API_SRID
-    geom2d_transformed = rest_gis_fields.GeometryField(read_only=True, precision=7)
+    # Geom field with API_SRID, with points buffered by species radius
+    geom2d_transformed = rest_gis_fields.GeometryField(read_only=True, precision=7, source='geom_api')
 
     class Meta(SensitiveAreaAPISerializer.Meta):
         geo_field = 'geom2d_transformed'
@@ -13,4 +13,42 @@ $$ LANGUAGE plpgsql;
 
 CREATE TRIGGER sensitivity_geom_buffered_intersection
     BEFORE INSERT OR UPDATE ON sensitivity_sensitivearea
-    FOR EACH ROW EXECUTE PROCEDURE sensitive_area_update_geom_buffered_intersection();
\ No newline at end of file
+    FOR EACH ROW EXECUTE PROCEDURE sensitive_area_update_geom_buffered_intersection();
+
+---------------------------------------------------------------------
+-- Geometry served by APIs, with points buffered by species radius
+---------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.sensitive_area_update_geom_api() RETURNS trigger SECURITY DEFINER AS $$
+DECLARE
+    radius integer;
+BEGIN
+    IF GeometryType(NEW.geom) = 'POINT' THEN
+        SELECT COALESCE(s.radius, {{ SENSITIVITY_DEFAULT_RADIUS }}) FROM sensitivity_species s
+        WHERE s.id = NEW.species_id INTO radius;
+        NEW.geom_api = ST_Transform(ST_Buffer(NEW.geom, radius, 4), {{ API_SRID }});
+    ELSE
+        NEW.geom_api = ST_Transform(NEW.geom, {{ API_SRID }});
+    END IF;
+    NEW.geom_api_area = COALESCE(ST_Area(NEW.geom_api), 0);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sensitivity_geom_api
+    BEFORE INSERT OR UPDATE OF geom, species_id ON sensitivity_sensitivearea
+    FOR EACH ROW EXECUTE PROCEDURE sensitive_area_update_geom_api();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.sensitive_area_species_update_geom_api() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    -- Geometries are computed again by sensitive_area_update_geom_api()
+    UPDATE sensitivity_sensitivearea SET geom = geom WHERE species_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sensitivity_species_geom_api
+    AFTER UPDATE OF radius ON sensitivity_species
+    FOR EACH ROW WHEN (OLD.radius IS DISTINCT FROM NEW.radius)
+    EXECUTE PROCEDURE sensitive_area_species_update_geom_api();
@@ -42,3 +42,6 @@ ALTER TABLE maintenance_project ALTER COLUMN date_insert SET DEFAULT now();
 ALTER TABLE maintenance_project ALTER COLUMN date_update SET DEFAULT now();
 ALTER TABLE sensitivity_sensitivearea ALTER COLUMN provider SET DEFAULT '';
 -- deleted
+-- geom_api
+ALTER TABLE sensitivity_sensitivearea ALTER COLUMN geom_api_area SET DEFAULT 0.0;
+ALTER TABLE sensitivity_sensitivearea ALTER COLUMN openair_texts SET DEFAULT '{}'::JSON;
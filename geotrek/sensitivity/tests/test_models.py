@@ -1,10 +1,13 @@
 from freezegun import freeze_time
 from difflib import SequenceMatcher
+from unittest import mock
 
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.conf import settings
+from django.utils import translation
 
+from geotrek.sensitivity.models import SensitiveArea
 from geotrek.sensitivity.tests.factories import SensitiveAreaFactory, SpeciesFactory
 from geotrek.trekking.tests.factories import TrekFactory
 
@@ -132,6 +135,61 @@ class SensitiveAreaModelTest(TestCase):
         sensitive_area = SensitiveAreaFactory.create(species=species)
         self.assertIn("AH 985FT AGL", sensitive_area.openair())
 
+    def test_openair_text_follows_species(self):
+        sensitive_area = SensitiveAreaFactory.create()
+        self.assertEqual(sensitive_area.get_openair_text(), sensitive_area.openair())
+        sensitive_area.species.name = "Other species"
+        sensitive_area.species.save()
+        sensitive_area.refresh_from_db()
+        self.assertIn("AN Other species\n", sensitive_area.get_openair_text())
+
+    def test_openair_text_by_language(self):
+        species = SpeciesFactory.create(name_en="Eagle", name_fr="Aigle")
+        sensitive_area = SensitiveAreaFactory.create(species=species)
+        with translation.override('en'):
+            self.assertIn("AN Eagle\n", sensitive_area.get_openair_text())
+        with translation.override('fr'):
+            self.assertIn("AN Aigle\n", sensitive_area.get_openair_text())
+        self.assertEqual(translation.get_language(), settings.LANGUAGE_CODE)
+
+    def test_openair_text_not_rendered_when_species_export_unchanged(self):
+        sensitive_area = SensitiveAreaFactory.create()
+        species = sensitive_area.species
+        with mock.patch('geotrek.sensitivity.models.SensitiveArea.update_openair') as update_openair:
+            species.url = "http://other.url.com"
+            species.save()
+            update_openair.assert_not_called()
+            species.radius = 50
+            species.save()
+            update_openair.assert_called_once_with()
+
+    def test_missing_openair_text_is_not_stored_when_read(self):
+        sensitive_area = SensitiveAreaFactory.create()
+        SensitiveArea.objects.filter(pk=sensitive_area.pk).update(openair_texts={})
+        sensitive_area.refresh_from_db()
+        with translation.override('en'):
+            self.assertEqual(sensitive_area.get_openair_text(), sensitive_area.openair())
+        sensitive_area.refresh_from_db()
+        self.assertEqual(sensitive_area.openair_texts, {})
+
+    def test_missing_openair_texts_are_filled_when_species_is_saved(self):
+        sensitive_area = SensitiveAreaFactory.create()
+        SensitiveArea.objects.filter(pk=sensitive_area.pk).update(openair_texts={})
+        sensitive_area.species.save()
+        sensitive_area.refresh_from_db()
+        self.assertEqual(set(sensitive_area.openair_texts), set(settings.MODELTRANSLATION_LANGUAGES))
+
+    def test_geom_api_follows_species_radius(self):
+        species = SpeciesFactory.create(radius=300)
+        sensitive_area = SensitiveAreaFactory.create(geom="POINT(700000 6600000)", species=species)
+        self.assertEqual(sensitive_area.geom_api.srid, settings.API_SRID)
+        self.assertEqual(sensitive_area.geom_api.geom_type, 'Polygon')
+        geom_api_area = sensitive_area.geom_api_area
+        species.radius = 100
+        species.save()
+        sensitive_area.refresh_from_db()
+        self.assertLess(sensitive_area.geom_api_area, geom_api_area)
+
     def test_is_public(self):
         sensitive_area = SensitiveAreaFactory.create()
         self.assertTrue(sensitive_area.is_public())
@@ -4,10 +4,9 @@ from datetime import datetime
 
 from django.conf import settings
 from django.contrib.gis.db.models.functions import Transform
-from django.db.models import F, Case, When
 from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.translation import ugettext_lazy as _
+from django.utils.translation import get_language, ugettext_lazy as _
 from django.views.generic import ListView
 from django.views.generic.detail import BaseDetailView
 from mapentity.views import (MapEntityCreate, MapEntityUpdate, MapEntityList, MapEntityDetail,
@@ -15,9 +14,8 @@ from mapentity.views import (MapEntityCreate, MapEntityUpdate, MapEntityList, Ma
 from rest_framework import permissions as rest_permissions, viewsets
 
 from geotrek.authent.decorators import same_structure_required
-from geotrek.common.functions import GeometryType, Buffer, Area
 from geotrek.common.mixins.api import APIViewSet
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.permissions import PublicOrReadPermMixin
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 from .filters import SensitiveAreaFilterSet
@@ -43,7 +41,7 @@ class SensitiveAreaList(CustomColumnsMixin, MapEntityList):
     default_extra_columns = ['category']
 
 
-class SensitiveAreaFormatList(MapEntityFormat, SensitiveAreaList):
+class SensitiveAreaFormatList(StreamingFormatMixin, MapEntityFormat, SensitiveAreaList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'species', 'published', 'description', 'contact', 'radius', 'pretty_period', 'pretty_practices',
@@ -134,14 +132,9 @@ if 'geotrek.trekking' in settings.INSTALLED_APPS:
                 raise Http404
             qs = trek.published_sensitive_areas
             qs = qs.prefetch_related('species')
-            qs = qs.annotate(geom_type=GeometryType(F('geom')))
-            qs = qs.annotate(geom2d_transformed=Case(
-                When(geom_type='POINT', then=Transform(Buffer(F('geom'), F('species__radius'), 4), settings.API_SRID)),
-                When(geom_type='POLYGON', then=Transform(F('geom'), settings.API_SRID))
-            ))
             # Ensure smaller areas are at the end of the list, ie above bigger areas on the map
             # to ensure we can select every area in case of overlapping
-            qs = qs.annotate(area=Area('geom2d_transformed')).order_by('-area')
+            qs = qs.order_by('-geom_api_area')
 
             if 'practices' in self.request.GET:
                 qs = qs.filter(species__practices__name__in=self.request.GET['practices'].split(','))
@@ -161,14 +154,9 @@ if 'geotrek.diving' in settings.INSTALLED_APPS:
                 raise Http404
             qs = dive.published_sensitive_areas
             qs = qs.prefetch_related('species')
-            qs = qs.annotate(geom_type=GeometryType(F('geom')))
-            qs = qs.annotate(geom2d_transformed=Case(
-                When(geom_type='POINT', then=Transform(Buffer(F('geom'), F('species__radius'), 4), settings.API_SRID)),
-                When(geom_type='POLYGON', then=Transform(F('geom'), settings.API_SRID))
-            ))
             # Ensure smaller areas are at the end of the list, ie above bigger areas on the map
             # to ensure we can select every area in case of overlapping
-            qs = qs.annotate(area=Area('geom2d_transformed')).order_by('-area')
+            qs = qs.order_by('-geom_api_area')
 
             if 'practices' in self.request.GET:
                 qs = qs.filter(species__practices__name__in=self.request.GET['practices'].split(','))
@@ -195,8 +183,9 @@ class SensitiveAreaOpenAirDetail(LastModifiedMixin, PublicOrReadPermMixin, BaseD
 * Using pyopenair library (https://github.com/lpoaura/pyopenair)
 * This file was created on:  {timestamp}\n\n""".format(scheme=self.request.scheme, domain=self.request.META['HTTP_HOST'], timestamp=datetime.now())
         is_aerial = area.species.practices.filter(name__in=settings.SENSITIVITY_OPENAIR_SPORT_PRACTICES).exists()
-        if is_aerial and area.openair():
-            result = file_header + area.openair()
+        openair_text = area.get_openair_text()
+        if is_aerial and openair_text:
+            result = file_header + openair_text
             response = HttpResponse(result, content_type='application/octet-stream; charset=UTF-8')
             response['Content-Disposition'] = 'inline; filename=sensitivearea_openair_' + str(area.id) + '.txt'
             return response
@@ -216,11 +205,21 @@ class SensitiveAreaOpenAirList(PublicOrReadPermMixin, ListView):
         ).select_related('species')
 
     def render_to_response(self, context):
-        areas = self.get_queryset()
+        # OpenAir exports of areas are stored when areas or their species are saved
+        areas = list(self.get_queryset().defer('geom', 'geom_buffered', 'geom_api'))
+        # Geometries are only needed to render missing exports, load them in a single query
+        language = get_language()
+        missing = [area.pk for area in areas if language not in area.openair_texts]
+        if missing:
+            geoms = dict(SensitiveArea.objects.filter(pk__in=missing).values_list('pk', 'geom'))
+            for area in areas:
+                if area.pk in geoms:
+                    area.geom = geoms[area.pk]
+        openair_texts = [area.get_openair_text() for area in areas]
         file_header = """* This file has been produced from GeoTrek sensitivity (https://geotrek.fr/) module from website {scheme}://{domain}
 * Using pyopenair library (https://github.com/lpoaura/pyopenair)
 * This file was created on:  {timestamp}\n\n""".format(scheme=self.request.scheme, domain=self.request.META['HTTP_HOST'], timestamp=datetime.now())
-        airspace_list = [a.openair() for a in areas if a.openair()]
+        airspace_list = [openair_text for openair_text in openair_texts if openair_text]
         airspace_core = '\n\n'.join(airspace_list)
         airspace_file = file_header + airspace_core
         response = HttpResponse(airspace_file, content_type='application/octet-stream; charset=UTF-8')
@@ -441,6 +441,7 @@ ALTIMETRIC_PROFILE_FONT = 'ubuntu'
 ALTIMETRIC_PROFILE_MIN_YSCALE = 1200  # Minimum y scale (in meters)
 ALTIMETRIC_AREA_MAX_RESOLUTION = 150  # Maximum number of points (by width/height)
 ALTIMETRIC_AREA_MARGIN = 0.15
+ALTIMETRIC_DEM_PYRAMID_ROOT = os.path.join(VAR_DIR, 'dem')  # DEM copy used to sample elevation areas
 
 # Let this be defined at instance-level
 LEAFLET_CONFIG = {
@@ -595,6 +596,9 @@ TOPOLOGY_STATIC_OFFSETS = {'land': -5,
                            'competence': 5,
                            'signagemanagement': -10,
                            'workmanagement': 10}
+# Compute geometry of topologies impacted by path changes in a Celery worker after commit
+TOPOLOGY_GEOMETRY_UPDATE_ASYNC = False
+TOPOLOGY_GEOMETRY_UPDATE_BATCH_SIZE = 100  # Topologies updated in each transaction by workers
 
 MESSAGE_TAGS = {
     messages.SUCCESS: 'alert-success',
@@ -630,6 +634,8 @@ MOBILE_TILES_RADIUS_SMALL = 0.005  # ~500 m
 MOBILE_TILES_GLOBAL_ZOOMS = list(range(13))
 MOBILE_TILES_LOW_ZOOMS = list(range(13, 15))
 MOBILE_TILES_HIGH_ZOOMS = list(range(15, 17))
+MOBILE_TILES_CACHE_EXPIRATION = 30  # days, None to keep downloaded tiles forever
+MOBILE_TILES_DOWNLOAD_WORKERS = 4
 MOBILE_CATEGORY_PICTO_SIZE = 32
 MOBILE_POI_PICTO_SIZE = 32
 MOBILE_INFORMATIONDESKTYPE_PICTO_SIZE = 32
@@ -817,6 +823,13 @@ REPORT_FILETYPE = "Report"
 PARSER_RETRY_SLEEP_TIME = 60  # time of sleep between requests
 PARSER_NUMBER_OF_TRIES = 3  # number of requests to try before abandon
 PARSER_RETRY_HTTP_STATUS = [503]
+# Attachments are checked and downloaded by this number of threads sharing connections,
+# 0 to download them one after the other without reusing connections
+PARSER_ATTACHMENTS_WORKERS = 4
+# Pages of paginated sources fetched in advance while importing rows of current page
+PARSER_PREFETCH_PAGES = 2
+# Pages stored by interrupted imports of parsers with pages_cache are discarded after this delay (in seconds)
+PARSER_PAGES_CACHE_TTL = 60 * 60 * 24
 
 USE_BOOKLET_PDF = False
 HIDDEN_FORM_FIELDS = {}
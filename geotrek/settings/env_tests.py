@@ -43,6 +43,14 @@ CACHES['api_v2'] = {
     'LOCATION': 'api_v2',
 }
 
+# Elevation areas are sampled in database unless a test builds a DEM pyramid
+ALTIMETRIC_DEM_PYRAMID_ROOT = None
+
+# Attachments and pages are downloaded in main thread, in the order expected by tests
+# mocking requests, unless a test enables workers
+PARSER_ATTACHMENTS_WORKERS = 0
+PARSER_PREFETCH_PAGES = 0
+
 
 class DisableMigrations():
     def __contains__(self, item):
@@ -10,7 +10,7 @@ from mapentity.views import (MapEntityList, MapEntityFormat, MapEntityDetail,
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.mixins.api import APIViewSet
 from geotrek.common.mixins.forms import FormsetMixin
-from geotrek.common.mixins.views import CustomColumnsMixin
+from geotrek.common.mixins.views import CustomColumnsMixin, StreamingFormatMixin
 from geotrek.common.viewsets import GeotrekMapentityViewSet
 from geotrek.core.models import AltimetryMixin
 from .filters import SignageFilterSet, BladeFilterSet
@@ -37,7 +37,7 @@ class SignageList(CustomColumnsMixin, MapEntityList):
     searchable_columns = ['id', 'name', 'code']
 
 
-class SignageFormatList(MapEntityFormat, SignageList):
+class SignageFormatList(StreamingFormatMixin, MapEntityFormat, SignageList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'name', 'code', 'type', 'condition', 'description',
@@ -49,8 +49,7 @@ class SyncRando:
         if self.global_sync.portal:
             contents = contents.filter(Q(portal__name=self.global_sync.portal) | Q(portal=None))
 
-        for content in contents:
-            self.sync_content(lang, content)
+        self.global_sync.sync_objects(lang, self.sync_content, contents, signature=self.signature)
 
         events = models.TouristicEvent.objects.existing().order_by('pk')
         events = events.filter(**{'published_{lang}'.format(lang=lang): True})
@@ -61,8 +60,7 @@ class SyncRando:
         if self.global_sync.portal:
             events = events.filter(Q(portal__name=self.global_sync.portal) | Q(portal=None))
 
-        for event in events:
-            self.sync_event(lang, event)
+        self.global_sync.sync_objects(lang, self.sync_event, events, signature=self.signature)
 
         # Information desks
         self.global_sync.sync_geojson(lang, tourism_views.InformationDeskViewSet, 'information_desks.geojson')
@@ -72,6 +70,9 @@ class SyncRando:
         for desk in models.InformationDesk.objects.all():
             self.global_sync.sync_media_file(lang, desk.thumbnail)
 
+    def signature(self, obj):
+        return self.global_sync.related_signature(obj.attachments.all())
+
     def sync_event(self, lang, event):
         self.global_sync.sync_metas(lang, tourism_views.TouristicEventMeta, event)
         self.global_sync.sync_pdf(lang, event,
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0049_alter_touristiccontentcategory_color'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='touristiccontent',
+            index=models.Index(fields=['date_update', 'id'], name='touristiccontent_update_idx'),
+        ),
+    ]
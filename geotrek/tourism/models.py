@@ -288,6 +288,10 @@ class TouristicContent(ZoningPropertiesMixin, AddPropertyMixin, PublishableMixin
     class Meta:
         verbose_name = _("Touristic content")
         verbose_name_plural = _("Touristic contents")
+        indexes = [
+            # Keyset pagination of API (see StandardResultsSetPagination)
+            models.Index(name='touristiccontent_update_idx', fields=['date_update', 'id']),
+        ]
 
     def __str__(self):
         return self.name
@@ -625,12 +625,13 @@ class EspritParcParser(AttachmentParserMixin, TouristicContentMixin, Parser):
             if isinstance(val, str):
                 val = [val]
             for subval in val:
-                try:
-                    dst.append(TouristicContentType1.objects.get(category=self.obj.category, label=subval))
-                except TouristicContentType1.DoesNotExist:
+                type1, created = self.lookup(TouristicContentType1, {'category': self.obj.category, 'label': subval})
+                if type1 is None:
                     self.add_warning(
                         _("Type 1 '{subval}' does not exist for category '{cat}'. Please add it").format(
                             subval=subval, cat=self.obj.category.label))
+                else:
+                    dst.append(type1)
         return dst
 
     def filter_type2(self, src, val):
@@ -639,12 +640,13 @@ class EspritParcParser(AttachmentParserMixin, TouristicContentMixin, Parser):
             if isinstance(val, str):
                 val = [val]
             for subval in val:
-                try:
-                    dst.append(TouristicContentType2.objects.get(category=self.obj.category, label=subval))
-                except TouristicContentType2.DoesNotExist:
+                type2, created = self.lookup(TouristicContentType2, {'category': self.obj.category, 'label': subval})
+                if type2 is None:
                     self.add_warning(
                         _("Type 2 '{subval}' does not exist for category '{cat}'. Please add it").format(
                             subval=subval, cat=self.obj.category.label))
+                else:
+                    dst.append(type2)
         return dst
 
 
@@ -758,8 +760,8 @@ class TouristicContentTourInSoftParserV3withMedias(TouristicContentTourInSoftPar
         'attachments': 'MediaPhotoss',
     }
 
-    def get_nb(self):
-        return int(len(self.root['value']))
+    def get_nb(self, root):
+        return int(len(root['value']))
 
     def filter_attachments(self, src, val):
         if not val:
@@ -0,0 +1,52 @@
+-------------------------------------------------------------------------------
+-- Full-text search documents
+-------------------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.search_touristiccontent_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    {% for lang in MODELTRANSLATION_LANGUAGES %}
+    PERFORM ft_search_document_update('tourism.touristiccontent', NEW.id, '{{ lang }}',
+        ft_search_vector('{{ lang }}', NEW.name_{{ lang }}, NEW.description_teaser_{{ lang }}, NEW.description_{{ lang }}));
+    {% endfor %}
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tourism_touristiccontent_30_search_iu_tgr
+AFTER INSERT OR UPDATE OF {% for lang in MODELTRANSLATION_LANGUAGES %}name_{{ lang }}, description_teaser_{{ lang }}, description_{{ lang }}{% if not forloop.last %}, {% endif %}{% endfor %} ON tourism_touristiccontent
+FOR EACH ROW EXECUTE PROCEDURE search_touristiccontent_iu();
+
+CREATE TRIGGER tourism_touristiccontent_30_search_d_tgr
+AFTER DELETE ON tourism_touristiccontent
+FOR EACH ROW EXECUTE PROCEDURE search_document_d('tourism.touristiccontent', 'id');
+
+{% for lang in MODELTRANSLATION_LANGUAGES %}
+SELECT ft_search_document_update('tourism.touristiccontent', id, '{{ lang }}',
+    ft_search_vector('{{ lang }}', name_{{ lang }}, description_teaser_{{ lang }}, description_{{ lang }}))
+FROM tourism_touristiccontent;
+{% endfor %}
+
+
+CREATE FUNCTION {{ schema_geotrek }}.search_touristicevent_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    {% for lang in MODELTRANSLATION_LANGUAGES %}
+    PERFORM ft_search_document_update('tourism.touristicevent', NEW.id, '{{ lang }}',
+        ft_search_vector('{{ lang }}', NEW.name_{{ lang }}, NEW.description_teaser_{{ lang }}, NEW.description_{{ lang }}));
+    {% endfor %}
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tourism_touristicevent_30_search_iu_tgr
+AFTER INSERT OR UPDATE OF {% for lang in MODELTRANSLATION_LANGUAGES %}name_{{ lang }}, description_teaser_{{ lang }}, description_{{ lang }}{% if not forloop.last %}, {% endif %}{% endfor %} ON tourism_touristicevent
+FOR EACH ROW EXECUTE PROCEDURE search_touristicevent_iu();
+
+CREATE TRIGGER tourism_touristicevent_30_search_d_tgr
+AFTER DELETE ON tourism_touristicevent
+FOR EACH ROW EXECUTE PROCEDURE search_document_d('tourism.touristicevent', 'id');
+
+{% for lang in MODELTRANSLATION_LANGUAGES %}
+SELECT ft_search_document_update('tourism.touristicevent', id, '{{ lang }}',
+    ft_search_vector('{{ lang }}', name_{{ lang }}, description_teaser_{{ lang }}, description_{{ lang }}))
+FROM tourism_touristicevent;
+{% endfor %}
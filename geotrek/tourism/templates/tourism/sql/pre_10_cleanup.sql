@@ -3,4 +3,9 @@ DROP TABLE IF EXISTS t_t_source_donnees;  -- legacy (removed without migration ?
 --20
 
 DROP VIEW IF EXISTS v_touristiccontents CASCADE;
-DROP VIEW IF EXISTS v_touristicevents CASCADE;
\ No newline at end of file
+DROP VIEW IF EXISTS v_touristicevents CASCADE;
+
+--30
+
+DROP FUNCTION IF EXISTS search_touristiccontent_iu() CASCADE;
+DROP FUNCTION IF EXISTS search_touristicevent_iu() CASCADE;
@@ -368,11 +368,12 @@ class TouristicEventViewsTests(GeotrekAPITestCase, CommonTest):
         total_count = sum(map(attrgetter('count'), counts))
         self.assertEqual(event.participants_total, total_count)
         self.assertEqual(event.participants_total_verbose_name, "Number of participants")
-        with self.assertNumQueries(15):
+        with self.assertNumQueries(14):
             response = self.client.get(event.get_format_list_url())
+            content = response.getvalue()
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get('Content-Type'), 'text/csv')
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(content.decode("utf-8")), delimiter=',')
         for row in reader:
             if row['ID'] == event.pk:
                 self.assertEqual(row['Number of participants'], total_count)
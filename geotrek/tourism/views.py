@@ -19,7 +19,7 @@ from rest_framework.views import APIView
 
 from geotrek.authent.decorators import same_structure_required
 from geotrek.common.mixins.api import APIViewSet
-from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, MetaMixin
+from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, MetaMixin, StreamingFormatMixin
 from geotrek.common.models import RecordSource, TargetPortal
 from geotrek.common.views import DocumentPublic, DocumentBookletPublic, MarkupPublic
 from geotrek.common.viewsets import GeotrekMapentityViewSet
@@ -52,7 +52,7 @@ class TouristicContentList(CustomColumnsMixin, MapEntityList):
         return TouristicContentCategory.objects.filter(pk__in=used)
 
 
-class TouristicContentFormatList(MapEntityFormat, TouristicContentList):
+class TouristicContentFormatList(StreamingFormatMixin, MapEntityFormat, TouristicContentList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'eid', 'name', 'category', 'type1', 'type2', 'description_teaser',
@@ -195,7 +195,7 @@ class TouristicEventList(CustomColumnsMixin, MapEntityList):
     searchable_columns = ['id', 'name']
 
 
-class TouristicEventFormatList(MapEntityFormat, TouristicEventList):
+class TouristicEventFormatList(StreamingFormatMixin, MapEntityFormat, TouristicEventList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'eid', 'name', 'type', 'description_teaser', 'description', 'themes',
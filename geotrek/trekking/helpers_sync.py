@@ -4,6 +4,7 @@ from django.db.models import Q
 import os
 from zipfile import ZipFile
 
+from geotrek.altimetry.helpers import AltimetryHelper
 from geotrek.common import views as common_views
 from geotrek.trekking import views
 from geotrek.trekking import models
@@ -41,8 +42,29 @@ class SyncRando:
         if self.global_sync.portal:
             treks = treks.filter(Q(portal__name=self.global_sync.portal) | Q(portal=None))
 
-        for trek in treks:
-            self.sync_detail(lang, trek)
+        self.global_sync.sync_json(lang, common_views.ParametersView, 'parameters', zipfile=self.global_sync.zipfile)
+        self.global_sync.sync_json(lang, common_views.ThemeViewSet, 'themes', as_view_args=[{'get': 'list'}],
+                                   zipfile=self.global_sync.zipfile)
+        # Compute elevation profiles at once, they are read from cache by profile views
+        AltimetryHelper.elevation_profiles(treks)
+        if settings.TREKKING_TOPOLOGY_ENABLED:
+            # Compute POIs of all treks with one query
+            treks = models.POI.prefetch_overlapping(treks)
+        self.global_sync.sync_objects(lang, self.sync_detail, treks, signature=self.signature)
+
+    def signature(self, trek):
+        """ Related objects rendered with trek details, whose changes do not update the trek """
+        related = [trek.parents, trek.children, trek.pois, trek.services, trek.information_desks.all(),
+                   trek.attachments.all()]
+        if self.global_sync.with_events:
+            related.append(trek.touristic_events)
+        if self.global_sync.categories:
+            related.append(trek.touristic_contents)
+        if self.global_sync.with_infrastructures:
+            related.append(trek.infrastructures)
+        if self.global_sync.with_signages:
+            related.append(trek.signages)
+        return self.global_sync.related_signature(*related)
 
     def sync_detail(self, lang, trek):
         zipname = os.path.join('zip', 'treks', lang, '{pk}.zip'.format(pk=trek.pk))
@@ -50,9 +72,6 @@ class SyncRando:
         self.global_sync.mkdirs(zipfullname)
         self.trek_zipfile = ZipFile(zipfullname, 'w')
 
-        self.global_sync.sync_json(lang, common_views.ParametersView, 'parameters', zipfile=self.global_sync.zipfile)
-        self.global_sync.sync_json(lang, common_views.ThemeViewSet, 'themes', as_view_args=[{'get': 'list'}],
-                                   zipfile=self.global_sync.zipfile)
         self.sync_trek_pois(lang, trek, zipfile=self.global_sync.zipfile)
         if self.global_sync.with_infrastructures:
             self.sync_trek_infrastructures(lang, trek)
@@ -62,7 +81,6 @@ class SyncRando:
         self.sync_trek_gpx(lang, trek)
         self.sync_trek_kml(lang, trek)
         self.global_sync.sync_metas(lang, views.TrekMeta, trek)
-        self.global_sync.sync_metas(lang, common_views.Meta)
         if settings.USE_BOOKLET_PDF:
             self.global_sync.sync_pdf(lang, trek, views.TrekDocumentBookletPublic.as_view(model=type(trek)))
         else:
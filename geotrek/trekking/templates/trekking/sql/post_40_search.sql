@@ -0,0 +1,54 @@
+-------------------------------------------------------------------------------
+-- Full-text search documents
+-------------------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.search_trek_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    {% for lang in MODELTRANSLATION_LANGUAGES %}
+    PERFORM ft_search_document_update('trekking.trek', NEW.topo_object_id, '{{ lang }}',
+        ft_search_vector('{{ lang }}', NEW.name_{{ lang }}, NEW.description_teaser_{{ lang }},
+                         concat_ws(' ', NEW.description_{{ lang }}, NEW.ambiance_{{ lang }})));
+    {% endfor %}
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trekking_trek_40_search_iu_tgr
+AFTER INSERT OR UPDATE OF {% for lang in MODELTRANSLATION_LANGUAGES %}name_{{ lang }}, description_teaser_{{ lang }}, description_{{ lang }}, ambiance_{{ lang }}{% if not forloop.last %}, {% endif %}{% endfor %} ON trekking_trek
+FOR EACH ROW EXECUTE PROCEDURE search_trek_iu();
+
+CREATE TRIGGER trekking_trek_40_search_d_tgr
+AFTER DELETE ON trekking_trek
+FOR EACH ROW EXECUTE PROCEDURE search_document_d('trekking.trek', 'topo_object_id');
+
+{% for lang in MODELTRANSLATION_LANGUAGES %}
+SELECT ft_search_document_update('trekking.trek', topo_object_id, '{{ lang }}',
+    ft_search_vector('{{ lang }}', name_{{ lang }}, description_teaser_{{ lang }},
+                     concat_ws(' ', description_{{ lang }}, ambiance_{{ lang }})))
+FROM trekking_trek;
+{% endfor %}
+
+
+CREATE FUNCTION {{ schema_geotrek }}.search_poi_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    {% for lang in MODELTRANSLATION_LANGUAGES %}
+    PERFORM ft_search_document_update('trekking.poi', NEW.topo_object_id, '{{ lang }}',
+        ft_search_vector('{{ lang }}', NEW.name_{{ lang }}, NULL, NEW.description_{{ lang }}));
+    {% endfor %}
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trekking_poi_40_search_iu_tgr
+AFTER INSERT OR UPDATE OF {% for lang in MODELTRANSLATION_LANGUAGES %}name_{{ lang }}, description_{{ lang }}{% if not forloop.last %}, {% endif %}{% endfor %} ON trekking_poi
+FOR EACH ROW EXECUTE PROCEDURE search_poi_iu();
+
+CREATE TRIGGER trekking_poi_40_search_d_tgr
+AFTER DELETE ON trekking_poi
+FOR EACH ROW EXECUTE PROCEDURE search_document_d('trekking.poi', 'topo_object_id');
+
+{% for lang in MODELTRANSLATION_LANGUAGES %}
+SELECT ft_search_document_update('trekking.poi', topo_object_id, '{{ lang }}',
+    ft_search_vector('{{ lang }}', name_{{ lang }}, NULL, description_{{ lang }}))
+FROM trekking_poi;
+{% endfor %}
@@ -13,4 +13,9 @@ DROP FUNCTION IF EXISTS cleanup_relationships_d() CASCADE;
 DROP VIEW IF EXISTS o_v_itineraire CASCADE;
 DROP VIEW IF EXISTS v_treks CASCADE;
 DROP VIEW IF EXISTS o_v_poi CASCADE;
-DROP VIEW IF EXISTS v_pois CASCADE;
\ No newline at end of file
+DROP VIEW IF EXISTS v_pois CASCADE;
+
+-- 40
+
+DROP FUNCTION IF EXISTS search_trek_iu() CASCADE;
+DROP FUNCTION IF EXISTS search_poi_iu() CASCADE;
@@ -1,5 +1,6 @@
 import csv
 import hashlib
+import json
 import os
 from collections import OrderedDict
 from io import StringIO
@@ -185,8 +186,8 @@ class POIViewsTest(GeotrekAPITestCase, CommonTest):
         with self.assertNumQueries(5):
             self.client.get(self.model.get_datatablelist_url())
 
-        with self.assertNumQueries(8):
-            self.client.get(self.model.get_format_list_url())
+        with self.assertNumQueries(4):
+            self.client.get(self.model.get_format_list_url()).getvalue()
 
     def test_list_in_csv(self):
         self.modelfactory.create()
@@ -196,7 +197,7 @@ class POIViewsTest(GeotrekAPITestCase, CommonTest):
                                geom="SRID=2154;MULTIPOLYGON (((200000 750000, 699991 6600005, 700005 "
                                     "6600005, 650000 1200000, 650000 750000, 200000 750000)))")
         response = self.client.get(self.model.get_format_list_url())
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         for row in reader:
             self.assertSetEqual({elem for elem in row['Districts'].split(', ')}, {'Trifouilli', 'Refouilli'})
 
@@ -514,7 +515,7 @@ class TrekViewsTest(GeotrekAPITestCase, CommonTest):
         self.assertEqual(response.get('Content-Type'), 'text/csv')
 
         # Read the csv
-        reader = csv.DictReader(StringIO(response.content.decode("utf-8")), delimiter=',')
+        reader = csv.DictReader(StringIO(response.getvalue().decode("utf-8")), delimiter=',')
         for row in reader:
             self.assertEqual(row['Cities'], "Trifouilli, Refouilli")
             self.assertEqual(row['Districts'], self.district.name)
@@ -539,6 +540,35 @@ class TrekViewsLiveTests(CommonLiveTest):
     userfactory = SuperUserFactory
 
 
+class TrekLayerTest(TrekkingManagerTest):
+    def setUp(self):
+        self.login()
+
+    def test_layer_is_cached(self):
+        trek = TrekFactory.create(name="Trek", published=True)
+        response = self.client.get(trek.get_layer_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        layer = response.json()
+        self.assertEqual(layer['type'], 'FeatureCollection')
+        self.assertEqual(len(layer['features']), 1)
+        self.assertEqual(layer['features'][0]['properties'], {'id': trek.pk, 'name': "Trek", 'published': True})
+        self.assertEqual(layer['features'][0]['geometry']['type'], 'LineString')
+        self.assertEqual(self.client.get(trek.get_layer_url()).json(), layer)
+        trek.name = "Modified"
+        trek.save()
+        layer = self.client.get(trek.get_layer_url()).json()
+        self.assertEqual(layer['features'][0]['properties']['name'], "Modified")
+
+    def test_filtered_layer_is_streamed(self):
+        trek = TrekFactory.create(name="Trek", published=True)
+        response = self.client.get(trek.get_layer_url(), {'published': 'True'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        layer = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(layer['features']), 1)
+
+
 class TrekCustomViewTests(TrekkingManagerTest):
     def setUp(self):
         self.login()
@@ -1519,7 +1549,7 @@ class ServiceViewsTest(GeotrekAPITestCase, CommonTest):
             self.client.get(self.model.get_datatablelist_url())
 
         with self.assertNumQueries(4):
-            self.client.get(self.model.get_format_list_url())
+            self.client.get(self.model.get_format_list_url()).getvalue()
 
     def test_services_on_treks_do_not_exist(self):
         self.modelfactory.create()
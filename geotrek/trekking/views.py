@@ -19,7 +19,7 @@ from geotrek.authent.decorators import same_structure_required
 from geotrek.common.forms import AttachmentAccessibilityForm
 from geotrek.common.mixins.api import APIViewSet
 from geotrek.common.mixins.forms import FormsetMixin
-from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, MetaMixin
+from geotrek.common.mixins.views import CompletenessMixin, CustomColumnsMixin, MetaMixin, StreamingFormatMixin
 from geotrek.common.models import Attachment, HDViewPoint, RecordSource, TargetPortal, Label
 from geotrek.common.permissions import PublicOrReadPermMixin
 from geotrek.common.views import DocumentPublic, DocumentBookletPublic, MarkupPublic
@@ -30,7 +30,6 @@ from geotrek.infrastructure.models import Infrastructure
 from geotrek.infrastructure.serializers import InfrastructureAPIGeojsonSerializer
 from geotrek.signage.models import Signage
 from geotrek.signage.serializers import SignageAPIGeojsonSerializer
-from geotrek.zoning.models import District, City, RestrictedArea
 
 from .filters import TrekFilterSet, POIFilterSet, ServiceFilterSet
 from .forms import TrekForm, TrekRelationshipFormSet, POIForm, WebLinkCreateFormPopup, ServiceForm
@@ -63,7 +62,7 @@ class TrekList(CustomColumnsMixin, FlattenPicturesMixin, MapEntityList):
     searchable_columns = ['id', 'name', 'departure', 'arrival']
 
 
-class TrekFormatList(MapEntityFormat, TrekList):
+class TrekFormatList(StreamingFormatMixin, MapEntityFormat, TrekList):
     mandatory_columns = ['id', 'name']
     default_extra_columns = [
         'eid', 'eid2', 'structure', 'departure', 'arrival', 'duration', 'duration_pretty', 'description',
@@ -190,7 +189,7 @@ class TrekDocumentPublicMixin:
         # Prepare altimetric graph
         trek = self.get_object()
         language = self.request.LANGUAGE_CODE
-        trek.prepare_elevation_chart(language, self.request.build_absolute_uri('/'))
+        trek.prepare_elevation_chart(language)
         return super().render_to_response(context, **response_kwargs)
 
 
@@ -244,11 +243,24 @@ class TrekViewSet(GeotrekMapentityViewSet):
     geojson_serializer_class = TrekGeojsonSerializer
     filterset_class = TrekFilterSet
     mapentity_list_class = TrekList
+    geojson_layer_properties = ('id', 'name', 'published')
+
+    def view_cache_key(self):
+        """Used by ``geojson_layer()`` to cache the layer when it is not filtered."""
+        language = self.request.LANGUAGE_CODE
+        latest_saved = Trek.latest_updated()
+        geojson_lookup = None
+
+        if latest_saved:
+            geojson_lookup = '%s_trek_%s_json_layer' % (
+                language,
+                latest_saved.strftime('%y%m%d%H%M%S%f'),
+            )
+        return geojson_lookup
 
     def get_queryset(self):
         qs = self.model.objects.existing()
         if self.format_kwarg == 'geojson':
-            qs = qs.annotate(api_geom=Transform('geom', settings.API_SRID))
             qs = qs.only('id', 'name', 'published')
         else:
             qs = qs.prefetch_related('attachments')
@@ -293,7 +305,7 @@ class POIList(CustomColumnsMixin, FlattenPicturesMixin, MapEntityList):
     searchable_columns = ['id', 'name', ]
 
 
-class POIFormatList(MapEntityFormat, POIList):
+class POIFormatList(StreamingFormatMixin, MapEntityFormat, POIList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'structure', 'eid', 'name', 'type', 'description', 'treks',
@@ -302,33 +314,9 @@ class POIFormatList(MapEntityFormat, POIList):
         'cities', 'districts', 'areas', 'uuid',
     ] + AltimetryMixin.COLUMNS
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-
-        denormalized = {}
-
-        # Since Land layers should have less records, start by them.
-        land_layers = [('districts', District),
-                       ('cities', City),
-                       ('areas', RestrictedArea)]
-        for attrname, land_layer in land_layers:
-            denormalized[attrname] = {}
-            for d in land_layer.objects.all():
-                overlapping = POI.objects.existing().filter(geom__within=d.geom)
-                for pid in overlapping.values_list('id', flat=True):
-                    denormalized[attrname].setdefault(pid, []).append(str(d))
-
-        # Same for treks
-        denormalized['treks'] = {}
-        for d in Trek.objects.existing():
-            for pid in d.pois.all():
-                denormalized['treks'].setdefault(pid, []).append(d)
-        for poi in qs:
-            # Put denormalized in specific attribute used in serializers
-            for attrname in denormalized.keys():
-                overlapping = denormalized[attrname].get(poi.id, [])
-                setattr(poi, '%s_csv_display' % attrname, ', '.join(overlapping))
-            yield poi
+    def prefetch_export(self, objects):
+        if settings.TREKKING_TOPOLOGY_ENABLED and 'treks' in self.columns:
+            Trek.prefetch_overlapping(objects)
 
 
 class POIDetail(CompletenessMixin, MapEntityDetail):
@@ -458,7 +446,7 @@ class ServiceList(CustomColumnsMixin, MapEntityList):
     searchable_columns = ['id']
 
 
-class ServiceFormatList(MapEntityFormat, ServiceList):
+class ServiceFormatList(StreamingFormatMixin, MapEntityFormat, ServiceList):
     mandatory_columns = ['id']
     default_extra_columns = [
         'id', 'eid', 'type', 'uuid',
@@ -0,0 +1,73 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def intersections_sql(table, zone_table, zone_field, zone_pk):
+    return f"""
+        INSERT INTO {table} (topology_id, {zone_field}, "order")
+        SELECT t.id, z.{zone_pk},
+               CASE WHEN GeometryType(t.geom) = 'LINESTRING' THEN COALESCE(
+                   (SELECT min(ST_LineLocatePoint(t.geom, COALESCE(ST_StartPoint(d.geom), d.geom)))
+                    FROM ST_Dump(ST_Intersection(t.geom, z.geom)) AS d
+                    WHERE GeometryType(d.geom) IN ('LINESTRING', 'POINT')), 0)
+               ELSE 0 END
+        FROM core_topology t JOIN {zone_table} z ON ST_Intersects(t.geom, z.geom)
+        WHERE t.kind != 'TMP';
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_auto_20230503_0837'),
+        ('zoning', '0103_alter_restrictedarea_area_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityIntersection',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.FloatField(default=0)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intersections', to='zoning.city')),
+                ('topology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='city_intersections', to='core.topology')),
+            ],
+            options={
+                'ordering': ['order', 'city__name'],
+                'unique_together': {('topology', 'city')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DistrictIntersection',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.FloatField(default=0)),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intersections', to='zoning.district')),
+                ('topology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='district_intersections', to='core.topology')),
+            ],
+            options={
+                'ordering': ['order', 'district__name'],
+                'unique_together': {('topology', 'district')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RestrictedAreaIntersection',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.FloatField(default=0)),
+                ('restricted_area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intersections', to='zoning.restrictedarea')),
+                ('topology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='restrictedarea_intersections', to='core.topology')),
+            ],
+            options={
+                'ordering': ['order', 'restricted_area__area_type', 'restricted_area__name'],
+                'unique_together': {('topology', 'restricted_area')},
+            },
+        ),
+        # Intersections are then maintained by triggers (see post_30_intersections.sql)
+        migrations.RunSQL(intersections_sql('zoning_cityintersection', 'zoning_city', 'city_id', 'code'),
+                          migrations.RunSQL.noop),
+        migrations.RunSQL(intersections_sql('zoning_districtintersection', 'zoning_district', 'district_id', 'id'),
+                          migrations.RunSQL.noop),
+        migrations.RunSQL(intersections_sql('zoning_restrictedareaintersection', 'zoning_restrictedarea', 'restricted_area_id', 'id'),
+                          migrations.RunSQL.noop),
+    ]
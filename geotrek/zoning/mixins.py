@@ -1,10 +1,11 @@
 import hashlib
 
 from django.core.cache import cache
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 
 from geotrek.common.utils import intersecting, uniquify
-from .models import RestrictedArea, District, City
+from .models import RestrictedArea, District, City, CityIntersection, DistrictIntersection, RestrictedAreaIntersection
 
 
 class ZoningPropertiesMixin:
@@ -14,7 +15,40 @@ class ZoningPropertiesMixin:
     def zoning_property(self):
         return self
 
+    @classmethod
+    def zoning_prefetches(cls, prefix=''):
+        """
+        Prefetch objects loading precomputed cities, districts and restricted areas
+        of topologies in bulk, e.g. ``qs.prefetch_related(*Trek.zoning_prefetches())``.
+        """
+        return [
+            Prefetch(f'{prefix}city_intersections',
+                     queryset=CityIntersection.objects.select_related('city').defer('city__geom')),
+            Prefetch(f'{prefix}district_intersections',
+                     queryset=DistrictIntersection.objects.select_related('district').defer('district__geom')),
+            Prefetch(f'{prefix}restrictedarea_intersections',
+                     queryset=RestrictedAreaIntersection.objects.select_related(
+                         'restricted_area', 'restricted_area__area_type').defer('restricted_area__geom')),
+        ]
+
+    def get_intersections(self, related_name, field):
+        """
+        Return zones of topologies from precomputed intersections (see
+        ``post_30_intersections.sql``), or None if not available for this object.
+        """
+        obj = self.zoning_property
+        if obj is None or obj.pk is None or not hasattr(obj, related_name):
+            return None
+        if related_name in getattr(obj, '_prefetched_objects_cache', {}):
+            intersections = getattr(obj, related_name).all()
+        else:
+            intersections = getattr(obj, related_name).select_related(field).defer(f'{field}__geom')
+        return uniquify(getattr(intersection, field) for intersection in intersections)
+
     def get_areas(self):
+        areas = self.get_intersections('restrictedarea_intersections', 'restricted_area')
+        if areas is not None:
+            return areas
         return uniquify(intersecting(RestrictedArea,
                                      self.zoning_property,
                                      distance=0,
@@ -22,6 +56,9 @@ class ZoningPropertiesMixin:
 
     @property
     def areas(self):
+        areas = self.get_intersections('restrictedarea_intersections', 'restricted_area')
+        if areas is not None:
+            return areas
         last_update_and_count = RestrictedArea.last_update_and_count
         last_update_iso_format = last_update_and_count['last_update'].isoformat() if last_update_and_count[
             'last_update'] else 'no-data'
@@ -35,10 +72,16 @@ class ZoningPropertiesMixin:
         return areas
 
     def get_districts(self):
+        districts = self.get_intersections('district_intersections', 'district')
+        if districts is not None:
+            return districts
         return uniquify(intersecting(District, self.zoning_property, distance=0, defer=('geom',)))
 
     @property
     def districts(self):
+        districts = self.get_intersections('district_intersections', 'district')
+        if districts is not None:
+            return districts
         last_update_and_count = District.last_update_and_count
         last_update_iso_format = last_update_and_count['last_update'].isoformat() if last_update_and_count['last_update'] else 'no-data'
         count = last_update_and_count['count']
@@ -51,15 +94,21 @@ class ZoningPropertiesMixin:
         return districts
 
     def get_cities(self):
+        cities = self.get_intersections('city_intersections', 'city')
+        if cities is not None:
+            return cities
         return uniquify(intersecting(City, self.zoning_property, distance=0, defer=('geom',)))
 
     @property
     def cities(self):
+        cities = self.get_intersections('city_intersections', 'city')
+        if cities is not None:
+            return cities
         last_update_and_count = City.last_update_and_count
         last_update_iso_format = last_update_and_count['last_update'].isoformat() if last_update_and_count[
             'last_update'] else 'no-data'
         count = last_update_and_count['count']
-        cache_string = f"areas:{self.pk}:{self.date_update.isoformat()}:{last_update_iso_format}:{count}"
+        cache_string = f"cities:{self.pk}:{self.date_update.isoformat()}:{last_update_iso_format}:{count}"
         cache_key = hashlib.md5(cache_string.encode("utf-8")).hexdigest()
         data = cache.get(cache_key)
         if data:
@@ -73,3 +73,42 @@ class District(TimeStampedModelMixin, models.Model):
 
     def __str__(self):
         return self.name
+
+
+class TopologyIntersection(models.Model):
+    """
+    Precomputed intersection between a topology and a zone, maintained by
+    triggers on topology and zone geometries (see ``post_30_intersections.sql``).
+    ``order`` is the position along linear topologies where the zone is entered.
+    """
+    order = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class CityIntersection(TopologyIntersection):
+    topology = models.ForeignKey('core.Topology', on_delete=models.CASCADE, related_name='city_intersections')
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name='intersections')
+
+    class Meta:
+        ordering = ['order', 'city__name']
+        unique_together = ('topology', 'city')
+
+
+class DistrictIntersection(TopologyIntersection):
+    topology = models.ForeignKey('core.Topology', on_delete=models.CASCADE, related_name='district_intersections')
+    district = models.ForeignKey(District, on_delete=models.CASCADE, related_name='intersections')
+
+    class Meta:
+        ordering = ['order', 'district__name']
+        unique_together = ('topology', 'district')
+
+
+class RestrictedAreaIntersection(TopologyIntersection):
+    topology = models.ForeignKey('core.Topology', on_delete=models.CASCADE, related_name='restrictedarea_intersections')
+    restricted_area = models.ForeignKey(RestrictedArea, on_delete=models.CASCADE, related_name='intersections')
+
+    class Meta:
+        ordering = ['order', 'restricted_area__area_type', 'restricted_area__name']
+        unique_together = ('topology', 'restricted_area')
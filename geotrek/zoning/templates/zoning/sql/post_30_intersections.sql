@@ -0,0 +1,148 @@
+-------------------------------------------------------------------------------
+-- Keep intersections between topologies and zones up-to-date
+-------------------------------------------------------------------------------
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_intersection_order(line geometry, zone geometry) RETURNS float AS $$
+    -- Position along a line where it enters the zone (0 for other geometries)
+    SELECT CASE
+        WHEN GeometryType(line) = 'LINESTRING' THEN COALESCE(
+            (SELECT min(ST_LineLocatePoint(line, COALESCE(ST_StartPoint(d.geom), d.geom)))
+             FROM ST_Dump(ST_Intersection(line, zone)) AS d
+             WHERE GeometryType(d.geom) IN ('LINESTRING', 'POINT')), 0)
+        ELSE 0
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_update_topology_intersections(t_id integer) RETURNS void AS $$
+BEGIN
+    DELETE FROM zoning_cityintersection WHERE topology_id = t_id;
+    DELETE FROM zoning_districtintersection WHERE topology_id = t_id;
+    DELETE FROM zoning_restrictedareaintersection WHERE topology_id = t_id;
+
+    INSERT INTO zoning_cityintersection (topology_id, city_id, "order")
+        SELECT t.id, z.code, zoning_intersection_order(t.geom, z.geom)
+        FROM core_topology t JOIN zoning_city z ON ST_Intersects(t.geom, z.geom)
+        WHERE t.id = t_id;
+    INSERT INTO zoning_districtintersection (topology_id, district_id, "order")
+        SELECT t.id, z.id, zoning_intersection_order(t.geom, z.geom)
+        FROM core_topology t JOIN zoning_district z ON ST_Intersects(t.geom, z.geom)
+        WHERE t.id = t_id;
+    INSERT INTO zoning_restrictedareaintersection (topology_id, restricted_area_id, "order")
+        SELECT t.id, z.id, zoning_intersection_order(t.geom, z.geom)
+        FROM core_topology t JOIN zoning_restrictedarea z ON ST_Intersects(t.geom, z.geom)
+        WHERE t.id = t_id;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_topology_intersections_iu() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.geom IS NOT DISTINCT FROM NEW.geom THEN
+        RETURN NULL;
+    END IF;
+    PERFORM zoning_update_topology_intersections(NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER zoning_topology_intersections_iu_tgr
+AFTER INSERT OR UPDATE OF geom ON core_topology
+FOR EACH ROW
+WHEN (NEW.kind != 'TMP')
+EXECUTE PROCEDURE zoning_topology_intersections_iu();
+
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_topology_intersections_d() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    DELETE FROM zoning_cityintersection WHERE topology_id = OLD.id;
+    DELETE FROM zoning_districtintersection WHERE topology_id = OLD.id;
+    DELETE FROM zoning_restrictedareaintersection WHERE topology_id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER zoning_topology_intersections_d_tgr
+BEFORE DELETE ON core_topology
+FOR EACH ROW EXECUTE PROCEDURE zoning_topology_intersections_d();
+
+
+-- Cities
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_city_intersections_iud() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP != 'INSERT' THEN
+        DELETE FROM zoning_cityintersection WHERE city_id = OLD.code;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO zoning_cityintersection (topology_id, city_id, "order")
+        SELECT t.id, NEW.code, zoning_intersection_order(t.geom, NEW.geom)
+        FROM core_topology t
+        WHERE ST_Intersects(t.geom, NEW.geom) AND t.kind != 'TMP';
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER zoning_city_intersections_iu_tgr
+AFTER INSERT OR UPDATE OF code, geom ON zoning_city
+FOR EACH ROW EXECUTE PROCEDURE zoning_city_intersections_iud();
+
+CREATE TRIGGER zoning_city_intersections_d_tgr
+BEFORE DELETE ON zoning_city
+FOR EACH ROW EXECUTE PROCEDURE zoning_city_intersections_iud();
+
+
+-- Districts
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_district_intersections_iud() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP != 'INSERT' THEN
+        DELETE FROM zoning_districtintersection WHERE district_id = OLD.id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO zoning_districtintersection (topology_id, district_id, "order")
+        SELECT t.id, NEW.id, zoning_intersection_order(t.geom, NEW.geom)
+        FROM core_topology t
+        WHERE ST_Intersects(t.geom, NEW.geom) AND t.kind != 'TMP';
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER zoning_district_intersections_iu_tgr
+AFTER INSERT OR UPDATE OF geom ON zoning_district
+FOR EACH ROW EXECUTE PROCEDURE zoning_district_intersections_iud();
+
+CREATE TRIGGER zoning_district_intersections_d_tgr
+BEFORE DELETE ON zoning_district
+FOR EACH ROW EXECUTE PROCEDURE zoning_district_intersections_iud();
+
+
+-- Restricted areas
+
+CREATE FUNCTION {{ schema_geotrek }}.zoning_restrictedarea_intersections_iud() RETURNS trigger SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP != 'INSERT' THEN
+        DELETE FROM zoning_restrictedareaintersection WHERE restricted_area_id = OLD.id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO zoning_restrictedareaintersection (topology_id, restricted_area_id, "order")
+        SELECT t.id, NEW.id, zoning_intersection_order(t.geom, NEW.geom)
+        FROM core_topology t
+        WHERE ST_Intersects(t.geom, NEW.geom) AND t.kind != 'TMP';
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER zoning_restrictedarea_intersections_iu_tgr
+AFTER INSERT OR UPDATE OF geom ON zoning_restrictedarea
+FOR EACH ROW EXECUTE PROCEDURE zoning_restrictedarea_intersections_iud();
+
+CREATE TRIGGER zoning_restrictedarea_intersections_d_tgr
+BEFORE DELETE ON zoning_restrictedarea
+FOR EACH ROW EXECUTE PROCEDURE zoning_restrictedarea_intersections_iud();
@@ -19,3 +19,13 @@ DROP VIEW IF EXISTS f_v_secteur CASCADE;
 DROP VIEW IF EXISTS v_districts CASCADE;
 DROP VIEW IF EXISTS f_v_zonage CASCADE;
 DROP VIEW IF EXISTS v_restrictedareas CASCADE;
+
+-- 30
+
+DROP FUNCTION IF EXISTS zoning_intersection_order(geometry, geometry) CASCADE;
+DROP FUNCTION IF EXISTS zoning_update_topology_intersections(integer) CASCADE;
+DROP FUNCTION IF EXISTS zoning_topology_intersections_iu() CASCADE;
+DROP FUNCTION IF EXISTS zoning_topology_intersections_d() CASCADE;
+DROP FUNCTION IF EXISTS zoning_city_intersections_iud() CASCADE;
+DROP FUNCTION IF EXISTS zoning_district_intersections_iud() CASCADE;
+DROP FUNCTION IF EXISTS zoning_restrictedarea_intersections_iud() CASCADE;
@@ -2,7 +2,9 @@ from django.conf import settings
 from django.test import TestCase
 
 from geotrek.core.tests.factories import PathFactory
+from geotrek.trekking.models import Trek
 from geotrek.trekking.tests.factories import TrekFactory
+from geotrek.zoning.models import CityIntersection
 from geotrek.zoning.tests.factories import CityFactory, DistrictFactory, RestrictedAreaFactory
 
 
@@ -89,3 +91,23 @@ class ZoningPropertiesMixinTest(TestCase):
         self.assertEqual(len(self.path.areas), 2)
         self.assertQuerysetEqual(self.path.published_areas, [repr(area), repr(self.area)])
         self.assertEqual(len(self.path.published_areas), 2)
+
+    def test_trek_intersections_follow_zones(self):
+        self.assertEqual(list(CityIntersection.objects.filter(topology=self.trek).values_list('city', flat=True)),
+                         [self.city.pk])
+        city = CityFactory.create(geom=self.geom_2_wkt)
+        self.assertEqual(self.trek.cities, [self.city, city])
+        city.delete()
+        self.assertEqual(self.trek.cities, [self.city])
+        self.city.geom = 'SRID=2154;MULTIPOLYGON(((0 0, 100000 0, 100000 100000, 0 100000, 0 0)))'
+        self.city.save()
+        self.assertEqual(self.trek.cities, [])
+
+    def test_trek_intersections_prefetched(self):
+        DistrictFactory.create(geom=self.geom_2_wkt)
+        with self.assertNumQueries(4):
+            trek = Trek.objects.prefetch_related(*Trek.zoning_prefetches()).get(pk=self.trek.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(trek.cities), 1)
+            self.assertEqual(len(trek.districts), 2)
+            self.assertEqual(len(trek.areas), 1)
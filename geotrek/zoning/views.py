@@ -1,7 +1,7 @@
-from django.contrib.gis.db.models.functions import Transform
 from django.shortcuts import get_object_or_404
 from django.views.decorators.cache import cache_page
 from django.conf import settings
+from django.http import HttpResponse
 from django.utils.decorators import method_decorator
 from rest_framework import permissions
 from rest_framework.generics import ListAPIView
@@ -9,17 +9,23 @@ from rest_framework.generics import ListAPIView
 from .models import City, RestrictedArea, RestrictedAreaType, District
 from .serializers import CitySerializer, RestrictedAreaSerializer, DistrictSerializer
 from ..common.functions import SimplifyPreserveTopology
+from ..common.utils.geojson import geojson_collection, geojson_features
 
 
 class LandGeoJSONAPIViewMixin(ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return self.model.objects.annotate(
-            api_geom=Transform(SimplifyPreserveTopology('geom',
-                                                        settings.LAYER_SIMPLIFY_LAND),
-                               settings.API_SRID)
-        ).defer('name', 'geom')
+        return self.model.objects.all()
+
+    def list(self, request, *args, **kwargs):
+        """ Render features from PostGIS GeoJSON, without building model instances nor geometries """
+        meta = self.get_serializer_class().Meta
+        properties = [field for field in meta.fields if field != meta.geo_field]
+        geometry = SimplifyPreserveTopology('geom', settings.LAYER_SIMPLIFY_LAND)
+        features = geojson_features(self.get_queryset(), properties, geometry=geometry,
+                                    precision=settings.LAYER_PRECISION_LAND)
+        return HttpResponse(''.join(geojson_collection(features)), content_type='application/json')
 
     @method_decorator(cache_page(settings.CACHE_TIMEOUT_LAND_LAYERS,
                                  cache=settings.MAPENTITY_CONFIG['GEOJSON_LAYERS_CACHE_BACKEND']))
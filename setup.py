@@ -65,6 +65,7 @@ setup(
         'drf-extensions',
         'django-colorfield',
         'Fiona',
+        'numpy',
         'markdown',
         "weasyprint==52.5",  # newer version required libpango (not available in bionic)
         'django-weasyprint<2.0.0',  # 2.10 require weasyprint > 53